@@ -0,0 +1,3 @@
+"""
+Analyses of parsed pieces and of corpora of pieces.
+"""
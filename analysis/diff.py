@@ -0,0 +1,262 @@
+"""
+Structural diff between two versions of a piece, at the event level.
+
+The sections of the pieces are paired by position and their voices by VoiceNum. The sections and voices with equal
+content hashes (see model.hashing) are skipped without looking at their events. The events of each changed voice are
+compared by their digests with Myers' O(ND) difference algorithm, in its linear-space form: the middle snake of the
+edit graph is found by searching forward and backward at the same time, and both halves are diffed recursively. Common
+prefixes and suffixes, the usual case of a revision, are stripped first.
+
+The result is an edit script per voice: the events inserted, deleted, and modified (a deleted event replaced by an
+event of the same class).
+
+Usage (from the repository root):
+    python -m analysis.diff OLD NEW
+"""
+import sys
+from typing import List, Sequence, Tuple
+
+from model import Piece
+from model.hashing import content_hash
+
+
+class EventEdit:
+    """
+    One edit of an event list. The indices are those of the event in the old and in the new list; for an insertion,
+    old_index is the position of the old list where the event is inserted, and for a deletion new_index is the
+    position of the new list where the event was.
+    """
+    INSERT = 'insert'
+    DELETE = 'delete'
+    MODIFY = 'modify'
+
+    def __init__(self, operation: str, old_index: int, new_index: int, old_event=None, new_event=None):
+        self.operation = operation
+        self.old_index = old_index
+        self.new_index = new_index
+        self.old_event = old_event
+        self.new_event = new_event
+
+    def __eq__(self, other):
+        if isinstance(other, EventEdit):
+            return (self.operation == other.operation and self.old_index == other.old_index and
+                    self.new_index == other.new_index and self.old_event == other.old_event and
+                    self.new_event == other.new_event)
+        return False
+
+    def __repr__(self):
+        return (f"EventEdit(Operation={self.operation}, OldIndex={self.old_index}, NewIndex={self.new_index}, "
+                f"OldEvent={self.old_event}, NewEvent={self.new_event})")
+
+
+class VoiceDiff:
+    """
+    The edits of a voice. A voice only in the new piece is 'added' (all its events are insertions), a voice only in
+    the old one 'removed'.
+    """
+    ADDED = 'added'
+    REMOVED = 'removed'
+    CHANGED = 'changed'
+
+    def __init__(self, section: int, voice_num: int, status: str, edits: List[EventEdit]):
+        self.section = section
+        self.voice_num = voice_num
+        self.status = status
+        self.edits = edits
+
+    def __repr__(self):
+        return (f"VoiceDiff(Section={self.section}, VoiceNum={self.voice_num}, Status={self.status}, "
+                f"Edits={len(self.edits)})")
+
+
+class PieceDiff:
+    """
+    The differences between two pieces: whether their metadata (CMME version, GeneralData, VoiceData) differ, the
+    sections that only one of them has, and the voices that changed.
+    """
+    def __init__(self, metadata_changed: bool, sections_added: List[int], sections_removed: List[int],
+                 voices: List[VoiceDiff]):
+        self.metadata_changed = metadata_changed
+        self.sections_added = sections_added
+        self.sections_removed = sections_removed
+        self.voices = voices
+
+    def __bool__(self):
+        return bool(self.metadata_changed or self.sections_added or self.sections_removed or self.voices)
+
+    def __repr__(self):
+        return (f"PieceDiff(MetadataChanged={self.metadata_changed}, SectionsAdded={self.sections_added}, "
+                f"SectionsRemoved={self.sections_removed}, Voices={self.voices})")
+
+
+def middle_snake(a: Sequence, a_low: int, a_high: int, b: Sequence, b_low: int,
+                 b_high: int) -> Tuple[int, int, int, int, int]:
+    """
+    Finds the middle snake of the shortest edit script of a[a_low:a_high] and b[b_low:b_high].
+
+    Returns:
+        The start (x, y) and the end (u, v) of the snake, relative to a_low and b_low, and the length of the edit
+        script.
+    """
+    n = a_high - a_low
+    m = b_high - b_low
+    delta = n - m
+    odd = delta % 2 == 1
+    offset = (n + m + 1) // 2 + 1
+    # Furthest x reached on each diagonal k (at index k + offset), forward and backward (from the ends)
+    forward = [0] * (2 * offset + 1)
+    backward = [0] * (2 * offset + 1)
+    for d in range(offset):
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and forward[k - 1 + offset] < forward[k + 1 + offset]):
+                x = forward[k + 1 + offset]
+            else:
+                x = forward[k - 1 + offset] + 1
+            y = x - k
+            start_x, start_y = x, y
+            while x < n and y < m and a[a_low + x] == b[b_low + y]:
+                x += 1
+                y += 1
+            forward[k + offset] = x
+            # The backward path on the same diagonal has reached x from the end
+            if odd and delta - (d - 1) <= k <= delta + (d - 1) and x + backward[delta - k + offset] >= n:
+                return start_x, start_y, x, y, 2 * d - 1
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and backward[k - 1 + offset] < backward[k + 1 + offset]):
+                x = backward[k + 1 + offset]
+            else:
+                x = backward[k - 1 + offset] + 1
+            y = x - k
+            start_x, start_y = x, y
+            while x < n and y < m and a[a_high - 1 - x] == b[b_high - 1 - y]:
+                x += 1
+                y += 1
+            backward[k + offset] = x
+            if not odd and -d <= delta - k <= d and x + forward[delta - k + offset] >= n:
+                return n - x, m - y, n - start_x, m - start_y, 2 * d
+    raise AssertionError("No middle snake")
+
+
+def add_matches(a: Sequence, a_low: int, a_high: int, b: Sequence, b_low: int, b_high: int,
+                found: List[Tuple[int, int]]):
+    # Common prefix and suffix
+    while a_low < a_high and b_low < b_high and a[a_low] == b[b_low]:
+        found.append((a_low, b_low))
+        a_low += 1
+        b_low += 1
+    suffix = []
+    while a_low < a_high and b_low < b_high and a[a_high - 1] == b[b_high - 1]:
+        a_high -= 1
+        b_high -= 1
+        suffix.append((a_high, b_high))
+
+    if a_low < a_high and b_low < b_high:
+        x, y, u, v, d = middle_snake(a, a_low, a_high, b, b_low, b_high)
+        if d > 1:
+            add_matches(a, a_low, a_low + x, b, b_low, b_low + y, found)
+            found.extend((a_low + x + step, b_low + y + step) for step in range(u - x))
+            add_matches(a, a_low + u, a_high, b, b_low + v, b_high, found)
+        else:
+            # One sequence is the other with one more item
+            i, j = a_low, b_low
+            while i < a_high and j < b_high:
+                if a[i] == b[j]:
+                    found.append((i, j))
+                    i += 1
+                    j += 1
+                elif a_high - i > b_high - j:
+                    i += 1
+                else:
+                    j += 1
+    found.extend(reversed(suffix))
+
+
+def matches(a: Sequence, b: Sequence) -> List[Tuple[int, int]]:
+    """
+    Returns a longest common subsequence of a and b, as the pairs of indices of its items in a and in b, in order.
+    """
+    found = []
+    add_matches(a, 0, len(a), b, 0, len(b), found)
+    return found
+
+
+def diff_events(old_events: Sequence, new_events: Sequence) -> List[EventEdit]:
+    """
+    Returns the edit script that turns a list of events into another, in the order of the lists.
+    """
+    old_digests = [content_hash(event) for event in old_events]
+    new_digests = [content_hash(event) for event in new_events]
+    edits = []
+    i = j = 0
+    for next_i, next_j in matches(old_digests, new_digests) + [(len(old_events), len(new_events))]:
+        # Between two matches, the events replaced by events of the same class are modified
+        while i < next_i and j < next_j and type(old_events[i]) is type(new_events[j]):
+            edits.append(EventEdit(EventEdit.MODIFY, i, j, old_events[i], new_events[j]))
+            i += 1
+            j += 1
+        for index in range(i, next_i):
+            edits.append(EventEdit(EventEdit.DELETE, index, j, old_events[index], None))
+        for index in range(j, next_j):
+            edits.append(EventEdit(EventEdit.INSERT, next_i, index, None, new_events[index]))
+        i, j = next_i + 1, next_j + 1
+    return edits
+
+
+def voice_events(voice) -> list:
+    return voice.event_list.events if voice.event_list is not None else []
+
+
+def diff_pieces(old: Piece, new: Piece) -> PieceDiff:
+    """
+    Compares two versions of a piece.
+    """
+    metadata_changed = (old.cmme_version != new.cmme_version or
+                        content_hash(old.general_data) != content_hash(new.general_data) or
+                        content_hash(old.voice_data) != content_hash(new.voice_data))
+    common = min(len(old.music_sections), len(new.music_sections))
+    voices = []
+    for section in range(common):
+        old_section, new_section = old.music_sections[section], new.music_sections[section]
+        if content_hash(old_section) == content_hash(new_section):
+            continue
+        old_voices = {voice.voice_num: voice for voice in old_section.content.voices}
+        new_voices = {voice.voice_num: voice for voice in new_section.content.voices}
+        for voice_num, old_voice in old_voices.items():
+            new_voice = new_voices.get(voice_num)
+            if new_voice is None:
+                voices.append(VoiceDiff(section, voice_num, VoiceDiff.REMOVED,
+                                        diff_events(voice_events(old_voice), [])))
+            elif content_hash(old_voice) != content_hash(new_voice):
+                voices.append(VoiceDiff(section, voice_num, VoiceDiff.CHANGED,
+                                        diff_events(voice_events(old_voice), voice_events(new_voice))))
+        for voice_num, new_voice in new_voices.items():
+            if voice_num not in old_voices:
+                voices.append(VoiceDiff(section, voice_num, VoiceDiff.ADDED, diff_events([], voice_events(new_voice))))
+    return PieceDiff(metadata_changed, list(range(common, len(new.music_sections))),
+                     list(range(common, len(old.music_sections))), voices)
+
+
+def main(argv: List[str]) -> int:
+    if len(argv) != 2:
+        print(__doc__, file=sys.stderr)
+        return 2
+    pieces = []
+    for path in argv:
+        with open(path) as file:
+            pieces.append(Piece.parse(file.read()))
+    piece_diff = diff_pieces(*pieces)
+    if piece_diff.metadata_changed:
+        print("Metadata changed")
+    for section in piece_diff.sections_added:
+        print(f"Section {section} added")
+    for section in piece_diff.sections_removed:
+        print(f"Section {section} removed")
+    for voice_diff in piece_diff.voices:
+        print(f"Section {voice_diff.section}, voice {voice_diff.voice_num} {voice_diff.status}:")
+        for edit in voice_diff.edits:
+            print(f"    {edit.operation} {edit.old_index} {edit.new_index} {edit.old_event} -> {edit.new_event}")
+    return 1 if piece_diff else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
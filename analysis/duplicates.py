@@ -0,0 +1,96 @@
+"""
+Duplicates in a corpus, found by content hashes (see model.hashing).
+
+Each file is parsed and hashed once (in a process pool if requested, which only sends back the digests), then the
+duplicates are grouped with a dictionary: finding them does not compare any piece with another. Two hashes are kept per
+piece: the hash of the whole document and the hash of its music alone, which is the same for the same music encoded
+with different GeneralData or VoiceData (e.g. by different editors). The sections are hashed as well, to find the
+sections shared by different pieces.
+
+Usage (from the repository root):
+    python -m analysis.duplicates [--music] FILE...
+"""
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Tuple
+
+from model import Piece
+from model.hashing import content_hash, music_hash
+
+
+class PieceHashes:
+    """
+    The digests of a CMME file: of the piece, of its music and of each of its sections.
+    """
+    def __init__(self, path: str, content: bytes, music: bytes, sections: List[bytes]):
+        self.path = path
+        self.content = content
+        self.music = music
+        self.sections = sections
+
+    def __eq__(self, other):
+        if isinstance(other, PieceHashes):
+            return (self.path == other.path and self.content == other.content and self.music == other.music and
+                    self.sections == other.sections)
+        return False
+
+    def __repr__(self):
+        return f"PieceHashes(Path={self.path}, Content={self.content.hex()}, Music={self.music.hex()})"
+
+
+def hash_file(path: str) -> PieceHashes:
+    with open(path) as file:
+        piece = Piece.parse(file.read())
+    return PieceHashes(path, content_hash(piece), music_hash(piece),
+                       [content_hash(music_section) for music_section in piece.music_sections])
+
+
+def hash_files(paths: Iterable[str], max_workers: int = 1) -> List[PieceHashes]:
+    """
+    Hashes CMME files, in a process pool if max_workers is greater than 1.
+    """
+    if max_workers <= 1:
+        return [hash_file(path) for path in paths]
+    with ProcessPoolExecutor(max_workers) as executor:
+        return list(executor.map(hash_file, paths, chunksize=16))
+
+
+def group(keys: Iterable[Tuple[bytes, object]]) -> List[list]:
+    """
+    Groups the items that share a digest, in the order of their first occurrence. Only the groups of several items are
+    returned.
+    """
+    groups: Dict[bytes, list] = {}
+    for digest, item in keys:
+        groups.setdefault(digest, []).append(item)
+    return [items for items in groups.values() if len(items) > 1]
+
+
+def duplicate_pieces(hashes: Iterable[PieceHashes], music: bool = False) -> List[List[str]]:
+    """
+    Returns the groups of paths of identical pieces, or of pieces with the same music if music is True.
+    """
+    return group(((piece_hashes.music if music else piece_hashes.content), piece_hashes.path)
+                 for piece_hashes in hashes)
+
+
+def duplicate_sections(hashes: Iterable[PieceHashes]) -> List[List[Tuple[str, int]]]:
+    """
+    Returns the groups of identical sections, as (path, section index) pairs.
+    """
+    return group((digest, (piece_hashes.path, index))
+                 for piece_hashes in hashes for index, digest in enumerate(piece_hashes.sections))
+
+
+def main(argv: List[str]) -> int:
+    paths = [argument for argument in argv if argument != '--music']
+    if not paths:
+        print(__doc__, file=sys.stderr)
+        return 2
+    for paths_group in duplicate_pieces(hash_files(paths), music='--music' in argv):
+        print('\t'.join(paths_group))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,53 @@
+"""
+The notes of a voice, in the edited text.
+"""
+from typing import Iterable, List
+
+from model.note import NoteEvent
+from model.visitor import SKIP, Traversal, Visitor
+
+
+class EditedTextVisitor(Visitor):
+    """
+    Base class of the visitors that follow the edited text: the new readings of EditorialData and the first reading of
+    VariantReadings. The other readings are skipped.
+    """
+    def __init__(self):
+        self.preferred_readings = []
+
+    def enter_variant_readings(self, variant_readings):
+        self.preferred_readings.append(variant_readings.readings[0] if variant_readings.readings else None)
+
+    def leave_variant_readings(self, variant_readings):
+        self.preferred_readings.pop()
+
+    def enter_reading(self, reading):
+        if reading is not self.preferred_readings[-1]:
+            return SKIP
+
+    def enter_original_reading(self, original_reading):
+        return SKIP
+
+
+class NoteCollector(EditedTextVisitor):
+    """
+    Collects the notes of the edited text, in order.
+    """
+    def __init__(self):
+        super().__init__()
+        self.notes: List[NoteEvent] = []
+
+    def enter_note_event(self, note):
+        self.notes.append(note)
+
+
+def notes(events: Iterable) -> List[NoteEvent]:
+    """
+    Returns the notes of a list of events in order, following the edited text (new readings of EditorialData, first
+    reading of VariantReadings).
+    """
+    collector = NoteCollector()
+    traversal = Traversal(collector)
+    for event in events:
+        traversal.walk(event)
+    return collector.notes
@@ -0,0 +1,445 @@
+"""
+Corpus search index over melodies, rhythms, texts and metadata.
+
+The notes of every voice are read in order, in the edited text (see analysis.notes), and three sequences are indexed:
+    - interval: the melodic intervals, in diatonic steps, so that a search does not depend on transposition;
+    - rhythm: the note types;
+    - text: the words of the modern text, joined from the syllables of the notes.
+
+Each sequence is indexed by n-grams: every position is the start of one n-gram (padded at the end of the voice), and
+the postings of an n-gram are the positions where it starts, packed as integers in an array. A pattern is found by
+intersecting the postings of the few n-grams that tile it, so a query never looks at the pieces themselves. Words are
+selective enough to be indexed one by one. The title, composer and incipit of GeneralData are indexed by word.
+
+The index is saved to a single (pickled) file and updated incrementally: update() only parses the files that are new
+or have changed since they were indexed, and indexes each one while it is parsed (PieceIndexer is a visitor, see
+model.visitor). The voices of removed or replaced pieces are marked as dead and dropped from the postings when the
+index is compacted.
+
+Usage (from the repository root):
+    python -m analysis.search_index INDEX update FILE...
+    python -m analysis.search_index INDEX search interval|rhythm|text|title|composer|incipit QUERY...
+"""
+import os
+import pickle
+import re
+import sys
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from analysis.notes import EditedTextVisitor
+from analysis.underlay import Underlay
+from model import Piece
+from model.columns import MISSING, NOTE_TYPE_CODES, diatonic_step
+from model.note import NoteEvent
+from model.pitch import Pitch
+from model.visitor import walk
+
+FORMAT_VERSION = 1
+
+DEFAULT_GRAM_SIZE = 3
+
+SEQUENCES = ('interval', 'rhythm', 'text')
+METADATA_FIELDS = ('title', 'composer', 'incipit')
+
+# A posting packs the voice (high bits) and the position in the voice (low bits)
+POSITION_BITS = 24
+POSITION_MASK = (1 << POSITION_BITS) - 1
+
+WORD = re.compile(r'\w+')
+
+
+def tokens(text: Optional[str]) -> List[str]:
+    return WORD.findall(text.lower()) if text else []
+
+
+def words(voice_notes: Iterable[NoteEvent]) -> List[str]:
+    """
+    Joins the syllables of the modern text of notes into words (see analysis.underlay).
+    """
+    return [token for word in Underlay.of_notes(voice_notes).words for token in tokens(word.text)]
+
+
+def intervals(steps: Sequence[int]) -> List[Optional[int]]:
+    """
+    Returns the intervals between consecutive diatonic steps (None next to a note without pitch, so that it never
+    matches).
+    """
+    return [second - first if first != MISSING and second != MISSING else None
+            for first, second in zip(steps, steps[1:])]
+
+
+class SearchMatch:
+    """
+    A match of a query: the voice of a piece and the position (in notes or words) where the pattern starts.
+    """
+    def __init__(self, key: str, section: int, voice_num: int, position: int):
+        self.key = key
+        self.section = section
+        self.voice_num = voice_num
+        self.position = position
+
+    def __eq__(self, other):
+        if isinstance(other, SearchMatch):
+            return (self.key == other.key and self.section == other.section and
+                    self.voice_num == other.voice_num and self.position == other.position)
+        return False
+
+    def __repr__(self):
+        return (f"SearchMatch(Key={self.key}, Section={self.section}, VoiceNum={self.voice_num}, "
+                f"Position={self.position})")
+
+
+class SearchIndex:
+    """
+    An inverted index over the pieces of a corpus, identified by a key (their absolute path for update()).
+    """
+    def __init__(self, gram_size: int = DEFAULT_GRAM_SIZE):
+        self.gram_sizes = {'interval': gram_size, 'rhythm': gram_size, 'text': 1}
+        # key -> (signature of the file, voice ids, metadata tokens by field)
+        self.documents: Dict[str, Tuple[Optional[tuple], List[int], Dict[str, List[str]]]] = {}
+        # voice id -> (key, section index, voice number), or None once the piece has been removed
+        self.voices: List[Optional[Tuple[str, int, int]]] = []
+        self.dead_voices = 0
+        self.postings: Dict[str, Dict[tuple, array]] = {name: {} for name in SEQUENCES}
+        self.metadata: Dict[str, Dict[str, Set[str]]] = {field: {} for field in METADATA_FIELDS}
+
+    def __len__(self):
+        return len(self.documents)
+
+    def __contains__(self, key: str):
+        return key in self.documents
+
+    def add(self, key: str, piece: Piece, signature: Optional[tuple] = None):
+        """
+        Indexes a piece, replacing the previous version indexed under the same key.
+        """
+        walk(piece, self.indexer(key, signature))
+
+    def indexer(self, key: str, signature: Optional[tuple] = None) -> 'PieceIndexer':
+        """
+        Returns a visitor that indexes the piece it visits, e.g. while it is parsed: Piece.parse(xml_string,
+        visitor=index.indexer(key)).
+        """
+        return PieceIndexer(self, key, signature)
+
+    def index_sequence(self, name: str, voice_id: int, sequence: Sequence):
+        if len(sequence) > POSITION_MASK:
+            raise ValueError(f"Voice too long to be indexed ({len(sequence)} items)")
+        postings = self.postings[name]
+        gram_size = self.gram_sizes[name]
+        padded = tuple(sequence) + (None,) * (gram_size - 1)
+        voice_bits = voice_id << POSITION_BITS
+        for position in range(len(sequence)):
+            if padded[position] is None:
+                continue
+            gram = padded[position:position + gram_size]
+            posting_list = postings.get(gram)
+            if posting_list is None:
+                posting_list = postings[gram] = array('q')
+            posting_list.append(voice_bits | position)
+
+    def add_document(self, key: str, voices: List[tuple], metadata: Dict[str, List[str]],
+                     signature: Optional[tuple] = None):
+        """
+        Indexes a piece, replacing the previous version indexed under the same key.
+
+        Args:
+            key: The key of the piece.
+            voices: The voices of the piece, as (section index, voice number, intervals, note type codes, words).
+            metadata: The tokens of the metadata of the piece, by field.
+            signature: The signature of the file of the piece (see update).
+        """
+        if key in self.documents:
+            self.remove(key)
+        voice_ids = []
+        try:
+            for section, voice_num, *sequences in voices:
+                voice_id = len(self.voices)
+                self.voices.append((key, section, voice_num))
+                voice_ids.append(voice_id)
+                for name, sequence in zip(SEQUENCES, sequences):
+                    self.index_sequence(name, voice_id, sequence)
+        except BaseException:
+            # The voices indexed so far are dead: their postings are never matched, and dropped by compact()
+            for voice_id in voice_ids:
+                self.voices[voice_id] = None
+            self.dead_voices += len(voice_ids)
+            raise
+        for field, field_tokens in metadata.items():
+            for token in field_tokens:
+                self.metadata[field].setdefault(token, set()).add(key)
+        self.documents[key] = (signature, voice_ids, metadata)
+
+    def remove(self, key: str):
+        """
+        Removes a piece. Its postings are only dropped when the index is compacted.
+        """
+        _, voice_ids, metadata = self.documents.pop(key)
+        for voice_id in voice_ids:
+            self.voices[voice_id] = None
+        self.dead_voices += len(voice_ids)
+        for field, field_tokens in metadata.items():
+            for token in field_tokens:
+                keys = self.metadata[field].get(token)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self.metadata[field][token]
+
+    def compact(self):
+        """
+        Drops the postings of removed pieces and renumbers the voices.
+        """
+        new_ids = {}
+        voices = []
+        for voice_id, voice in enumerate(self.voices):
+            if voice is not None:
+                new_ids[voice_id] = len(voices)
+                voices.append(voice)
+
+        for name in SEQUENCES:
+            postings = {}
+            for gram, posting_list in self.postings[name].items():
+                compacted = array('q', ((new_ids[posting >> POSITION_BITS] << POSITION_BITS) | (posting & POSITION_MASK)
+                                        for posting in posting_list if posting >> POSITION_BITS in new_ids))
+                if compacted:
+                    postings[gram] = compacted
+            self.postings[name] = postings
+
+        self.documents = {key: (signature, [new_ids[voice_id] for voice_id in voice_ids], metadata)
+                          for key, (signature, voice_ids, metadata) in self.documents.items()}
+        self.voices = voices
+        self.dead_voices = 0
+
+    def update(self, paths: Iterable[str], prune: bool = False, max_workers: int = 1) -> List[str]:
+        """
+        Indexes the files that are new or have changed (by modification time and size) since they were indexed.
+
+        Args:
+            paths: The paths of the CMME files of the corpus.
+            prune: If True, the indexed pieces whose path is not in paths are removed.
+            max_workers: If greater than 1, the files are parsed in a process pool of that size.
+
+        Returns:
+            The keys (absolute paths) of the pieces that were (re)indexed.
+        """
+        keys = []
+        signatures = {}
+        for path in paths:
+            key = os.path.abspath(path)
+            status = os.stat(key)
+            signatures[key] = (status.st_mtime_ns, status.st_size)
+            if key not in self.documents or self.documents[key][0] != signatures[key]:
+                keys.append(key)
+
+        if prune:
+            for key in [key for key in self.documents if key not in signatures]:
+                self.remove(key)
+
+        if max_workers > 1:
+            from batch.runner import parse_files
+
+            for key, piece in parse_files(keys, max_workers):
+                self.add(key, piece, signatures[key])
+        else:
+            for key in keys:
+                with open(key) as file:
+                    Piece.parse(file.read(), visitor=self.indexer(key, signatures[key]))
+        return keys
+
+    def search_sequence(self, name: str, pattern: Sequence) -> List[SearchMatch]:
+        """
+        Finds the occurrences of a pattern in one of the indexed sequences ('interval', 'rhythm' or 'text').
+        """
+        pattern = tuple(pattern)
+        if not pattern or None in pattern:
+            raise ValueError(f"Invalid {name} pattern: {pattern}")
+        postings = self.postings[name]
+        gram_size = self.gram_sizes[name]
+
+        if len(pattern) < gram_size:
+            # The pattern is a prefix of the n-grams starting where it occurs
+            candidates = set()
+            for gram, posting_list in postings.items():
+                if gram[:len(pattern)] == pattern:
+                    candidates.update(posting_list)
+        else:
+            offsets = list(range(0, len(pattern) - gram_size + 1, gram_size))
+            if offsets[-1] != len(pattern) - gram_size:
+                offsets.append(len(pattern) - gram_size)
+            lists = []
+            for offset in offsets:
+                posting_list = postings.get(pattern[offset:offset + gram_size])
+                if posting_list is None:
+                    return []
+                lists.append((len(posting_list), offset, posting_list))
+            # Start from the rarest n-gram
+            lists.sort(key=lambda item: item[0])
+            _, offset, posting_list = lists[0]
+            candidates = {posting - offset for posting in posting_list}
+            for _, offset, posting_list in lists[1:]:
+                candidates.intersection_update([posting - offset for posting in posting_list])
+                if not candidates:
+                    return []
+
+        matches = []
+        for candidate in sorted(candidates):
+            voice = self.voices[candidate >> POSITION_BITS]
+            if voice is not None:
+                matches.append(SearchMatch(voice[0], voice[1], voice[2], candidate & POSITION_MASK))
+        return matches
+
+    def search_intervals(self, pattern: Sequence[int]) -> List[SearchMatch]:
+        """
+        Finds a sequence of melodic intervals, in diatonic steps (e.g. [1, 1] for three ascending conjunct notes).
+        The positions of the matches are those of their first note.
+        """
+        return self.search_sequence('interval', pattern)
+
+    def search_melody(self, pitches: Sequence[Pitch]) -> List[SearchMatch]:
+        """
+        Finds a melody at any transposition.
+        """
+        return self.search_intervals(intervals([diatonic_step(pitch) for pitch in pitches]))
+
+    def search_rhythm(self, note_types: Sequence[str]) -> List[SearchMatch]:
+        """
+        Finds a sequence of note types (e.g. ['Semibrevis', 'Minima', 'Minima']).
+        """
+        if any(note_type not in NOTE_TYPE_CODES for note_type in note_types):
+            raise ValueError(f"Unknown note type in {note_types}")
+        return self.search_sequence('rhythm', [NOTE_TYPE_CODES[note_type] for note_type in note_types])
+
+    def search_text(self, text: str) -> List[SearchMatch]:
+        """
+        Finds a phrase of the modern text (case and punctuation are ignored). The positions are in words.
+        """
+        return self.search_sequence('text', tokens(text))
+
+    def search_metadata(self, **fields: str) -> List[str]:
+        """
+        Finds the pieces whose metadata contain all the words given for each field, e.g.
+        search_metadata(composer='la rue', title='salutaris').
+
+        Returns:
+            The keys of the pieces, sorted.
+        """
+        keys = None
+        for field, text in fields.items():
+            if field not in METADATA_FIELDS:
+                raise ValueError(f"Unknown metadata field: {field}")
+            for token in tokens(text):
+                token_keys = self.metadata[field].get(token, set())
+                keys = set(token_keys) if keys is None else keys & token_keys
+        return sorted(keys) if keys is not None else []
+
+    def save(self, path: str):
+        """
+        Saves the index, compacting it first if many pieces have been removed. The file is replaced atomically.
+        """
+        if self.dead_voices > len(self.voices) // 4:
+            self.compact()
+        state = {'version': FORMAT_VERSION, 'gram_sizes': self.gram_sizes, 'documents': self.documents,
+                 'voices': self.voices, 'dead_voices': self.dead_voices, 'postings': self.postings,
+                 'metadata': self.metadata}
+        temporary_path = path + '.tmp'
+        with open(temporary_path, 'wb') as file:
+            pickle.dump(state, file, pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'SearchIndex':
+        """
+        Loads an index saved by save(). Index files are pickles: only load the ones you have built.
+        """
+        with open(path, 'rb') as file:
+            state = pickle.load(file)
+        if state.get('version') != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a search index of version {FORMAT_VERSION}")
+        index = cls()
+        index.gram_sizes = state['gram_sizes']
+        index.documents = state['documents']
+        index.voices = state['voices']
+        index.dead_voices = state['dead_voices']
+        index.postings = state['postings']
+        index.metadata = state['metadata']
+        return index
+
+    @classmethod
+    def open(cls, path: str) -> 'SearchIndex':
+        """
+        Loads an index, or returns an empty one if the file does not exist yet.
+        """
+        return cls.load(path) if os.path.exists(path) else cls()
+
+
+class PieceIndexer(EditedTextVisitor):
+    """
+    Indexes a piece as it is visited. The sequences of its voices are kept until the piece has been left, so that the
+    index is only changed once the piece has been parsed completely: a parse that fails leaves the index as it was.
+    """
+    def __init__(self, index: SearchIndex, key: str, signature: Optional[tuple] = None):
+        super().__init__()
+        self.index = index
+        self.key = key
+        self.signature = signature
+        # (section index, voice number, intervals, note type codes, words) of each voice
+        self.voices: List[tuple] = []
+        self.section = 0
+        self.notes: List[NoteEvent] = []
+
+    def leave_music_section(self, music_section):
+        self.section += 1
+
+    def enter_voice(self, voice):
+        self.notes = []
+
+    def enter_note_event(self, note):
+        self.notes.append(note)
+
+    def leave_voice(self, voice):
+        if voice.event_list is None:
+            return
+        if len(self.notes) > POSITION_MASK:
+            raise ValueError(f"Voice too long to be indexed ({len(self.notes)} notes)")
+        self.voices.append((self.section, voice.voice_num,
+                            intervals([diatonic_step(note.pitch) for note in self.notes]),
+                            [NOTE_TYPE_CODES.get(note.note_type) for note in self.notes], words(self.notes)))
+
+    def leave_piece(self, piece):
+        general_data = piece.general_data
+        metadata = {'title': tokens(general_data.title), 'composer': tokens(general_data.composer),
+                    'incipit': tokens(general_data.incipit)}
+        self.index.add_document(self.key, self.voices, metadata, self.signature)
+
+
+def main(argv: List[str]) -> int:
+    if len(argv) < 3 or argv[1] not in ('update', 'search'):
+        print(__doc__, file=sys.stderr)
+        return 2
+    index_path, command, arguments = argv[0], argv[1], argv[2:]
+    index = SearchIndex.open(index_path)
+
+    if command == 'update':
+        updated = index.update(arguments)
+        index.save(index_path)
+        print(f"{len(updated)} pieces indexed, {len(index)} in total")
+        return 0
+
+    kind, query = arguments[0], arguments[1:]
+    if kind == 'interval':
+        results = index.search_intervals([int(interval) for interval in query])
+    elif kind == 'rhythm':
+        results = index.search_rhythm(query)
+    elif kind == 'text':
+        results = index.search_text(' '.join(query))
+    else:
+        results = index.search_metadata(**{kind: ' '.join(query)})
+    for result in results:
+        print(result)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
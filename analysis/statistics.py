@@ -0,0 +1,256 @@
+"""
+Statistics of pieces, collected in one pass.
+
+StatisticsCollector is a Visitor (see model.visitor): pass it to Piece.parse to collect the statistics while the piece
+is parsed (possibly fused with other visitors in a Traversal), or walk a parsed piece with it. For each voice, it
+gathers:
+    - the number of top-level events, by type (VariantReadings and EditorialData included);
+    - the number of notes, their range and the ligatures (and the notes they contain), in the edited text;
+    - the colored notes and the color changes;
+    - the mensuration and proportion changes;
+    - the variants (VariantReadings) and their density: the number of variants per 100 events.
+
+The statistics of a corpus are exported as JSON (an object per piece, with its totals and its voices) or as CSV (a
+row per voice).
+
+Usage (from the repository root):
+    python -m analysis.statistics [--csv] FILE...
+"""
+import csv
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, TextIO
+
+from analysis.notes import EditedTextVisitor
+from model import Piece
+from model.columns import EVENT_KINDS, MISSING, diatonic_step, step_pitch
+from model.visitor import walk
+
+
+def pitch_name(step: Optional[int]) -> Optional[str]:
+    if step is None:
+        return None
+    pitch = step_pitch(step)
+    return f'{pitch.letter_name}{pitch.octave_num}'
+
+
+class VoiceStatistics:
+    """
+    The statistics of a voice, or the totals of a piece (without section and voice number). The range is given in
+    diatonic steps (see model.columns).
+    """
+    COUNTERS = ('events', 'notes', 'ligatures', 'ligated_notes', 'colored_notes', 'color_changes',
+                'mensuration_changes', 'proportion_changes', 'variants', 'editorial_data')
+
+    def __init__(self, section: Optional[int] = None, voice_num: Optional[int] = None):
+        self.section = section
+        self.voice_num = voice_num
+        self.event_counts: Dict[str, int] = {}
+        self.lowest: Optional[int] = None
+        self.highest: Optional[int] = None
+        for counter in self.COUNTERS:
+            setattr(self, counter, 0)
+
+    @property
+    def variant_density(self) -> float:
+        return 100 * self.variants / self.events if self.events else 0.0
+
+    def add(self, other: 'VoiceStatistics'):
+        """
+        Adds the statistics of another voice to these.
+        """
+        for counter in self.COUNTERS:
+            setattr(self, counter, getattr(self, counter) + getattr(other, counter))
+        for event_type, count in other.event_counts.items():
+            self.event_counts[event_type] = self.event_counts.get(event_type, 0) + count
+        if other.lowest is not None:
+            self.lowest = other.lowest if self.lowest is None else min(self.lowest, other.lowest)
+            self.highest = other.highest if self.highest is None else max(self.highest, other.highest)
+
+    def to_dict(self) -> dict:
+        values = {'section': self.section, 'voice_num': self.voice_num} if self.voice_num is not None else {}
+        values.update((counter, getattr(self, counter)) for counter in self.COUNTERS)
+        values['variant_density'] = round(self.variant_density, 3)
+        values['lowest'] = pitch_name(self.lowest)
+        values['highest'] = pitch_name(self.highest)
+        values['event_counts'] = dict(sorted(self.event_counts.items()))
+        return values
+
+    def __repr__(self):
+        return (f"VoiceStatistics(Section={self.section}, VoiceNum={self.voice_num}, Events={self.events}, "
+                f"Notes={self.notes}, Range={pitch_name(self.lowest)}-{pitch_name(self.highest)})")
+
+
+class PieceStatistics:
+    """
+    The statistics of the voices of a piece, in order, and their totals.
+    """
+    def __init__(self, key: Optional[str], title: Optional[str], composer: Optional[str],
+                 voices: List[VoiceStatistics]):
+        self.key = key
+        self.title = title
+        self.composer = composer
+        self.voices = voices
+        self.totals = VoiceStatistics()
+        for voice in voices:
+            self.totals.add(voice)
+
+    def to_dict(self) -> dict:
+        return {'key': self.key, 'title': self.title, 'composer': self.composer, 'totals': self.totals.to_dict(),
+                'voices': [voice.to_dict() for voice in self.voices]}
+
+
+class StatisticsCollector(EditedTextVisitor):
+    """
+    Collects the statistics of one piece. Once the piece has been visited, they are in the statistics attribute.
+    """
+    def __init__(self, key: Optional[str] = None):
+        super().__init__()
+        self.key = key
+        self.statistics: Optional[PieceStatistics] = None
+        self.voices: List[VoiceStatistics] = []
+        self.section = 0
+        self.current = VoiceStatistics()
+        # The previous note of the voice is ligated to the next one
+        self.in_ligature = False
+        # The number of events entered and not left: the top-level events are entered at depth 1
+        self.event_depth = 0
+
+    def leave_music_section(self, music_section):
+        self.section += 1
+
+    def enter_voice(self, voice):
+        self.current = VoiceStatistics(self.section, voice.voice_num)
+        self.in_ligature = False
+
+    def leave_voice(self, voice):
+        self.voices.append(self.current)
+
+    def count_event(self, event):
+        # The counts are of the top-level events, the nested ones are only visited for their notes
+        self.event_depth += 1
+        if self.event_depth > 1:
+            return
+        current = self.current
+        event_type = type(event).__name__
+        current.events += 1
+        current.event_counts[event_type] = current.event_counts.get(event_type, 0) + 1
+
+        if event_type == 'MensurationEvent':
+            current.mensuration_changes += 1
+        elif event_type == 'ProportionEvent':
+            current.proportion_changes += 1
+        elif event_type == 'ColorChangeEvent':
+            current.color_changes += 1
+        elif event_type == 'VariantReadings':
+            current.variants += 1
+        elif event_type == 'EditorialData':
+            current.editorial_data += 1
+
+    def enter_event(self, event):
+        self.count_event(event)
+
+    def leave_event(self, event):
+        self.event_depth -= 1
+
+    def enter_variant_readings(self, variant_readings):
+        self.count_event(variant_readings)
+        return super().enter_variant_readings(variant_readings)
+
+    def leave_variant_readings(self, variant_readings):
+        super().leave_variant_readings(variant_readings)
+        self.event_depth -= 1
+
+    def enter_note_event(self, note):
+        self.count_event(note)
+        current = self.current
+        current.notes += 1
+        step = diatonic_step(note.pitch)
+        if step != MISSING:
+            if current.lowest is None or step < current.lowest:
+                current.lowest = step
+            if current.highest is None or step > current.highest:
+                current.highest = step
+        if note.event_attributes.colored:
+            current.colored_notes += 1
+        # Lig is set on every note of a ligature but the last one
+        if note.lig is not None or self.in_ligature:
+            current.ligated_notes += 1
+        if note.lig is not None and not self.in_ligature:
+            current.ligatures += 1
+        self.in_ligature = note.lig is not None
+
+    def leave_piece(self, piece):
+        self.statistics = PieceStatistics(self.key, piece.general_data.title, piece.general_data.composer,
+                                          self.voices)
+
+
+def collect(piece: Piece, key: Optional[str] = None) -> PieceStatistics:
+    """
+    Collects the statistics of a parsed piece.
+    """
+    collector = StatisticsCollector(key)
+    walk(piece, collector)
+    return collector.statistics
+
+
+def collect_file(path: str) -> PieceStatistics:
+    """
+    Parses a CMME file, collecting its statistics in the same pass.
+    """
+    collector = StatisticsCollector(path)
+    with open(path) as file:
+        Piece.parse(file.read(), visitor=collector)
+    return collector.statistics
+
+
+def collect_files(paths: Iterable[str], max_workers: int = 1) -> List[PieceStatistics]:
+    """
+    Collects the statistics of CMME files, in a process pool if max_workers is greater than 1 (only the statistics are
+    sent back by the workers).
+    """
+    if max_workers <= 1:
+        return [collect_file(path) for path in paths]
+    with ProcessPoolExecutor(max_workers) as executor:
+        return list(executor.map(collect_file, paths))
+
+
+def write_json(statistics: Iterable[PieceStatistics], file: TextIO):
+    json.dump([piece_statistics.to_dict() for piece_statistics in statistics], file, indent=1, ensure_ascii=False)
+
+
+CSV_COLUMNS = (['key', 'title', 'composer', 'section', 'voice_num'] + list(VoiceStatistics.COUNTERS) +
+               ['variant_density', 'lowest', 'highest'] + list(EVENT_KINDS))
+
+
+def write_csv(statistics: Iterable[PieceStatistics], file: TextIO):
+    """
+    Writes a row per voice, with a column for the count of each event type.
+    """
+    writer = csv.DictWriter(file, CSV_COLUMNS, extrasaction='ignore')
+    writer.writeheader()
+    for piece_statistics in statistics:
+        for voice in piece_statistics.voices:
+            row = voice.to_dict()
+            row.update({'key': piece_statistics.key, 'title': piece_statistics.title,
+                        'composer': piece_statistics.composer})
+            row.update((event_type, voice.event_counts.get(event_type, 0)) for event_type in EVENT_KINDS)
+            writer.writerow(row)
+
+
+def main(argv: List[str]) -> int:
+    paths = [argument for argument in argv if argument != '--csv']
+    if not paths:
+        print(__doc__, file=sys.stderr)
+        return 2
+    statistics = collect_files(paths)
+    if '--csv' in argv:
+        write_csv(statistics, sys.stdout)
+    else:
+        write_json(statistics, sys.stdout)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
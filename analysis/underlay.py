@@ -0,0 +1,200 @@
+"""
+Text underlay of the voices: the syllables of the notes, the words they make, and the phrases of the original text.
+
+The modern text is carried by the notes (ModernText: its syllables, and whether the last one ends a word); the original
+text is given by OriginalTextEvents, each holding a phrase written before the notes it goes with. The underlay of a
+voice is built in one pass over its notes, in the edited text (see analysis.notes):
+    - each syllable is aligned with its note (by the index of the note in the voice) and with its word, and gets its
+      position in the word (MEI's data.WORDPOS: i, m, t, or s for a word of one syllable);
+    - a word is closed by the WordEnd of its last syllable (or by the end of the voice);
+    - a phrase is anchored to the next note, and to the word that is open there (or starts there).
+
+The underlay is used by the MEI export (the @wordpos of the <syl> elements) and by the text search index (its words).
+"""
+from typing import Dict, Iterable, List, Optional
+
+from analysis.notes import EditedTextVisitor
+from model.note import NoteEvent
+from model.visitor import Traversal
+
+# Position of a syllable in its word, by (first syllable of the word, last syllable of the word)
+WORD_POSITIONS = {(True, True): 's', (True, False): 'i', (False, False): 'm', (False, True): 't'}
+
+
+class UnderlaySyllable:
+    """
+    A syllable of the modern text, on the note at note_index in the voice, in the word at word_index.
+    """
+    def __init__(self, text: str, note_index: int, word_index: int, position: Optional[str] = None):
+        self.text = text
+        self.note_index = note_index
+        self.word_index = word_index
+        self.position = position
+
+    def __eq__(self, other):
+        if isinstance(other, UnderlaySyllable):
+            return (self.text == other.text and self.note_index == other.note_index and
+                    self.word_index == other.word_index and self.position == other.position)
+        return False
+
+    def __repr__(self):
+        return (f"UnderlaySyllable(Text={self.text}, NoteIndex={self.note_index}, WordIndex={self.word_index}, "
+                f"Position={self.position})")
+
+
+class UnderlayWord:
+    """
+    A word of the modern text, made of syllables[start:stop] of the underlay.
+    """
+    def __init__(self, text: str, start: int, stop: int):
+        self.text = text
+        self.start = start
+        self.stop = stop
+
+    def __eq__(self, other):
+        if isinstance(other, UnderlayWord):
+            return self.text == other.text and self.start == other.start and self.stop == other.stop
+        return False
+
+    def __repr__(self):
+        return f"UnderlayWord(Text={self.text}, Start={self.start}, Stop={self.stop})"
+
+
+class UnderlayPhrase:
+    """
+    A phrase of the original text, before the note at note_index (the number of notes of the voice if no note follows
+    it) and at the word at word_index.
+    """
+    def __init__(self, text: Optional[str], note_index: int, word_index: int):
+        self.text = text
+        self.note_index = note_index
+        self.word_index = word_index
+
+    def __eq__(self, other):
+        if isinstance(other, UnderlayPhrase):
+            return (self.text == other.text and self.note_index == other.note_index and
+                    self.word_index == other.word_index)
+        return False
+
+    def __repr__(self):
+        return f"UnderlayPhrase(Text={self.text}, NoteIndex={self.note_index}, WordIndex={self.word_index})"
+
+
+class Underlay:
+    """
+    The underlay of a voice, built note by note (add_note, add_phrase) and closed at the end of the voice.
+    """
+    def __init__(self):
+        self.notes: List[NoteEvent] = []
+        self.syllables: List[UnderlaySyllable] = []
+        self.words: List[UnderlayWord] = []
+        self.phrases: List[UnderlayPhrase] = []
+        # The start of the open word in syllables, and the phrases waiting for their note
+        self.word_start = 0
+        self.pending: List[UnderlayPhrase] = []
+
+    @classmethod
+    def of(cls, events: Iterable) -> 'Underlay':
+        """
+        Returns the underlay of a list of events (the events of a voice), following the edited text.
+        """
+        aligner = UnderlayAligner()
+        underlay = aligner.underlay = cls()
+        traversal = Traversal(aligner)
+        for event in events:
+            traversal.walk(event)
+        underlay.close()
+        return underlay
+
+    @classmethod
+    def of_notes(cls, notes: Iterable[NoteEvent]) -> 'Underlay':
+        """
+        Returns the underlay of a sequence of notes.
+        """
+        underlay = cls()
+        for note in notes:
+            underlay.add_note(note)
+        underlay.close()
+        return underlay
+
+    def add_note(self, note: NoteEvent):
+        note_index = len(self.notes)
+        self.notes.append(note)
+        for phrase in self.pending:
+            phrase.note_index = note_index
+        self.pending = []
+        if note.modern_text is None:
+            return
+        for text in note.modern_text.syllables:
+            if text:
+                self.syllables.append(UnderlaySyllable(text, note_index, len(self.words)))
+        if note.modern_text.has_word_end:
+            self.end_word()
+
+    def add_phrase(self, text: Optional[str]):
+        phrase = UnderlayPhrase(text, len(self.notes), len(self.words))
+        self.phrases.append(phrase)
+        self.pending.append(phrase)
+
+    def end_word(self):
+        start, stop = self.word_start, len(self.syllables)
+        if start == stop:
+            return
+        for index in range(start, stop):
+            self.syllables[index].position = WORD_POSITIONS[index == start, index == stop - 1]
+        self.words.append(UnderlayWord(''.join(syllable.text for syllable in self.syllables[start:stop]), start, stop))
+        self.word_start = stop
+
+    def close(self):
+        """
+        Ends the last word, if it is open.
+        """
+        self.end_word()
+        self.pending = []
+
+    def word_positions(self) -> Dict[int, List[str]]:
+        """
+        Returns the positions in their words of the syllables of each note with text, by id of the note.
+        """
+        positions = {}
+        for syllable in self.syllables:
+            positions.setdefault(id(self.notes[syllable.note_index]), []).append(syllable.position)
+        return positions
+
+    def text(self) -> str:
+        """
+        Returns the modern text, as words separated by spaces.
+        """
+        return ' '.join(word.text for word in self.words)
+
+    def __repr__(self):
+        return f"Underlay(Notes={len(self.notes)}, Words={len(self.words)}, Phrases={len(self.phrases)})"
+
+
+class UnderlayAligner(EditedTextVisitor):
+    """
+    Builds the underlay of each voice it visits, e.g. while the piece is parsed. The underlays are kept as
+    (section index, voice number, underlay) in document order.
+    """
+    def __init__(self):
+        super().__init__()
+        self.underlays: List[tuple] = []
+        self.section = 0
+        self.underlay: Optional[Underlay] = None
+
+    def leave_music_section(self, music_section):
+        self.section += 1
+
+    def enter_voice(self, voice):
+        self.underlay = Underlay()
+
+    def enter_note_event(self, note):
+        self.underlay.add_note(note)
+
+    def enter_original_text_event(self, original_text):
+        self.underlay.add_phrase(original_text.phrase)
+
+    def leave_voice(self, voice):
+        self.underlay.close()
+        self.underlays.append((self.section, voice.voice_num, self.underlay))
+        self.underlay = None
@@ -0,0 +1,3 @@
+"""
+Conversion of many CMME files in a process pool.
+"""
@@ -0,0 +1,118 @@
+"""
+Builds a catalog of CMME files from their metadata, scanned in a process pool with Piece.scan_metadata (which stops
+reading each file at its first MusicSection).
+
+Usage (from the repository root):
+    python -m batch.catalog DIRECTORY [CATALOG.jsonl]
+"""
+import json
+import os
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from model import Piece
+from model.piece import PieceMetadata
+
+
+def find_files(directory: str, suffix: str = '.cmme.xml') -> List[str]:
+    """
+    Returns the paths of the CMME files found (recursively) in a directory, sorted.
+    """
+    paths = []
+    for dir_path, _, filenames in os.walk(directory):
+        paths += [os.path.join(dir_path, filename) for filename in filenames if filename.endswith(suffix)]
+    return sorted(paths)
+
+
+def scan_file(path: str) -> Tuple[Optional[PieceMetadata], Optional[str]]:
+    """
+    Scans the metadata of a file (in a worker process).
+
+    Returns:
+        The metadata, or None and the error if the file could not be read.
+    """
+    try:
+        return Piece.scan_metadata(path), None
+    except Exception as error:
+        # Any error of a file (unreadable, malformed XML, or metadata the model cannot build) is reported in its record
+        # instead of stopping the scan of the corpus
+        return None, f"{type(error).__name__}: {error}"
+
+
+def scan_files(paths: Iterable[str], max_workers: Optional[int] = None,
+               executor: Optional[Executor] = None) -> Iterator[Tuple[str, Optional[PieceMetadata], Optional[str]]]:
+    """
+    Scans the metadata of CMME files.
+
+    Args:
+        paths: The paths of the CMME files.
+        max_workers: The number of processes (by default, one per core). With 1, the files are scanned in this process.
+        executor: An existing pool to use.
+
+    Yields:
+        The path, the metadata (or None) and the error (or None) of each file, in the order of paths.
+    """
+    paths = list(paths)
+    if executor is None and max_workers == 1:
+        results = map(scan_file, paths)
+    else:
+        # Scanning a file is much cheaper than sending it to a worker: send them in large batches
+        chunksize = max(1, min(256, len(paths) // (8 * (max_workers or os.cpu_count() or 1))))
+        pool = executor if executor is not None else ProcessPoolExecutor(max_workers)
+        try:
+            results = list(pool.map(scan_file, paths, chunksize=chunksize))
+        finally:
+            if executor is None:
+                pool.shutdown()
+    for path, (metadata, error) in zip(paths, results):
+        yield path, metadata, error
+
+
+def scan_directory(directory: str, max_workers: Optional[int] = None
+                   ) -> Iterator[Tuple[str, Optional[PieceMetadata], Optional[str]]]:
+    """
+    Scans the metadata of the CMME files of a directory, see scan_files.
+    """
+    return scan_files(find_files(directory), max_workers)
+
+
+def catalog_record(path: str, metadata: Optional[PieceMetadata], error: Optional[str] = None) -> dict:
+    """
+    Returns the catalog entry of a file, as a dictionary that can be serialised to JSON.
+    """
+    if metadata is None:
+        return {'path': path, 'error': error}
+    general_data = metadata.general_data
+    return {
+        'path': path,
+        'cmme_version': metadata.cmme_version,
+        'title': general_data.title,
+        'composer': general_data.composer,
+        'editor': general_data.editor,
+        'variant_versions': [{'id': variant_version.id_,
+                              'source': variant_version.source.name if variant_version.source is not None else None}
+                             for variant_version in general_data.variant_versions],
+        'num_voices': metadata.voice_data.num_voices,
+        'voices': [voice.name for voice in metadata.voice_data.voices],
+    }
+
+
+def main(argv: List[str]) -> int:
+    if not argv:
+        print(__doc__, file=sys.stderr)
+        return 2
+    output = open(argv[1], 'w') if len(argv) > 1 else sys.stdout
+    errors = 0
+    try:
+        for path, metadata, error in scan_directory(argv[0]):
+            errors += error is not None
+            output.write(json.dumps(catalog_record(path, metadata, error), ensure_ascii=False) + '\n')
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
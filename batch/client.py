@@ -0,0 +1,99 @@
+"""
+Thin client of the conversion daemon (batch.daemon).
+
+It only imports the few standard library modules it needs (not the model, nor typing), so that it starts almost as fast
+as the interpreter. Running it as a script rather than with -m also saves the import of runpy.
+
+The MEI document of each file is written next to it (NAME.cmme.xml to NAME.mei), or to the directory given with -o.
+
+Usage:
+    python batch/client.py SOCKET [-o DIRECTORY] FILE...
+    python batch/client.py SOCKET --shutdown
+"""
+import json
+import os
+import socket
+import sys
+
+
+class Client:
+    """
+    A connection to the daemon, sending one request at a time.
+    """
+    def __init__(self, socket_path: str, timeout: float = None):
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.settimeout(timeout)
+        try:
+            self.socket.connect(socket_path)
+        except OSError:
+            self.socket.close()
+            raise
+        self.reader = self.socket.makefile('rb')
+
+    def request(self, request: dict) -> dict:
+        self.socket.sendall(json.dumps(request).encode('utf-8') + b'\n')
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError("The daemon closed the connection")
+        return json.loads(line)
+
+    def convert(self, path: str, validate: bool = False) -> dict:
+        """
+        Returns the response of the daemon for a file (see batch.daemon). The path is sent as an absolute path, as the
+        daemon does not run in the working directory of the client.
+        """
+        return self.request({'path': os.path.abspath(path), 'validate': validate})
+
+    def convert_all(self, paths, validate: bool = False):
+        for path in paths:
+            yield self.convert(path, validate)
+
+    def shutdown(self):
+        self.request({'command': 'shutdown'})
+
+    def close(self):
+        self.reader.close()
+        self.socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def output_path(path: str, directory: str = None) -> str:
+    """
+    Returns the path of the MEI document of a file: NAME.mei, in the directory of the file or in the given one.
+    """
+    name = os.path.basename(path)
+    name = name[:-len('.cmme.xml')] if name.endswith('.cmme.xml') else os.path.splitext(name)[0]
+    return os.path.join(directory if directory is not None else os.path.dirname(path), name + '.mei')
+
+
+def main(argv: list) -> int:
+    directory = None
+    if argv[1:2] == ['-o'] and len(argv) > 2:
+        directory, argv = argv[2], argv[:1] + argv[3:]
+    if len(argv) < 2:
+        print(__doc__, file=sys.stderr)
+        return 2
+    failures = 0
+    with Client(argv[0]) as client:
+        if argv[1:] == ['--shutdown']:
+            client.shutdown()
+            return 0
+        for response in client.convert_all(argv[1:]):
+            if response['error'] is not None:
+                print(f"{response['path']}: {response['error']}", file=sys.stderr)
+            for diagnostic in response['diagnostics']:
+                print(f"{response['path']}: {diagnostic['location']}: {diagnostic['message']}", file=sys.stderr)
+            if response['mei'] is not None:
+                with open(output_path(response['path'], directory), 'w', encoding='utf-8') as file:
+                    file.write(response['mei'])
+            failures += not response['ok']
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
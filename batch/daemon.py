@@ -0,0 +1,137 @@
+"""
+Long-lived conversion daemon, serving over a Unix socket.
+
+Converting a file from a build system would otherwise pay, for every file, the start of the interpreter and the import
+of the model. The daemon imports the model and builds its dispatch tables once, then converts the files named by its
+clients (see batch.client, which only imports the standard library).
+
+The protocol is line-based JSON. Each request is a JSON object on a line, e.g. {"path": "piece.cmme.xml"}, answered by a
+line with the result of the conversion of the file: {"path": ..., "ok": ..., "diagnostics": [...], "error": ...,
+"mei": ...}. The files are parsed in recovering mode (see model.recovery): "diagnostics" lists the errors found, with
+their locations, "mei" is the MEI document (see mei.export), and "error" is set if the file could not be converted at
+all. The request {"command": "shutdown"} stops the daemon. A connection can send any number of requests, and
+connections are served concurrently (in threads: the conversions themselves share one core).
+
+Usage (from the repository root):
+    python -m batch.daemon SOCKET
+"""
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+from typing import List
+
+from cmme2mei import cmme2mei
+from model.event_factory import EventFactory
+from model.music_section import EventList
+from model.recovery import describe
+from model.visitor import Structure
+
+
+def convert(request: dict) -> dict:
+    """
+    Converts the file of a request, never raising: the errors are reported in the response.
+    """
+    path = request.get('path')
+    response = {'path': path, 'ok': False, 'diagnostics': [], 'error': None, 'mei': None}
+    diagnostics = []
+    try:
+        response['mei'] = cmme2mei(path, request.get('validate', False), diagnostics)
+        response['ok'] = not diagnostics
+    except Exception as error:
+        # Unreadable or malformed files, schema violations (with validate), and any unexpected error of the converter,
+        # which must not stop the daemon
+        response['error'] = describe(error)
+    response['diagnostics'] = [{'location': diagnostic.location, 'message': diagnostic.message}
+                               for diagnostic in diagnostics]
+    return response
+
+
+class ConversionHandler(socketserver.StreamRequestHandler):
+    """
+    Answers the requests of one connection, in order.
+    """
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError as error:
+                self.send({'ok': False, 'error': describe(error)})
+                continue
+            if request.get('command') == 'shutdown':
+                self.send({'ok': True})
+                # shutdown() waits for serve_forever() to return, which runs in another thread
+                threading.Thread(target=self.server.shutdown).start()
+                return
+            self.send(convert(request))
+
+    def send(self, response: dict):
+        self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n')
+
+
+class ConversionServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str):
+        remove_stale_socket(socket_path)
+        super().__init__(socket_path, ConversionHandler)
+        self.socket_path = socket_path
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+def remove_stale_socket(socket_path: str):
+    """
+    Removes the socket file left by a daemon that did not stop cleanly, refusing to replace a running one.
+    """
+    if not os.path.exists(socket_path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except OSError:
+        os.unlink(socket_path)
+        return
+    finally:
+        probe.close()
+    raise OSError(f"A daemon is already listening on {socket_path}")
+
+
+def warm_up():
+    """
+    Builds the tables that the first conversion would otherwise build.
+    """
+    EventFactory.parsers()
+    EventList.parsers()
+    Structure.get()
+
+
+def serve(socket_path: str):
+    """
+    Serves conversions on a Unix socket until a shutdown request (or an interrupt).
+    """
+    warm_up()
+    with ConversionServer(socket_path) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def main(argv: List[str]) -> int:
+    if len(argv) != 1:
+        print(__doc__, file=sys.stderr)
+        return 2
+    serve(argv[0])
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,342 @@
+"""
+Numeric dataset of a corpus: the events of every voice as integer columns in .npy files, for machine learning.
+
+The events of each voice are read in document order, in the edited text (see analysis.notes), the events nested in a
+MultiEvent, a reading or an EditorialData following it one level deeper. Each event is one row of the columns (see
+COLUMNS): the piece, section and voice it belongs to, its depth, its kind and note type (the codes of model.columns),
+its pitch as a diatonic step from A0, and its length (numerator and denominator, as encoded). An event without one of
+these properties has MISSING (-1) in the column.
+
+A dataset is a directory with:
+    - a file NAME.npy per column, a one-dimensional array of all the events of the corpus;
+    - voices.npy, the offsets of the voices: a row (piece, section, voice, start, stop) per voice, its events being
+      rows start:stop of the columns;
+    - pieces.npy, the offsets of the pieces: a row (start, stop, first voice, end of the voices) per piece, in events
+      and in rows of voices.npy;
+    - dataset.json, the keys (paths) of the pieces, by index, and the codes of the columns.
+The .npy files are in NumPy's format (version 1.0, little-endian), so that numpy.load(path, mmap_mode='r') maps them
+without reading them; Dataset maps them with mmap and reads the columns as memoryviews, without NumPy. A data loader
+can then slice a voice or a piece of a large corpus without parsing any XML.
+
+The files are written by appending the events of each piece as it is parsed; the headers of the arrays are completed
+with their shapes when the writer is closed. The events of a piece are kept until it has been parsed completely, so
+that a file that cannot be parsed leaves no rows.
+
+Usage (from the repository root):
+    python -m batch.dataset DIRECTORY FILE...
+"""
+import ast
+import json
+import mmap
+import os
+import sys
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from analysis.notes import EditedTextVisitor
+from model import Piece
+from model.columns import EVENT_KIND_CODES, EVENT_KINDS, MISSING, NOTE_TYPE_CODES, NOTE_TYPES, PITCH_LETTERS
+from model.columns import diatonic_step
+from model.pitch import Pitch
+from model.visitor import Traversal
+
+FORMAT = 'cmme-dataset'
+FORMAT_VERSION = 1
+
+# The columns of the events, with their array typecodes
+COLUMNS = (('piece', 'i'), ('section', 'h'), ('voice', 'h'), ('depth', 'b'), ('kind', 'b'), ('note_type', 'b'),
+           ('pitch', 'h'), ('length_num', 'i'), ('length_den', 'i'))
+
+# The fields of the rows of the offset tables (int64)
+VOICE_FIELDS = ('piece', 'section', 'voice', 'start', 'stop')
+PIECE_FIELDS = ('start', 'stop', 'voice_start', 'voice_stop')
+
+# NumPy dtypes of the typecodes
+DTYPES = {'b': '|i1', 'h': '<i2', 'i': '<i4', 'q': '<i8'}
+
+NPY_MAGIC = b'\x93NUMPY\x01\x00'
+# Size of the headers of the .npy files (magic included): room enough for any shape, and a multiple of 64 as NumPy
+# aligns the data
+NPY_HEADER_SIZE = 128
+
+
+def npy_header(typecode: str, shape: Tuple[int, ...]) -> bytes:
+    """
+    Returns the header of a .npy file of an array, padded to NPY_HEADER_SIZE.
+    """
+    shape_text = f"({shape[0]},)" if len(shape) == 1 else f"({', '.join(str(size) for size in shape)})"
+    text = f"{{'descr': '{DTYPES[typecode]}', 'fortran_order': False, 'shape': {shape_text}, }}"
+    padding = NPY_HEADER_SIZE - len(NPY_MAGIC) - 2 - len(text) - 1
+    if padding < 0:
+        raise ValueError(f"The shape {shape} does not fit in the header")
+    length = (NPY_HEADER_SIZE - len(NPY_MAGIC) - 2).to_bytes(2, 'little')
+    return NPY_MAGIC + length + (text + ' ' * padding + '\n').encode('latin-1')
+
+
+def read_npy_header(buffer) -> Tuple[str, Tuple[int, ...], int]:
+    """
+    Reads the header of a .npy file (version 1.0) from the start of a buffer.
+
+    Returns:
+        The dtype, the shape of the array and the offset of its data.
+    """
+    if bytes(buffer[:len(NPY_MAGIC)]) != NPY_MAGIC:
+        raise ValueError("Not a .npy file of version 1.0")
+    length = int.from_bytes(buffer[len(NPY_MAGIC):len(NPY_MAGIC) + 2], 'little')
+    offset = len(NPY_MAGIC) + 2 + length
+    header = ast.literal_eval(bytes(buffer[len(NPY_MAGIC) + 2:offset]).decode('latin-1'))
+    if header['fortran_order']:
+        raise ValueError("Arrays in Fortran order are not supported")
+    return header['descr'], tuple(header['shape']), offset
+
+
+class EventRecorder(EditedTextVisitor):
+    """
+    Records the events of the voices it visits (e.g. while a piece is parsed) as rows of the columns, but the piece
+    column, and the offsets of the voices as (section, voice, start, stop).
+    """
+    def __init__(self):
+        super().__init__()
+        self.columns: Dict[str, array] = {name: array(typecode) for name, typecode in COLUMNS if name != 'piece'}
+        self.voices: List[Tuple[int, int, int, int]] = []
+        self.section = 0
+        self.voice_num = MISSING
+        self.start = 0
+        self.depth = 0
+
+    def __len__(self):
+        return len(self.columns['kind'])
+
+    def leave_music_section(self, music_section):
+        self.section += 1
+
+    def enter_voice(self, voice):
+        self.voice_num = voice.voice_num if voice.voice_num is not None else MISSING
+        self.start = len(self)
+
+    def leave_voice(self, voice):
+        self.voices.append((self.section, self.voice_num, self.start, len(self)))
+
+    def enter_event(self, event):
+        columns = self.columns
+        columns['section'].append(self.section)
+        columns['voice'].append(self.voice_num)
+        columns['depth'].append(self.depth)
+        columns['kind'].append(EVENT_KIND_CODES.get(type(event).__name__, MISSING))
+        type_name = getattr(event, 'note_type', None) or getattr(event, 'rest_type', None)
+        columns['note_type'].append(NOTE_TYPE_CODES.get(type_name, MISSING))
+        pitch = getattr(event, 'pitch', None)
+        columns['pitch'].append(diatonic_step(pitch) if isinstance(pitch, Pitch) else MISSING)
+        length = getattr(event, 'length', None)
+        if length is not None:
+            num, den = length.num, length.den
+        else:
+            num, den = getattr(event, 'length_num', None), getattr(event, 'length_den', None)
+        columns['length_num'].append(num if num is not None else MISSING)
+        columns['length_den'].append(den if den is not None else MISSING)
+        self.depth += 1
+
+    def leave_event(self, event):
+        self.depth -= 1
+
+    def enter_variant_readings(self, variant_readings):
+        super().enter_variant_readings(variant_readings)
+        self.enter_event(variant_readings)
+
+    def leave_variant_readings(self, variant_readings):
+        super().leave_variant_readings(variant_readings)
+        self.leave_event(variant_readings)
+
+
+class NpyAppender:
+    """
+    A .npy file of a one- or two-dimensional array written by appending rows, whose header is completed when it is
+    closed.
+    """
+    def __init__(self, path: str, typecode: str, width: Optional[int] = None):
+        self.typecode = typecode
+        self.width = width
+        self.size = 0
+        self.file = open(path, 'wb')
+        self.file.write(b'\0' * NPY_HEADER_SIZE)
+
+    def append(self, values: array):
+        if sys.byteorder == 'big':
+            values = array(values.typecode, values)
+            values.byteswap()
+        values.tofile(self.file)
+        self.size += len(values)
+
+    def close(self):
+        shape = (self.size,) if self.width is None else (self.size // self.width, self.width)
+        self.file.seek(0)
+        self.file.write(npy_header(self.typecode, shape))
+        self.file.close()
+
+
+class DatasetWriter:
+    """
+    Writes the dataset of a corpus to a directory, piece by piece.
+    """
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.keys: List[Optional[str]] = []
+        self.rows = 0
+        self.voice_rows = 0
+        self.columns = {name: NpyAppender(self.path(name), typecode) for name, typecode in COLUMNS}
+        self.voices = NpyAppender(self.path('voices'), 'q', len(VOICE_FIELDS))
+        self.pieces = NpyAppender(self.path('pieces'), 'q', len(PIECE_FIELDS))
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, name + '.npy')
+
+    def append(self, key: Optional[str], recorder: EventRecorder) -> int:
+        """
+        Appends the events recorded for a piece.
+
+        Returns:
+            The index of the piece in the dataset.
+        """
+        index = len(self.keys)
+        rows = len(recorder)
+        self.columns['piece'].append(array('i', [index]) * rows)
+        for name, values in recorder.columns.items():
+            self.columns[name].append(values)
+        offsets = array('q')
+        for section, voice_num, start, stop in recorder.voices:
+            offsets.extend((index, section, voice_num, self.rows + start, self.rows + stop))
+        self.voices.append(offsets)
+        self.pieces.append(array('q', (self.rows, self.rows + rows, self.voice_rows,
+                                       self.voice_rows + len(recorder.voices))))
+        self.keys.append(key)
+        self.rows += rows
+        self.voice_rows += len(recorder.voices)
+        return index
+
+    def add(self, piece: Piece, key: Optional[str] = None) -> int:
+        """
+        Appends the events of a parsed piece, and returns its index.
+        """
+        recorder = EventRecorder()
+        Traversal(recorder).walk(piece)
+        return self.append(key, recorder)
+
+    def add_file(self, path: str) -> int:
+        """
+        Parses a CMME file and appends its events, under its absolute path, and returns its index.
+        """
+        recorder = EventRecorder()
+        with open(path) as file:
+            Piece.parse(file.read(), visitor=recorder)
+        return self.append(os.path.abspath(path), recorder)
+
+    def close(self):
+        for appender in list(self.columns.values()) + [self.voices, self.pieces]:
+            appender.close()
+        manifest = {'format': FORMAT, 'version': FORMAT_VERSION, 'columns': [name for name, _ in COLUMNS],
+                    'voice_fields': VOICE_FIELDS, 'piece_fields': PIECE_FIELDS, 'kinds': EVENT_KINDS,
+                    'note_types': NOTE_TYPES, 'letters': PITCH_LETTERS, 'missing': MISSING, 'keys': self.keys}
+        with open(os.path.join(self.directory, 'dataset.json'), 'w', encoding='utf-8') as file:
+            json.dump(manifest, file, ensure_ascii=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class Dataset:
+    """
+    A dataset written by DatasetWriter, its arrays being mapped in memory and read as memoryviews (the offset tables
+    as two-dimensional ones, indexed by [row, field]).
+    """
+    def __init__(self, directory: str):
+        if sys.byteorder == 'big':
+            raise ValueError("The arrays of a dataset are little-endian")
+        with open(os.path.join(directory, 'dataset.json'), encoding='utf-8') as file:
+            manifest = json.load(file)
+        if manifest.get('format') != FORMAT or manifest.get('version') != FORMAT_VERSION:
+            raise ValueError(f"{directory} is not a dataset of version {FORMAT_VERSION}")
+        self.directory = directory
+        self.keys: List[Optional[str]] = manifest['keys']
+        self.maps: List[mmap.mmap] = []
+        self.views: List[memoryview] = []
+        self.columns = {name: self.map(name, typecode) for name, typecode in COLUMNS}
+        self.voices = self.map('voices', 'q')
+        self.pieces = self.map('pieces', 'q')
+
+    def map(self, name: str, typecode: str) -> memoryview:
+        with open(os.path.join(self.directory, name + '.npy'), 'rb') as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.maps.append(mapped)
+        dtype, shape, offset = read_npy_header(mapped)
+        if dtype != DTYPES[typecode]:
+            raise ValueError(f"{name}.npy has the dtype {dtype} instead of {DTYPES[typecode]}")
+        if 0 in shape:
+            # A memoryview cannot be cast to a shape with no rows: an empty array is read as a one-dimensional view
+            view = memoryview(mapped)[offset:offset].cast(typecode)
+        else:
+            view = memoryview(mapped)[offset:].cast(typecode, shape)
+        self.views.append(view)
+        return view
+
+    def __len__(self):
+        return len(self.keys)
+
+    def column(self, name: str) -> memoryview:
+        return self.columns[name]
+
+    def piece(self, index: int) -> Tuple[int, int]:
+        """
+        Returns the rows (start, stop) of the events of a piece.
+        """
+        return self.pieces[index, 0], self.pieces[index, 1]
+
+    def voices_of(self, index: int) -> List[Tuple[int, int, int, int]]:
+        """
+        Returns the voices of a piece, as (section, voice, start, stop).
+        """
+        return [(self.voices[row, 1], self.voices[row, 2], self.voices[row, 3], self.voices[row, 4])
+                for row in range(self.pieces[index, 2], self.pieces[index, 3])]
+
+    def close(self):
+        """
+        Releases the views and unmaps the files (the views taken from the columns must have been released).
+        """
+        for view in self.views:
+            view.release()
+        for mapped in self.maps:
+            mapped.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __repr__(self):
+        return f"Dataset(Pieces={len(self)}, Events={len(self.columns['kind'])})"
+
+
+def main(argv: List[str]) -> int:
+    if len(argv) < 2:
+        print(__doc__, file=sys.stderr)
+        return 2
+    errors = 0
+    with DatasetWriter(argv[0]) as writer:
+        for path in argv[1:]:
+            try:
+                writer.add_file(path)
+            except Exception as error:
+                # Unreadable or malformed files, and any error of the model (e.g. an unknown event): the events of a
+                # file are only appended once it has been parsed, so the other files are kept
+                errors += 1
+                print(f"{path}: {type(error).__name__}: {error}", file=sys.stderr)
+        print(f"{len(writer.keys)} pieces, {writer.rows} events")
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
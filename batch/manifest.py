@@ -0,0 +1,219 @@
+"""
+Manifest of a batch run, so that an interrupted run can be resumed.
+
+The manifest is a JSONL file with a record per conversion of an input: its key (absolute path), the content hash of
+the file (BLAKE2b, as in model.hashing), its size and modification time, the status of the conversion (done or failed),
+the paths of its outputs, when it started and how long it took, and the error of a failed conversion. Records are only
+appended, one line per write, and flushed as soon as an input has been converted, so that a crash loses at most the
+input being converted (a truncated last line is ignored); the last record of an input is the one in force.
+
+A rerun only converts the inputs that are not done: the new ones, those that failed, those whose outputs are missing,
+and those whose content has changed. The content hash is only computed for a file whose size or modification time
+differ from its record, so that checking a large corpus that has not changed does not read it.
+
+A run can be sharded across machines that share the filesystem: shard K of N takes the inputs whose key hashes to K
+modulo N, so that the shards never convert the same input. The shards can append to the same manifest on a local
+filesystem, where appends are atomic; on a network filesystem, each shard should have its own.
+"""
+import hashlib
+import json
+import os
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from model.hashing import DIGEST_SIZE
+
+DONE = 'done'
+FAILED = 'failed'
+
+# Size of the blocks in which the files are hashed
+BLOCK_SIZE = 1 << 20
+
+
+def content_hash(path: str) -> str:
+    """
+    Returns the content hash of a file, in hexadecimal.
+    """
+    digest = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def shard_of(key: str, count: int) -> int:
+    """
+    Returns the shard of an input among count shards, the same on every machine.
+    """
+    digest = hashlib.blake2b(key.encode('utf-8', 'surrogatepass'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') % count
+
+
+def parse_shard(text: str) -> Tuple[int, int]:
+    """
+    Parses a shard given as K/N (the shards of N being numbered from 0).
+    """
+    index, _, count = text.partition('/')
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        raise ValueError(f"Invalid shard {text}, expected K/N") from None
+    if not 0 <= index < count:
+        raise ValueError(f"Invalid shard {text}, K must be in 0..N-1")
+    return index, count
+
+
+class ManifestEntry:
+    """
+    The record of the conversion of an input.
+    """
+    def __init__(self, key: str, content_hash: Optional[str], size: Optional[int], mtime_ns: Optional[int],
+                 status: str, outputs: Optional[List[str]] = None, started: Optional[float] = None,
+                 seconds: Optional[float] = None, error: Optional[str] = None):
+        self.key = key
+        self.content_hash = content_hash
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.status = status
+        self.outputs = outputs or []
+        self.started = started
+        self.seconds = seconds
+        self.error = error
+
+    def to_dict(self) -> dict:
+        return {'key': self.key, 'hash': self.content_hash, 'size': self.size, 'mtime_ns': self.mtime_ns,
+                'status': self.status, 'outputs': self.outputs, 'started': self.started, 'seconds': self.seconds,
+                'error': self.error}
+
+    @classmethod
+    def from_dict(cls, record: dict) -> 'ManifestEntry':
+        return cls(record['key'], record.get('hash'), record.get('size'), record.get('mtime_ns'), record['status'],
+                   record.get('outputs'), record.get('started'), record.get('seconds'), record.get('error'))
+
+    def __eq__(self, other):
+        if isinstance(other, ManifestEntry):
+            return self.to_dict() == other.to_dict()
+        return False
+
+    def __repr__(self):
+        return (f"ManifestEntry(Key={self.key}, Hash={self.content_hash}, Status={self.status}, "
+                f"Outputs={self.outputs}, Seconds={self.seconds}, Error={self.error})")
+
+
+class Manifest:
+    """
+    The records of a manifest file, by key: the last one of each input.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, ManifestEntry] = {}
+        self.load()
+
+    def load(self):
+        """
+        Reads the records of the file, including those appended by other shards since it was last read.
+        """
+        self.entries = {}
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding='utf-8') as file:
+            for line in file:
+                try:
+                    entry = ManifestEntry.from_dict(json.loads(line))
+                except (ValueError, KeyError, TypeError):
+                    # A line cut short by a crash
+                    continue
+                self.entries[entry.key] = entry
+
+    def record(self, entry: ManifestEntry):
+        """
+        Appends a record to the file.
+        """
+        self.entries[entry.key] = entry
+        with open(self.path, 'a', encoding='utf-8') as file:
+            file.write(json.dumps(entry.to_dict(), ensure_ascii=False) + '\n')
+
+    def is_done(self, key: str) -> bool:
+        """
+        Returns whether an input has been converted, with its outputs, and has not changed since (an input that has
+        been removed or cannot be read is not done).
+        """
+        entry = self.entries.get(key)
+        if entry is None or entry.status != DONE or not all(os.path.exists(output) for output in entry.outputs):
+            return False
+        try:
+            status = os.stat(key)
+            if (status.st_size, status.st_mtime_ns) == (entry.size, entry.mtime_ns):
+                return True
+            if content_hash(key) != entry.content_hash:
+                return False
+        except OSError:
+            # Its conversion is attempted, and fails in run_batch, which records it
+            return False
+        # Touched but unchanged: its record is renewed, so that it is not hashed again
+        self.record(ManifestEntry(key, entry.content_hash, status.st_size, status.st_mtime_ns, DONE, entry.outputs,
+                                  entry.started, entry.seconds))
+        return True
+
+    def compact(self):
+        """
+        Rewrites the file with the last record of each input only.
+        """
+        temporary = self.path + '.tmp'
+        with open(temporary, 'w', encoding='utf-8') as file:
+            for entry in self.entries.values():
+                file.write(json.dumps(entry.to_dict(), ensure_ascii=False) + '\n')
+        os.replace(temporary, self.path)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __repr__(self):
+        return f"Manifest(Path={self.path}, Entries={len(self.entries)})"
+
+
+def run_batch(manifest: Manifest, paths: Iterable[str], convert: Callable[[str], List[str]],
+              shard: Optional[Tuple[int, int]] = None,
+              done: Optional[Callable[[str], bool]] = None) -> Dict[str, List[str]]:
+    """
+    Converts the inputs that are not done, recording each conversion in the manifest. Any error of a conversion is
+    recorded, and the run goes on.
+
+    Args:
+        manifest: The manifest of the run.
+        paths: The paths of the inputs.
+        convert: Converts an input, given its key, and returns the paths of its outputs.
+        shard: If given, (K, N): only the inputs of shard K of N are converted.
+        done: If given, whether the result of an input recorded as done has been kept where the manifest cannot check
+            it (e.g. in a search index saved at the end of the run); the inputs for which it is false are converted
+            again.
+
+    Returns:
+        The keys of the inputs that were skipped, converted (done) and that failed, by status ('skipped', DONE and
+        FAILED).
+    """
+    keys = {'skipped': [], DONE: [], FAILED: []}
+    for path in paths:
+        key = os.path.abspath(path)
+        if shard is not None and shard_of(key, shard[1]) != shard[0]:
+            continue
+        if manifest.is_done(key) and (done is None or done(key)):
+            keys['skipped'].append(key)
+            continue
+        started = time.time()
+        start = time.perf_counter()
+        try:
+            # The content is hashed before the conversion, which then converts this content or a later one
+            status = os.stat(key)
+            digest = content_hash(key)
+            outputs = convert(key)
+        except Exception as error:
+            # Unreadable or malformed files, and any error of the model or of the conversion (e.g. an unknown event)
+            entry = ManifestEntry(key, None, None, None, FAILED, None, started, time.perf_counter() - start,
+                                  f"{type(error).__name__}: {error}")
+        else:
+            entry = ManifestEntry(key, digest, status.st_size, status.st_mtime_ns, DONE, outputs, started,
+                                  time.perf_counter() - start)
+        manifest.record(entry)
+        keys[entry.status].append(key)
+    return keys
@@ -0,0 +1,265 @@
+"""
+Fan-out pipeline: the outputs of a file from a single parse.
+
+A Pipeline holds registered sinks, each made for a file by its factory. A sink is a Visitor (see model.visitor) with a
+result: the sinks of a file are fused in one Traversal and given to Piece.parse, so that each MusicSection is fed to
+every sink as soon as it is parsed and the sinks work incrementally, section by section, in the same pass as the parse.
+Adding an output only adds the work of its sink.
+
+The sinks of the usual outputs are:
+    - MEISink: the MEI document (see mei.export), the voices of each section being rendered as the section arrives;
+    - SummarySink: the catalog entry of the piece (see batch.catalog) with the types of its sections, for JSON;
+    - StatisticsSink: the statistics of the piece (see analysis.statistics);
+    - SearchIndexSink: the entries of the piece in a search index (see analysis.search_index);
+    - DatasetSink: the rows of the events of the piece in a numeric dataset (see batch.dataset).
+
+Usage (from the repository root):
+    python -m batch.pipeline [--index INDEX] [--manifest MANIFEST] [--shard K/N] OUTPUT_DIRECTORY FILE...
+writes OUTPUT_DIRECTORY/NAME.mei and OUTPUT_DIRECTORY/NAME.json (the summary and the statistics) for each FILE, and
+updates the search index INDEX if it is given. The outputs of the files in subdirectories of the deepest directory
+containing all the FILEs are written to the same subdirectories of OUTPUT_DIRECTORY. With a MANIFEST (see
+batch.manifest), the conversions are recorded and a rerun only converts the files that are not done; the files that
+fail are recorded and the run goes on. With --shard, only shard K of N of the files is converted.
+"""
+import io
+import json
+import os
+import sys
+from typing import Callable, Dict, List, Optional
+
+from analysis.search_index import PieceIndexer, SearchIndex
+from analysis.statistics import StatisticsCollector
+from batch.catalog import catalog_record
+from batch.dataset import DatasetWriter, EventRecorder
+from batch.manifest import DONE, FAILED, Manifest, parse_shard, run_batch, shard_of
+from mei.export import write_document
+from mei.render import render_voice
+from model import Piece
+from model.piece import PieceMetadata
+from model.recovery import Diagnostic
+from model.staff import ClefTable, resolve_section
+from model.visitor import Traversal, Visitor
+
+
+class Sink(Visitor):
+    """
+    Base class of the sinks: a visitor of the piece as it is parsed, whose output is returned by result() once the
+    piece has been left.
+    """
+    def result(self):
+        return None
+
+
+class MEISink(Sink):
+    """
+    Renders the voices of each section as it arrives, and writes the MEI document at the end of the piece.
+    """
+    def __init__(self, key: Optional[str] = None):
+        self.key = key
+        self.fragments: List[List[str]] = []
+        # The clef table of each voice at the end of the previous sections
+        self.clefs: Dict[int, Optional[ClefTable]] = {}
+        self.document: Optional[str] = None
+
+    def leave_music_section(self, music_section):
+        resolve_section(music_section, self.clefs)
+        if music_section.content.section_type != 'Text':
+            self.fragments.append([render_voice(voice) for voice in music_section.content.voices])
+
+    def leave_piece(self, piece):
+        output = io.StringIO()
+        write_document(piece, output, self.fragments)
+        self.document = output.getvalue()
+
+    def result(self) -> Optional[str]:
+        return self.document
+
+
+class SummarySink(Sink):
+    """
+    Summarises a piece: its catalog entry and the types of its sections.
+    """
+    def __init__(self, key: Optional[str] = None):
+        self.key = key
+        self.section_types: List[str] = []
+        self.summary: Optional[dict] = None
+
+    def leave_music_section(self, music_section):
+        self.section_types.append(music_section.content.section_type)
+
+    def leave_piece(self, piece):
+        self.summary = catalog_record(self.key, PieceMetadata(piece.cmme_version, piece.general_data,
+                                                              piece.voice_data))
+        self.summary['music_sections'] = self.section_types
+
+    def result(self) -> Optional[dict]:
+        return self.summary
+
+
+class StatisticsSink(StatisticsCollector, Sink):
+    """
+    Collects the statistics of the piece.
+    """
+    def result(self):
+        return self.statistics
+
+
+class SearchIndexSink(PieceIndexer, Sink):
+    """
+    Indexes the piece in a search index, under its key; the result is the key.
+    """
+    def result(self) -> str:
+        return self.key
+
+
+class DatasetSink(EventRecorder, Sink):
+    """
+    Appends the events of the piece to a dataset, once the piece has been parsed; the result is its index in the
+    dataset.
+    """
+    def __init__(self, writer: DatasetWriter, key: Optional[str] = None):
+        super().__init__()
+        self.writer = writer
+        self.key = key
+        self.index: Optional[int] = None
+
+    def leave_piece(self, piece):
+        self.index = self.writer.append(self.key, self)
+
+    def result(self) -> Optional[int]:
+        return self.index
+
+
+class Pipeline:
+    """
+    Registered sinks, by name, fed by one parse of each file.
+    """
+    def __init__(self):
+        self.factories: Dict[str, Callable[[Optional[str]], Sink]] = {}
+
+    def register(self, name: str, factory: Callable[[Optional[str]], Sink]) -> 'Pipeline':
+        """
+        Registers a sink, made for each piece by calling the factory with the key of the piece (e.g. its path).
+        """
+        if name in self.factories:
+            raise ValueError(f"A sink is already registered as {name}")
+        self.factories[name] = factory
+        return self
+
+    def run(self, xml_string: str, key: Optional[str] = None, validate: bool = False,
+            diagnostics: Optional[List[Diagnostic]] = None) -> Dict[str, object]:
+        """
+        Parses a CMME document once, feeding every registered sink.
+
+        Args:
+            xml_string: The CMME document.
+            key: The key of the piece, given to the factories of the sinks.
+            validate: If True, the document is validated (see Piece.parse).
+            diagnostics: If a list is given, the parse recovers from the errors in the music (see Piece.parse).
+
+        Returns:
+            The result of each sink, by name.
+        """
+        sinks = {name: factory(key) for name, factory in self.factories.items()}
+        Piece.parse(xml_string, validate, Traversal(*sinks.values()), diagnostics)
+        return {name: sink.result() for name, sink in sinks.items()}
+
+    def run_file(self, path: str, validate: bool = False,
+                 diagnostics: Optional[List[Diagnostic]] = None) -> Dict[str, object]:
+        """
+        Runs the pipeline on a CMME file, with its absolute path as key.
+        """
+        with open(path) as file:
+            return self.run(file.read(), os.path.abspath(path), validate, diagnostics)
+
+
+def default_pipeline(index: Optional[SearchIndex] = None, dataset: Optional[DatasetWriter] = None) -> Pipeline:
+    """
+    Returns a pipeline with the sinks of the MEI document, the summary and the statistics, and of the search index and
+    the dataset if they are given.
+    """
+    pipeline = Pipeline()
+    pipeline.register('mei', MEISink).register('summary', SummarySink).register('statistics', StatisticsSink)
+    if index is not None:
+        pipeline.register('search_index', lambda key: SearchIndexSink(index, key))
+    if dataset is not None:
+        pipeline.register('dataset', lambda key: DatasetSink(dataset, key))
+    return pipeline
+
+
+def common_root(paths: List[str]) -> str:
+    """
+    Returns the deepest directory containing all the files.
+    """
+    return os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in paths])
+
+
+def convert_file(pipeline: Pipeline, path: str, directory: str, root: Optional[str] = None) -> List[str]:
+    """
+    Runs the pipeline on a file, and writes its MEI document and its summary and statistics (JSON) to a directory.
+
+    Args:
+        pipeline: The pipeline.
+        path: The path of the file.
+        directory: The output directory.
+        root: If given, a directory containing the file: the outputs are written to the same path relative to the
+            output directory as the file relative to the root, so that files with the same name in different
+            directories do not overwrite each other's outputs. Otherwise they are written to the output directory.
+
+    Returns:
+        The paths of the files written.
+    """
+    results = pipeline.run_file(path)
+    if root is not None:
+        directory = os.path.join(directory, os.path.relpath(os.path.dirname(os.path.abspath(path)), root))
+        os.makedirs(directory, exist_ok=True)
+    name = os.path.basename(path)
+    name = name[:-len('.cmme.xml')] if name.endswith('.cmme.xml') else os.path.splitext(name)[0]
+    outputs = [os.path.join(directory, name + '.mei'), os.path.join(directory, name + '.json')]
+    with open(outputs[0], 'w', encoding='utf-8') as file:
+        file.write(results['mei'])
+    with open(outputs[1], 'w', encoding='utf-8') as file:
+        json.dump({'summary': results['summary'], 'statistics': results['statistics'].to_dict()}, file, indent=1,
+                  ensure_ascii=False)
+    return outputs
+
+
+def main(argv: List[str]) -> int:
+    options = {'--index': None, '--manifest': None, '--shard': None}
+    while argv[:1] and argv[0] in options and len(argv) > 1:
+        options[argv[0]], argv = argv[1], argv[2:]
+    if len(argv) < 2:
+        print(__doc__, file=sys.stderr)
+        return 2
+    directory, paths = argv[0], argv[1:]
+    index_path = options['--index']
+    index = SearchIndex.open(index_path) if index_path is not None else None
+    shard = parse_shard(options['--shard']) if options['--shard'] is not None else None
+    pipeline = default_pipeline(index)
+    os.makedirs(directory, exist_ok=True)
+    # Of all the files, whatever the shard, so that the outputs of a file are at the same place in every shard
+    root = common_root(paths)
+    try:
+        if options['--manifest'] is not None:
+            # The index is only saved at the end: the files done in a run that did not save it are converted again
+            keys = run_batch(Manifest(options['--manifest']), paths,
+                             lambda key: convert_file(pipeline, key, directory, root), shard,
+                             (lambda key: key in index) if index is not None else None)
+            failed = len(keys[FAILED])
+            print(f"{len(keys[DONE])} files converted, {len(keys['skipped'])} skipped, {failed} failed")
+        else:
+            if shard is not None:
+                paths = [path for path in paths if shard_of(os.path.abspath(path), shard[1]) == shard[0]]
+            for path in paths:
+                convert_file(pipeline, path, directory, root)
+            failed = 0
+            print(f"{len(paths)} files converted")
+    finally:
+        # What has been indexed is kept if the run is interrupted
+        if index is not None:
+            index.save(index_path)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
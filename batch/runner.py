@@ -0,0 +1,93 @@
+"""
+Parses CMME files in a process pool.
+"""
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from model import Piece
+from model.recovery import Diagnostic, describe
+from batch.transport import attach_voices, release_piece, share_voices
+
+
+def parse_file(path: str, shared_memory: bool = False) -> Piece:
+    """
+    Parses a CMME file (in a worker process).
+
+    Args:
+        path: The path of the CMME file.
+        shared_memory: If True, the voices of the piece are replaced by handles to shared memory blocks, to be
+            attached by the parent (see batch.transport).
+
+    Returns:
+        A Piece object.
+    """
+    with open(path) as file:
+        piece = Piece.parse(file.read())
+    return share_voices(piece) if shared_memory else piece
+
+
+def parse_file_recovering(path: str, shared_memory: bool = False) -> Tuple[Optional[Piece], List[Diagnostic]]:
+    """
+    Parses a CMME file (in a worker process), recovering from the errors in its music (see model.recovery).
+
+    Returns:
+        The Piece, or None if the file could not be parsed at all (e.g. malformed XML, or an error outside the music),
+        and the diagnostics of the file.
+    """
+    diagnostics = []
+    try:
+        with open(path) as file:
+            piece = Piece.parse(file.read(), diagnostics=diagnostics)
+    except Exception as error:
+        # Any error of a file is one of its diagnostics, so that the other files of the batch are still parsed
+        return None, diagnostics + [Diagnostic('/', describe(error))]
+    return share_voices(piece) if shared_memory else piece, diagnostics
+
+
+def parse_files(paths: Iterable[str], max_workers: Optional[int] = None, shared_memory: bool = True,
+                executor: Optional[Executor] = None,
+                diagnostics: Optional[Dict[str, List[Diagnostic]]] = None) -> Iterator[Tuple[str, Piece]]:
+    """
+    Parses CMME files in a process pool.
+
+    Args:
+        paths: The paths of the CMME files.
+        max_workers: The number of processes of the pool (by default, one per core). Ignored if executor is given.
+        shared_memory: If True, the voices are handed over through shared memory (as SharedVoice objects) instead of
+            being pickled back with the rest of the piece.
+        executor: An existing pool to use.
+        diagnostics: If a dict is given, the files are parsed in recovering mode, and the diagnostics of each file
+            that has errors are stored in it under its path. The files that cannot be parsed at all are not yielded,
+            so that the batch completes in one pass.
+
+    Yields:
+        The path and the Piece of each file, in the order of paths. Without diagnostics, the exception raised by a
+        file stops the iteration.
+    """
+    paths = list(paths)
+    recovering = diagnostics is not None
+    pool = executor if executor is not None else ProcessPoolExecutor(max_workers)
+    futures = [pool.submit(parse_file_recovering if recovering else parse_file, path, shared_memory)
+               for path in paths]
+    try:
+        for index, path in enumerate(paths):
+            piece = futures[index].result()
+            # The pieces already consumed are not kept by the iterator
+            futures[index] = None
+            if recovering:
+                piece, file_diagnostics = piece
+                if file_diagnostics:
+                    diagnostics[path] = file_diagnostics
+                if piece is None:
+                    continue
+            yield path, attach_voices(piece)
+    finally:
+        # Free the blocks of the pieces that were parsed but will not be consumed
+        for future in futures:
+            if future is not None and not future.cancel() and shared_memory:
+                if future.exception() is None:
+                    piece = future.result()[0] if recovering else future.result()
+                    if piece is not None:
+                        release_piece(piece)
+        if executor is None:
+            pool.shutdown()
@@ -0,0 +1,177 @@
+"""
+Hands the voices parsed by worker processes over to the parent through shared memory.
+
+Returning a Piece from a worker pickles all its events, and the parent has to rebuild every object before it can use
+any of them. Instead, each Voice is written by the worker into its own shared memory block: a small header, the
+columnar form of its events (see model.columns) and the pickled EventList. Only a SharedVoiceHandle (the name of the
+block) travels through the pool. The parent maps the block and gets a SharedVoice, whose columns are read in place and
+whose EventList is only unpickled if it is accessed.
+
+The parent owns the blocks: they are unlinked as soon as they are mapped, and the memory is freed when the SharedVoice
+is closed or garbage collected.
+"""
+import os
+import pickle
+import struct
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import List
+
+from model import Piece
+from model.columns import VoiceColumns
+from model.music_section import EventList, Voice
+
+
+class SharedVoiceHandle:
+    """
+    What a worker sends to the parent for each Voice: the name of its shared memory block and the few fields that are
+    not events.
+    """
+    def __init__(self, name: str, voice_num: int, missing_version_ids: List[str]):
+        self.name = name
+        self.voice_num = voice_num
+        self.missing_version_ids = missing_version_ids
+
+    def __repr__(self):
+        return f"SharedVoiceHandle(Name={self.name}, VoiceNum={self.voice_num})"
+
+
+class SharedVoice(Voice):
+    """
+    A Voice whose events live in a shared memory block. The columns are views of the block; the EventList is
+    unpickled from it on first access.
+    """
+    # Size of the pickled EventList, which follows the columns
+    HEADER = struct.Struct('<Q')
+
+    def __init__(self, handle: SharedVoiceHandle):
+        # The event_list attribute of Voice is replaced by a property
+        self.voice_num = handle.voice_num
+        self.missing_version_ids = handle.missing_version_ids
+        self._shared_memory = SharedMemory(handle.name)
+        # The mapping stays valid after the name is removed
+        self._shared_memory.unlink()
+        self._event_list = None
+
+        self.columns, offset = VoiceColumns.from_buffer(self._shared_memory.buf, self.HEADER.size)
+        payload_size, = self.HEADER.unpack_from(self._shared_memory.buf, 0)
+        self._payload = self._shared_memory.buf[offset:offset + payload_size]
+
+    @property
+    def event_list(self) -> EventList:
+        if self._payload is not None:
+            self._event_list = pickle.loads(self._payload)
+            self._payload.release()
+            self._payload = None
+        return self._event_list
+
+    def close(self):
+        """
+        Frees the shared memory block, once the events have been read (or are not needed).
+        """
+        if getattr(self, '_shared_memory', None) is None:
+            return
+        # The views may not have been made if __init__ failed
+        if getattr(self, 'columns', None) is not None:
+            self.columns.release()
+        if getattr(self, '_payload', None) is not None:
+            self._payload.release()
+            self._payload = None
+        self._shared_memory.close()
+        self._shared_memory = None
+
+    def __del__(self):
+        if getattr(self, '_shared_memory', None) is not None:
+            self.close()
+
+    def __reduce__(self):
+        # Copies of a SharedVoice (e.g. pickled again) are ordinary voices
+        return Voice, (self.voice_num, self.missing_version_ids, self.event_list)
+
+
+def untrack(name: str):
+    """
+    Stops the resource tracker of this process from unlinking a shared memory block when the process ends. Only POSIX
+    systems track the blocks, under their name with a leading slash (which the name of SharedMemory omits).
+    """
+    if os.name == 'posix':
+        resource_tracker.unregister(name if name.startswith('/') else '/' + name, 'shared_memory')
+
+
+def share_voice(voice: Voice) -> SharedVoiceHandle:
+    """
+    Writes a Voice into a new shared memory block, whose ownership is passed to the process that will map it.
+    """
+    columns = VoiceColumns.from_events(voice.event_list.events if voice.event_list is not None else [])
+    payload = pickle.dumps(voice.event_list, pickle.HIGHEST_PROTOCOL)
+    offset = SharedVoice.HEADER.size + columns.nbytes
+
+    shared_memory = SharedMemory(create=True, size=offset + len(payload))
+    try:
+        buffer = shared_memory.buf
+        SharedVoice.HEADER.pack_into(buffer, 0, len(payload))
+        columns.write_into(buffer, SharedVoice.HEADER.size)
+        buffer[offset:offset + len(payload)] = payload
+        del buffer
+    except BaseException:
+        shared_memory.close()
+        shared_memory.unlink()
+        raise
+    shared_memory.close()
+    # The block must outlive this process: the receiver unlinks it
+    untrack(shared_memory.name)
+    return SharedVoiceHandle(shared_memory.name, voice.voice_num, voice.missing_version_ids)
+
+
+def voices_of(piece: Piece):
+    """
+    Yields the voice lists of the sections of a piece (text sections have none).
+    """
+    for music_section in piece.music_sections:
+        yield music_section.content.voices
+
+
+def share_voices(piece: Piece) -> Piece:
+    """
+    Replaces, in place, the voices of a piece by handles to shared memory blocks.
+    """
+    handles = []
+    try:
+        for voices in voices_of(piece):
+            for index, voice in enumerate(voices):
+                voices[index] = share_voice(voice)
+                handles.append(voices[index])
+    except BaseException:
+        release_handles(handles)
+        raise
+    return piece
+
+
+def attach_voices(piece: Piece) -> Piece:
+    """
+    Replaces, in place, the handles of a piece received from a worker by SharedVoice objects.
+    """
+    for voices in voices_of(piece):
+        for index, voice in enumerate(voices):
+            if isinstance(voice, SharedVoiceHandle):
+                voices[index] = SharedVoice(voice)
+    return piece
+
+
+def release_handles(handles: List[SharedVoiceHandle]):
+    """
+    Frees the blocks of handles that will never be attached.
+    """
+    for handle in handles:
+        try:
+            SharedMemory(handle.name).unlink()
+        except FileNotFoundError:
+            pass
+
+
+def release_piece(piece: Piece):
+    """
+    Frees the blocks of a piece received from a worker that will not be used.
+    """
+    release_handles([voice for voices in voices_of(piece) for voice in voices
+                     if isinstance(voice, SharedVoiceHandle)])
@@ -0,0 +1,61 @@
+"""
+Benchmark: handing parsed pieces from the workers to the parent by pickling or through shared memory.
+
+A few large pieces (the MusicSections of the BrusBRIV922 score repeated) are written to a temporary directory and
+parsed with batch.runner.parse_files. For each transport, two consumers are timed: one that only reads the columnar
+form of the voices (pitches) and one that reads every event. Besides the wall time, the CPU time of the parent process
+is reported: it is the part of the run that does not scale with the number of workers.
+
+Usage (from the repository root):
+    python benchmarks/batch_transport.py [files] [copies]
+"""
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from batch.runner import parse_files
+from model.columns import VoiceColumns
+from parallel_parse import large_piece
+
+
+def pitches(voice):
+    columns = voice.columns if hasattr(voice, 'columns') else VoiceColumns.from_events(voice.event_list.events)
+    return sum(1 for step in columns.pitch if step >= 0)
+
+
+def events(voice):
+    return len(voice.event_list.events)
+
+
+def main(files=4, copies=10):
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        xml_string = large_piece(copies)
+        for index in range(files):
+            paths.append(os.path.join(directory, f'piece{index}.cmme.xml'))
+            with open(paths[-1], 'w') as file:
+                file.write(xml_string)
+
+        print(f"{files} files of {len(xml_string) / 1e6:.1f} MB, {os.cpu_count()} cores")
+        with ProcessPoolExecutor() as executor:
+            list(executor.map(abs, range(os.cpu_count())))
+            for shared_memory in (False, True):
+                for consumer in (pitches, events):
+                    start = time.perf_counter()
+                    start_cpu = time.process_time()
+                    for _, piece in parse_files(paths, shared_memory=shared_memory, executor=executor):
+                        for music_section in piece.music_sections:
+                            for voice in music_section.content.voices:
+                                consumer(voice)
+                    elapsed = time.perf_counter() - start
+                    elapsed_cpu = time.process_time() - start_cpu
+                    label = f"{'shared memory' if shared_memory else 'pickle'} / {consumer.__name__}"
+                    print(f"{label:<24} {elapsed * 1e3:>9.1f} ms wall {elapsed_cpu * 1e3:>9.1f} ms parent CPU")
+
+
+if __name__ == '__main__':
+    main(*(int(argument) for argument in sys.argv[1:3]))
@@ -0,0 +1,48 @@
+"""
+Benchmark: building a catalog with Piece.scan_metadata instead of parsing whole pieces.
+
+Copies of the bundled scores are written to a temporary directory, which is then scanned in this process and in a
+process pool; a full Piece.parse of a sample of the files gives the reference cost.
+
+Usage (from the repository root):
+    python benchmarks/catalog_scan.py [files]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from batch.catalog import find_files, scan_files
+from model import Piece
+
+RESOURCES = os.path.join(os.path.dirname(__file__), '..', 'tests', 'resources')
+
+
+def main(files=2000):
+    scores = find_files(RESOURCES)
+    with tempfile.TemporaryDirectory() as directory:
+        for index in range(files):
+            shutil.copy(scores[index % len(scores)], os.path.join(directory, f'{index:05}.cmme.xml'))
+        paths = find_files(directory)
+        print(f"{len(paths)} files, {os.cpu_count()} cores")
+
+        sample = paths[:100]
+        start = time.perf_counter()
+        for path in sample:
+            with open(path) as file:
+                Piece.parse(file.read())
+        parse = (time.perf_counter() - start) / len(sample)
+        print(f"{'full parse':<16} {parse * 1e3:>8.3f} ms/file ({parse * 1e4:.1f} s per 10k files)")
+
+        for label, max_workers in (('scan, 1 process', 1), ('scan, pool', None)):
+            start = time.perf_counter()
+            records = list(scan_files(paths, max_workers))
+            scan = (time.perf_counter() - start) / len(records)
+            print(f"{label:<16} {scan * 1e3:>8.3f} ms/file ({scan * 1e4:.1f} s per 10k files)")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
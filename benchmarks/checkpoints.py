@@ -0,0 +1,52 @@
+"""
+Benchmark: cost of finding the state before an event, by replaying the voice from its start against the checkpoints.
+
+The voice is made by concatenating the events of every voice of a large piece (see benchmarks/parallel_parse.py), so
+that it has tens of thousands of events. Seeks are made to evenly spaced positions; building the checkpoints is timed
+separately.
+
+Usage (from the repository root):
+    python benchmarks/checkpoints.py [copies] [intervals...]
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.parallel_parse import best_of, large_piece
+from model import Piece
+from model.checkpoints import Checkpoints, VoiceState
+from model.music_section import EventList
+
+SEEKS = 200
+
+
+def replay(events, index):
+    state = VoiceState()
+    for event in events[:index]:
+        if event is not None:
+            state.advance(event)
+    return state
+
+
+def main(copies=20, intervals=(16, 64, 256)):
+    piece = Piece.parse(large_piece(copies))
+    event_list = EventList([event for music_section in piece.music_sections
+                            for voice in music_section.content.voices for event in voice.event_list.events])
+    events = event_list.events
+    positions = range(0, len(events), max(1, len(events) // SEEKS))
+    print(f"{len(events)} events, {len(positions)} seeks")
+
+    seconds = best_of(lambda: [replay(events, index) for index in positions], repeat=1)
+    print(f"{'replay':<14} {seconds / len(positions) * 1e6:>9.1f} us/seek")
+    for interval in intervals:
+        build = best_of(lambda: Checkpoints.build(events, interval))
+        checkpoints = event_list.checkpoints(interval)
+        seconds = best_of(lambda: [checkpoints.state_at(events, index) for index in positions])
+        print(f"{f'interval {interval}':<14} {seconds / len(positions) * 1e6:>9.1f} us/seek "
+              f"(build {build * 1e3:.1f} ms, {len(checkpoints.states)} checkpoints)")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20,
+         tuple(int(argument) for argument in sys.argv[2:]) or (16, 64, 256))
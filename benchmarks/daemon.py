@@ -0,0 +1,59 @@
+"""
+Benchmark: per-file latency of a conversion run as a new process, against the conversion daemon (batch.daemon).
+
+Three ways of converting a small piece (LaRue) are timed: a new interpreter that imports cmme2mei and converts the file,
+as a build system invoking the converter per file would; a new interpreter running the thin client (batch.client),
+which sends the file to a running daemon; and a request of a client that is already connected.
+
+Usage (from the repository root):
+    python benchmarks/daemon.py [runs]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from batch.client import Client
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+SCORE = os.path.join(ROOT, 'tests', 'resources', 'LaRue-OSalutarisHostia.cmme.xml')
+
+
+def mean_time(function, runs):
+    start = time.perf_counter()
+    for _ in range(runs):
+        function()
+    return (time.perf_counter() - start) / runs
+
+
+def main(runs=20):
+    with tempfile.TemporaryDirectory() as directory:
+        socket_path = os.path.join(directory, 'cmme2mei.sock')
+        daemon = subprocess.Popen([sys.executable, '-m', 'batch.daemon', socket_path], cwd=ROOT)
+        try:
+            while not os.path.exists(socket_path):
+                time.sleep(0.01)
+
+            cold = mean_time(lambda: subprocess.run(
+                [sys.executable, '-c', f'from cmme2mei import cmme2mei; cmme2mei({SCORE!r})'], cwd=ROOT, check=True),
+                runs)
+            print(f"{'new process':<24} {cold * 1e3:>8.1f} ms/file")
+
+            client_process = mean_time(lambda: subprocess.run(
+                [sys.executable, os.path.join(ROOT, 'batch', 'client.py'), socket_path, SCORE], cwd=ROOT, check=True), runs)
+            print(f"{'client process':<24} {client_process * 1e3:>8.1f} ms/file")
+
+            with Client(socket_path) as client:
+                client.convert(SCORE)
+                connected = mean_time(lambda: client.convert(SCORE), runs)
+                print(f"{'connected client':<24} {connected * 1e3:>8.1f} ms/file")
+                client.shutdown()
+        finally:
+            daemon.wait(timeout=10)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,66 @@
+"""
+Benchmark: reading the notes of a voice from a numeric dataset against parsing the CMME file.
+
+The piece is made by repeating the MusicSections of the BrusBRIV922 score (see benchmarks/parallel_parse.py), and the
+dataset holds several copies of it (see batch.dataset). Reading the pitches of the notes of a voice from the mapped
+columns is compared with parsing the document to get them.
+
+Usage (from the repository root):
+    python benchmarks/dataset.py [copies] [pieces]
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from analysis.notes import notes
+from batch.dataset import Dataset, DatasetWriter, EventRecorder
+from benchmarks.parallel_parse import best_of, large_piece
+from model import Piece
+from model.columns import EVENT_KIND_CODES, diatonic_step
+
+
+def main(copies=10, pieces=20):
+    xml_string = large_piece(copies)
+    directory = tempfile.mkdtemp()
+    try:
+        def export():
+            with DatasetWriter(directory) as writer:
+                for index in range(pieces):
+                    recorder = EventRecorder()
+                    Piece.parse(xml_string, visitor=recorder)
+                    writer.append(f"piece{index}", recorder)
+
+        seconds = best_of(export, 1)
+        print(f"{'export':<10} {seconds * 1e3:>8.1f} ms ({pieces} pieces, {seconds / pieces * 1e3:.1f} ms per piece)")
+
+        def parse():
+            piece = Piece.parse(xml_string)
+            voice = piece.music_sections[-1].content.voices[-1]
+            return [diatonic_step(note.pitch) for note in notes(voice.event_list.events)]
+
+        seconds = best_of(parse)
+        print(f"{'parse':<10} {seconds * 1e3:>8.1f} ms (the notes of a voice)")
+
+        with Dataset(directory) as dataset:
+            def read():
+                _, _, start, stop = dataset.voices_of(pieces - 1)[-1]
+                kinds = dataset.column('kind')[start:stop]
+                pitches = dataset.column('pitch')[start:stop]
+                found = [pitch for kind, pitch in zip(kinds, pitches) if kind == EVENT_KIND_CODES['NoteEvent']]
+                kinds.release()
+                pitches.release()
+                return found
+
+            assert read() == parse()
+            seconds = best_of(read)
+            print(f"{'dataset':<10} {seconds * 1e3:>8.3f} ms (the notes of a voice, {len(dataset.column('kind'))} "
+                  f"events)")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main(*(int(argument) for argument in sys.argv[1:3]))
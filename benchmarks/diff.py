@@ -0,0 +1,52 @@
+"""
+Benchmark: diff of two versions of a large piece that differ by one note.
+
+The piece is made by repeating the MusicSections of the BrusBRIV922 score (see benchmarks/parallel_parse.py). The diff
+of analysis.diff, which skips the sections and voices with equal content hashes, is compared with diffing the events of
+every voice. The first diff hashes both pieces; the next ones only rehash what was forgotten after the edit.
+
+Usage (from the repository root):
+    python benchmarks/diff.py [copies]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from analysis.diff import diff_events, diff_pieces, voice_events
+from benchmarks.parallel_parse import large_piece
+from model import Piece
+from model.hashing import forget
+from model.pitch import Pitch
+
+
+def main(copies=20):
+    xml_string = large_piece(copies)
+    old, new = Piece.parse(xml_string), Piece.parse(xml_string)
+    music_section = new.music_sections[len(new.music_sections) // 2]
+    voice = music_section.content.voices[0]
+    note = next(event for event in voice_events(voice) if type(event).__name__ == 'NoteEvent')
+    voices = sum(len(section.content.voices) for section in old.music_sections)
+    print(f"{len(old.music_sections)} sections, {voices} voices")
+
+    start = time.perf_counter()
+    edits = [edit for voice_diff in diff_pieces(old, new).voices for edit in voice_diff.edits]
+    print(f"{'first diff':<24} {(time.perf_counter() - start) * 1e3:>9.2f} ms, {len(edits)} edits")
+
+    for octave in (1, 2, 3):
+        note.pitch = Pitch('C', octave)
+        forget(voice.event_list, voice, music_section, new)
+        start = time.perf_counter()
+        edits = [edit for voice_diff in diff_pieces(old, new).voices for edit in voice_diff.edits]
+        print(f"{'diff after an edit':<24} {(time.perf_counter() - start) * 1e3:>9.2f} ms, {len(edits)} edits")
+
+    start = time.perf_counter()
+    edits = [edit for old_section, new_section in zip(old.music_sections, new.music_sections)
+             for old_voice, new_voice in zip(old_section.content.voices, new_section.content.voices)
+             for edit in diff_events(voice_events(old_voice), voice_events(new_voice))]
+    print(f"{'every voice diffed':<24} {(time.perf_counter() - start) * 1e3:>9.2f} ms, {len(edits)} edits")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,67 @@
+"""
+Benchmark: cost of parsing editorial-dense CMME files relative to plain ones.
+
+Each score is parsed repeatedly and the time is normalised by the number of events it contains (including the
+events nested in VariantReadings, EditorialData and MultiEvent), so that files of different sizes can be compared.
+
+Usage (from the repository root):
+    python benchmarks/editorial_parse.py [repetitions]
+"""
+import os
+import sys
+import timeit
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from model import Piece
+
+RESOURCES = os.path.join(os.path.dirname(__file__), '..', 'tests', 'resources')
+
+SCORES = [
+    ('BrusBRIV922', 'Anonymous-CibavitEos-BrusBRIV922.cmme.xml'),
+    ('LaRue', 'LaRue-OSalutarisHostia.cmme.xml'),
+    ('Editorial', 'Editorial-Synthetic.cmme.xml'),
+]
+
+# Elements whose children are events
+EVENT_CONTAINERS = {'{http://www.cmme.org}' + tag for tag in
+                    ('EventList', 'Music', 'MultiEvent', 'NewReading', 'Error')}
+
+# Containers that are children of an EventList (the editorial structures)
+EDITORIAL_STRUCTURES = {'{http://www.cmme.org}VariantReadings', '{http://www.cmme.org}EditorialData'}
+
+
+def count_events(xml_string):
+    """
+    Returns the number of events and of editorial structures in a CMME document.
+    """
+    events = 0
+    structures = 0
+    for element in ET.fromstring(xml_string).iter():
+        if element.tag in EVENT_CONTAINERS:
+            for child in element:
+                if child.tag in EDITORIAL_STRUCTURES:
+                    structures += 1
+                else:
+                    events += 1
+    return events, structures
+
+
+def main(repetitions=50):
+    baseline = None
+    print(f"{'score':<12} {'events':>7} {'editorial':>9} {'ms/parse':>9} {'us/event':>9} {'relative':>8}")
+    for label, filename in SCORES:
+        with open(os.path.join(RESOURCES, filename)) as file:
+            xml_string = file.read()
+        events, structures = count_events(xml_string)
+        seconds = min(timeit.repeat(lambda: Piece.parse(xml_string), number=repetitions, repeat=3)) / repetitions
+        per_event = seconds / events
+        if baseline is None:
+            baseline = per_event
+        print(f"{label:<12} {events:>7} {structures:>9} {seconds * 1e3:>9.3f} {per_event * 1e6:>9.2f} "
+              f"{per_event / baseline:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
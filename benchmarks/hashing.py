@@ -0,0 +1,66 @@
+"""
+Benchmark: content hashes (model.hashing) and duplicate detection.
+
+Measures the first hash of a piece, the memoized one, the rehash after a change in one voice, and the deduplication of
+many parsed pieces with a set, compared with pairwise deep comparisons of their events (the model had no structural
+equality for pieces before).
+
+Usage (from the repository root):
+    python benchmarks/hashing.py [pieces]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from model import Piece
+from model.hashing import content_hash, forget
+
+RESOURCES = os.path.join(os.path.dirname(__file__), '..', 'tests', 'resources')
+
+
+def main(pieces=200):
+    xml_strings = []
+    for filename in sorted(os.listdir(RESOURCES)):
+        with open(os.path.join(RESOURCES, filename)) as file:
+            xml_strings.append(file.read())
+    parsed = [Piece.parse(xml_strings[index % len(xml_strings)]) for index in range(pieces)]
+
+    start = time.perf_counter()
+    for piece in parsed:
+        content_hash(piece)
+    print(f"{'first hash':<20} {(time.perf_counter() - start) / pieces * 1e3:>8.3f} ms/piece")
+
+    start = time.perf_counter()
+    for piece in parsed:
+        content_hash(piece)
+    print(f"{'memoized hash':<20} {(time.perf_counter() - start) / pieces * 1e6:>8.3f} us/piece")
+
+    start = time.perf_counter()
+    for piece in parsed:
+        music_section = piece.music_sections[0]
+        voice = music_section.content.voices[0] if music_section.content.voices else None
+        forget(*([voice.event_list, voice] if voice is not None else []), music_section, piece)
+        content_hash(piece)
+    print(f"{'rehash of one voice':<20} {(time.perf_counter() - start) / pieces * 1e3:>8.3f} ms/piece")
+
+    start = time.perf_counter()
+    unique = {piece.digest() for piece in parsed}
+    print(f"{'set of digests':<20} {(time.perf_counter() - start) * 1e3:>8.3f} ms for {pieces} pieces, "
+          f"{len(unique)} distinct")
+
+    # Deep comparisons of the events (their __eq__) of each piece with the distinct pieces found before it
+    start = time.perf_counter()
+    distinct = []
+    for piece in parsed:
+        events = [voice.event_list.events if voice.event_list is not None else None
+                  for music_section in piece.music_sections for voice in music_section.content.voices]
+        if all(events != other for other in distinct):
+            distinct.append(events)
+    print(f"{'pairwise __eq__':<20} {(time.perf_counter() - start) * 1e3:>8.3f} ms for {pieces} pieces, "
+          f"{len(distinct)} distinct")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,57 @@
+"""
+Benchmark: import time of the model, measured with python -X importtime.
+
+Each statement is run in a new interpreter, several times, and the total import time is given beyond that of an empty
+interpreter (the best of the runs), with the modules that take longest to import (their own time, without the modules
+they import).
+
+Usage (from the repository root):
+    python benchmarks/import_time.py [runs]
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+SCORE = os.path.join('tests', 'resources', 'LaRue-OSalutarisHostia.cmme.xml')
+
+STATEMENTS = [
+    'import model',
+    'from model import Piece',
+    f'from model import Piece; Piece.parse(open({SCORE!r}).read())',
+    'import batch.client',
+]
+
+
+def import_times(statement):
+    """
+    Returns the import time of each module imported by a statement, in microseconds, from its -X importtime report.
+    """
+    report = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement], cwd=ROOT, capture_output=True,
+                            text=True, check=True).stderr
+    times = {}
+    for line in report.splitlines():
+        if line.startswith('import time:') and not line.endswith('imported package'):
+            self_time, _, name = line[len('import time:'):].split('|')
+            if self_time.strip().isdigit():
+                times[name.strip()] = int(self_time)
+    return times
+
+
+def best_total(statement, runs):
+    reports = [import_times(statement) for _ in range(runs)]
+    best = min(reports, key=lambda times: sum(times.values()))
+    return sum(best.values()), best
+
+
+def main(runs=5):
+    baseline, baseline_times = best_total('pass', runs)
+    for statement in STATEMENTS:
+        total, times = best_total(statement, runs)
+        slowest = sorted((name for name in times if name not in baseline_times), key=times.get, reverse=True)[:5]
+        print(f"{statement[:40]:<42} {(total - baseline) / 1e3:>7.1f} ms   "
+              + ', '.join(f"{name} {times[name] / 1e3:.1f}" for name in slowest))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,58 @@
+"""
+Benchmark: resolution of the ligatures of a large piece, and the table lookup against the rules it is built from.
+
+The piece is made by repeating the MusicSections of the BrusBRIV922 score (see benchmarks/parallel_parse.py), whose
+voices are rich in ligatures. The resolution covers the nested readings; the comparison of the table with rule() is
+made on the features of every ligated note of the piece.
+
+Usage (from the repository root):
+    python benchmarks/ligatures.py [copies]
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.parallel_parse import best_of, large_piece
+from model import Piece
+from model.columns import diatonic_step
+from model.ligatures import FIRST, LAST, MIDDLE, STEMS, LigatureResolver, key, rule
+
+
+def features(ligatures):
+    found = []
+    for ligature in ligatures:
+        steps = [diatonic_step(note.pitch) for note in ligature.notes]
+        last = len(ligature.notes) - 1
+        for position, note in enumerate(ligature.notes):
+            other = position - 1 if position else min(1, last)
+            connection = ligature.connections[max(position, 1) - 1] if last else None
+            place = FIRST if position == 0 else LAST if position == last else MIDDLE
+            found.append((place, steps[max(position, other)] > steps[min(position, other)], connection == 'Obliqua',
+                          STEMS.get(note.stem_dir, 0), position == 1 and ligature.notes[0].stem_dir == 'Up',
+                          note.note_type == 'Maxima'))
+    return found
+
+
+def main(copies=20):
+    piece = Piece.parse(large_piece(copies))
+    event_lists = [voice.event_list.events for music_section in piece.music_sections
+                   for voice in music_section.content.voices]
+    ligatures = [ligature for events in event_lists for ligature in LigatureResolver.resolve_all(events)]
+    notes = sum(len(ligature.notes) for ligature in ligatures)
+    print(f"{sum(len(events) for events in event_lists)} events, {len(ligatures)} ligatures, {notes} ligated notes")
+
+    seconds = best_of(lambda: [LigatureResolver.resolve_all(events) for events in event_lists])
+    print(f"{'resolve':<8} {seconds * 1e3:>8.2f} ms ({seconds / notes * 1e6:.2f} us/note)")
+
+    keys = features(ligatures)
+    table = LigatureResolver.table()
+    packed = [key(*note_features) for note_features in keys]
+    for name, function in (('rules', lambda: [rule(*note_features) for note_features in keys]),
+                           ('table', lambda: [table[index] for index in packed])):
+        seconds = best_of(function)
+        print(f"{name:<8} {seconds / len(keys) * 1e9:>8.1f} ns/note")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
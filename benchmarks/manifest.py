@@ -0,0 +1,53 @@
+"""
+Benchmark: a rerun of a corpus conversion with a manifest against the first run.
+
+The corpus is made of copies of the BrusBRIV922 score. The first run converts every file with the pipeline (see
+batch.pipeline); a rerun skips them from their sizes and modification times, and a rerun after every file has been
+touched hashes them to find that they have not changed.
+
+Usage (from the repository root):
+    python benchmarks/manifest.py [files]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from batch.manifest import DONE, Manifest, run_batch
+from batch.pipeline import convert_file, default_pipeline
+
+RESOURCES = os.path.join(os.path.dirname(__file__), '..', 'tests', 'resources')
+
+
+def main(files=200):
+    with tempfile.TemporaryDirectory() as directory:
+        with open(os.path.join(RESOURCES, 'Anonymous-CibavitEos-BrusBRIV922.cmme.xml')) as file:
+            xml_string = file.read()
+        paths = [os.path.join(directory, f"piece{index:05}.cmme.xml") for index in range(files)]
+        for path in paths:
+            with open(path, 'w') as file:
+                file.write(xml_string)
+        output = os.path.join(directory, 'out')
+        os.makedirs(output)
+        pipeline = default_pipeline()
+        manifest_path = os.path.join(directory, 'manifest.jsonl')
+
+        def run(label):
+            start = time.perf_counter()
+            keys = run_batch(Manifest(manifest_path), paths, lambda key: convert_file(pipeline, key, output))
+            seconds = time.perf_counter() - start
+            print(f"{label:<10} {seconds * 1e3:>9.1f} ms ({len(keys[DONE])} converted, {len(keys['skipped'])} "
+                  f"skipped)")
+
+        run('first')
+        run('rerun')
+        for path in paths:
+            os.utime(path)
+        run('touched')
+        run('rerun')
+
+
+if __name__ == '__main__':
+    main(*(int(argument) for argument in sys.argv[1:2]))
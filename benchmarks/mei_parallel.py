@@ -0,0 +1,42 @@
+"""
+Benchmark: latency of the MEI export with the voices rendered in a process pool against the serial export.
+
+The piece is made by repeating the MusicSections of the BrusBRIV922 score (see benchmarks/parallel_parse.py) and is
+parsed once. Two modes are timed: a pool started for the export (max_workers), whose workers inherit the voices, and
+a pool created once, as in a batch (executor), to which the voices are pickled. Both include sending the fragments
+back, which the serial export does not pay, and the first includes starting the workers.
+
+Usage (from the repository root):
+    python benchmarks/mei_parallel.py [copies] [workers...]
+"""
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.parallel_parse import best_of, large_piece
+from mei.export import music_sections, to_mei
+from model import Piece
+
+
+def main(copies=20, workers=(2, 4)):
+    piece = Piece.parse(large_piece(copies))
+    num_voices = sum(len(section.voices) for section in music_sections(piece))
+    serial = best_of(lambda: to_mei(piece))
+    print(f"{len(piece.music_sections)} sections, {num_voices} voices, {len(to_mei(piece)) / 1e6:.1f} MB of MEI, "
+          f"{os.cpu_count()} cores")
+    print(f"{'serial':<20} {serial * 1e3:>9.1f} ms")
+    for max_workers in workers:
+        parallel = best_of(lambda: to_mei(piece, max_workers=max_workers))
+        print(f"{f'{max_workers} workers':<20} {parallel * 1e3:>9.1f} ms {serial / parallel:>6.2f}x")
+        with ProcessPoolExecutor(max_workers) as executor:
+            # Start the workers before timing
+            list(executor.map(abs, range(max_workers)))
+            parallel = best_of(lambda: to_mei(piece, executor=executor))
+        print(f"{f'{max_workers} workers (executor)':<20} {parallel * 1e3:>9.1f} ms {serial / parallel:>6.2f}x")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20,
+         tuple(int(argument) for argument in sys.argv[2:]) or (2, 4))
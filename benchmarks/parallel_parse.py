@@ -0,0 +1,57 @@
+"""
+Benchmark: latency of Piece.parse_parallel against Piece.parse on a large piece.
+
+The piece is made by repeating the MusicSections of the BrusBRIV922 score, so that it has many independent sections.
+The pool is created once, as in a batch; the timings include cutting the document, sending the sections to the
+workers and pickling the parsed sections back.
+
+Usage (from the repository root):
+    python benchmarks/parallel_parse.py [copies] [workers...]
+"""
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from model import Piece
+from model.piece import music_section_ranges
+
+SCORE = os.path.join(os.path.dirname(__file__), '..', 'tests', 'resources', 'Anonymous-CibavitEos-BrusBRIV922.cmme.xml')
+
+
+def large_piece(copies):
+    with open(SCORE) as file:
+        xml_string = file.read()
+    ranges = music_section_ranges(xml_string)
+    sections = xml_string[ranges[0][0]:ranges[-1][1]]
+    return xml_string[:ranges[0][0]] + '\n'.join([sections] * copies) + xml_string[ranges[-1][1]:]
+
+
+def best_of(function, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(copies=20, workers=(2, 4)):
+    xml_string = large_piece(copies)
+    print(f"{len(music_section_ranges(xml_string))} sections, {len(xml_string) / 1e6:.1f} MB, "
+          f"{os.cpu_count()} cores")
+    serial = best_of(lambda: Piece.parse(xml_string))
+    print(f"{'serial':<12} {serial * 1e3:>9.1f} ms")
+    for max_workers in workers:
+        with ProcessPoolExecutor(max_workers) as executor:
+            # Start the workers before timing
+            list(executor.map(abs, range(max_workers)))
+            parallel = best_of(lambda: Piece.parse_parallel(xml_string, executor=executor))
+        print(f"{f'{max_workers} workers':<12} {parallel * 1e3:>9.1f} ms {serial / parallel:>6.2f}x")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20,
+         tuple(int(argument) for argument in sys.argv[2:]) or (2, 4))
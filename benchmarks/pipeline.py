@@ -0,0 +1,39 @@
+"""
+Benchmark: the outputs of a file (MEI, summary, statistics, search index) from one parse against a parse per output.
+
+The piece is made by repeating the MusicSections of the BrusBRIV922 score (see benchmarks/parallel_parse.py). Each
+output is first made on its own, from a parse of the document; then the pipeline of batch.pipeline makes them all from
+a single parse. The cost of each sink alone is the time of a one-sink pipeline minus that of a bare parse.
+
+Usage (from the repository root):
+    python benchmarks/pipeline.py [copies]
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from analysis.search_index import SearchIndex
+from batch.pipeline import Pipeline, default_pipeline
+from benchmarks.parallel_parse import best_of, large_piece
+from model import Piece
+
+
+def main(copies=10):
+    xml_string = large_piece(copies)
+    parse = best_of(lambda: Piece.parse(xml_string))
+    print(f"{'parse':<14} {parse * 1e3:>8.1f} ms")
+
+    pipeline = default_pipeline(SearchIndex())
+    separate = 0
+    for name, factory in pipeline.factories.items():
+        seconds = best_of(lambda: Pipeline().register(name, factory).run(xml_string, 'piece'))
+        separate += seconds
+        print(f"{name:<14} {seconds * 1e3:>8.1f} ms (sink {(seconds - parse) * 1e3:.1f} ms)")
+    print(f"{'separately':<14} {separate * 1e3:>8.1f} ms ({len(pipeline.factories)} parses)")
+    seconds = best_of(lambda: pipeline.run(xml_string, 'piece'))
+    print(f"{'pipeline':<14} {seconds * 1e3:>8.1f} ms (1 parse)")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
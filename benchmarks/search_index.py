@@ -0,0 +1,64 @@
+"""
+Benchmark: query latency of the corpus search index.
+
+The bundled scores are added to an index under many keys, to simulate a corpus of that many pieces, and typical
+queries (a melodic incipit, a short interval pattern, a rhythm, a text phrase and a metadata lookup) are timed.
+
+Usage (from the repository root):
+    python benchmarks/search_index.py [copies]
+"""
+import os
+import sys
+import tempfile
+import time
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from analysis.search_index import SearchIndex
+from model import Piece
+
+RESOURCES = os.path.join(os.path.dirname(__file__), '..', 'tests', 'resources')
+
+SCORES = ['Anonymous-CibavitEos-BrusBRIV922.cmme.xml', 'LaRue-OSalutarisHostia.cmme.xml',
+          'Editorial-Synthetic.cmme.xml']
+
+QUERIES = [
+    ('melody (7 intervals)', lambda index: index.search_intervals([2, -1, -1, -1, 0, -1, 1])),
+    ('intervals (2)', lambda index: index.search_intervals([2, -1])),
+    ('rhythm (4)', lambda index: index.search_rhythm(['Semibrevis', 'Minima', 'Minima', 'Semibrevis'])),
+    ('text phrase', lambda index: index.search_text('eos ex adipe frumenti')),
+    ('metadata', lambda index: index.search_metadata(composer='la rue')),
+]
+
+
+def main(copies=300):
+    pieces = []
+    for filename in SCORES:
+        with open(os.path.join(RESOURCES, filename)) as file:
+            pieces.append(Piece.parse(file.read()))
+
+    index = SearchIndex()
+    start = time.perf_counter()
+    for copy in range(copies):
+        for filename, piece in zip(SCORES, pieces):
+            index.add(f'{copy}/{filename}', piece)
+    print(f"indexed {len(index)} pieces in {time.perf_counter() - start:.2f} s")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'corpus.index')
+        start = time.perf_counter()
+        index.save(path)
+        saved = time.perf_counter()
+        index = SearchIndex.load(path)
+        print(f"saved in {saved - start:.2f} s, loaded in {time.perf_counter() - saved:.2f} s "
+              f"({os.path.getsize(path) / 1e6:.1f} MB)")
+
+    for label, query in QUERIES:
+        matches = len(query(index))
+        seconds = min(timeit.repeat(lambda: query(index), number=5, repeat=3)) / 5
+        print(f"{label:<22} {matches:>7} matches {seconds * 1e3:>9.2f} ms")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300)
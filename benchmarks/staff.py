@@ -0,0 +1,52 @@
+"""
+Benchmark: staff locations of the events of a long voice, resolved in one pass against a lookup of the clef per event.
+
+The voice is made by concatenating the events of every voice of a large piece (see benchmarks/parallel_parse.py). The
+lookup per event finds the clef in force with the checkpoints of the voice (model.checkpoints) and computes the
+location from it, as each caller had to before; the pass resolves every event, nested ones included, with the clef
+tables of model.staff.
+
+Usage (from the repository root):
+    python benchmarks/staff.py [copies]
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.parallel_parse import best_of, large_piece
+from model import Piece
+from model.columns import MISSING, diatonic_step
+from model.music_section import EventList
+from model.staff import StaffPositions
+
+
+def per_event(event_list):
+    locs = []
+    for index, event in enumerate(event_list.events):
+        if type(event).__name__ != 'NoteEvent':
+            continue
+        clef = event_list.state_at(index).clef
+        step = diatonic_step(event.pitch)
+        if clef is not None and clef.staff_loc is not None and step != MISSING:
+            locs.append(step - diatonic_step(clef.pitch) + clef.staff_loc)
+    return locs
+
+
+def main(copies=20):
+    piece = Piece.parse(large_piece(copies))
+    event_list = EventList([event for music_section in piece.music_sections
+                            for voice in music_section.content.voices for event in voice.event_list.events])
+    positions = StaffPositions.build(event_list.events)
+    notes = sum(1 for event in event_list.events if type(event).__name__ == 'NoteEvent')
+    print(f"{len(event_list.events)} events ({notes} top-level notes), {len(positions.events)} with the nested ones")
+
+    event_list.checkpoints()
+    seconds = best_of(lambda: per_event(event_list), repeat=1)
+    print(f"{'per event':<10} {seconds * 1e3:>8.1f} ms ({seconds / notes * 1e6:.2f} us/note)")
+    seconds = best_of(lambda: StaffPositions.build(event_list.events))
+    print(f"{'one pass':<10} {seconds * 1e3:>8.1f} ms ({seconds / len(positions.events) * 1e6:.2f} us/event)")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
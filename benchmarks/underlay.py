@@ -0,0 +1,49 @@
+"""
+Benchmark: alignment of the text underlay of long voices, in one pass against a quadratic alignment.
+
+The voices are made by concatenating the events of every voice of a large piece (see benchmarks/parallel_parse.py),
+repeated a growing number of times. The quadratic alignment is the way the alignment used to be scripted: each syllable
+finds its note by searching the notes from the start, and its word by counting the word ends before it.
+
+Usage (from the repository root):
+    python benchmarks/underlay.py [copies...]
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from analysis.notes import notes as edited_notes
+from analysis.underlay import Underlay
+from benchmarks.parallel_parse import best_of, large_piece
+from model import Piece
+
+
+def quadratic(notes):
+    alignment = []
+    for note in notes:
+        if note.modern_text is None:
+            continue
+        note_index = next(index for index, other in enumerate(notes) if other is note)
+        word_index = sum(1 for other in notes[:note_index] if other.modern_text is not None and
+                         other.modern_text.has_word_end)
+        for syllable in note.modern_text.syllables:
+            alignment.append((syllable, note_index, word_index))
+    return alignment
+
+
+def main(copies=(1, 2, 4)):
+    for count in copies:
+        piece = Piece.parse(large_piece(count))
+        events = [event for music_section in piece.music_sections
+                  for voice in music_section.content.voices for event in voice.event_list.events]
+        notes = edited_notes(events)
+        underlay = Underlay.of(events)
+        linear = best_of(lambda: Underlay.of(events))
+        slow = best_of(lambda: quadratic(notes), repeat=1)
+        print(f"{len(notes):>6} notes, {len(underlay.words):>5} words: one pass {linear * 1e3:8.2f} ms, "
+              f"quadratic {slow * 1e3:9.1f} ms")
+
+
+if __name__ == '__main__':
+    main(tuple(int(argument) for argument in sys.argv[1:]) or (1, 2, 4))
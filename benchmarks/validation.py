@@ -0,0 +1,50 @@
+"""
+Benchmark: cost of XSD validation relative to parsing.
+
+For each score, compares ElementTree tokenising alone, Piece.parse, Piece.parse(validate=True) (which checks the tree
+it has already built) and the streaming validator (which reports line numbers but has to tokenise the document with
+Python callbacks). The schema is compiled once, before timing.
+
+Usage (from the repository root):
+    python benchmarks/validation.py [repetitions]
+"""
+import os
+import sys
+import timeit
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from model import Piece
+from schema.validation import CompiledSchema, validate_string
+
+RESOURCES = os.path.join(os.path.dirname(__file__), '..', 'tests', 'resources')
+
+SCORES = [
+    ('BrusBRIV922', 'Anonymous-CibavitEos-BrusBRIV922.cmme.xml'),
+    ('LaRue', 'LaRue-OSalutarisHostia.cmme.xml'),
+    ('Editorial', 'Editorial-Synthetic.cmme.xml'),
+]
+
+
+def main(repetitions=20):
+    CompiledSchema.load()
+    stages = [
+        ('tokenise', lambda xml_string: ET.fromstring(xml_string)),
+        ('parse', lambda xml_string: Piece.parse(xml_string)),
+        ('parse+valid.', lambda xml_string: Piece.parse(xml_string, validate=True)),
+        ('streaming', validate_string),
+    ]
+    print(f"{'score':<12}" + ''.join(f" {label:>12}" for label, _ in stages) + "   (ms)")
+    for label, filename in SCORES:
+        with open(os.path.join(RESOURCES, filename)) as file:
+            xml_string = file.read()
+        row = f"{label:<12}"
+        for _, stage in stages:
+            seconds = min(timeit.repeat(lambda: stage(xml_string), number=repetitions, repeat=3)) / repetitions
+            row += f" {seconds * 1e3:>12.3f}"
+        print(row)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
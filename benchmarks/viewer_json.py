@@ -0,0 +1,35 @@
+"""
+Benchmark: the JSON of a piece for the web viewer, by reflection over __dict__ against the compact exporter.
+
+The piece is made by repeating the MusicSections of the BrusBRIV922 score (see benchmarks/parallel_parse.py). The
+reflected JSON is what json.dumps writes when every object is replaced by its __dict__; the compact one is written by
+viewer.export, whole and as the chunks of its sections.
+
+Usage (from the repository root):
+    python benchmarks/viewer_json.py [copies]
+"""
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.parallel_parse import best_of, large_piece
+from model import Piece
+from viewer.export import iter_chunks, to_json
+
+
+def main(copies=10):
+    piece = Piece.parse(large_piece(copies))
+    reflected = json.dumps(piece, default=lambda value: value.__dict__)
+    seconds = best_of(lambda: json.dumps(piece, default=lambda value: value.__dict__))
+    print(f"{'__dict__':<10} {seconds * 1e3:>8.1f} ms {len(reflected) / 1024:>8.1f} KiB")
+    compact = to_json(piece)
+    seconds = best_of(lambda: to_json(piece))
+    print(f"{'compact':<10} {seconds * 1e3:>8.1f} ms {len(compact) / 1024:>8.1f} KiB")
+    seconds = best_of(lambda: list(iter_chunks(piece)))
+    print(f"{'chunks':<10} {seconds * 1e3:>8.1f} ms ({len(piece.music_sections)} sections)")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
@@ -0,0 +1,42 @@
+"""
+Benchmark: throughput of Piece.write against Piece.parse on a large piece.
+
+The piece is made by repeating the MusicSections of the BrusBRIV922 score (see benchmarks/parallel_parse.py). Both
+throughputs are given in MB of CMME per second: the parse reads the original document, the writer streams its own output
+to a temporary file (and to an in-memory buffer, to separate the cost of the disk).
+
+Usage (from the repository root):
+    python benchmarks/writer.py [copies]
+"""
+import io
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.parallel_parse import best_of, large_piece
+from model import Piece
+
+
+def main(copies=20):
+    xml_string = large_piece(copies)
+    piece = Piece.parse(xml_string)
+    written = piece.to_string()
+    print(f"{len(piece.music_sections)} sections, {len(xml_string) / 1e6:.1f} MB read, {len(written) / 1e6:.1f} MB "
+          f"written")
+
+    parse = best_of(lambda: Piece.parse(xml_string))
+    print(f"{'parse':<16} {parse * 1e3:>9.1f} ms {len(xml_string) / parse / 1e6:>7.1f} MB/s")
+
+    write = best_of(lambda: piece.write(io.StringIO()))
+    print(f"{'write (memory)':<16} {write * 1e3:>9.1f} ms {len(written) / write / 1e6:>7.1f} MB/s")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'piece.cmme.xml')
+        write = best_of(lambda: piece.write(path))
+    print(f"{'write (file)':<16} {write * 1e3:>9.1f} ms {len(written) / write / 1e6:>7.1f} MB/s")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
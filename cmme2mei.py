@@ -14,10 +14,32 @@ Contributors:
     - [Contributor 1 Name], [Date], Changes: [Description of changes]
     - [Contributor 2 Name], [Date], Changes: [Description of changes]
 """
+import sys
+
+from mei.export import to_mei
 from model import Piece
 
 
-def cmme2mei(file_path):
-    piece = Piece.parse(file_path)
-    # TO-DO Now, the MEI structure has to be created and exported
+def cmme2mei(file_path, validate=False, diagnostics=None, max_workers=None, executor=None):
+    """
+    Converts a CMME file to an MEI document (see mei.export), returned as a string.
+
+    Args:
+        file_path: The path of the CMME file.
+        validate: If True, the file is checked against the CMME schema first (see Piece.parse).
+        diagnostics: If a list is given, the file is parsed in recovering mode and the errors are appended to it.
+        max_workers: If given, the voices are rendered in a process pool of this size.
+        executor: An existing pool to render the voices in.
+    """
+    with open(file_path) as file:
+        piece = Piece.parse(file.read(), validate=validate, diagnostics=diagnostics)
+    return to_mei(piece, max_workers, executor)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        print("Usage: python cmme2mei.py INPUT.cmme.xml OUTPUT.mei", file=sys.stderr)
+        sys.exit(2)
+    with open(sys.argv[2], 'w', encoding='utf-8') as output:
+        output.write(cmme2mei(sys.argv[1]))
 
@@ -0,0 +1,3 @@
+"""
+Export of the model as MEI (mensural notation).
+"""
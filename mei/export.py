@@ -0,0 +1,170 @@
+"""
+Export of a Piece as an MEI document in white mensural notation.
+
+The document has a header with the title, composer, editor and the sources of the variant versions, a scoreDef with a
+staffDef per voice of VoiceData, and a <section> per MusicSection with music (Text sections have no counterpart in the
+score). Each voice of a section is rendered as a <staff> fragment (see mei.render).
+
+The fragments of the voices are independent, so they can be rendered in a process pool: with max_workers or an
+executor, the voices of the piece are rendered by the workers and the fragments, received in document order, are
+spliced into the output, which is the same as the serial one. Sending a voice to a worker costs more than rendering it
+(pickling the events takes about three times as long), so a pool started for the piece (max_workers) is given the
+voices through its initializer, and only their indices are sent as tasks; the voices are pickled to an existing
+executor. The initializer works with any start method: forked workers (Linux) inherit its arguments without pickling,
+while spawned workers (Windows, macOS) receive them pickled, once per worker, which saves nothing over an executor.
+Either way, the pool only pays off with several cores: on one core, the serial export is faster.
+"""
+import io
+import os
+from typing import TYPE_CHECKING, List, Optional, TextIO, Union
+
+from mei.render import render_voice, source_id
+from model.piece import Piece
+from model.staff import resolve_piece
+from model.writer import CMMEWriter
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+NAMESPACE = 'http://www.music-encoding.org/ns/mei'
+MEI_VERSION = '5.0'
+
+
+def music_sections(piece: Piece) -> list:
+    """
+    Returns the contents of the MusicSections rendered as <section>s: those with voices.
+    """
+    return [music_section.content for music_section in piece.music_sections
+            if music_section is not None and music_section.content.section_type != 'Text']
+
+
+# The voices of the piece rendered by a pool started by render_fragments, in its workers
+shared_voices = []
+
+
+def share_voices(voices: list):
+    global shared_voices
+    shared_voices = voices
+
+
+def render_shared_voice(index: int) -> str:
+    return render_voice(shared_voices[index])
+
+
+def render_fragments(piece: Piece, max_workers: Optional[int] = None,
+                     executor: Optional['Executor'] = None) -> List[List[str]]:
+    """
+    Renders the voices of the sections, returning the fragments of each section in order.
+
+    Args:
+        piece: The piece.
+        max_workers: If given, the voices are rendered in a process pool of this size.
+        executor: An existing pool to render the voices in, e.g. to reuse it across the files of a batch.
+    """
+    sections = music_sections(piece)
+    # The clefs go on from one section to the next: the staff positions of the voices are resolved here (and inherited
+    # or pickled with them by the workers)
+    resolve_piece(piece)
+    if max_workers is None and executor is None:
+        return [[render_voice(voice) for voice in section.voices] for section in sections]
+
+    voices = [voice for section in sections for voice in section.voices]
+    # Several voices per task: each round trip to a worker has a fixed cost
+    chunksize = max(1, len(voices) // (4 * (max_workers or os.cpu_count() or 1)))
+    if executor is not None:
+        # The voices are pickled to the workers of the pool
+        rendered = iter(executor.map(render_voice, voices, chunksize=chunksize))
+    else:
+        # The voices are given to each worker by the initializer (inherited without pickling where processes are
+        # forked), and the tasks are their indices
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers, initializer=share_voices, initargs=(voices,)) as pool:
+            rendered = iter(list(pool.map(render_shared_voice, range(len(voices)), chunksize=chunksize)))
+    return [[next(rendered) for _ in section.voices] for section in sections]
+
+
+def write_head(writer: CMMEWriter, piece: Piece):
+    general_data = piece.general_data
+    writer.start('meiHead')
+    writer.start('fileDesc')
+    writer.start('titleStmt')
+    writer.element('title', general_data.title or '')
+    writer.element('composer', general_data.composer)
+    writer.element('editor', general_data.editor)
+    writer.end('titleStmt')
+    writer.empty('pubStmt')
+    sources = [variant_version for variant_version in general_data.variant_versions or []
+               if variant_version.id_ is not None]
+    if sources:
+        writer.start('sourceDesc')
+        for variant_version in sources:
+            name = variant_version.source.name if variant_version.source is not None else None
+            writer.empty('source', {'xml:id': source_id(variant_version.id_), 'label': name or variant_version.id_})
+        writer.end('sourceDesc')
+    writer.end('fileDesc')
+    writer.end('meiHead')
+
+
+def write_score_def(writer: CMMEWriter, piece: Piece):
+    voice_data = piece.voice_data
+    writer.start('scoreDef')
+    writer.start('staffGrp')
+    for voice_num in range(1, (voice_data.num_voices or len(voice_data.voices)) + 1):
+        voice = voice_data.voices[voice_num - 1] if voice_num <= len(voice_data.voices) else None
+        writer.empty('staffDef', {'n': voice_num, 'lines': 5, 'notationtype': 'mensural.white',
+                                  'label': voice.name if voice is not None else None})
+    writer.end('staffGrp')
+    writer.end('scoreDef')
+
+
+def write_mei(piece: Piece, file: Union[str, TextIO], max_workers: Optional[int] = None,
+              executor: Optional['Executor'] = None):
+    """
+    Writes a piece as an MEI document.
+
+    Args:
+        piece: The piece.
+        file: The path of the file, or a text file open for writing.
+        max_workers: If given, the voices are rendered in a process pool of this size (see render_fragments).
+        executor: An existing pool to render the voices in.
+    """
+    if isinstance(file, str):
+        with open(file, 'w', encoding='utf-8') as opened:
+            write_mei(piece, opened, max_workers, executor)
+        return
+    write_document(piece, file, render_fragments(piece, max_workers, executor))
+
+
+def write_document(piece: Piece, file: TextIO, fragments: List[List[str]]):
+    """
+    Writes the MEI document of a piece, given the fragments of the voices of each section (see render_fragments).
+    """
+    writer = CMMEWriter(file)
+    writer.declaration()
+    writer.start('mei', {'xmlns': NAMESPACE, 'meiversion': MEI_VERSION})
+    write_head(writer, piece)
+    writer.start('music')
+    writer.start('body')
+    writer.start('mdiv')
+    writer.start('score')
+    write_score_def(writer, piece)
+    for section_fragments in fragments:
+        writer.start('section')
+        for fragment in section_fragments:
+            writer.splice(fragment)
+        writer.end('section')
+    writer.end('score')
+    writer.end('mdiv')
+    writer.end('body')
+    writer.end('music')
+    writer.end('mei')
+    writer.close()
+
+
+def to_mei(piece: Piece, max_workers: Optional[int] = None, executor: Optional['Executor'] = None) -> str:
+    """
+    Returns a piece as an MEI document (see write_mei).
+    """
+    output = io.StringIO()
+    write_mei(piece, output, max_workers, executor)
+    return output.getvalue()
@@ -0,0 +1,252 @@
+"""
+Rendering of the events of a voice as MEI.
+
+Each voice of a MusicSection becomes a <staff> with a single <layer>, rendered on its own by render_voice: its fragment
+does not depend on the other voices, so that the voices can be rendered in any order, or in other processes, and spliced
+into the document (see mei.export).
+
+CMME numbers the octaves from A and MEI from C: CMME C3 is middle C (MEI C4), and CMME A3 and B3 are the A and B below
+it (MEI A3 and B3).
+
+The ligated notes of a list of events are grouped in a <ligature> (see model.ligatures), with the form of their
+connections, or, if they are mixed, with the connection of each note in its @lig. The syllables of the edited text
+get their position in their word (@wordpos) from the underlay of the voice (see analysis.underlay), and the rests are
+placed on the pitch of their bottom line under the clef in force (see model.staff).
+"""
+import io
+import re
+from typing import Callable, Dict, List, Optional
+
+from analysis.underlay import Underlay
+from model.ligatures import LigatureResolver
+from model.pitch import Pitch
+from model.staff import StaffPositions
+from model.writer import CMMEWriter
+
+# Depth of the <staff> elements in the document: mei, music, body, mdiv, score, section, staff
+STAFF_DEPTH = 6
+
+# MEI durations (data.DURATION.mensural) of the CMME note and rest types
+DURATIONS = {'Maxima': 'maxima', 'Longa': 'longa', 'Brevis': 'brevis', 'Semibrevis': 'semibrevis',
+             'Minima': 'minima', 'Semiminima': 'semiminima', 'Fusa': 'fusa', 'Semifusa': 'semifusa'}
+
+# Clef shapes of the CMME clef appearances, and accidentals of the clefs that are signatures or accidentals
+CLEF_SHAPES = {'C': 'C', 'F': 'F', 'Frnd': 'F', 'Fsqr': 'F', 'G': 'G', 'Gamma': 'G',
+               'MODERNC': 'C', 'MODERNF': 'F', 'MODERNG': 'G', 'MODERNG8': 'G'}
+CLEF_ACCIDENTALS = {'Bmol': 'f', 'BmolDouble': 'ff', 'Bqua': 'n', 'Diesis': 's', 'Fis': 's'}
+
+ORIENTATIONS = {'Reversed': 'reversed', '90CW': '90CW', '90CCW': '90CCW'}
+
+STEM_DIRECTIONS = {'Up': 'up', 'Down': 'down'}
+
+LIGATURE_FORMS = {'Recta': 'recta', 'Obliqua': 'obliqua'}
+
+# The syllables that are followed by another syllable of their word are connected by a dash
+CONNECTED_POSITIONS = {'i', 'm'}
+
+
+class MEIWriter(CMMEWriter):
+    """
+    Writes the fragment of a voice, with the positions in their words of the syllables of its notes (by id of the note)
+    and the staff positions of its events.
+    """
+    def __init__(self, file, depth: int = 0, word_positions: Optional[Dict[int, List[str]]] = None,
+                 staff_positions: Optional[StaffPositions] = None):
+        super().__init__(file, depth=depth)
+        self.word_positions = word_positions if word_positions is not None else {}
+        self.staff_positions = staff_positions
+
+
+def mei_pitch(pitch: Optional[Pitch]) -> Dict[str, Optional[str]]:
+    """
+    Returns the pname and oct attributes of a pitch (None where it is incomplete).
+    """
+    if pitch is None or pitch.letter_name is None:
+        return {'pname': None, 'oct': None}
+    octave = None
+    if pitch.octave_num is not None:
+        octave = pitch.octave_num if pitch.letter_name in 'AB' else pitch.octave_num + 1
+    return {'pname': pitch.letter_name.lower(), 'oct': octave}
+
+
+def source_id(variant_version_id: str) -> str:
+    """
+    Returns the xml:id of the <source> of a variant version (see mei.export).
+    """
+    return 'source_' + re.sub(r'[^\w.-]', '_', variant_version_id)
+
+
+def render_events(writer: CMMEWriter, events: list):
+    ligatures = {ligature.start: ligature for ligature in LigatureResolver.resolve(events)}
+    ligature = None
+    for index, event in enumerate(events):
+        if index in ligatures:
+            ligature = ligatures[index]
+            writer.start('ligature', {'form': LIGATURE_FORMS.get(ligature.form)})
+        name = type(event).__name__
+        if name == 'NoteEvent' and ligature is not None and ligature.form is None:
+            # In a ligature of mixed connections, each note gives its connection to the next one
+            render_note(writer, event, LIGATURE_FORMS.get(event.lig))
+        else:
+            render = RENDERERS.get(name)
+            if render is not None:
+                render(writer, event)
+        if ligature is not None and index + 1 == ligature.stop:
+            writer.end('ligature')
+            ligature = None
+
+
+def render_note(writer: CMMEWriter, note, lig: Optional[str] = None):
+    attributes = {'dur': DURATIONS.get(note.note_type), **mei_pitch(note.pitch),
+                  'colored': 'true' if note.event_attributes.colored else None,
+                  'stem.dir': STEM_DIRECTIONS.get(note.stem_dir), 'lig': lig}
+    syllables = [syllable for syllable in note.modern_text.syllables
+                 if syllable] if note.modern_text is not None else []
+    if not syllables:
+        writer.empty('note', attributes)
+        return
+    writer.start('note', attributes)
+    writer.start('verse')
+    positions = writer.word_positions.get(id(note), ()) if isinstance(writer, MEIWriter) else ()
+    for index, syllable in enumerate(syllables):
+        position = positions[index] if index < len(positions) else None
+        writer.element('syl', syllable, {'wordpos': position, 'con': 'd' if position in CONNECTED_POSITIONS else None})
+    writer.end('verse')
+    writer.end('note')
+
+
+def render_rest(writer: CMMEWriter, rest):
+    attributes = {'dur': DURATIONS.get(rest.rest_type)}
+    staff_positions = writer.staff_positions if isinstance(writer, MEIWriter) else None
+    if staff_positions is not None:
+        pitch = mei_pitch(staff_positions.pitch(rest))
+        if pitch['pname'] is not None:
+            attributes.update(ploc=pitch['pname'], oloc=pitch['oct'])
+        else:
+            attributes['loc'] = staff_positions.mei_loc(rest)
+    writer.empty('rest', attributes)
+
+
+def render_clef(writer: CMMEWriter, clef):
+    line = (clef.staff_loc + 1) // 2 if clef.staff_loc is not None else None
+    accidental = CLEF_ACCIDENTALS.get(clef.appearance)
+    if accidental is None:
+        writer.empty('clef', {'shape': CLEF_SHAPES.get(clef.appearance), 'line': line})
+    elif clef.signature:
+        writer.start('keySig')
+        writer.empty('keyAccid', {'accid': accidental, **mei_pitch(clef.pitch)})
+        writer.end('keySig')
+    else:
+        pitch = mei_pitch(clef.pitch)
+        writer.empty('accid', {'accid': accidental, 'ploc': pitch['pname'], 'oloc': pitch['oct']})
+
+
+def render_mensuration(writer: CMMEWriter, mensuration):
+    mens_info = mensuration.mens_info
+    attributes = {'sign': mensuration.main_symbol if mensuration.main_symbol in ('C', 'O') else None,
+                  'slash': mensuration.strokes or None,
+                  'dot': 'true' if mensuration.dot else None,
+                  'orient': ORIENTATIONS.get(mensuration.orientation),
+                  'num': mensuration.number.num if mensuration.number is not None else None,
+                  'numbase': mensuration.number.den if mensuration.number is not None else None,
+                  'modusmaior': mens_info.get('modus_maior'), 'modusminor': mens_info.get('modus_minor'),
+                  'tempus': mens_info.get('tempus'), 'prolatio': mens_info.get('prolatio')}
+    writer.empty('mensur', attributes)
+
+
+def render_dot(writer: CMMEWriter, dot):
+    pitch = mei_pitch(dot.pitch)
+    writer.empty('dot', {'ploc': pitch['pname'], 'oloc': pitch['oct']})
+
+
+def render_custos(writer: CMMEWriter, custos):
+    writer.empty('custos', mei_pitch(custos.pitch))
+
+
+def render_line_end(writer: CMMEWriter, line_end):
+    writer.empty('pb' if line_end.page_end else 'sb')
+
+
+def render_misc_item(writer: CMMEWriter, misc_item):
+    writer.empty('barLine', {'form': 'dbl' if misc_item.num_lines == 2 else None})
+
+
+def render_proportion(writer: CMMEWriter, proportion_event):
+    writer.empty('proport', {'num': proportion_event.proportion.num,
+                             'numbase': proportion_event.proportion.den})
+
+
+def render_multi_event(writer: CMMEWriter, multi_event):
+    render_events(writer, multi_event.events)
+
+
+def render_variant_readings(writer: CMMEWriter, variant_readings):
+    writer.start('app')
+    for reading in variant_readings.readings:
+        if 'DEFAULT' in reading.variant_version_ids:
+            writer.start('lem')
+            tag = 'lem'
+        else:
+            writer.start('rdg', {'source': ' '.join('#' + source_id(variant_version_id)
+                                                    for variant_version_id in reading.variant_version_ids)})
+            tag = 'rdg'
+        if reading.lacuna:
+            writer.empty('gap', {'reason': 'lacuna'})
+        else:
+            render_events(writer, reading.music_events)
+        writer.end(tag)
+    writer.end('app')
+
+
+def render_editorial_data(writer: CMMEWriter, editorial_data):
+    writer.start('choice')
+    writer.start('corr')
+    render_events(writer, editorial_data.new_reading)
+    writer.end('corr')
+    original_reading = editorial_data.original_reading
+    if original_reading is not None:
+        writer.start('sic')
+        if original_reading.lacuna:
+            writer.empty('gap', {'reason': 'lacuna'})
+        else:
+            render_events(writer, original_reading.music_events)
+        writer.end('sic')
+    writer.end('choice')
+
+
+# The renderer of each class of event, by class name. The events without a counterpart in MEI's mensural notation
+# (ColorChange, ModernKeySignature, OriginalText) and those that could not be parsed are not rendered
+RENDERERS: Dict[str, Callable[[CMMEWriter, object], None]] = {
+    'NoteEvent': render_note,
+    'RestEvent': render_rest,
+    'ClefEvent': render_clef,
+    'MensurationEvent': render_mensuration,
+    'DotEvent': render_dot,
+    'CustosEvent': render_custos,
+    'LineEndEvent': render_line_end,
+    'MiscItemEvent': render_misc_item,
+    'ProportionEvent': render_proportion,
+    'MultiEvent': render_multi_event,
+    'VariantReadings': render_variant_readings,
+    'EditorialData': render_editorial_data,
+}
+
+
+def render_voice(voice) -> str:
+    """
+    Renders a voice as a <staff> (numbered by its VoiceNum) with one <layer>, indented for its place in the document.
+    """
+    output = io.StringIO()
+    if voice.event_list is not None:
+        writer = MEIWriter(output, STAFF_DEPTH, Underlay.of(voice.event_list.events).word_positions(),
+                           voice.event_list.staff_positions())
+    else:
+        writer = MEIWriter(output, STAFF_DEPTH)
+    writer.start('staff', {'n': voice.voice_num})
+    writer.start('layer', {'n': 1})
+    if voice.event_list is not None:
+        render_events(writer, voice.event_list.events)
+    writer.end('layer')
+    writer.end('staff')
+    writer.flush()
+    return output.getvalue()
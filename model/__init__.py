@@ -1,18 +1,45 @@
-#from .coloration import ColorAndFillData, ColorationData, BaseColoration
-#from .reading import Reading, VariantReadings, OriginalReading, EditorialData
-#from .general_data import SourceInfo, VariantVersion, GeneralData
-#from .voice_data import SingleVoiceData, VoiceData
-#from .clef import ClefEvent
-#from .custos import CustosEvent
-#from .dot import DotEvent
-#from .key_signature import ModernKeySignatureEvent
-#from .line_end import LineEndEvent
-#from .mensuration import MensurationEvent
-#from .misc_item import MiscItemEvent
-#from .multievent import MultiEvent
-#from .note import NoteEvent
-#from .rest import RestEvent
+"""
+The classes of the model are imported on first use (e.g. by `from model import Piece`), so that importing the package,
+or one of its modules, does not import the whole hierarchy.
+"""
+# The public classes, by the module that defines them
+_modules = {
+    'ColorAndFillData': 'coloration', 'ColorationData': 'coloration', 'BaseColoration': 'coloration',
+    'ColorChangeEvent': 'coloration',
+    'Reading': 'reading', 'VariantReadings': 'reading', 'OriginalReading': 'reading', 'EditorialData': 'reading',
+    'SourceInfo': 'general_data', 'VariantVersion': 'general_data', 'GeneralData': 'general_data',
+    'SingleVoiceData': 'voice_data', 'VoiceData': 'voice_data',
+    'ClefEvent': 'clef',
+    'CustosEvent': 'custos',
+    'DotEvent': 'dot',
+    'ModernKeySignatureEvent': 'key_signature',
+    'LineEndEvent': 'line_end',
+    'MensurationEvent': 'mensuration',
+    'MiscItemEvent': 'misc_item',
+    'MultiEvent': 'multievent',
+    'NoteEvent': 'note',
+    'OriginalTextEvent': 'original_text',
+    'ProportionEvent': 'proportion_event',
+    'RestEvent': 'rest',
+    'AbstractMusicSectionContent': 'music_section', 'MensuralMusic': 'music_section', 'Plainchant': 'music_section',
+    'TextSection': 'music_section', 'MusicSection': 'music_section', 'Voice': 'music_section',
+    'Piece': 'piece',
+}
 
+__all__ = sorted(_modules)
 
-#from .music_section import AbstractMusicSectionContent, MensuralMusic, Plainchant, TextSection, MusicSection, Voice
-from .piece import Piece
+
+def __getattr__(name):
+    module_name = _modules.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    # Called once per name: importlib is not imported with the package
+    import importlib
+    value = getattr(importlib.import_module(f'.{module_name}', __name__), name)
+    # Later lookups find it without calling __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
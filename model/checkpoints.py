@@ -0,0 +1,197 @@
+"""
+Checkpoints of the notational state along a list of events.
+
+Rendering or playing a voice from its middle needs the clef, signature, mensuration, proportion, key signature and
+coloration in force there, and the onset of the event, which otherwise means replaying the voice from its start. The
+Checkpoints of an EventList hold a VoiceState every `interval` events, so that the state before any event is found by
+replaying at most `interval` events from the previous checkpoint.
+
+The state follows the edited text, as analysis.notes does: the new reading of EditorialData and the first reading of
+VariantReadings. The events of a MultiEvent are simultaneous: their changes all apply, and the onset advances by the
+longest of them. Onsets are in minims, from the lengths of the notes and rests as the editor gives them (Length) or, if
+they have none, from their types and the mensuration in force; the proportion in force is part of the state but is not
+applied to the onsets.
+
+The checkpoints of an EventList are memoized on it (see EventList.checkpoints), so they are pickled with the model;
+model.hashing.forget drops them with the digests.
+"""
+from fractions import Fraction
+from typing import List, Optional, Tuple
+
+DEFAULT_INTERVAL = 64
+
+# Attribute of the memoized checkpoints of an EventList
+MEMO = '_checkpoints'
+
+# Clef appearances that are accidentals: with Signature, they are part of the key signature
+ACCIDENTAL_APPEARANCES = {'Bmol', 'BmolDouble', 'Bqua', 'Diesis', 'Fis'}
+
+# Lengths in minims of the note types that do not depend on the mensuration
+MINIM_LENGTHS = {'Minima': Fraction(1), 'Semiminima': Fraction(1, 2), 'Fusa': Fraction(1, 4),
+                 'Semifusa': Fraction(1, 8)}
+
+# For the longer note types: the shorter type and the level of the mensuration that divides them
+MENSURATION_LEVELS = {'Semibrevis': ('Minima', 'prolatio'), 'Brevis': ('Semibrevis', 'tempus'),
+                      'Longa': ('Brevis', 'modus_minor'), 'Maxima': ('Longa', 'modus_maior')}
+
+
+def nominal_length(note_type: Optional[str], mens_info: Optional[dict]) -> Fraction:
+    """
+    Returns the length in minims of a note type under a mensuration (MensInfo, binary where it is not given), without
+    imperfection nor alteration. Unknown types have no length.
+    """
+    length = MINIM_LENGTHS.get(note_type)
+    if length is not None:
+        return length
+    level = MENSURATION_LEVELS.get(note_type)
+    if level is None:
+        return Fraction(0)
+    shorter_type, division = level
+    value = mens_info.get(division) if mens_info else None
+    return nominal_length(shorter_type, mens_info) * (3 if str(value) == '3' else 2)
+
+
+class VoiceState:
+    """
+    The notational state before an event: the events in force (or None), the accidentals of the signature following
+    the clef, and the onset in minims.
+    """
+    def __init__(self, clef=None, signature: Tuple = (), mensuration=None, proportion=None, key_signature=None,
+                 coloration=None, onset: Fraction = Fraction(0)):
+        self.clef = clef
+        self.signature = signature
+        self.mensuration = mensuration
+        self.proportion = proportion
+        self.key_signature = key_signature
+        self.coloration = coloration
+        self.onset = onset
+
+    def copy(self) -> 'VoiceState':
+        return VoiceState(self.clef, self.signature, self.mensuration, self.proportion, self.key_signature,
+                          self.coloration, self.onset)
+
+    def advance(self, event):
+        """
+        Applies an event (of the top level of an EventList) to the state.
+        """
+        self.onset += self.apply(event)
+
+    def apply(self, event) -> Fraction:
+        """
+        Applies the changes of an event to the state, except its onset, and returns its length.
+        """
+        name = type(event).__name__
+        if name == 'NoteEvent':
+            if event.length is not None:
+                return Fraction(event.length.num, event.length.den)
+            return nominal_length(event.note_type, self.mensuration.mens_info if self.mensuration else None)
+        if name == 'RestEvent':
+            if event.length_num is not None and event.length_den:
+                return Fraction(event.length_num, event.length_den)
+            return nominal_length(event.rest_type, self.mensuration.mens_info if self.mensuration else None)
+        if name == 'ClefEvent':
+            if event.appearance not in ACCIDENTAL_APPEARANCES:
+                # A clef restates the signature
+                self.clef = event
+                self.signature = ()
+            elif event.signature:
+                self.signature += (event,)
+        elif name == 'MensurationEvent':
+            self.mensuration = event
+        elif name == 'ProportionEvent':
+            self.proportion = event.proportion
+        elif name == 'ModernKeySignatureEvent':
+            self.key_signature = event
+        elif name == 'ColorChangeEvent':
+            self.coloration = event
+        elif name == 'MultiEvent':
+            return max((self.apply(item) for item in event.events if item is not None), default=Fraction(0))
+        elif name == 'EditorialData':
+            return self.apply_all(event.new_reading)
+        elif name == 'VariantReadings':
+            return self.apply_all(event.readings[0].music_events) if event.readings else Fraction(0)
+        return Fraction(0)
+
+    def apply_all(self, events: list) -> Fraction:
+        """
+        Applies a sequence of events, returning their total length.
+        """
+        length = Fraction(0)
+        for event in events:
+            if event is not None:
+                length += self.apply(event)
+        return length
+
+    def __eq__(self, other):
+        if isinstance(other, VoiceState):
+            return (self.clef == other.clef and
+                    self.signature == other.signature and
+                    self.mensuration == other.mensuration and
+                    self.proportion == other.proportion and
+                    self.key_signature == other.key_signature and
+                    self.coloration == other.coloration and
+                    self.onset == other.onset)
+        return False
+
+    def __repr__(self):
+        return (f"VoiceState(Clef={self.clef}, Signature={self.signature}, Mensuration={self.mensuration}, "
+                f"Proportion={self.proportion}, KeySignature={self.key_signature}, Coloration={self.coloration}, "
+                f"Onset={self.onset})")
+
+
+class Checkpoints:
+    """
+    The VoiceStates before the events 0, interval, 2 * interval, ... of a list of events.
+    """
+    def __init__(self, interval: int, states: List[VoiceState]):
+        self.interval = interval
+        self.states = states
+
+    @classmethod
+    def build(cls, events: list, interval: int = DEFAULT_INTERVAL) -> 'Checkpoints':
+        """
+        Builds the checkpoints of a list of events in one pass.
+
+        Args:
+            events: The events of an EventList.
+            interval: The number of events between two checkpoints.
+
+        Returns:
+            A Checkpoints object.
+        """
+        if interval < 1:
+            raise ValueError(f"The interval of the checkpoints must be positive, not {interval}")
+        state = VoiceState()
+        states = []
+        for index, event in enumerate(events):
+            if index % interval == 0:
+                states.append(state.copy())
+            if event is not None:
+                state.advance(event)
+        return cls(interval, states)
+
+    def state_at(self, events: list, index: int) -> VoiceState:
+        """
+        Returns the state before an event (or after the last one if index is len(events)), replaying the events from
+        the previous checkpoint.
+
+        Args:
+            events: The events the checkpoints were built from.
+            index: The index of the event.
+
+        Returns:
+            A new VoiceState.
+        """
+        if not 0 <= index <= len(events):
+            raise IndexError(f"Event index {index} out of range")
+        checkpoint = min(index // self.interval, len(self.states) - 1) if self.states else -1
+        if checkpoint < 0:
+            return VoiceState()
+        state = self.states[checkpoint].copy()
+        for event in events[checkpoint * self.interval:index]:
+            if event is not None:
+                state.advance(event)
+        return state
+
+    def __repr__(self):
+        return f"Checkpoints(Interval={self.interval}, States={len(self.states)})"
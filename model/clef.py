@@ -3,6 +3,7 @@ from xml.etree.ElementTree import Element
 
 from model.events import EventAttributes, Event
 from model.pitch import Pitch
+from model.schema_parsers import scan_clef_data
 
 
 class ClefEvent(Event):
@@ -24,33 +25,34 @@ class ClefEvent(Event):
 
         Args:
             element: The XML element that contains ClefEvent data.
-            parse_event_attributes: A helper function to parse event attributes.
 
         Returns:
             A ClefEvent object.
         """
-        # Parse Appearance
-        appearance = element.find('{http://www.cmme.org}Appearance').text if element.find('{http://www.cmme.org}Appearance') is not None else None
-
-        # Parse StaffLoc as an integer
-        staff_loc = int(element.find('{http://www.cmme.org}StaffLoc').text) if element.find('{http://www.cmme.org}StaffLoc') is not None else None
+        values = scan_clef_data(element)
 
         # Parse Pitch (which uses the Locus group)
-        pitch_element = element.find('{http://www.cmme.org}Pitch')
-        if pitch_element is not None:
-            letter_name = pitch_element.find('{http://www.cmme.org}LetterName').text if pitch_element.find('{http://www.cmme.org}LetterName') is not None else None
-            octave_num = int(pitch_element.find('{http://www.cmme.org}OctaveNum').text) if pitch_element.find('{http://www.cmme.org}OctaveNum') is not None else None
-            pitch = Pitch(letter_name, octave_num)
-        else:
-            pitch = None
+        pitch = Pitch.parse(values.get('pitch'))
+
+        # Signature is optional (True if present)
+        signature = values.get('signature') is not None
 
-        # Parse Signature (optional)
-        signature = element.find('{http://www.cmme.org}Signature') is not None
+        # EventAttributes (referenced group) are scanned with the rest of the content
+        event_attributes = EventAttributes.from_values(values)
 
-        # Parse EventAttributes (referenced group)
-        event_attributes = EventAttributes.parse(element)
+        return cls(values.get('appearance'), values.get('staff_loc'), pitch, event_attributes, signature)
 
-        return cls(appearance, staff_loc, pitch, event_attributes, signature)
+    def to_xml(self, writer):
+        writer.start('Clef')
+        writer.element('Appearance', self.appearance)
+        writer.element('StaffLoc', self.staff_loc)
+        if self.pitch is not None:
+            writer.start('Pitch')
+            self.pitch.to_xml(writer)
+            writer.end('Pitch')
+        writer.flag('Signature', self.signature)
+        self.event_attributes.to_xml(writer)
+        writer.end('Clef')
 
     def __eq__(self, other):
         if not isinstance(other, ClefEvent):
@@ -2,6 +2,7 @@ from typing import Optional
 from xml.etree.ElementTree import Element
 
 from model.events import Event
+from model.schema_parsers import scan_color_and_fill_data, scan_coloration_data, scan_color_change_data
 
 
 class ColorAndFillData:
@@ -14,13 +15,12 @@ class ColorAndFillData:
         if element is None:
             return None
 
-        color_el = element.find('{http://www.cmme.org}Color')
-        fill_el = element.find('{http://www.cmme.org}Fill')
+        values = scan_color_and_fill_data(element)
+        return cls(values.get('color'), values.get('fill'))
 
-        color = color_el.text if color_el is not None else None
-        fill = fill_el.text if fill_el is not None else None
-
-        return cls(color, fill)
+    def to_xml(self, writer):
+        writer.element('Color', self.color)
+        writer.element('Fill', self.fill)
 
 
 class ColorationData:
@@ -33,20 +33,29 @@ class ColorationData:
         if element is None:
             return None
 
+        values = scan_coloration_data(element)
+
         # Parse the primary color (required)
-        primary_color_el = element.find('{http://www.cmme.org}PrimaryColor')
-        primary_color_data = ColorAndFillData.parse(primary_color_el)
+        primary_color_data = ColorAndFillData.parse(values.get('primary_color'))
 
         if primary_color_data is None:
             # Primary color is required, if not found, return None
             return None
 
         # Parse the secondary color (optional)
-        secondary_color_el = element.find('{http://www.cmme.org}SecondaryColor')
-        secondary_color_data = ColorAndFillData.parse(secondary_color_el)
+        secondary_color_data = ColorAndFillData.parse(values.get('secondary_color'))
 
         return cls(primary_color_data, secondary_color_data)
 
+    def to_xml(self, writer):
+        writer.start('PrimaryColor')
+        self.primary_color.to_xml(writer)
+        writer.end('PrimaryColor')
+        if self.secondary_color is not None:
+            writer.start('SecondaryColor')
+            self.secondary_color.to_xml(writer)
+            writer.end('SecondaryColor')
+
 
 class BaseColoration:
     def __init__(self, coloration_data: ColorationData):
@@ -66,11 +75,16 @@ class BaseColoration:
 
         return cls(coloration_data)
 
+    def to_xml(self, writer):
+        writer.start('BaseColoration')
+        self.coloration_data.to_xml(writer)
+        writer.end('BaseColoration')
+
 class ColorChangeEvent(Event):
     """
     Represents a color change event in musical notation, containing primary and secondary colors.
     """
-    def __init__(self, primary_color: Optional[str], secondary_color: Optional[str]):
+    def __init__(self, primary_color: Optional[ColorAndFillData], secondary_color: Optional[ColorAndFillData]):
         self.primary_color = primary_color
         self.secondary_color = secondary_color
 
@@ -85,11 +99,24 @@ class ColorChangeEvent(Event):
         Returns:
             A ColorChangeEvent object.
         """
-        primary_color = element.find('{http://www.cmme.org}PrimaryColor').text if element.find('{http://www.cmme.org}PrimaryColor') is not None else None
-        secondary_color = element.find('{http://www.cmme.org}SecondaryColor').text if element.find('{http://www.cmme.org}SecondaryColor') is not None else None
+        values = scan_color_change_data(element)
+        primary_color = ColorAndFillData.parse(values.get('primary_color'))
+        secondary_color = ColorAndFillData.parse(values.get('secondary_color'))
 
         return cls(primary_color, secondary_color)
 
+    def to_xml(self, writer):
+        writer.start('ColorChange')
+        if self.primary_color is not None:
+            writer.start('PrimaryColor')
+            self.primary_color.to_xml(writer)
+            writer.end('PrimaryColor')
+        if self.secondary_color is not None:
+            writer.start('SecondaryColor')
+            self.secondary_color.to_xml(writer)
+            writer.end('SecondaryColor')
+        writer.end('ColorChange')
+
     def __eq__(self, other):
         if isinstance(other, ColorChangeEvent):
             return self.primary_color == other.primary_color and self.secondary_color == other.secondary_color
@@ -0,0 +1,129 @@
+"""
+Columnar form of the events of a Voice.
+
+Each top-level event of an EventList becomes one row of three integer columns: the kind of event, its note type
+(notes and rests) and its pitch as a diatonic step (events with a Pitch). The columns can be written into any
+writable buffer and read back as memoryviews of that buffer, without copying, e.g. from shared memory.
+"""
+import struct
+from array import array
+from typing import Iterable, Tuple
+
+from model.pitch import Pitch
+
+# Codes of the kind column, by class name
+EVENT_KINDS = ('ClefEvent', 'ColorChangeEvent', 'CustosEvent', 'DotEvent', 'ModernKeySignatureEvent', 'LineEndEvent',
+               'MensurationEvent', 'MiscItemEvent', 'MultiEvent', 'NoteEvent', 'OriginalTextEvent', 'ProportionEvent',
+               'RestEvent', 'VariantReadings', 'EditorialData')
+EVENT_KIND_CODES = {name: code for code, name in enumerate(EVENT_KINDS)}
+
+# Codes of the note_type column, from the shortest to the longest value (NoteTypeName)
+NOTE_TYPES = ('Semifusa', 'Fusa', 'Semiminima', 'Minima', 'Semibrevis', 'Brevis', 'Longa', 'Maxima')
+NOTE_TYPE_CODES = {name: code for code, name in enumerate(NOTE_TYPES)}
+
+# CMME numbers the octaves from A: G3 is followed by A4
+PITCH_LETTERS = 'ABCDEFG'
+
+# Value of a column for an event without that property
+MISSING = -1
+
+
+def diatonic_step(pitch: Pitch) -> int:
+    """
+    Returns the number of diatonic steps from A0 to a pitch (e.g. 28 for A4, 30 for C4), or MISSING if the pitch is
+    incomplete.
+    """
+    if pitch is None or pitch.letter_name is None or pitch.octave_num is None:
+        return MISSING
+    return pitch.octave_num * 7 + PITCH_LETTERS.index(pitch.letter_name)
+
+
+def step_pitch(step: int) -> Pitch:
+    """
+    Returns the pitch of a diatonic step (the inverse of diatonic_step).
+    """
+    return Pitch(PITCH_LETTERS[step % 7], step // 7)
+
+
+class VoiceColumns:
+    """
+    The kind, note_type and pitch columns of a Voice. They are arrays when built from events, and memoryviews when read
+    from a buffer.
+    """
+    # Number of rows, followed by the int8 kind and note_type columns and the int16 pitch column
+    HEADER = struct.Struct('<I')
+
+    def __init__(self, kind, note_type, pitch):
+        self.kind = kind
+        self.note_type = note_type
+        self.pitch = pitch
+
+    @classmethod
+    def from_events(cls, events: Iterable) -> 'VoiceColumns':
+        kind = array('b')
+        note_type = array('b')
+        pitch = array('h')
+        for event in events:
+            kind.append(EVENT_KIND_CODES.get(type(event).__name__, MISSING))
+            type_name = getattr(event, 'note_type', None) or getattr(event, 'rest_type', None)
+            note_type.append(NOTE_TYPE_CODES.get(type_name, MISSING))
+            event_pitch = getattr(event, 'pitch', None)
+            pitch.append(diatonic_step(event_pitch) if isinstance(event_pitch, Pitch) else MISSING)
+        return cls(kind, note_type, pitch)
+
+    def __len__(self):
+        return len(self.kind)
+
+    @classmethod
+    def layout(cls, rows: int) -> Tuple[int, int, int, int]:
+        """
+        Returns the offsets of the three columns and the end of the columns, relative to their start in a buffer.
+        """
+        kind_offset = cls.HEADER.size
+        note_type_offset = kind_offset + rows
+        # The int16 column starts at an even offset
+        pitch_offset = note_type_offset + rows + (note_type_offset + rows) % 2
+        return kind_offset, note_type_offset, pitch_offset, pitch_offset + 2 * rows
+
+    @property
+    def nbytes(self) -> int:
+        return self.layout(len(self))[3]
+
+    def write_into(self, buffer, offset: int = 0) -> int:
+        """
+        Writes the columns into a writable buffer at the given (even) offset.
+
+        Returns:
+            The offset following the columns.
+        """
+        rows = len(self)
+        kind_offset, note_type_offset, pitch_offset, end = (offset + relative for relative in self.layout(rows))
+        self.HEADER.pack_into(buffer, offset, rows)
+        buffer[kind_offset:note_type_offset] = self.kind.tobytes()
+        buffer[note_type_offset:note_type_offset + rows] = self.note_type.tobytes()
+        buffer[pitch_offset:end] = self.pitch.tobytes()
+        return end
+
+    @classmethod
+    def from_buffer(cls, buffer, offset: int = 0) -> Tuple['VoiceColumns', int]:
+        """
+        Reads columns written by write_into as views of the buffer (no data is copied).
+
+        Returns:
+            The columns and the offset following them.
+        """
+        rows, = cls.HEADER.unpack_from(buffer, offset)
+        kind_offset, note_type_offset, pitch_offset, end = (offset + relative for relative in cls.layout(rows))
+        view = memoryview(buffer)
+        columns = cls(view[kind_offset:note_type_offset].cast('b'),
+                      view[note_type_offset:note_type_offset + rows].cast('b'),
+                      view[pitch_offset:end].cast('h'))
+        return columns, end
+
+    def release(self):
+        """
+        Releases the views on the underlying buffer, which can then be closed.
+        """
+        for column in (self.kind, self.note_type, self.pitch):
+            if isinstance(column, memoryview):
+                column.release()
@@ -1,6 +1,7 @@
 from typing import Optional
 from xml.etree.ElementTree import Element
 from model.pitch import Pitch
+from model.schema_parsers import scan_custos_data
 
 
 class CustosEvent:
@@ -21,8 +22,13 @@ class CustosEvent:
         Returns:
             A CustosEvent object.
         """
-        pitch = Pitch.parse(element)
-        return cls(pitch)
+        values = scan_custos_data(element)
+        return cls(Pitch(values.get('letter_name'), values.get('octave_num'), values.get('staff_loc')))
+
+    def to_xml(self, writer):
+        writer.start('Custos')
+        self.pitch.to_xml(writer)
+        writer.end('Custos')
 
     def __eq__(self, other):
         if isinstance(other, CustosEvent):
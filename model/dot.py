@@ -1,15 +1,24 @@
 from typing import Optional
 from xml.etree.ElementTree import Element
 
+from model.events import EventAttributes
 from model.pitch import Pitch
+from model.schema_parsers import scan_dot_data
 
 
 class DotEvent:
     """
-    Represents a dot event in musical notation, which may include a pitch.
+    Represents a dot event in musical notation, positioned by a pitch or, in older files, by a staff location or by a
+    staff location relative to a note (given by its event ID).
     """
-    def __init__(self, pitch: Optional[Pitch]):
+    def __init__(self, pitch: Optional[Pitch], staff_loc: Optional[int] = None,
+                 relative_staff_loc: Optional[int] = None, note_event_id: Optional[int] = None,
+                 event_attributes: Optional[EventAttributes] = None):
         self.pitch = pitch
+        self.staff_loc = staff_loc
+        self.relative_staff_loc = relative_staff_loc
+        self.note_event_id = note_event_id
+        self.event_attributes = event_attributes if event_attributes is not None else EventAttributes()
 
     @classmethod
     def parse(cls, element: Element) -> 'DotEvent':
@@ -18,20 +27,47 @@ class DotEvent:
 
         Args:
             element: The XML element containing DotEvent data.
-            parse_pitch: Helper function to parse Pitch.
 
         Returns:
             A DotEvent object.
         """
-        pitch_element = element.find('{http://www.cmme.org}Pitch')
-        pitch = Pitch.parse(pitch_element) if pitch_element is not None else None
+        values = scan_dot_data(element)
+        pitch = Pitch.parse(values.get('pitch'))
 
-        return cls(pitch)
+        return cls(pitch, values.get('staff_loc'), values.get('relative_staff_loc'), values.get('note_event_id'),
+                   EventAttributes.from_values(values))
+
+    def to_xml(self, writer):
+        """
+        Writes the Dot element, with the first of its positions that is set.
+
+        Raises:
+            ValueError: If the dot has no position, which CMME requires.
+        """
+        writer.start('Dot')
+        if self.pitch is not None:
+            writer.start('Pitch')
+            self.pitch.to_xml(writer)
+            writer.end('Pitch')
+        elif self.staff_loc is not None:
+            writer.element('StaffLoc', self.staff_loc)
+        elif self.relative_staff_loc is not None and self.note_event_id is not None:
+            writer.element('RelativeStaffLoc', self.relative_staff_loc)
+            writer.element('NoteEventID', self.note_event_id)
+        else:
+            raise ValueError(f"{self!r} has no position")
+        self.event_attributes.to_xml(writer)
+        writer.end('Dot')
 
     def __eq__(self, other):
         if isinstance(other, DotEvent):
-            return self.pitch == other.pitch
+            return (self.pitch == other.pitch and
+                    self.staff_loc == other.staff_loc and
+                    self.relative_staff_loc == other.relative_staff_loc and
+                    self.note_event_id == other.note_event_id and
+                    self.event_attributes == other.event_attributes)
         return False
 
     def __repr__(self):
-        return f"DotEvent(Pitch={self.pitch})"
+        return (f"DotEvent(Pitch={self.pitch}, StaffLoc={self.staff_loc}, RelativeStaffLoc={self.relative_staff_loc}, "
+                f"NoteEventID={self.note_event_id}, EventAttributes={self.event_attributes})")
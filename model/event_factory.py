@@ -1,54 +1,91 @@
-from .events import Event
-from .clef import ClefEvent
-from .custos import CustosEvent
-from .dot import DotEvent
-from .key_signature import ModernKeySignatureEvent
-from .line_end import LineEndEvent
-from .mensuration import MensurationEvent
-from .misc_item import MiscItemEvent
-from .multievent import MultiEvent
-from .note import NoteEvent
-from .original_text import OriginalTextEvent
-from .proportion_event import ProportionEvent
-from .rest import RestEvent
+import importlib
+
+from .recovery import RECOVERY
+
+# The event classes, by the module that defines them. The modules are imported when the table of parse methods is
+# built, not with this one
+EVENT_CLASSES = (('clef', 'ClefEvent'), ('coloration', 'ColorChangeEvent'), ('custos', 'CustosEvent'),
+                 ('dot', 'DotEvent'), ('key_signature', 'ModernKeySignatureEvent'), ('line_end', 'LineEndEvent'),
+                 ('mensuration', 'MensurationEvent'), ('misc_item', 'MiscItemEvent'), ('multievent', 'MultiEvent'),
+                 ('note', 'NoteEvent'), ('original_text', 'OriginalTextEvent'),
+                 ('proportion_event', 'ProportionEvent'), ('rest', 'RestEvent'))
+
 
 class EventFactory:
     '''
-    This class is responsible for creating events. It uses reflection. Note that for working, all event classes must be imported above
+    This class is responsible for creating events. The event classes listed above are indexed once by their
+    (namespaced) XML tag, so creating an event is a single dictionary lookup.
     '''
+    _parsers = None
+
+    @classmethod
+    def parsers(cls):
+        """
+        Returns the table mapping each namespaced event tag (e.g. '{http://www.cmme.org}Clef') to the parse method
+        of its class. For each event type (e.g. 'Clef'), there is an associated class (e.g. ClefEvent).
+        The table is built on first use, which imports the event modules.
+        """
+        if cls._parsers is None:
+            parsers = {}
+            for module_name, class_name in EVENT_CLASSES:
+                event_class = getattr(importlib.import_module(f'.{module_name}', __package__), class_name)
+                parse_method = getattr(event_class, 'parse', None)
+                if parse_method is None:
+                    raise ParseMethodNotFoundException(class_name)
+                tag_suffix = class_name if class_name == 'MultiEvent' else class_name[:-len('Event')]
+                parsers['{http://www.cmme.org}' + tag_suffix] = parse_method
+            cls._parsers = parsers
+        return cls._parsers
+
     @classmethod
     def create(cls, event_el):
         """
-        Dynamically constructs the class name from the XML tag and calls its parse method.
-        For each event type (e.g. 'Clef'), there is an associated class (e.g. Clef)
+        Looks up the class associated with the XML tag and calls its parse method.
 
         Args:
             event_el: The XML element representing the event.
 
         Returns:
-            An Event object if a corresponding class with a parse method is found, otherwise None.
+            An Event object if a corresponding class with a parse method is found.
         """
-        # Extract the tag name and construct the class name dynamically
-        tag_suffix = event_el.tag.split('}')[-1]  # Get the suffix part of the tag (after the namespace)
-        class_name = f'{tag_suffix}Event'  # Dynamically construct the class name, e.g., 'ClefEvent'
-        if class_name == 'MultiEventEvent':
-            class_name = 'MultiEvent'
+        parse_method = (cls._parsers or cls.parsers()).get(event_el.tag)
+        if parse_method is None:
+            # Raise exception if the class is not found
+            raise EventClassNotFoundException(cls.class_name(event_el.tag))
+
+        return parse_method(event_el)
 
-        # Attempt to find the class in the current global scope
-        event_class = globals().get(class_name)
+    @classmethod
+    def create_all(cls, parent_el):
+        """
+        Creates the events for all the children of an element (e.g. the SingleOrMultiEventData content of a
+        MultiEvent, a Reading's Music or an EditorialData's NewReading).
 
-        if event_class is None:
-            # Raise exception if the class is not found
-            raise EventClassNotFoundException(class_name)
+        Args:
+            parent_el: The XML element whose children are events.
 
-            # Check if the class has the 'parse' method
-        parse_method = getattr(event_class, 'parse', None)
-        if parse_method is None:
-            # Raise exception if the 'parse' method is not found
-            raise ParseMethodNotFoundException(class_name)
+        Returns:
+            The list of Event objects, in document order.
+        """
+        parsers = cls._parsers or cls.parsers()
+        recovery = RECOVERY.get()
+        if recovery is not None:
+            return [recovery.parse_event(parsers, event_el) for event_el in parent_el]
+        events = []
+        for event_el in parent_el:
+            parse_method = parsers.get(event_el.tag)
+            if parse_method is None:
+                raise EventClassNotFoundException(cls.class_name(event_el.tag))
+            events.append(parse_method(event_el))
+        return events
 
-        # Call the parse method and return the result
-        return parse_method(event_el)
+    @staticmethod
+    def class_name(tag):
+        """
+        Returns the name of the class expected for a tag, e.g. 'ClefEvent' for '{http://www.cmme.org}Clef'.
+        """
+        tag_suffix = tag.split('}')[-1]  # Get the suffix part of the tag (after the namespace)
+        return 'MultiEvent' if tag_suffix == 'MultiEvent' else f'{tag_suffix}Event'
 
 class EventClassNotFoundException(Exception):
     """Exception raised when the event class is not found."""
@@ -1,4 +1,9 @@
-class Event:
+from abc import ABC, abstractmethod
+
+from model.schema_parsers import scan_event_attributes
+
+
+class Event(ABC):
     """
     Base class for all events.
     Each event has a type (e.g., 'Clef', 'Note', 'Dot', etc.).
@@ -9,6 +14,12 @@ class Event:
     def __repr__(self):
         return f"{self.__class__.__name__}(Type={self.event_type})"
 
+    @abstractmethod
+    def to_xml(self, writer):
+        """
+        Writes the element of the event to a CMMEWriter (see model.writer); each kind of event writes its own.
+        """
+
 
 class EventAttributes:
     def __init__(self, colored: bool = False, ambiguous: bool = False, editorial: bool = False, error: bool = False, editorial_commentary: str = None):
@@ -38,23 +49,28 @@ class EventAttributes:
         Parse the EventAttributes group, which includes optional elements:
         Colored, Ambiguous, Editorial, Error, and EditorialCommentary.
         """
-        # Parse Colored (True if present)
-        colored = element.find('{http://www.cmme.org}Colored') is not None
-
-        # Parse Ambiguous (True if present)
-        ambiguous = element.find('{http://www.cmme.org}Ambiguous') is not None
+        return cls.from_values(scan_event_attributes(element))
 
-        # Parse Editorial (True if present)
-        editorial = element.find('{http://www.cmme.org}Editorial') is not None
-
-        # Parse Error (True if present)
-        error = element.find('{http://www.cmme.org}Error') is not None
-
-        # Parse EditorialCommentary (if present)
-        editorial_commentary_element = element.find('{http://www.cmme.org}EditorialCommentary')
-        editorial_commentary = editorial_commentary_element.text if editorial_commentary_element is not None else None
+    @classmethod
+    def from_values(cls, values: dict) -> 'EventAttributes':
+        """
+        Builds the EventAttributes from the values scanned from an event element, as the group is part of the
+        content of every event (the flags are True if present).
+        """
+        return cls(values.get('colored') is not None,
+                   values.get('ambiguous') is not None,
+                   values.get('editorial') is not None,
+                   values.get('error') is not None,
+                   values.get('editorial_commentary'))
 
-        # Create and return EventAttributes object
-        return EventAttributes(colored, ambiguous, editorial, error, editorial_commentary)
+    def to_xml(self, writer):
+        """
+        Writes the EventAttributes group, at the end of the element of the event.
+        """
+        writer.flag('Colored', self.colored)
+        writer.flag('Ambiguous', self.ambiguous)
+        writer.flag('Editorial', self.editorial)
+        writer.flag('Error', self.error)
+        writer.element('EditorialCommentary', self.editorial_commentary)
 
 
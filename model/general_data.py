@@ -2,6 +2,8 @@ from typing import List, Optional
 from xml.etree.ElementTree import Element
 
 from model.coloration import BaseColoration
+from model.schema_parsers import (scan_general_data_group, scan_missing_voices, scan_source_info,
+                                  scan_variant_version)
 
 class SourceInfo:
     def __init__(self, name: str, id_: int):
@@ -13,40 +15,54 @@ class SourceInfo:
         if element is None:
             return None
 
-        name_el = element.find('{http://www.cmme.org}Name')
-        id_el = element.find('{http://www.cmme.org}ID')
+        values = scan_source_info(element)
+        return cls(values.get('name'), values.get('id'))  # Return an instance of SourceInfo
 
-        name = name_el.text if name_el is not None else None
-        id_ = int(id_el.text) if id_el is not None else None
-
-        return cls(name, id_)  # Return an instance of SourceInfo
+    def to_xml(self, writer):
+        writer.start('Source')
+        writer.element('Name', self.name)
+        writer.element('ID', self.id_)
+        writer.end('Source')
 
 class VariantVersion:
     def __init__(self, id_: str, source: Optional[SourceInfo] = None, description: Optional[str] = None,
-                 missing_voices: Optional[List[str]] = None):
+                 missing_voices: Optional[List[str]] = None, default: bool = False, editor: Optional[str] = None):
         self.id_ = id_
+        self.default = default
         self.source = source
+        self.editor = editor
         self.description = description
         self.missing_voices = missing_voices if missing_voices is not None else []
 
     @classmethod
     def parse(cls, element: Element) -> 'VariantVersion':
-        id_el = element.find('{http://www.cmme.org}ID')
-        id_ = id_el.text if id_el is not None else None
-
-        source_el = element.find('{http://www.cmme.org}Source')
-        source = SourceInfo.parse(source_el) if source_el is not None else None
+        values = scan_variant_version(element)
 
-        description_el = element.find('{http://www.cmme.org}Description')
-        description = description_el.text if description_el is not None else None
+        source = SourceInfo.parse(values.get('source'))
 
-        missing_voices_el = element.find('{http://www.cmme.org}MissingVoices')
+        missing_voices_el = values.get('missing_voices')
         missing_voices = []
         if missing_voices_el is not None:
-            voice_num_els = missing_voices_el.findall('{http://www.cmme.org}VoiceNum')
-            missing_voices = [voice_num_el.text for voice_num_el in voice_num_els if voice_num_el.text is not None]
+            missing_voices = [voice_num for voice_num in scan_missing_voices(missing_voices_el)['voice_num']
+                              if voice_num is not None]
 
-        return cls(id_, source, description, missing_voices)
+        return cls(values.get('id'), source, values.get('description'), missing_voices,
+                   values.get('default') is not None, values.get('editor'))
+
+    def to_xml(self, writer):
+        writer.start('VariantVersion')
+        writer.flag('Default', self.default)
+        writer.element('ID', self.id_)
+        if self.source is not None:
+            self.source.to_xml(writer)
+        writer.element('Editor', self.editor)
+        writer.element('Description', self.description)
+        if self.missing_voices:
+            writer.start('MissingVoices')
+            for voice_num in self.missing_voices:
+                writer.element('VoiceNum', voice_num)
+            writer.end('MissingVoices')
+        writer.end('VariantVersion')
 
 
 
@@ -69,33 +85,32 @@ class GeneralData:
         if element is None:
             raise ValueError("GeneralData element is missing")
 
-        incipit_el = element.find('{http://www.cmme.org}Incipit')
-        incipit = incipit_el.text if incipit_el is not None else None
-
-        title_el = element.find('{http://www.cmme.org}Title')
-        title = title_el.text if title_el is not None else None
+        values = scan_general_data_group(element)
 
-        section_el = element.find('{http://www.cmme.org}Section')
-        section = section_el.text if section_el is not None else None
-
-        composer_el = element.find('{http://www.cmme.org}Composer')
-        composer = composer_el.text if composer_el is not None else None
-
-        editor_el = element.find('{http://www.cmme.org}Editor')
-        editor = editor_el.text if editor_el is not None else None
-
-        publicNotes_el = element.find('{http://www.cmme.org}PublicNotes')
-        publicNotes = publicNotes_el.text if publicNotes_el is not None else None
-
-        notes_el = element.find('{http://www.cmme.org}Notes')
-        notes = notes_el.text if notes_el is not None else None
+        # Incipit is untyped: keep its text, empty if it has none
+        incipit_el = values.get('incipit')
+        incipit = incipit_el.text or '' if incipit_el is not None else None
 
         # Parse BaseColoration
-        base_coloration_el = element.find('{http://www.cmme.org}BaseColoration')
-        base_coloration = BaseColoration.parse(base_coloration_el)
+        base_coloration = BaseColoration.parse(values.get('base_coloration'))
 
         # Handle 0..* (unbounded) cardinality for VariantVersion
-        variant_versions = [VariantVersion.parse(var_ver_el) for var_ver_el in
-                            element.findall('{http://www.cmme.org}VariantVersion')]
-
-        return cls(incipit, title, section, composer, editor, publicNotes, notes, variant_versions, base_coloration)
+        variant_versions = [VariantVersion.parse(var_ver_el) for var_ver_el in values['variant_version']]
+
+        return cls(incipit, values.get('title'), values.get('section'), values.get('composer'), values.get('editor'),
+                   values.get('public_notes'), values.get('notes'), variant_versions, base_coloration)
+
+    def to_xml(self, writer):
+        writer.start('GeneralData')
+        writer.element('Incipit', self.incipit)
+        writer.element('Title', self.title)
+        writer.element('Section', self.section)
+        writer.element('Composer', self.composer)
+        writer.element('Editor', self.editor)
+        writer.element('PublicNotes', self.publicNotes)
+        writer.element('Notes', self.notes)
+        for variant_version in self.variant_versions:
+            variant_version.to_xml(writer)
+        if self.base_coloration is not None:
+            self.base_coloration.to_xml(writer)
+        writer.end('GeneralData')
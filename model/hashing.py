@@ -0,0 +1,169 @@
+"""
+Canonical content hashes of the model.
+
+The hash of an object is a digest (BLAKE2b, 16 bytes) of a canonical encoding of its content: its class and the values
+of its public attributes, in a fixed order. It does not depend on the identity of the objects nor on the process, so
+that it can be stored and compared across runs.
+
+The hashes are Merkle-style: an EventList is hashed as a block of events, a Voice from the digest of its EventList, a
+MusicSection from the digests of its voices, and a Piece from those of its sections. Each digest is memoized on its
+object, so that hashing a piece again, or a piece in which one voice has changed, only encodes what is new. The model is
+mutable: after changing an object, call forget() on it and on its ancestors.
+
+The nodes are mutable, so they keep the __eq__ and __hash__ of objects (their identity): a digest memoized before a
+change would otherwise make them equal to what they no longer are, or lose them in a set. Their digest() and
+same_content() methods compare contents, and duplicates are found by their digests (see analysis.duplicates).
+"""
+import hashlib
+from typing import Dict, List, Tuple
+
+from model.checkpoints import MEMO as CHECKPOINTS
+from model.staff import MEMO as STAFF_POSITIONS
+
+DIGEST_SIZE = 16
+
+# Attribute of the memoized digests
+MEMO = '_content_hash'
+
+# Attributes of the values memoized on the nodes, which are dropped with the digests (see model.checkpoints and
+# model.staff)
+MEMOS = (MEMO, CHECKPOINTS, STAFF_POSITIONS)
+
+# The classes that memoize their digest, and the attributes they are hashed from (in that order)
+NODE_FIELDS = {
+    'EventList': ('events',),
+    'Voice': ('voice_num', 'missing_version_ids', 'event_list'),
+    'MusicSection': ('content',),
+    'Piece': ('cmme_version', 'general_data', 'voice_data', 'music_sections'),
+}
+
+# class -> (the name it is hashed under, the attributes it is hashed from, whether it is a node)
+_fields: Dict[type, Tuple[str, Tuple[str, ...], bool]] = {}
+
+
+def fields(value) -> Tuple[str, Tuple[str, ...], bool]:
+    value_class = type(value)
+    found = _fields.get(value_class)
+    if found is None:
+        node_class = next((base for base in value_class.__mro__ if base.__name__ in NODE_FIELDS), None)
+        if node_class is not None:
+            # A SharedVoice is hashed as the Voice it stands for
+            found = (node_class.__name__, NODE_FIELDS[node_class.__name__], True)
+        else:
+            # The model classes set all their attributes in __init__
+            found = (value_class.__name__, tuple(sorted(name for name in vars(value) if not name.startswith('_'))),
+                     False)
+        _fields[value_class] = found
+    return found
+
+
+def encode_object(value, parts: List[str]):
+    name, names, is_node = fields(value)
+    if is_node:
+        parts.append('H')
+        parts.append(content_hash(value).hex())
+        return
+    parts.append(f'O{name};')
+    for attribute in names:
+        item = getattr(value, attribute)
+        (ENCODERS.get(type(item)) or encode_object)(item, parts)
+
+
+def encode_sequence(value, parts: List[str]):
+    parts.append(f'L{len(value)};')
+    for item in value:
+        (ENCODERS.get(type(item)) or encode_object)(item, parts)
+
+
+def encode_dict(value, parts: List[str]):
+    # In the order of the keys, whatever the order of insertion
+    parts.append(f'M{len(value)};')
+    for key, item in sorted(value.items()):
+        encode(key, parts)
+        encode(item, parts)
+
+
+def encode_str(value, parts: List[str]):
+    parts.append(f'S{len(value)}:')
+    parts.append(value)
+
+
+# The encoders of the values that are not model objects, by type
+ENCODERS = {
+    type(None): lambda value, parts: parts.append('N'),
+    bool: lambda value, parts: parts.append('T' if value else 'F'),
+    int: lambda value, parts: parts.append(f'I{value};'),
+    float: lambda value, parts: parts.append(f'D{value!r};'),
+    str: encode_str,
+    list: encode_sequence,
+    tuple: encode_sequence,
+    dict: encode_dict,
+}
+
+
+def encode(value, parts: List[str]):
+    """
+    Appends the canonical encoding of a value to parts: type tags, lengths and values, with the class name and the
+    attributes of the objects. The nodes it contains are encoded by their digest.
+    """
+    encoder = ENCODERS.get(type(value))
+    if encoder is not None:
+        encoder(value, parts)
+    elif hasattr(value, '__dict__'):
+        encode_object(value, parts)
+    else:
+        raise TypeError(f"Cannot hash a value of type {type(value).__name__}")
+
+
+def content_hash(value) -> bytes:
+    """
+    Returns the digest of a model object (or of any value made of lists, dictionaries, strings, numbers and model
+    objects). It is memoized if the object is an EventList, a Voice, a MusicSection or a Piece.
+    """
+    attributes = getattr(value, '__dict__', None)
+    if attributes is None or not fields(value)[2]:
+        parts = []
+        encode(value, parts)
+        return hashlib.blake2b(''.join(parts).encode('utf-8', 'surrogatepass'), digest_size=DIGEST_SIZE).digest()
+
+    digest = attributes.get(MEMO)
+    if digest is None:
+        name, names, _ = fields(value)
+        parts = [f'O{name};']
+        for attribute in names:
+            encode(getattr(value, attribute), parts)
+        digest = hashlib.blake2b(''.join(parts).encode('utf-8', 'surrogatepass'), digest_size=DIGEST_SIZE).digest()
+        setattr(value, MEMO, digest)
+    return digest
+
+
+def music_hash(piece) -> bytes:
+    """
+    Returns the digest of the music of a piece (its sections), without its GeneralData and VoiceData: the same music
+    encoded by different editors, or with different metadata, has the same music hash.
+    """
+    parts = ['M']
+    encode(piece.music_sections, parts)
+    return hashlib.blake2b(''.join(parts).encode('utf-8', 'surrogatepass'), digest_size=DIGEST_SIZE).digest()
+
+
+def forget(*nodes):
+    """
+    Drops the memoized digests (and checkpoints and staff positions) of objects that have been modified. Their ancestors must be forgotten as
+    well; their other descendants keep their digests.
+    """
+    for node in nodes:
+        for memo in MEMOS:
+            node.__dict__.pop(memo, None)
+
+
+def same_content(node, other) -> bool:
+    """
+    Whether two nodes have equal contents (with the probability of a collision of 128-bit digests). The digests are
+    the memoized ones: nodes changed since they were hashed must have been forgotten.
+    """
+    if node is other:
+        return True
+    if not hasattr(other, '__dict__') or fields(other)[0] != fields(node)[0]:
+        return False
+    return content_hash(node) == content_hash(other)
@@ -1,6 +1,9 @@
 from typing import Optional
 from xml.etree.ElementTree import Element
 
+from model.schema_parsers import (scan_modern_accidental_data, scan_modern_key_signature_data,
+                                  scan_modern_key_signature_element)
+
 
 class ModernKeySignatureEvent:
     """
@@ -21,11 +24,31 @@ class ModernKeySignatureEvent:
         Returns:
             A ModernKeySignatureEvent object.
         """
-        accidental = element.find('{http://www.cmme.org}Accidental').text if element.find('{http://www.cmme.org}Accidental') is not None else None
-        pitch_class = element.find('{http://www.cmme.org}PitchClass').text if element.find('{http://www.cmme.org}PitchClass') is not None else None
+        accidental = None
+        pitch_class = None
+
+        # The accidental and pitch class are those of the first SigElement
+        sig_elements = scan_modern_key_signature_data(element)['sig_element']
+        if sig_elements:
+            sig_element_values = scan_modern_key_signature_element(sig_elements[0])
+            pitch_class = sig_element_values.get('pitch')
+            accidental_el = sig_element_values.get('accidental')
+            if accidental_el is not None:
+                accidental = scan_modern_accidental_data(accidental_el).get('a_type')
 
         return cls(accidental, pitch_class)
 
+    def to_xml(self, writer):
+        writer.start('ModernKeySignature')
+        if self.pitch_class is not None or self.accidental is not None:
+            writer.start('SigElement')
+            writer.element('Pitch', self.pitch_class)
+            writer.start('Accidental')
+            writer.element('AType', self.accidental)
+            writer.end('Accidental')
+            writer.end('SigElement')
+        writer.end('ModernKeySignature')
+
     def __eq__(self, other):
         if isinstance(other, ModernKeySignatureEvent):
             return self.accidental == other.accidental and self.pitch_class == other.pitch_class
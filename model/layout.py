@@ -0,0 +1,218 @@
+"""
+Index of the original layout of a source: the pages and systems of each voice.
+
+A source's layout is encoded by LineEndEvents (with PageEnd at the end of a page), usually preceded by a CustosEvent.
+In an edition made from several sources, they are in the readings of that source's variant version, so the layout is
+indexed for one variant version: the top-level events of the voices, and in each VariantReadings the reading of that
+version (or the DEFAULT reading if it has none). The new readings of EditorialData and the events of MultiEvents are
+followed too.
+
+Pages and systems are numbered from 1, the systems from the start of each page. A system runs from the event after a
+line end to the top-level event holding the next one, so that each system is a slice of the events of a Voice (a
+system that goes on in the next MusicSection has one range in each section). The LayoutIndexer builds the index while
+the piece is parsed (Piece.parse(xml, visitor=LayoutIndexer('Occo Codex'))), or over a parsed piece (LayoutIndex.of).
+"""
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple
+
+from model.visitor import SKIP, Visitor, walk
+
+DEFAULT_VERSION = 'DEFAULT'
+
+
+class SystemRange:
+    """
+    The events of a system in one section: events[start:stop] of the EventList of the voice, and the custos that ends
+    the system, if any.
+    """
+    def __init__(self, page: int, system: int, section: int, start: int, stop: int, custos=None):
+        self.page = page
+        self.system = system
+        self.section = section
+        self.start = start
+        self.stop = stop
+        self.custos = custos
+
+    def __eq__(self, other):
+        if isinstance(other, SystemRange):
+            return (self.page == other.page and self.system == other.system and self.section == other.section and
+                    self.start == other.start and self.stop == other.stop and self.custos == other.custos)
+        return False
+
+    def __repr__(self):
+        return (f"SystemRange(Page={self.page}, System={self.system}, Section={self.section}, Start={self.start}, "
+                f"Stop={self.stop}, Custos={self.custos})")
+
+
+class VoiceLayout:
+    """
+    The systems of a voice through the piece, in order.
+    """
+    def __init__(self, voice_num: int):
+        self.voice_num = voice_num
+        self.ranges: List[SystemRange] = []
+        # The (section, start) of the ranges, in order
+        self.starts: List[Tuple[int, int]] = []
+        # (page, system) -> the indices of its ranges
+        self.positions: Dict[Tuple[int, int], List[int]] = {}
+
+    def add(self, system_range: SystemRange):
+        self.positions.setdefault((system_range.page, system_range.system), []).append(len(self.ranges))
+        self.ranges.append(system_range)
+        self.starts.append((system_range.section, system_range.start))
+
+    def systems(self) -> List[Tuple[int, int]]:
+        """
+        Returns the (page, system) positions of the voice, in order.
+        """
+        return list(self.positions)
+
+    def system(self, page: int, system: int) -> List[SystemRange]:
+        """
+        Returns the ranges of a system (one per section it spans), or an empty list if the voice does not have it.
+        """
+        return [self.ranges[index] for index in self.positions.get((page, system), ())]
+
+    def locate(self, section: int, index: int) -> Optional[Tuple[int, int]]:
+        """
+        Returns the (page, system) of a top-level event of the voice, or None if it is not in a system.
+        """
+        position = bisect_right(self.starts, (section, index)) - 1
+        if position < 0:
+            return None
+        system_range = self.ranges[position]
+        if system_range.section != section or index >= system_range.stop:
+            return None
+        return system_range.page, system_range.system
+
+    def __repr__(self):
+        return f"VoiceLayout(VoiceNum={self.voice_num}, Systems={len(self.positions)})"
+
+
+class LayoutIndex:
+    """
+    The layout of the voices of a piece in a variant version, by voice number.
+    """
+    def __init__(self, version: str = DEFAULT_VERSION):
+        self.version = version
+        self.voices: Dict[int, VoiceLayout] = {}
+
+    @classmethod
+    def of(cls, piece, version: str = DEFAULT_VERSION) -> 'LayoutIndex':
+        """
+        Indexes the layout of a parsed piece (see LayoutIndexer to index it while it is parsed).
+        """
+        indexer = LayoutIndexer(version)
+        walk(piece, indexer)
+        return indexer.index
+
+    def voice(self, voice_num: int) -> VoiceLayout:
+        """
+        Returns the layout of a voice (empty if the piece has no such voice).
+        """
+        return self.voices.get(voice_num) or VoiceLayout(voice_num)
+
+    def events(self, piece, voice_num: int, page: int, system: int) -> list:
+        """
+        Returns the top-level events of a system of a voice, from all the sections it spans.
+
+        Args:
+            piece: The piece the index was built from.
+            voice_num: The VoiceNum of the voice.
+            page: The page, from 1.
+            system: The system in the page, from 1.
+
+        Returns:
+            The events, or an empty list if the voice does not have that system.
+        """
+        events = []
+        for system_range in self.voice(voice_num).system(page, system):
+            for voice in piece.music_sections[system_range.section].content.voices:
+                if voice.voice_num == voice_num and voice.event_list is not None:
+                    events += voice.event_list.events[system_range.start:system_range.stop]
+        return events
+
+    def __repr__(self):
+        return f"LayoutIndex(Version={self.version}, Voices={list(self.voices.values())})"
+
+
+class LayoutIndexer(Visitor):
+    """
+    Builds the LayoutIndex of a variant version, one event list at a time.
+    """
+    def __init__(self, version: str = DEFAULT_VERSION):
+        self.index = LayoutIndex(version)
+        self.section = 0
+        self.voice_num = None
+        # voice number -> (page, system) where the voice is
+        self.positions: Dict[int, Tuple[int, int]] = {}
+
+    def leave_music_section(self, music_section):
+        self.section += 1
+
+    def enter_voice(self, voice):
+        self.voice_num = voice.voice_num
+
+    def enter_event_list(self, event_list):
+        layout = self.index.voices.get(self.voice_num)
+        if layout is None:
+            layout = self.index.voices[self.voice_num] = VoiceLayout(self.voice_num)
+        page, system = self.positions.get(self.voice_num, (1, 1))
+        start = 0
+        custos = None
+        for index, event in enumerate(event_list.events):
+            for line_end, event_custos in self.line_ends(event):
+                custos = event_custos or custos
+                if line_end is None:
+                    continue
+                layout.add(SystemRange(page, system, self.section, start, index + 1, custos))
+                start = index + 1
+                custos = None
+                page, system = (page + 1, 1) if line_end.page_end else (page, system + 1)
+        if start < len(event_list.events):
+            layout.add(SystemRange(page, system, self.section, start, len(event_list.events), custos))
+        self.positions[self.voice_num] = (page, system)
+        # The events have been read here
+        return SKIP
+
+    def line_ends(self, event) -> List[tuple]:
+        """
+        Returns the line ends of an event, in the version's text, as (LineEndEvent, preceding CustosEvent) pairs; a
+        custos that is not followed by a line end in the event is returned with None.
+        """
+        found = []
+        custos = None
+        for item in self.version_events(event):
+            name = type(item).__name__
+            if name == 'CustosEvent':
+                custos = item
+            elif name == 'LineEndEvent':
+                found.append((item, custos))
+                custos = None
+        if custos is not None:
+            found.append((None, custos))
+        return found
+
+    def version_events(self, event) -> list:
+        """
+        Returns an event, or the events it stands for in the version's text.
+        """
+        name = type(event).__name__
+        if name == 'VariantReadings':
+            reading = self.reading(event)
+            return [item for music_event in reading.music_events
+                    for item in self.version_events(music_event)] if reading is not None else []
+        if name == 'EditorialData':
+            return [item for new_event in event.new_reading for item in self.version_events(new_event)]
+        if name == 'MultiEvent':
+            return [item for multi_event in event.events for item in self.version_events(multi_event)]
+        return [event]
+
+    def reading(self, variant_readings):
+        default = None
+        for reading in variant_readings.readings:
+            if self.index.version in reading.variant_version_ids:
+                return reading
+            if DEFAULT_VERSION in reading.variant_version_ids:
+                default = reading
+        return default
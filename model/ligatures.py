@@ -0,0 +1,213 @@
+"""
+Resolution of ligatures.
+
+In CMME, a note whose Lig is Recta or Obliqua is bound to the next note of its list of events by a square or an oblique
+connection; a ligature is a run of such notes, ended by the first note without Lig. Other events (a Dot, an
+OriginalText) can stand between the notes of a ligature.
+
+The value of each note of a ligature follows from its shape, by the rules of proprietas and perfectio:
+- the first note is a semibreve, as is the second, if it has an ascending stem (cum opposita proprietate); otherwise,
+  without a stem, it is a breve if the ligature ascends and a long if it descends (cum and sine proprietate), and a
+  descending stem makes it the other value: a breve if the ligature descends, a long if it ascends;
+- the middle notes are breves;
+- the last note is a breve at the end of an oblique connection or of an ascending square one (unless it has a stem,
+  which makes it a long), and a long at the end of a descending square one;
+- a maxima is drawn as such wherever it is.
+
+These rules are compiled once into a table indexed by the features of a note (its position, direction, connection,
+stem and whether it follows an opposita proprietas), so that resolving a ligature costs a table lookup per note. The
+lengths in minims are those given by the editor (Length) or, if there are none, the nominal lengths of the resolved
+values under the mensuration in force (see model.checkpoints).
+"""
+from fractions import Fraction
+from typing import List, Optional, Tuple
+
+from model.checkpoints import nominal_length
+from model.columns import diatonic_step
+
+# Positions in a ligature
+FIRST, MIDDLE, LAST = 0, 1, 2
+
+# Stems, as encoded in the keys of the table
+STEMS = {None: 0, 'Up': 1, 'Down': 2}
+NO_STEM, STEM_UP, STEM_DOWN = 0, 1, 2
+
+CONNECTIONS = ('Recta', 'Obliqua')
+
+
+def rule(position: int, ascending: bool, oblique: bool, stem: int, after_opposita: bool, maxima: bool) -> str:
+    """
+    Returns the value of a note of a ligature from the features of its shape (see the rules above). The direction and
+    the connection are those towards the next note for the first note, and from the previous note for the others.
+    """
+    if maxima:
+        return 'Maxima'
+    if position == FIRST:
+        if stem == STEM_UP:
+            return 'Semibrevis'
+        # Without a stem, a breve if the ligature ascends; a descending stem reverses that
+        if ascending:
+            return 'Longa' if stem == STEM_DOWN else 'Brevis'
+        return 'Brevis' if stem == STEM_DOWN else 'Longa'
+    if after_opposita:
+        return 'Semibrevis'
+    if position == MIDDLE or oblique:
+        return 'Brevis'
+    if ascending:
+        return 'Longa' if stem != NO_STEM else 'Brevis'
+    return 'Longa'
+
+
+def key(position: int, ascending: bool, oblique: bool, stem: int, after_opposita: bool, maxima: bool) -> int:
+    return (((((position * 2 + ascending) * 2 + oblique) * 3 + stem) * 2 + after_opposita) * 2) + maxima
+
+
+class Ligature:
+    """
+    A ligature of a list of events: the events[start:stop] hold its notes (and possibly other events), the
+    connections between its notes ('Recta' or 'Obliqua'), and the values and lengths (in minims) of its notes.
+    """
+    def __init__(self, start: int, stop: int, notes: list, connections: List[str], values: List[str],
+                 lengths: List[Fraction]):
+        self.start = start
+        self.stop = stop
+        self.notes = notes
+        self.connections = connections
+        self.values = values
+        self.lengths = lengths
+
+    @property
+    def form(self) -> Optional[str]:
+        """
+        The connection of all the notes ('Recta' or 'Obliqua'), or None if they are mixed.
+        """
+        forms = set(self.connections)
+        return forms.pop() if len(forms) == 1 else None
+
+    def __eq__(self, other):
+        if isinstance(other, Ligature):
+            return (self.start == other.start and self.stop == other.stop and self.notes == other.notes and
+                    self.connections == other.connections and self.values == other.values and
+                    self.lengths == other.lengths)
+        return False
+
+    def __repr__(self):
+        return (f"Ligature(Start={self.start}, Stop={self.stop}, Connections={self.connections}, "
+                f"Values={self.values}, Lengths={[str(length) for length in self.lengths]})")
+
+
+class LigatureResolver:
+    """
+    Groups the ligated notes of lists of events and resolves their values, with the table of the rules built on first
+    use.
+    """
+    _table = None
+
+    @classmethod
+    def table(cls) -> Tuple[str, ...]:
+        """
+        Returns the value of every combination of features, indexed by key().
+        """
+        if cls._table is None:
+            table = {}
+            for position in (FIRST, MIDDLE, LAST):
+                for ascending in (False, True):
+                    for oblique in (False, True):
+                        for stem in (NO_STEM, STEM_UP, STEM_DOWN):
+                            for after_opposita in (False, True):
+                                for maxima in (False, True):
+                                    table[key(position, ascending, oblique, stem, after_opposita, maxima)] = rule(
+                                        position, ascending, oblique, stem, after_opposita, maxima)
+            cls._table = tuple(table[index] for index in range(len(table)))
+        return cls._table
+
+    @classmethod
+    def resolve(cls, events: list, mens_info: Optional[dict] = None) -> List[Ligature]:
+        """
+        Finds and resolves the ligatures of a list of events, in one pass. The events nested in other events
+        (VariantReadings, EditorialData, MultiEvent) are lists of their own (see resolve_all).
+
+        Args:
+            events: A list of events.
+            mens_info: The MensInfo in force at the start of the list, for the notes without Length.
+
+        Returns:
+            The ligatures, in order.
+        """
+        table = cls._table or cls.table()
+        ligatures = []
+        notes = []
+        indices = []
+        for index, event in enumerate(events):
+            name = type(event).__name__
+            if name == 'MensurationEvent':
+                mens_info = event.mens_info
+                continue
+            if name != 'NoteEvent':
+                continue
+            if notes or event.lig is not None:
+                notes.append(event)
+                indices.append(index)
+                if event.lig is None:
+                    ligatures.append(cls.ligature(table, notes, indices, mens_info))
+                    notes = []
+                    indices = []
+        if notes:
+            # A ligature left open at the end of the list ends with its last note
+            ligatures.append(cls.ligature(table, notes, indices, mens_info))
+        return ligatures
+
+    @staticmethod
+    def ligature(table: Tuple[str, ...], notes: list, indices: List[int], mens_info: Optional[dict]) -> Ligature:
+        steps = [diatonic_step(note.pitch) for note in notes]
+        connections = [note.lig for note in notes[:-1]]
+        values = []
+        last = len(notes) - 1
+        after_opposita = False
+        for position, note in enumerate(notes):
+            if position == 0:
+                # The first note is shaped by the connection to the next one
+                other = 1 if last else 0
+                connection = connections[0] if last else None
+                place = FIRST
+            else:
+                other = position - 1
+                connection = connections[position - 1]
+                place = LAST if position == last else MIDDLE
+            ascending = steps[max(position, other)] > steps[min(position, other)]
+            value = table[key(place, ascending, connection == 'Obliqua', STEMS.get(note.stem_dir, NO_STEM),
+                              after_opposita, note.note_type == 'Maxima')]
+            values.append(value)
+            after_opposita = position == 0 and note.stem_dir == 'Up'
+        lengths = [Fraction(note.length.num, note.length.den) if note.length is not None
+                   else nominal_length(value, mens_info) for note, value in zip(notes, values)]
+        return Ligature(indices[0], indices[-1] + 1, notes, connections, values, lengths)
+
+    @classmethod
+    def resolve_all(cls, events: list) -> List[Ligature]:
+        """
+        Resolves the ligatures of a list of events and of the lists nested in its events (the readings of
+        VariantReadings, the new and original readings of EditorialData, the events of MultiEvents), in document order.
+        The nested lists start with the mensuration in force where they are.
+        """
+        ligatures = []
+        cls.collect(events, None, ligatures)
+        return ligatures
+
+    @classmethod
+    def collect(cls, events: list, mens_info: Optional[dict], ligatures: List[Ligature]) -> Optional[dict]:
+        ligatures += cls.resolve(events, mens_info)
+        for event in events:
+            name = type(event).__name__
+            if name == 'MensurationEvent':
+                mens_info = event.mens_info
+            elif name == 'VariantReadings':
+                for reading in event.readings:
+                    cls.collect(reading.music_events, mens_info, ligatures)
+            elif name == 'EditorialData':
+                cls.collect(event.new_reading, mens_info, ligatures)
+                if event.original_reading is not None:
+                    cls.collect(event.original_reading.music_events, mens_info, ligatures)
+            elif name == 'MultiEvent':
+                cls.collect(event.events, mens_info, ligatures)
+        return mens_info
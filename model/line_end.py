@@ -1,5 +1,7 @@
 from xml.etree.ElementTree import Element
 
+from model.schema_parsers import scan_line_end_data
+
 
 class LineEndEvent:
     """
@@ -20,10 +22,15 @@ class LineEndEvent:
             A LineEndEvent object.
         """
         # Check if PageEnd is present
-        page_end = element.find('{http://www.cmme.org}PageEnd') is not None
+        page_end = scan_line_end_data(element).get('page_end') is not None
 
         return cls(page_end)
 
+    def to_xml(self, writer):
+        writer.start('LineEnd')
+        writer.flag('PageEnd', self.page_end)
+        writer.end('LineEnd')
+
     def __eq__(self, other):
         if isinstance(other, LineEndEvent):
             return self.page_end == other.page_end
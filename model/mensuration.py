@@ -3,6 +3,7 @@ from xml.etree.ElementTree import Element
 
 from model.events import EventAttributes
 from model.proportion import Proportion
+from model.schema_parsers import scan_mens_info, scan_mensuration_data, scan_sign
 
 
 class MensurationEvent:
@@ -29,8 +30,6 @@ class MensurationEvent:
 
         Args:
             element: The XML element that contains MensurationEvent data.
-            parse_event_attributes: Helper function to parse event attributes.
-            parse_proportion: Helper function to parse proportion.
 
         Returns:
             A MensurationEvent object.
@@ -41,51 +40,76 @@ class MensurationEvent:
         dot = False
         number = None
 
-        # Handle Sign element
-        sign_el = element.find('{http://www.cmme.org}Sign')
-        if sign_el is not None:
-            main_symbol_el = sign_el.find('{http://www.cmme.org}MainSymbol')
-            main_symbol = main_symbol_el.text if main_symbol_el is not None else None
+        values = scan_mensuration_data(element)
 
-            orientation_el = sign_el.find('{http://www.cmme.org}Orientation')
-            orientation = orientation_el.text if orientation_el is not None else None
-
-            strokes_el = sign_el.find('{http://www.cmme.org}Strokes')
-            strokes = int(strokes_el.text) if strokes_el is not None else None
-
-            dot = sign_el.find('{http://www.cmme.org}Dot') is not None
+        # Handle Sign element (the first one)
+        if values['sign']:
+            sign_values = scan_sign(values['sign'][0])
+            main_symbol = sign_values.get('main_symbol')
+            orientation = sign_values.get('orientation')
+            strokes = sign_values.get('strokes')
+            dot = sign_values.get('dot') is not None
 
         # Handle Number element (Proportion group)
-        number_el = element.find('{http://www.cmme.org}Number')
-        if number_el is not None:
-            number = Proportion.parse(number_el)
+        if values['number']:
+            number = Proportion.parse(values['number'][0])
 
         # Parse optional StaffLoc
-        staff_loc_el = element.find('{http://www.cmme.org}StaffLoc')
-        staff_loc = int(staff_loc_el.text) if staff_loc_el is not None else None
+        staff_loc = values.get('staff_loc')
 
         # Parse MensInfo (if present)
         mens_info = {}
-        mens_info_el = element.find('{http://www.cmme.org}MensInfo')
+        mens_info_el = values.get('mens_info')
         if mens_info_el is not None:
-            mens_info['prolatio'] = mens_info_el.find('{http://www.cmme.org}Prolatio').text if mens_info_el.find('{http://www.cmme.org}Prolatio') is not None else None
-            mens_info['tempus'] = mens_info_el.find('{http://www.cmme.org}Tempus').text if mens_info_el.find('{http://www.cmme.org}Tempus') is not None else None
-            mens_info['modus_minor'] = mens_info_el.find('{http://www.cmme.org}ModusMinor').text if mens_info_el.find('{http://www.cmme.org}ModusMinor') is not None else None
-            mens_info['modus_maior'] = mens_info_el.find('{http://www.cmme.org}ModusMaior').text if mens_info_el.find('{http://www.cmme.org}ModusMaior') is not None else None
+            mens_info_values = scan_mens_info(mens_info_el)
+            mens_info['prolatio'] = mens_info_values.get('prolatio')
+            mens_info['tempus'] = mens_info_values.get('tempus')
+            mens_info['modus_minor'] = mens_info_values.get('modus_minor')
+            mens_info['modus_maior'] = mens_info_values.get('modus_maior')
 
-            tempo_change_el = mens_info_el.find('{http://www.cmme.org}TempoChange')
+            tempo_change_el = mens_info_values.get('tempo_change')
             if tempo_change_el is not None:
                 mens_info['tempo_change'] = Proportion.parse(tempo_change_el)
 
         # Parse NoScoreEffect (True if present)
-        no_score_effect = element.find('{http://www.cmme.org}NoScoreEffect') is not None
+        no_score_effect = values.get('no_score_effect') is not None
 
         # Parse EventAttributes
-        event_attributes = EventAttributes.parse(element)
+        event_attributes = EventAttributes.from_values(values)
 
         # Return the parsed MensurationEvent object
         return cls(main_symbol, strokes, orientation, dot, number, staff_loc, mens_info, no_score_effect, event_attributes)
 
+    def to_xml(self, writer):
+        writer.start('Mensuration')
+        if self.main_symbol is not None:
+            writer.start('Sign')
+            writer.element('MainSymbol', self.main_symbol)
+            writer.element('Orientation', self.orientation)
+            writer.element('Strokes', self.strokes)
+            writer.flag('Dot', self.dot)
+            writer.end('Sign')
+        if self.number is not None:
+            writer.start('Number')
+            self.number.to_xml(writer)
+            writer.end('Number')
+        writer.element('StaffLoc', self.staff_loc)
+        if self.mens_info:
+            writer.start('MensInfo')
+            writer.element('Prolatio', self.mens_info.get('prolatio'))
+            writer.element('Tempus', self.mens_info.get('tempus'))
+            writer.element('ModusMinor', self.mens_info.get('modus_minor'))
+            writer.element('ModusMaior', self.mens_info.get('modus_maior'))
+            tempo_change = self.mens_info.get('tempo_change')
+            if tempo_change is not None:
+                writer.start('TempoChange')
+                tempo_change.to_xml(writer)
+                writer.end('TempoChange')
+            writer.end('MensInfo')
+        writer.flag('NoScoreEffect', self.no_score_effect)
+        self.event_attributes.to_xml(writer)
+        writer.end('Mensuration')
+
     def __eq__(self, other):
         if isinstance(other, MensurationEvent):
             return (self.main_symbol == other.main_symbol and
@@ -1,17 +1,23 @@
-from typing import Optional
+from typing import Optional, Union
 from xml.etree.ElementTree import Element
 
-
+from model.recovery import UnparsedEvent
+from model.schema_parsers import scan_barline, scan_misc_item_data
 
 class MiscItemEvent:
     """
-    Represents a miscellaneous item event, which may include barline data such as the number of lines.
+    Represents a miscellaneous item event, which may include barline data such as the number of lines, the repeat
+    sign and the staff position.
     """
-    def __init__(self, num_lines: Optional[str]):
+    def __init__(self, num_lines: Optional[int], repeat_sign: bool = False, bottom_staff_line: Optional[int] = None,
+                 num_spaces: Optional[int] = None):
         self.num_lines = num_lines
+        self.repeat_sign = repeat_sign
+        self.bottom_staff_line = bottom_staff_line
+        self.num_spaces = num_spaces
 
     @classmethod
-    def parse(cls, element: Element) -> Optional['MiscItemEvent']:
+    def parse(cls, element: Element) -> Union['MiscItemEvent', UnparsedEvent]:
         """
         Parses a MiscItemEvent from an XML element.
 
@@ -19,19 +25,33 @@ class MiscItemEvent:
             element: The XML element containing MiscItemEvent data.
 
         Returns:
-            A MiscItemEvent object, or None if no valid data is found.
+            A MiscItemEvent object for a Barline, or an UnparsedEvent keeping the XML of the other items (e.g. a
+            Lacuna), which the model does not represent.
         """
-        barline_el = element.find('{http://www.cmme.org}Barline')
+        barline_el = scan_misc_item_data(element).get('barline')
         if barline_el is not None:
-            num_lines = barline_el.find('{http://www.cmme.org}NumLines').text if barline_el.find('{http://www.cmme.org}NumLines') is not None else None
-            return cls(num_lines)
-
-        return None
+            values = scan_barline(barline_el)
+            return cls(values.get('num_lines'), values.get('repeat_sign') is not None,
+                       values.get('bottom_staff_line'), values.get('num_spaces'))
+
+        return UnparsedEvent.of(element)
+
+    def to_xml(self, writer):
+        writer.start('MiscItem')
+        writer.start('Barline')
+        writer.element('NumLines', self.num_lines)
+        writer.flag('RepeatSign', self.repeat_sign)
+        writer.element('BottomStaffLine', self.bottom_staff_line)
+        writer.element('NumSpaces', self.num_spaces)
+        writer.end('Barline')
+        writer.end('MiscItem')
 
     def __eq__(self, other):
         if isinstance(other, MiscItemEvent):
-            return self.num_lines == other.num_lines
+            return (self.num_lines == other.num_lines and self.repeat_sign == other.repeat_sign and
+                    self.bottom_staff_line == other.bottom_staff_line and self.num_spaces == other.num_spaces)
         return False
 
     def __repr__(self):
-        return f"MiscItemEvent(NumLines={self.num_lines})"
+        return (f"MiscItemEvent(NumLines={self.num_lines}, RepeatSign={self.repeat_sign}, "
+                f"BottomStaffLine={self.bottom_staff_line}, NumSpaces={self.num_spaces})")
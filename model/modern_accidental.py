@@ -0,0 +1,50 @@
+from typing import Optional
+from xml.etree.ElementTree import Element
+
+from model.schema_parsers import scan_modern_accidental_data
+
+
+class ModernAccidental:
+    """
+    Represents the ModernAccidentalData of a note: an accidental suggested by the editor, given either as an offset
+    of the pitch (PitchOffset) or as an accidental type with an optional number (AType, Num), and which may be
+    optional.
+    """
+    def __init__(self, pitch_offset: Optional[int] = None, accidental_type: Optional[str] = None,
+                 num: Optional[int] = None, optional: bool = False):
+        self.pitch_offset = pitch_offset
+        self.accidental_type = accidental_type
+        self.num = num
+        self.optional = optional
+
+    @classmethod
+    def parse(cls, element: Optional[Element]) -> Optional['ModernAccidental']:
+        """
+        Parses the content of a ModernAccidental element, or returns None if the element is None.
+        """
+        if element is None:
+            return None
+        values = scan_modern_accidental_data(element)
+        return cls(values.get('pitch_offset'), values.get('a_type'), values.get('num'),
+                   values.get('optional') is not None)
+
+    def to_xml(self, writer):
+        """
+        Writes the ModernAccidentalData group, within the ModernAccidental element written by the owner.
+        """
+        if self.pitch_offset is not None:
+            writer.element('PitchOffset', self.pitch_offset)
+        else:
+            writer.element('AType', self.accidental_type)
+            writer.element('Num', self.num)
+        writer.flag('Optional', self.optional)
+
+    def __eq__(self, other):
+        if isinstance(other, ModernAccidental):
+            return (self.pitch_offset == other.pitch_offset and self.accidental_type == other.accidental_type and
+                    self.num == other.num and self.optional == other.optional)
+        return False
+
+    def __repr__(self):
+        return (f"ModernAccidental(PitchOffset={self.pitch_offset}, AType={self.accidental_type}, Num={self.num}, "
+                f"Optional={self.optional})")
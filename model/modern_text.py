@@ -1,6 +1,8 @@
 from typing import List, Optional
 from xml.etree.ElementTree import Element
 
+from model.schema_parsers import scan_modern_text_data
+
 class ModernText:
     """
     Represents modern text elements like syllables for a note, with optional word endings.
@@ -23,20 +25,26 @@ class ModernText:
         if element is None:
             return None
 
-        syllables = []
-        has_word_end = False
+        values = scan_modern_text_data(element)
 
-        # Parse Syllable elements
-        for syllable_el in element.findall('{http://www.cmme.org}Syllable'):
-            syllables.append(syllable_el.text)
+        # The schema allows a single Syllable per ModernText
+        syllables = [values['syllable']] if 'syllable' in values else []
 
         # Check if WordEnd is present
-        word_end_el = element.find('{http://www.cmme.org}WordEnd')
-        if word_end_el is not None:
-            has_word_end = True
+        has_word_end = values.get('word_end') is not None
 
         return cls(syllables, has_word_end)
 
+    def to_xml(self, writer):
+        writer.start('ModernText')
+        for syllable in self.syllables:
+            if syllable is None:
+                writer.empty('Syllable')
+            else:
+                writer.element('Syllable', syllable)
+        writer.flag('WordEnd', self.has_word_end)
+        writer.end('ModernText')
+
     def __eq__(self, other):
         if isinstance(other, ModernText):
             return self.syllables == other.syllables and self.has_word_end == other.has_word_end
@@ -1,6 +1,8 @@
 from typing import List, Optional
 from xml.etree.ElementTree import Element
 
+from model.event_factory import EventFactory
+
 class MultiEvent:
     """
     Represents a collection of multiple events.
@@ -15,20 +17,17 @@ class MultiEvent:
 
         Args:
             element: The XML element that contains MultiEvent data.
-            parse_single_event: A helper function to parse individual event elements.
 
         Returns:
             A MultiEvent object containing a list of parsed events.
         """
-        multi_events = []
-
-        # Iterate over each child element inside MultiEvent and parse it
-        for sub_event_el in element:
-            from model.event_factory import EventFactory
-            event = EventFactory.create(sub_event_el)
-            multi_events.append(event)
+        # Parse each child element inside MultiEvent
+        return cls(EventFactory.create_all(element))
 
-        return cls(multi_events)
+    def to_xml(self, writer):
+        writer.start('MultiEvent')
+        writer.events(self.events)
+        writer.end('MultiEvent')
 
     def __eq__(self, other):
         if isinstance(other, MultiEvent):
@@ -2,39 +2,115 @@ from abc import ABC
 from typing import List, Optional
 from xml.etree.ElementTree import Element
 
+from model.checkpoints import DEFAULT_INTERVAL, MEMO as CHECKPOINTS, Checkpoints, VoiceState
 from model.coloration import BaseColoration
+from model.event_factory import EventFactory
+from model.hashing import content_hash, same_content
 from model.events import Event
+from model.reading import VariantReadings, EditorialData
+from model.recovery import RECOVERY
+from model.staff import MEMO as STAFF_POSITIONS, ClefTable, StaffPositions, table_anchor
+from model.schema_parsers import (scan_mensural_music_data, scan_music_section_data_group,
+                                  scan_single_voice_mensural_section_data, scan_tacet_data, scan_text_section_data)
 
 
 class EventList:
     """
     Represents the events inside a Voice, such as Clef, Note, Rest, or complex structures like VariantReadings or EditorialData.
     """
+    _parsers = None
+
     def __init__(self, events: List[Event]):
         self.events = events
 
+    def digest(self) -> bytes:
+        """
+        The content hash of the event list (memoized: see model.hashing).
+        """
+        return content_hash(self)
+
+    def same_content(self, other) -> bool:
+        """
+        Whether another event list has the same content, compared by digest.
+        """
+        return same_content(self, other)
+
     @classmethod
     def parse(cls, element: Element) -> 'EventList':
+        # The structures of EventListData are dispatched through the same tag table as the standard events
+        # handled by SingleOrMultiEventData
+        parsers = cls._parsers or cls.parsers()
+        recovery = RECOVERY.get()
+        if recovery is not None:
+            return EventList([recovery.parse_event(parsers, event_el) for event_el in element])
         events = []
-
-        # Parse all standard events and other structures in EventListData
         for event_el in element:
-            if event_el.tag.endswith('VariantReadings'):
-                from model.reading import VariantReadings
-                variant_reading = VariantReadings.parse(event_el)
-                events.append(variant_reading)
-            elif event_el.tag.endswith('EditorialData'):
-                from model.reading import EditorialData
-                editorial_data = EditorialData.parse(event_el)
-                events.append(editorial_data)
-            else:
-                # For standard events handled by SingleOrMultiEventData
-                from model.event_factory import EventFactory
-                event = EventFactory.create(event_el)
-                events.append(event)
+            parse_method = parsers.get(event_el.tag)
+            events.append(parse_method(event_el) if parse_method is not None else EventFactory.create(event_el))
 
         return EventList(events)
 
+    def checkpoints(self, interval: int = DEFAULT_INTERVAL) -> Checkpoints:
+        """
+        Returns the checkpoints of the state along the events (see model.checkpoints), built on first use and memoized.
+        """
+        checkpoints = self.__dict__.get(CHECKPOINTS)
+        if checkpoints is None or checkpoints.interval != interval:
+            checkpoints = Checkpoints.build(self.events, interval)
+            setattr(self, CHECKPOINTS, checkpoints)
+        return checkpoints
+
+    def state_at(self, index: int, interval: int = DEFAULT_INTERVAL) -> VoiceState:
+        """
+        Returns the clef, signature, mensuration, proportion, key signature, coloration and onset before an event,
+        replaying at most `interval` events.
+
+        Args:
+            index: The index of the event (len(events) for the state at the end).
+            interval: The number of events between two checkpoints.
+
+        Returns:
+            A new VoiceState.
+        """
+        return self.checkpoints(interval).state_at(self.events, index)
+
+    def staff_positions(self, initial: Optional[ClefTable] = None) -> StaffPositions:
+        """
+        Returns the staff locations of the events, under the clefs in force (see model.staff).
+
+        Args:
+            initial: The table of the clef in force before the events. If it is not given, the memoized positions are
+                returned (those resolved in their piece by resolve_piece, whatever clef they started with), or the
+                positions without an initial clef are resolved and memoized. If it is given, the memoized positions are
+                only returned if they start with the same clef; other positions are resolved without being memoized.
+        """
+        positions = self.__dict__.get(STAFF_POSITIONS)
+        if positions is not None and (initial is None or table_anchor(positions.initial) == initial.anchor):
+            return positions
+        if initial is not None:
+            return StaffPositions.build(self.events, initial)
+        positions = StaffPositions.build(self.events)
+        setattr(self, STAFF_POSITIONS, positions)
+        return positions
+
+    def to_xml(self, writer):
+        writer.start('EventList')
+        writer.events(self.events)
+        writer.end('EventList')
+
+    @classmethod
+    def parsers(cls):
+        """
+        Returns the table mapping each namespaced EventListData tag to its parse method: the events of
+        EventFactory plus VariantReadings and EditorialData.
+        """
+        if cls._parsers is None:
+            parsers = dict(EventFactory.parsers())
+            parsers['{http://www.cmme.org}VariantReadings'] = VariantReadings.parse
+            parsers['{http://www.cmme.org}EditorialData'] = EditorialData.parse
+            cls._parsers = parsers
+        return cls._parsers
+
 
 class Voice:
     """
@@ -47,20 +123,38 @@ class Voice:
         self.missing_version_ids = missing_version_ids if missing_version_ids is not None else []
         self.event_list = event_list
 
+    def digest(self) -> bytes:
+        """
+        The content hash of the voice (memoized: see model.hashing).
+        """
+        return content_hash(self)
+
+    def same_content(self, other) -> bool:
+        """
+        Whether another voice has the same content, compared by digest.
+        """
+        return same_content(self, other)
+
     @classmethod
     def parse(cls, element: Element) -> 'Voice':
-        # Parse the VoiceNum (required)
-        voice_num_el = element.find('{http://www.cmme.org}VoiceNum')
-        voice_num = int(voice_num_el.text) if voice_num_el is not None else None
-
-        # Parse MissingVersionID (optional, can occur multiple times)
-        missing_version_ids = [mv_el.text for mv_el in element.findall('{http://www.cmme.org}MissingVersionID')]
+        # The mensural content is a superset of the plainchant one (it adds CanonResolutio)
+        values = scan_single_voice_mensural_section_data(element)
 
         # Parse EventList (required)
-        event_list_el = element.find('{http://www.cmme.org}EventList')
+        event_list_el = values.get('event_list')
         event_list = EventList.parse(event_list_el) if event_list_el is not None else None
 
-        return Voice(voice_num, missing_version_ids, event_list)
+        # VoiceNum is required, MissingVersionID is optional and can occur multiple times
+        return Voice(values.get('voice_num'), values['missing_version_id'], event_list)
+
+    def to_xml(self, writer):
+        writer.start('Voice')
+        writer.element('VoiceNum', self.voice_num)
+        for missing_version_id in self.missing_version_ids:
+            writer.element('MissingVersionID', missing_version_id)
+        if self.event_list is not None:
+            self.event_list.to_xml(writer)
+        writer.end('Voice')
 
 
 class TacetData:
@@ -73,16 +167,17 @@ class TacetData:
 
     @classmethod
     def parse(cls, element: Element) -> 'TacetData':
-        # Parse the VoiceNum element (unsigned integer)
-        voice_num_el = element.find('{http://www.cmme.org}VoiceNum')
-        voice_num = int(voice_num_el.text) if voice_num_el is not None else None
-
-        # Parse the TacetText element (string)
-        tacet_text_el = element.find('{http://www.cmme.org}TacetText')
-        tacet_text = tacet_text_el.text if tacet_text_el is not None else None
+        # VoiceNum (unsigned integer) and TacetText (string)
+        values = scan_tacet_data(element)
 
         # Return a TacetData object
-        return cls(voice_num, tacet_text)
+        return cls(values.get('voice_num'), values.get('tacet_text'))
+
+    def to_xml(self, writer):
+        writer.start('TacetInstruction')
+        writer.element('VoiceNum', self.voice_num)
+        writer.element('TacetText', self.tacet_text)
+        writer.end('TacetInstruction')
 
 
 class AbstractMusicSectionContent(ABC):
@@ -96,26 +191,37 @@ class AbstractMusicSectionContent(ABC):
     """
     @classmethod
     def parse(cls, element: Element):
+        # MensuralMusicData and PlainchantSectionData have the same content
+        values = scan_mensural_music_data(element)
+
         # Parse NumVoices (required)
-        num_voices_el = element.find('{http://www.cmme.org}NumVoices')
-        num_voices = int(num_voices_el.text) if num_voices_el is not None else 0
+        num_voices = values.get('num_voices', 0)
 
         # Parse BaseColoration (optional)
-        base_coloration_el = element.find('{http://www.cmme.org}BaseColoration')
-        base_coloration = BaseColoration.parse(base_coloration_el) if base_coloration_el is not None else None
+        base_coloration = BaseColoration.parse(values.get('base_coloration'))
 
         # Parse TacetInstruction elements (optional, can occur multiple times)
-        tacet_instructions = []
-        tacet_instruction_els = element.findall('{http://www.cmme.org}TacetInstruction')
-        for tacet_instruction_el in tacet_instruction_els:
-            tacet_instructions.append(TacetData.parse(tacet_instruction_el))
+        tacet_instructions = [TacetData.parse(tacet_instruction_el)
+                              for tacet_instruction_el in values['tacet_instruction']]
 
         # Parse Voice elements (must occur at least once)
-        voices = [Voice.parse(voice_el) for voice_el in element.findall('{http://www.cmme.org}Voice')]
+        voices = [Voice.parse(voice_el) for voice_el in values['voice']]
 
         # Return all common data
         return num_voices, base_coloration, tacet_instructions, voices
 
+    def to_xml(self, writer):
+        # The element is named by the section type (MensuralMusic or Plainchant, which have the same content)
+        writer.start(self.section_type)
+        writer.element('NumVoices', self.num_voices)
+        if self.base_coloration is not None:
+            self.base_coloration.to_xml(writer)
+        for tacet_instruction in self.tacet_instructions:
+            tacet_instruction.to_xml(writer)
+        for voice in self.voices:
+            voice.to_xml(writer)
+        writer.end(self.section_type)
+
 
 class MensuralMusic(AbstractMusicSectionContent):
     def __init__(self, num_voices: int, base_coloration: Optional[BaseColoration],
@@ -144,38 +250,57 @@ class Plainchant(AbstractMusicSectionContent):
 
 
 class TextSection(AbstractMusicSectionContent):
-    def __init__(self, num_voices: int, voices: List[Voice]):
-        super().__init__('Text', num_voices, voices)
+    """
+    A section made only of text (TextSectionData): it has no voices.
+    """
+    def __init__(self, content: Optional[str]):
+        super().__init__('Text', 0, [])
+        self.content = content
 
     @classmethod
     def parse(cls, element: Element) -> 'TextSection':
         # Parse the Content element
-        content_elements = element.findall('{http://www.cmme.org}Content')
-        contents = [content_el.text for content_el in content_elements if content_el.text is not None]
+        return cls(scan_text_section_data(element).get('content'))
 
-        # Return the TextSection object with the parsed contents
-        return cls(contents)
+    def to_xml(self, writer):
+        writer.start('Text')
+        writer.element('Content', self.content)
+        writer.end('Text')
 
 class MusicSection:
     def __init__(self, content: AbstractMusicSectionContent):
         self.content = content
 
+    def digest(self) -> bytes:
+        """
+        The content hash of the section (memoized: see model.hashing).
+        """
+        return content_hash(self)
+
+    def same_content(self, other) -> bool:
+        """
+        Whether another section has the same content, compared by digest.
+        """
+        return same_content(self, other)
+
     @classmethod
     def parse(cls, element: Element) -> 'MusicSection':
+        values = scan_music_section_data_group(element)
+
         # Try to find the MensuralMusic element
-        mensural_music_el = element.find('{http://www.cmme.org}MensuralMusic')
+        mensural_music_el = values.get('mensural_music')
         if mensural_music_el is not None:
             content = MensuralMusic.parse(mensural_music_el)
             return MusicSection(content)
 
         # Try to find the Plainchant element
-        plainchant_el = element.find('{http://www.cmme.org}Plainchant')
+        plainchant_el = values.get('plainchant')
         if plainchant_el is not None:
             content = Plainchant.parse(plainchant_el)
             return MusicSection(content)
 
         # Try to find the Text element
-        text_el = element.find('{http://www.cmme.org}Text')
+        text_el = values.get('text')
         if text_el is not None:
             content = TextSection.parse(text_el)
             return MusicSection(content)
@@ -183,3 +308,8 @@ class MusicSection:
         # If no known content type is found, raise an error
         raise ValueError("Unsupported section type in MusicSection")
 
+    def to_xml(self, writer):
+        writer.start('MusicSection')
+        self.content.to_xml(writer)
+        writer.end('MusicSection')
+
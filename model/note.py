@@ -1,21 +1,71 @@
-from typing import Optional
+from typing import List, Optional
 from xml.etree.ElementTree import Element
 
+from model.events import EventAttributes
 from model.pitch import Pitch
+from model.modern_accidental import ModernAccidental
 from model.modern_text import ModernText
+from model.proportion import Proportion
+from model.schema_parsers import scan_flagged, scan_note_data, scan_stem
+from model.signum import Signum
+
+
+class Stem:
+    """
+    Represents a stem of a note: its direction and, optionally, its side.
+    """
+    def __init__(self, direction: Optional[str], side: Optional[str] = None):
+        self.direction = direction
+        self.side = side
+
+    def to_xml(self, writer):
+        writer.start('Stem')
+        writer.element('Dir', self.direction)
+        writer.element('Side', self.side)
+        writer.end('Stem')
+
+    def __eq__(self, other):
+        if isinstance(other, Stem):
+            return self.direction == other.direction and self.side == other.side
+        return False
+
+    def __repr__(self):
+        return f"Stem(Dir={self.direction}, Side={self.side})"
 
 
 class NoteEvent:
     """
-    Represents a musical note event, including type, pitch, ligature, stem direction, and modern text.
+    Represents a musical note event, including type, pitch, ligature, stem direction, modern text, the event
+    attributes (coloration, editorial flags) and the length in minims given by the editor, if any. The other elements
+    of a Note are kept as well: the modern accidental, the flags, the tie, every stem (stem_dir is the direction of
+    the first one), the half coloration, the corona and the signum congruentiae.
     """
     def __init__(self, note_type: Optional[str], pitch: Optional[Pitch], lig: Optional[str],
-                 stem_dir: Optional[str], modern_text: Optional[ModernText]):
+                 stem_dir: Optional[str], modern_text: Optional[ModernText],
+                 event_attributes: Optional[EventAttributes] = None, length: Optional[Proportion] = None,
+                 modern_accidental: Optional[ModernAccidental] = None, flagged: bool = False,
+                 num_flags: Optional[int] = None, tie: Optional[str] = None, stems: Optional[List[Stem]] = None,
+                 half_coloration: Optional[str] = None, corona: Optional[Signum] = None,
+                 signum: Optional[Signum] = None):
         self.note_type = note_type
         self.pitch = pitch
         self.lig = lig
-        self.stem_dir = stem_dir
+        # The stems replace stem_dir when they are given
+        self.stems = stems if stems is not None else [Stem(stem_dir)] if stem_dir is not None else []
         self.modern_text = modern_text
+        self.event_attributes = event_attributes if event_attributes is not None else EventAttributes()
+        self.length = length
+        self.modern_accidental = modern_accidental
+        self.flagged = flagged
+        self.num_flags = num_flags
+        self.tie = tie
+        self.half_coloration = half_coloration
+        self.corona = corona
+        self.signum = signum
+
+    @property
+    def stem_dir(self) -> Optional[str]:
+        return self.stems[0].direction if self.stems else None
 
     @classmethod
     def parse(cls, element: Element) -> 'NoteEvent':
@@ -28,32 +78,87 @@ class NoteEvent:
         Returns:
             A NoteEvent object.
         """
-        # Parse note type
-        note_type = element.find('{http://www.cmme.org}Type').text if element.find('{http://www.cmme.org}Type') is not None else None
-
-        pitch = Pitch.parse(element) # the elements of the pitch are contained in the Note
+        values = scan_note_data(element)
 
-        # Parse Ligature (Lig)
-        lig = element.find('{http://www.cmme.org}Lig').text if element.find('{http://www.cmme.org}Lig') is not None else None
+        # The elements of the pitch (StaffPitchData) are contained in the Note
+        pitch = Pitch(values.get('letter_name'), values.get('octave_num'), values.get('staff_loc'))
 
-        # Parse Stem direction (optional)
-        stem_dir = element.find('{http://www.cmme.org}Stem/Dir').text if element.find('{http://www.cmme.org}Stem/Dir') is not None else None
+        # Parse the stems (optional, possibly several)
+        stems = []
+        for stem_el in values['stem']:
+            stem_values = scan_stem(stem_el)
+            stems.append(Stem(stem_values.get('dir'), stem_values.get('side')))
 
         # Parse ModernText (optional)
-        modern_text_element = element.find('{http://www.cmme.org}ModernText')
-        modern_text = ModernText.parse(modern_text_element) if modern_text_element is not None else None
+        modern_text = ModernText.parse(values.get('modern_text'))
+
+        # Parse Length (optional)
+        length_el = values.get('length')
+        length = Proportion.parse(length_el) if length_el is not None else None
+
+        flagged_el = values.get('flagged')
+        num_flags = scan_flagged(flagged_el).get('num_flags') if flagged_el is not None else None
+
+        return cls(values.get('type'), pitch, values.get('lig'), None, modern_text,
+                   EventAttributes.from_values(values), length, ModernAccidental.parse(values.get('modern_accidental')),
+                   flagged_el is not None, num_flags, values.get('tie'), stems, values.get('half_coloration'),
+                   Signum.parse(values.get('corona')), Signum.parse(values.get('signum')))
 
-        return cls(note_type, pitch, lig, stem_dir, modern_text)
+    def to_xml(self, writer):
+        writer.start('Note')
+        writer.element('Type', self.note_type)
+        if self.length is not None:
+            writer.start('Length')
+            self.length.to_xml(writer)
+            writer.end('Length')
+        self.pitch.to_xml(writer)
+        if self.modern_accidental is not None:
+            writer.start('ModernAccidental')
+            self.modern_accidental.to_xml(writer)
+            writer.end('ModernAccidental')
+        if self.flagged:
+            writer.start('Flagged')
+            writer.element('NumFlags', self.num_flags)
+            writer.end('Flagged')
+        writer.element('Lig', self.lig)
+        writer.element('Tie', self.tie)
+        for stem in self.stems:
+            stem.to_xml(writer)
+        writer.element('HalfColoration', self.half_coloration)
+        if self.corona is not None:
+            writer.start('Corona')
+            self.corona.to_xml(writer)
+            writer.end('Corona')
+        if self.signum is not None:
+            writer.start('Signum')
+            self.signum.to_xml(writer)
+            writer.end('Signum')
+        if self.modern_text is not None:
+            self.modern_text.to_xml(writer)
+        self.event_attributes.to_xml(writer)
+        writer.end('Note')
 
     def __eq__(self, other):
         if isinstance(other, NoteEvent):
             return (self.note_type == other.note_type and
                     self.pitch == other.pitch and
                     self.lig == other.lig and
-                    self.stem_dir == other.stem_dir and
-                    self.modern_text == other.modern_text)
+                    self.stems == other.stems and
+                    self.modern_text == other.modern_text and
+                    self.event_attributes == other.event_attributes and
+                    self.length == other.length and
+                    self.modern_accidental == other.modern_accidental and
+                    self.flagged == other.flagged and
+                    self.num_flags == other.num_flags and
+                    self.tie == other.tie and
+                    self.half_coloration == other.half_coloration and
+                    self.corona == other.corona and
+                    self.signum == other.signum)
         return False
 
     def __repr__(self):
         return (f"NoteEvent(NoteType={self.note_type}, Pitch={self.pitch}, Lig={self.lig}, "
-                f"StemDir={self.stem_dir}, ModernText={self.modern_text})")
+                f"Stems={self.stems}, ModernText={self.modern_text}, EventAttributes={self.event_attributes}, "
+                f"Length={self.length}, ModernAccidental={self.modern_accidental}, Flagged={self.flagged}, "
+                f"NumFlags={self.num_flags}, Tie={self.tie}, HalfColoration={self.half_coloration}, "
+                f"Corona={self.corona}, Signum={self.signum})")
@@ -1,6 +1,8 @@
 from typing import Optional
 from xml.etree.ElementTree import Element
 
+from model.schema_parsers import scan_original_text_data
+
 
 class OriginalTextEvent:
     """
@@ -20,8 +22,12 @@ class OriginalTextEvent:
         Returns:
             An OriginalTextEvent object.
         """
-        phrase = element.find('{http://www.cmme.org}Phrase').text if element.find('{http://www.cmme.org}Phrase') is not None else None
-        return cls(phrase)
+        return cls(scan_original_text_data(element).get('phrase'))
+
+    def to_xml(self, writer):
+        writer.start('OriginalText')
+        writer.element('Phrase', self.phrase)
+        writer.end('OriginalText')
 
     def __eq__(self, other):
         if isinstance(other, OriginalTextEvent):
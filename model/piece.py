@@ -1,8 +1,78 @@
-from typing import List
+import io
+import os
+import re
+from functools import partial
+from typing import TYPE_CHECKING, List, Optional, TextIO, Tuple, Union
 import xml.etree.ElementTree as ET
 from .general_data import GeneralData
+from .hashing import content_hash, same_content
 from .voice_data import VoiceData
 from .music_section import MusicSection
+from .recovery import RECOVERY, Diagnostic, Recovery
+from .schema_parsers import TAG_MUSIC_SECTION, scan_piece
+from .visitor import Traversal, Visitor
+from .writer import NAMESPACE, XSI_NAMESPACE, CMMEWriter
+
+if TYPE_CHECKING:
+    # concurrent.futures (with multiprocessing) is only imported by parse_parallel, as it takes longer to import than
+    # the whole model
+    from concurrent.futures import Executor
+
+# Start tag of the document element (skipping the XML declaration, comments and DOCTYPE)
+ROOT_START_TAG = re.compile(r'<(?![?!])([^\s/>]+)[^>]*>')
+MUSIC_SECTION_START_TAG = re.compile(r'<(?:[\w.-]+:)?MusicSection[\s>]')
+MUSIC_SECTION_END_TAG = re.compile(r'</(?:[\w.-]+:)?MusicSection\s*>')
+
+
+def music_section_ranges(xml_string: str) -> Optional[List[Tuple[int, int]]]:
+    """
+    Locates the MusicSection elements of a CMME document without parsing it.
+
+    Args:
+        xml_string: The CMME document.
+
+    Returns:
+        The (start, end) offsets of each MusicSection element, in document order, or None if the sections could not be
+        delimited unambiguously (e.g. a tag without its counterpart).
+    """
+    ranges = []
+    position = 0
+    while True:
+        start_match = MUSIC_SECTION_START_TAG.search(xml_string, position)
+        if start_match is None:
+            return ranges
+        end_match = MUSIC_SECTION_END_TAG.search(xml_string, start_match.end())
+        if end_match is None:
+            return None
+        next_start_match = MUSIC_SECTION_START_TAG.search(xml_string, start_match.end(), end_match.start())
+        if next_start_match is not None:
+            return None
+        ranges.append((start_match.start(), end_match.end()))
+        position = end_match.end()
+
+
+class PieceMetadata:
+    """
+    The descriptive part of a piece, read by Piece.scan_metadata without its music: the CMME version, GeneralData and
+    VoiceData.
+    """
+    def __init__(self, cmme_version: str, general_data: GeneralData, voice_data: VoiceData):
+        self.cmme_version = cmme_version
+        self.general_data = general_data
+        self.voice_data = voice_data
+
+    def __repr__(self):
+        return (f"PieceMetadata(CMMEversion={self.cmme_version}, Title={self.general_data.title}, "
+                f"Composer={self.general_data.composer}, NumVoices={self.voice_data.num_voices})")
+
+
+def parse_music_section(root_start_tag: str, root_end_tag: str, fragment: str) -> MusicSection:
+    """
+    Parses one MusicSection cut out of a document. It is wrapped in the start tag of the document element, so that it
+    keeps the namespace declarations of the original file.
+    """
+    return MusicSection.parse(ET.fromstring(root_start_tag + fragment + root_end_tag)[0])
+
 
 class Piece:
     def __init__(self, cmme_version: str, general_data: GeneralData, voice_data: VoiceData,
@@ -12,22 +82,218 @@ class Piece:
         self.voice_data = voice_data
         self.music_sections = music_sections
 
+    def digest(self) -> bytes:
+        """
+        The content hash of the piece (memoized: see model.hashing).
+        """
+        return content_hash(self)
+
+    def same_content(self, other) -> bool:
+        """
+        Whether another piece has the same content, compared by digest.
+        """
+        return same_content(self, other)
+
     @classmethod
-    def parse(cls, xml_string: str) -> 'Piece':
+    def parse(cls, xml_string: str, validate: bool = False, visitor: Optional[Union[Visitor, Traversal]] = None,
+              diagnostics: Optional[List[Diagnostic]] = None) -> 'Piece':
+        """
+        Parses a Piece from a CMME document.
+
+        Args:
+            xml_string: The CMME document.
+            validate: If True, the document is checked against resources/cmme.xsd before being converted, and an
+                InvalidCMMEException listing every violation (with line numbers) is raised if it does not conform. The
+                check adds about two fifths of the cost of the parse (see schema.validation).
+            visitor: A Visitor, or a Traversal fusing several of them, that walks the piece as it is parsed: the piece
+                is entered once GeneralData and VoiceData are parsed, and each MusicSection is walked as soon as it is
+                (see model.visitor).
+            diagnostics: If a list is given, the parse recovers from the errors in the music: the events that cannot
+                be parsed are replaced by UnparsedEvents and the MusicSections that cannot be parsed are skipped, and
+                each error is appended to the list as a Diagnostic with its location (see model.recovery). Errors in
+                GeneralData or VoiceData are still raised.
+
+        Returns:
+            A Piece object.
+        """
         root = ET.fromstring(xml_string)
+        if validate:
+            cls.validate(xml_string, root)
+
         cmme_version = root.attrib.get('CMMEversion')
 
+        values = scan_piece(root)
+
         # Parse GeneralData (required)
-        general_data_el = root.find('{http://www.cmme.org}GeneralData')
-        general_data = GeneralData.parse(general_data_el)
+        general_data = GeneralData.parse(values.get('general_data'))
 
         # Parse VoiceData (required)
-        voice_data_el = root.find('{http://www.cmme.org}VoiceData')
-        voice_data = VoiceData.parse(voice_data_el)
+        voice_data = VoiceData.parse(values.get('voice_data'))
 
         # Parse MusicSection (1..unbounded)
-        music_sections = [MusicSection.parse(ms_el) for ms_el in
-                          root.findall('{http://www.cmme.org}MusicSection')]
+        piece = Piece(cmme_version, general_data, voice_data, [])
+        recovery = Recovery() if diagnostics is not None else None
+        token = RECOVERY.set(recovery)
+        try:
+            if visitor is None and recovery is None:
+                piece.music_sections = [MusicSection.parse(ms_el) for ms_el in values['music_section']]
+                return piece
+
+            traversal = Traversal.of(visitor) if visitor is not None else None
+            active = traversal.enter(piece) if traversal is not None else None
+            for ms_el in values['music_section']:
+                if recovery is None:
+                    music_section = MusicSection.parse(ms_el)
+                else:
+                    music_section = recovery.parse_section(MusicSection.parse, ms_el)
+                    if music_section is None:
+                        continue
+                piece.music_sections.append(music_section)
+                if traversal is not None:
+                    traversal.walk(music_section, active)
+            if traversal is not None:
+                traversal.leave(piece)
+        finally:
+            RECOVERY.reset(token)
+
+        if recovery is not None:
+            diagnostics += recovery.diagnostics(root)
+        return piece
+
+    @classmethod
+    def parse_parallel(cls, xml_string: str, max_workers: Optional[int] = None,
+                       executor: Optional['Executor'] = None,
+                       visitor: Optional[Union[Visitor, Traversal]] = None) -> 'Piece':
+        """
+        Parses a Piece, converting its MusicSections in a process pool.
+
+        Once GeneralData and VoiceData are known the MusicSections are independent: the document is cut at their
+        boundaries, each section is parsed by a worker, and the Piece is reassembled in document order. Documents whose
+        sections cannot be delimited, or with a single section, are parsed serially.
+
+        Args:
+            xml_string: The CMME document.
+            max_workers: The number of processes of the pool (by default, one per core).
+            executor: An existing pool to submit the sections to, e.g. to reuse it across the files of a batch.
+            visitor: A Visitor or Traversal run as by Piece.parse. It runs in this process, as each section is received.
+
+        Returns:
+            A Piece object, equal to the one returned by Piece.parse.
+        """
+        ranges = music_section_ranges(xml_string)
+        root_match = ROOT_START_TAG.search(xml_string)
+        if not ranges or len(ranges) < 2 or root_match is None:
+            return cls.parse(xml_string, visitor=visitor)
+
+        # Everything but the sections: the document element with GeneralData and VoiceData
+        metadata = cls.metadata(ET.fromstring(xml_string[:ranges[0][0]] + xml_string[ranges[-1][1]:]))
+
+        parse = partial(parse_music_section, root_match.group(0), f'</{root_match.group(1)}>')
+        fragments = [xml_string[start:end] for start, end in ranges]
+        # Several sections per task: each round trip to a worker has a fixed cost
+        chunksize = max(1, len(fragments) // (4 * (max_workers or os.cpu_count() or 1)))
+        piece = Piece(metadata.cmme_version, metadata.general_data, metadata.voice_data, [])
+        traversal = Traversal.of(visitor) if visitor is not None else None
+        active = traversal.enter(piece) if traversal is not None else None
+        if executor is None:
+            from concurrent.futures import ProcessPoolExecutor
+        pool = executor if executor is not None else ProcessPoolExecutor(max_workers)
+        try:
+            for music_section in pool.map(parse, fragments, chunksize=chunksize):
+                piece.music_sections.append(music_section)
+                if traversal is not None:
+                    traversal.walk(music_section, active)
+        finally:
+            if executor is None:
+                pool.shutdown()
+
+        if traversal is not None:
+            traversal.leave(piece)
+        return piece
+
+    def to_xml(self, writer: CMMEWriter):
+        attributes = {'xmlns': NAMESPACE, 'xmlns:xsi': XSI_NAMESPACE,
+                      'xsi:schemaLocation': f'{NAMESPACE} cmme.xsd'}
+        if self.cmme_version is not None:
+            attributes['CMMEversion'] = self.cmme_version
+        writer.start('Piece', attributes)
+        self.general_data.to_xml(writer)
+        self.voice_data.to_xml(writer)
+        for music_section in self.music_sections:
+            music_section.to_xml(writer)
+        writer.end('Piece')
+
+    def write(self, file: Union[str, TextIO]):
+        """
+        Writes the piece as a CMME document, streaming it to the file as its elements are generated.
+
+        Args:
+            file: The path of the file, or a text file open for writing.
+        """
+        if isinstance(file, str):
+            with open(file, 'w', encoding='utf-8') as opened:
+                self.write(opened)
+            return
+        writer = CMMEWriter(file)
+        writer.declaration()
+        self.to_xml(writer)
+        writer.close()
+
+    def to_string(self) -> str:
+        """
+        Returns the piece as a CMME document (see Piece.write).
+        """
+        output = io.StringIO()
+        self.write(output)
+        return output.getvalue()
+
+    @staticmethod
+    def scan_metadata(path: str, chunk_size: int = 1 << 12) -> PieceMetadata:
+        """
+        Reads the metadata of a CMME file, without reading (or parsing) the file beyond the start of its first
+        MusicSection.
+
+        Args:
+            path: The path of the CMME file.
+            chunk_size: The number of bytes read at a time (the metadata usually fits in the first few kilobytes).
+
+        Returns:
+            A PieceMetadata object.
+        """
+        parser = ET.XMLPullParser(events=('start',))
+        root = None
+        with open(path, 'rb') as file:
+            while True:
+                chunk = file.read(chunk_size)
+                if not chunk:
+                    break
+                parser.feed(chunk)
+                for _, element in parser.read_events():
+                    if root is None:
+                        root = element
+                    elif element.tag == TAG_MUSIC_SECTION:
+                        # GeneralData and VoiceData are complete, as they precede the music
+                        return Piece.metadata(root)
+        parser.close()
+        return Piece.metadata(root)
+
+    @staticmethod
+    def metadata(root: ET.Element) -> PieceMetadata:
+        values = scan_piece(root)
+        return PieceMetadata(root.attrib.get('CMMEversion'), GeneralData.parse(values.get('general_data')),
+                             VoiceData.parse(values.get('voice_data')))
+
+    @staticmethod
+    def validate(xml_string: str, root: ET.Element):
+        """
+        Checks the parsed tree against the compiled (cached) schema. Only when it is invalid is the document streamed
+        again to collect the violations with their positions, which ElementTree does not keep. The document is
+        rejected even if the streaming pass finds no position for the violation.
+        """
+        from schema.validation import InvalidCMMEException, Validator, Violation
 
-        return Piece(cmme_version, general_data, voice_data, music_sections)
+        validator = Validator()
+        if not validator.is_valid_tree(root):
+            raise InvalidCMMEException(validator.validate_string(xml_string)
+                                       or [Violation(1, 0, 'the document does not conform to the schema')])
 
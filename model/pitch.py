@@ -1,28 +1,48 @@
 from typing import Optional
 from xml.etree.ElementTree import Element
 
+from model.schema_parsers import scan_staff_pitch_data
+
 
 class Pitch:
     """
-    Represents a musical pitch with a letter name and octave number.
+    Represents a musical pitch with a letter name and octave number, or only with its staff location (StaffPitchData
+    allows either).
     """
 
-    def __init__(self, letter_name: Optional[str], octave_num: Optional[int]):
+    def __init__(self, letter_name: Optional[str], octave_num: Optional[int], staff_loc: Optional[int] = None):
         self.letter_name = letter_name
         self.octave_num = octave_num
+        self.staff_loc = staff_loc
 
     def __repr__(self):
-        return f"Pitch(LetterName={self.letter_name}, OctaveNum={self.octave_num})"
+        return f"Pitch(LetterName={self.letter_name}, OctaveNum={self.octave_num}, StaffLoc={self.staff_loc})"
 
     def __eq__(self, other):
         if not isinstance(other, Pitch):
             return False
-        return self.letter_name == other.letter_name and self.octave_num == other.octave_num
+        return (self.letter_name == other.letter_name and self.octave_num == other.octave_num and
+                self.staff_loc == other.staff_loc)
 
     @classmethod
     def parse(cls, element: Element) -> 'Pitch':
         if element is None:
             return None
-        letter_name = element.find('{http://www.cmme.org}LetterName').text if element.find('{http://www.cmme.org}LetterName') is not None else None
-        octave_num = int(element.find('{http://www.cmme.org}OctaveNum').text) if element.find('{http://www.cmme.org}OctaveNum') is not None else None
-        return cls(letter_name, octave_num)
+        values = scan_staff_pitch_data(element)
+        return cls(values.get('letter_name'), values.get('octave_num'), values.get('staff_loc'))
+
+    def to_xml(self, writer):
+        """
+        Writes the StaffPitchData choice (StaffLoc, or the Locus group: LetterName, OctaveNum), within the element of
+        the owner of the pitch.
+
+        Raises:
+            ValueError: If the pitch has neither a letter name nor a staff location, which CMME cannot encode.
+        """
+        if self.letter_name is None and self.staff_loc is not None:
+            writer.element('StaffLoc', self.staff_loc)
+            return
+        if self.letter_name is None:
+            raise ValueError(f"{self!r} has neither a letter name nor a staff location")
+        writer.element('LetterName', self.letter_name)
+        writer.element('OctaveNum', self.octave_num)
@@ -1,5 +1,7 @@
 from xml.etree.ElementTree import Element
 
+from model.schema_parsers import scan_proportion
+
 class Proportion:
     """
     Represents a proportion with a numerator and denominator.
@@ -11,9 +13,12 @@ class Proportion:
     @classmethod
     def parse(cls, element: Element) -> 'Proportion':
         # Implement the parsing logic for a proportion (numerator and denominator)
-        num = int(element.find('{http://www.cmme.org}Num').text)
-        den = int(element.find('{http://www.cmme.org}Den').text)
-        return cls(num, den)
+        values = scan_proportion(element)
+        return cls(values['num'], values['den'])
+
+    def to_xml(self, writer):
+        writer.element('Num', self.num)
+        writer.element('Den', self.den)
 
     def __eq__(self, other):
         if isinstance(other, Proportion):
@@ -25,6 +25,11 @@ class ProportionEvent(Event):
         proportion = Proportion.parse(element)
         return cls(proportion)
 
+    def to_xml(self, writer):
+        writer.start('Proportion')
+        self.proportion.to_xml(writer)
+        writer.end('Proportion')
+
     def __eq__(self, other):
         if isinstance(other, ProportionEvent):
             return self.proportion == other.proportion
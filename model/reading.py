@@ -1,15 +1,19 @@
-from typing import List, Optional, Dict
+from typing import List, Optional
 from xml.etree.ElementTree import Element
 
 from model.event_factory import EventFactory
+from model.events import Event
+from model.schema_parsers import (scan_editorial_data, scan_original_reading, scan_reading,
+                                  scan_variant_readings)
 
 
 class ReadingBase:
     """
     A base class for Reading-related classes that contain common properties such as variant_version_ids, preferred_reading, error, and lacuna.
+    PreferredReading and Error are empty elements in a Reading: the flags are True if present.
     """
-    def __init__(self, variant_version_ids: List[str], preferred_reading: Optional[str], error: Optional[str],
-                 lacuna: bool, music_events: List[Dict]):
+    def __init__(self, variant_version_ids: List[str], preferred_reading: bool, error: bool,
+                 lacuna: bool, music_events: List[Event]):
         self.variant_version_ids = variant_version_ids
         self.preferred_reading = preferred_reading
         self.error = error
@@ -18,22 +22,30 @@ class ReadingBase:
 
     @classmethod
     def parse_reading(cls, reading_el: Element) -> 'ReadingBase':
-        variant_version_ids = [vv_el.text for vv_el in reading_el.findall('{http://www.cmme.org}VariantVersionID')]
-        preferred_reading_el = reading_el.find('{http://www.cmme.org}PreferredReading')
-        error_el = reading_el.find('{http://www.cmme.org}Error')
-        lacuna_el = reading_el.find('{http://www.cmme.org}Lacuna')
-
-        preferred_reading = preferred_reading_el.text if preferred_reading_el is not None else None
-        error = error_el.text if error_el is not None else None
-        lacuna = lacuna_el is not None
-
-        # Parse Music events
-        music_el = reading_el.find('{http://www.cmme.org}Music')
-        music_events = []
-        if music_el is not None:
-            music_events = [EventFactory.create(me_el) for me_el in music_el.findall('{http://www.cmme.org}Event')]
-
-        return cls(variant_version_ids, preferred_reading, error, lacuna, music_events)
+        values = scan_reading(reading_el)
+        preferred_reading = values.get('preferred_reading') is not None
+        error = values.get('error') is not None
+        lacuna = values.get('lacuna') is not None
+
+        # Parse Music events (SingleOrMultiEventData children, dispatched like any other event)
+        music_el = values.get('music')
+        music_events = EventFactory.create_all(music_el) if music_el is not None else []
+
+        return cls(values['variant_version_id'], preferred_reading, error, lacuna, music_events)
+
+    def to_xml(self, writer):
+        writer.start('Reading')
+        for variant_version_id in self.variant_version_ids:
+            writer.element('VariantVersionID', variant_version_id)
+        writer.flag('PreferredReading', self.preferred_reading)
+        writer.flag('Error', self.error)
+        if self.lacuna:
+            writer.empty('Lacuna')
+        else:
+            writer.start('Music')
+            writer.events(self.music_events)
+            writer.end('Music')
+        writer.end('Reading')
 
     def __eq__(self, other):
         if isinstance(other, ReadingBase):
@@ -67,13 +79,15 @@ class VariantReadings:
 
     @classmethod
     def parse(cls, element: Element) -> 'VariantReadings':
-        readings = []
-        for reading_el in element.findall('{http://www.cmme.org}Reading'):
-            reading = Reading.parse_reading(reading_el)
-            readings.append(reading)
-
+        readings = [Reading.parse_reading(reading_el) for reading_el in scan_variant_readings(element)['reading']]
         return cls(readings)
 
+    def to_xml(self, writer):
+        writer.start('VariantReadings')
+        for reading in self.readings:
+            reading.to_xml(writer)
+        writer.end('VariantReadings')
+
     def __eq__(self, other):
         if isinstance(other, VariantReadings):
             return self.readings == other.readings
@@ -85,39 +99,83 @@ class VariantReadings:
 
 class OriginalReading(ReadingBase):
     """
-    Represents the original reading in editorial data, which can include lacuna and error events.
+    Represents the original reading in editorial data, which is either a lacuna or an erroneous
+    passage whose events are kept in music_events.
     Inherits common properties from ReadingBase.
     """
     @classmethod
-    def parse(cls, element: Element, parse_single_or_multi_event_data) -> 'OriginalReading':
-        return super().parse_reading(element, parse_single_or_multi_event_data)
+    def parse(cls, element: Element) -> 'OriginalReading':
+        """
+        Parses an OriginalReading from an XML element.
+
+        Args:
+            element: The XML element containing OriginalReading data (a Lacuna or an Error with events).
+
+        Returns:
+            An OriginalReading object.
+        """
+        values = scan_original_reading(element)
+        lacuna = values.get('lacuna') is not None
+
+        # The Error element wraps the original (erroneous) events
+        error_el = values.get('error')
+        music_events = EventFactory.create_all(error_el) if error_el is not None else []
+
+        return cls([], False, False, lacuna, music_events)
+
+    def to_xml(self, writer):
+        writer.start('OriginalReading')
+        if self.lacuna:
+            writer.empty('Lacuna')
+        else:
+            writer.start('Error')
+            writer.events(self.music_events)
+            writer.end('Error')
+        writer.end('OriginalReading')
 
 
 class EditorialData:
     """
     Represents editorial data, containing new and original readings.
     """
-    def __init__(self, new_reading: List[Dict], original_reading: Optional[OriginalReading]):
+    def __init__(self, new_reading: List[Event], original_reading: Optional[OriginalReading]):
         self.new_reading = new_reading
         self.original_reading = original_reading
 
     @classmethod
-    def parse(cls, element: Element, parse_single_or_multi_event_data) -> 'EditorialData':
-        new_reading_el = element.find('{http://www.cmme.org}NewReading')
-        original_reading_el = element.find('{http://www.cmme.org}OriginalReading')
+    def parse(cls, element: Element) -> 'EditorialData':
+        """
+        Parses EditorialData from an XML element.
+
+        Args:
+            element: The XML element containing EditorialData data.
+
+        Returns:
+            An EditorialData object.
+        """
+        values = scan_editorial_data(element)
+        new_reading_el = values.get('new_reading')
+        original_reading_el = values.get('original_reading')
 
         # Parse new reading events
-        new_events = []
-        if new_reading_el is not None:
-            new_events = [parse_single_or_multi_event_data(ne_el) for ne_el in new_reading_el.findall('{http://www.cmme.org}Event')]
+        new_events = EventFactory.create_all(new_reading_el) if new_reading_el is not None else []
 
         # Parse original reading events
         original_reading = None
         if original_reading_el is not None:
-            original_reading = OriginalReading.parse(original_reading_el, parse_single_or_multi_event_data)
+            original_reading = OriginalReading.parse(original_reading_el)
 
         return cls(new_events, original_reading)
 
+    def to_xml(self, writer):
+        writer.start('EditorialData')
+        writer.start('NewReading')
+        writer.events(self.new_reading)
+        writer.end('NewReading')
+        if self.original_reading is not None:
+            self.original_reading.to_xml(writer)
+        writer.end('EditorialData')
+
     def __eq__(self, other):
         if isinstance(other, EditorialData):
             return self.new_reading == other.new_reading and self.original_reading == other.original_reading
@@ -0,0 +1,144 @@
+"""
+Recovering parse of CMME documents.
+
+By default, the first event that cannot be parsed (an unknown tag, or a value of the wrong type) aborts Piece.parse.
+When Piece.parse is given a list of diagnostics, the events that cannot be parsed are replaced by UnparsedEvents, which
+keep their XML, and the MusicSections that cannot be parsed are skipped. Each error is reported as a Diagnostic with
+the XPath-like location of its element (e.g. /Piece/MusicSection[2]/MensuralMusic/Voice[3]/EventList/Note[14]), so that
+all the errors of a file are found in one pass.
+
+The Recovery of the parse in progress is held in a context variable, so that the parse methods of the model do not pass
+it around: EventList.parse and EventFactory.create_all look it up once per list of events.
+"""
+import copy
+import xml.etree.ElementTree as ET
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional
+
+NAMESPACE = 'http://www.cmme.org'
+
+
+def local_name(tag: str) -> str:
+    return tag.split('}')[-1]
+
+
+def describe(error: Exception) -> str:
+    return f"{type(error).__name__}: {error}"
+
+
+class Diagnostic:
+    """
+    An error found while parsing a document, at the location of its element.
+    """
+    def __init__(self, location: str, message: str):
+        self.location = location
+        self.message = message
+
+    def __eq__(self, other):
+        if isinstance(other, Diagnostic):
+            return self.location == other.location and self.message == other.message
+        return False
+
+    def __str__(self):
+        return f"{self.location}: {self.message}"
+
+    def __repr__(self):
+        return f"Diagnostic(Location={self.location}, Message={self.message})"
+
+
+class UnparsedEvent:
+    """
+    Stands for an event that could not be parsed, or that the model does not represent (the MiscItems other than a
+    Barline), in place of it: it keeps the tag and the XML of the element, which is written back as it was (see
+    model.writer).
+    """
+    def __init__(self, tag: str, xml: str):
+        self.tag = tag
+        self.xml = xml
+
+    @classmethod
+    def of(cls, element: ET.Element) -> 'UnparsedEvent':
+        element = copy.copy(element)
+        element.tail = None
+        try:
+            xml = ET.tostring(element, encoding='unicode', default_namespace=NAMESPACE)
+        except ValueError:
+            # Some elements are not in the CMME namespace
+            xml = ET.tostring(element, encoding='unicode')
+        return cls(local_name(element.tag), xml)
+
+    def to_xml(self, writer):
+        writer.raw(self.xml)
+
+    def __eq__(self, other):
+        if isinstance(other, UnparsedEvent):
+            return self.tag == other.tag and self.xml == other.xml
+        return False
+
+    def __repr__(self):
+        return f"UnparsedEvent(Tag={self.tag})"
+
+
+class Recovery:
+    """
+    Collects the errors of a parse, with their elements, whose locations are only computed if there are errors.
+    """
+    def __init__(self):
+        self.errors = []
+
+    def report(self, element: ET.Element, message: str):
+        self.errors.append((element, message))
+
+    def parse_event(self, parsers: Dict[str, Callable], event_el: ET.Element):
+        """
+        Parses an event with the parse method of its tag, or returns an UnparsedEvent if it cannot be parsed.
+        """
+        parse_method = parsers.get(event_el.tag)
+        if parse_method is None:
+            self.report(event_el, f"unknown event {local_name(event_el.tag)}")
+            return UnparsedEvent.of(event_el)
+        try:
+            return parse_method(event_el)
+        except Exception as error:
+            self.report(event_el, describe(error))
+            return UnparsedEvent.of(event_el)
+
+    def parse_section(self, parse_method: Callable, element: ET.Element):
+        """
+        Parses a MusicSection, or returns None if it cannot be parsed (the section is skipped).
+        """
+        try:
+            return parse_method(element)
+        except Exception as error:
+            self.report(element, f"section skipped: {describe(error)}")
+            return None
+
+    def diagnostics(self, root: ET.Element) -> List[Diagnostic]:
+        """
+        Returns the errors as Diagnostics, in the order they were found.
+
+        Args:
+            root: The document element, from which the locations are given.
+        """
+        if not self.errors:
+            return []
+        parents = {child: parent for parent in root.iter() for child in parent}
+        return [Diagnostic(self.location(element, parents), message) for element, message in self.errors]
+
+    @staticmethod
+    def location(element: ET.Element, parents: Dict[ET.Element, ET.Element]) -> str:
+        steps = []
+        while element is not None:
+            parent = parents.get(element)
+            step = local_name(element.tag)
+            if parent is not None:
+                siblings = [sibling for sibling in parent if sibling.tag == element.tag]
+                if len(siblings) > 1:
+                    step += f'[{siblings.index(element) + 1}]'
+            steps.append(step)
+            element = parent
+        return '/' + '/'.join(reversed(steps))
+
+
+# The Recovery of the parse in progress, or None if errors are raised
+RECOVERY: ContextVar[Optional[Recovery]] = ContextVar('recovery', default=None)
@@ -1,17 +1,27 @@
 from typing import Optional
 from xml.etree.ElementTree import Element
 
+from model.events import EventAttributes
+from model.proportion import Proportion
+from model.schema_parsers import scan_rest_data
+from model.signum import Signum
+
 class RestEvent:
     """
-    Represents a rest event in musical notation, including type, length, staff line, and spacing information.
+    Represents a rest event in musical notation, including type, length, staff line, and spacing information, the
+    corona and signum congruentiae, and the event attributes.
     """
-    def __init__(self, rest_type: Optional[str], length_num: Optional[str], length_den: Optional[str],
-                 bottom_staff_line: Optional[str], num_spaces: Optional[str]):
+    def __init__(self, rest_type: Optional[str], length_num: Optional[int], length_den: Optional[int],
+                 bottom_staff_line: Optional[int], num_spaces: Optional[int], corona: Optional[Signum] = None,
+                 signum: Optional[Signum] = None, event_attributes: Optional[EventAttributes] = None):
         self.rest_type = rest_type
         self.length_num = length_num
         self.length_den = length_den
         self.bottom_staff_line = bottom_staff_line
         self.num_spaces = num_spaces
+        self.corona = corona
+        self.signum = signum
+        self.event_attributes = event_attributes if event_attributes is not None else EventAttributes()
 
     @classmethod
     def parse(cls, element: Element) -> 'RestEvent':
@@ -24,20 +34,38 @@ class RestEvent:
         Returns:
             A RestEvent object.
         """
-        # Parse Rest Type
-        rest_type = element.find('{http://www.cmme.org}Type').text if element.find('{http://www.cmme.org}Type') is not None else None
+        values = scan_rest_data(element)
 
         # Parse Length (Num and Den)
-        length_num = element.find('{http://www.cmme.org}Length/Num').text if element.find('{http://www.cmme.org}Length/Num') is not None else None
-        length_den = element.find('{http://www.cmme.org}Length/Den').text if element.find('{http://www.cmme.org}Length/Den') is not None else None
-
-        # Parse BottomStaffLine
-        bottom_staff_line = element.find('{http://www.cmme.org}BottomStaffLine').text if element.find('{http://www.cmme.org}BottomStaffLine') is not None else None
+        length_el = values.get('length')
+        length = Proportion.parse(length_el) if length_el is not None else None
+        length_num = length.num if length is not None else None
+        length_den = length.den if length is not None else None
 
-        # Parse NumSpaces
-        num_spaces = element.find('{http://www.cmme.org}NumSpaces').text if element.find('{http://www.cmme.org}NumSpaces') is not None else None
+        return cls(values.get('type'), length_num, length_den, values.get('bottom_staff_line'),
+                   values.get('num_spaces'), Signum.parse(values.get('corona')), Signum.parse(values.get('signum')),
+                   EventAttributes.from_values(values))
 
-        return cls(rest_type, length_num, length_den, bottom_staff_line, num_spaces)
+    def to_xml(self, writer):
+        writer.start('Rest')
+        writer.element('Type', self.rest_type)
+        if self.length_num is not None:
+            writer.start('Length')
+            writer.element('Num', self.length_num)
+            writer.element('Den', self.length_den)
+            writer.end('Length')
+        writer.element('BottomStaffLine', self.bottom_staff_line)
+        writer.element('NumSpaces', self.num_spaces)
+        if self.corona is not None:
+            writer.start('Corona')
+            self.corona.to_xml(writer)
+            writer.end('Corona')
+        if self.signum is not None:
+            writer.start('Signum')
+            self.signum.to_xml(writer)
+            writer.end('Signum')
+        self.event_attributes.to_xml(writer)
+        writer.end('Rest')
 
     def __eq__(self, other):
         if isinstance(other, RestEvent):
@@ -45,9 +73,13 @@ class RestEvent:
                     self.length_num == other.length_num and
                     self.length_den == other.length_den and
                     self.bottom_staff_line == other.bottom_staff_line and
-                    self.num_spaces == other.num_spaces)
+                    self.num_spaces == other.num_spaces and
+                    self.corona == other.corona and
+                    self.signum == other.signum and
+                    self.event_attributes == other.event_attributes)
         return False
 
     def __repr__(self):
         return (f"RestEvent(RestType={self.rest_type}, LengthNum={self.length_num}, "
-                f"LengthDen={self.length_den}, BottomStaffLine={self.bottom_staff_line}, NumSpaces={self.num_spaces})")
+                f"LengthDen={self.length_den}, BottomStaffLine={self.bottom_staff_line}, NumSpaces={self.num_spaces}, "
+                f"Corona={self.corona}, Signum={self.signum}, EventAttributes={self.event_attributes})")
@@ -0,0 +1,1049 @@
+"""
+Schema-driven scanners for the CMME complex types.
+
+GENERATED by schema/codegen.py from resources/cmme.xsd: do not edit, run `python -m schema.codegen` instead.
+"""
+from xml.etree.ElementTree import Element
+
+NAMESPACE = '{http://www.cmme.org}'
+
+TAG_ACCIDENTAL = '{http://www.cmme.org}Accidental'
+TAG_AMBIGUOUS = '{http://www.cmme.org}Ambiguous'
+TAG_APPEARANCE = '{http://www.cmme.org}Appearance'
+TAG_A_TYPE = '{http://www.cmme.org}AType'
+TAG_BARLINE = '{http://www.cmme.org}Barline'
+TAG_BASE_COLORATION = '{http://www.cmme.org}BaseColoration'
+TAG_BEGIN = '{http://www.cmme.org}Begin'
+TAG_BOTTOM_STAFF_LINE = '{http://www.cmme.org}BottomStaffLine'
+TAG_CANON_RESOLUTIO = '{http://www.cmme.org}CanonResolutio'
+TAG_COLOR = '{http://www.cmme.org}Color'
+TAG_COLORED = '{http://www.cmme.org}Colored'
+TAG_COMPOSER = '{http://www.cmme.org}Composer'
+TAG_CONTENT = '{http://www.cmme.org}Content'
+TAG_CORONA = '{http://www.cmme.org}Corona'
+TAG_DEFAULT = '{http://www.cmme.org}Default'
+TAG_DEN = '{http://www.cmme.org}Den'
+TAG_DESCRIPTION = '{http://www.cmme.org}Description'
+TAG_DIR = '{http://www.cmme.org}Dir'
+TAG_DOT = '{http://www.cmme.org}Dot'
+TAG_EDITOR = '{http://www.cmme.org}Editor'
+TAG_EDITORIAL = '{http://www.cmme.org}Editorial'
+TAG_EDITORIAL_COMMENTARY = '{http://www.cmme.org}EditorialCommentary'
+TAG_ELLIPSIS = '{http://www.cmme.org}Ellipsis'
+TAG_END = '{http://www.cmme.org}End'
+TAG_ERROR = '{http://www.cmme.org}Error'
+TAG_EVENT_LIST = '{http://www.cmme.org}EventList'
+TAG_FILL = '{http://www.cmme.org}Fill'
+TAG_FLAGGED = '{http://www.cmme.org}Flagged'
+TAG_GENERAL_DATA = '{http://www.cmme.org}GeneralData'
+TAG_HALF_COLORATION = '{http://www.cmme.org}HalfColoration'
+TAG_ID = '{http://www.cmme.org}ID'
+TAG_INCIPIT = '{http://www.cmme.org}Incipit'
+TAG_LACUNA = '{http://www.cmme.org}Lacuna'
+TAG_LENGTH = '{http://www.cmme.org}Length'
+TAG_LETTER_NAME = '{http://www.cmme.org}LetterName'
+TAG_LIG = '{http://www.cmme.org}Lig'
+TAG_MAIN_SYMBOL = '{http://www.cmme.org}MainSymbol'
+TAG_MENSURAL_MUSIC = '{http://www.cmme.org}MensuralMusic'
+TAG_MENS_INFO = '{http://www.cmme.org}MensInfo'
+TAG_MISSING_VERSION_ID = '{http://www.cmme.org}MissingVersionID'
+TAG_MISSING_VOICES = '{http://www.cmme.org}MissingVoices'
+TAG_MODERN_ACCIDENTAL = '{http://www.cmme.org}ModernAccidental'
+TAG_MODERN_TEXT = '{http://www.cmme.org}ModernText'
+TAG_MODUS_MAIOR = '{http://www.cmme.org}ModusMaior'
+TAG_MODUS_MINOR = '{http://www.cmme.org}ModusMinor'
+TAG_MUSIC = '{http://www.cmme.org}Music'
+TAG_MUSIC_SECTION = '{http://www.cmme.org}MusicSection'
+TAG_NAME = '{http://www.cmme.org}Name'
+TAG_NEW_READING = '{http://www.cmme.org}NewReading'
+TAG_NOTES = '{http://www.cmme.org}Notes'
+TAG_NOTE_EVENT_ID = '{http://www.cmme.org}NoteEventID'
+TAG_NO_SCORE_EFFECT = '{http://www.cmme.org}NoScoreEffect'
+TAG_NUM = '{http://www.cmme.org}Num'
+TAG_NUMBER = '{http://www.cmme.org}Number'
+TAG_NUM_FLAGS = '{http://www.cmme.org}NumFlags'
+TAG_NUM_LINES = '{http://www.cmme.org}NumLines'
+TAG_NUM_SPACES = '{http://www.cmme.org}NumSpaces'
+TAG_NUM_VOICES = '{http://www.cmme.org}NumVoices'
+TAG_OCTAVE = '{http://www.cmme.org}Octave'
+TAG_OCTAVE_NUM = '{http://www.cmme.org}OctaveNum'
+TAG_OFFSET = '{http://www.cmme.org}Offset'
+TAG_OPTIONAL = '{http://www.cmme.org}Optional'
+TAG_ORIENTATION = '{http://www.cmme.org}Orientation'
+TAG_ORIGINAL_READING = '{http://www.cmme.org}OriginalReading'
+TAG_PAGE_END = '{http://www.cmme.org}PageEnd'
+TAG_PHRASE = '{http://www.cmme.org}Phrase'
+TAG_PITCH = '{http://www.cmme.org}Pitch'
+TAG_PITCH_OFFSET = '{http://www.cmme.org}PitchOffset'
+TAG_PLAINCHANT = '{http://www.cmme.org}Plainchant'
+TAG_PREFERRED_READING = '{http://www.cmme.org}PreferredReading'
+TAG_PRIMARY_COLOR = '{http://www.cmme.org}PrimaryColor'
+TAG_PRINCIPAL_SOURCE = '{http://www.cmme.org}PrincipalSource'
+TAG_PROLATIO = '{http://www.cmme.org}Prolatio'
+TAG_PUBLIC_NOTES = '{http://www.cmme.org}PublicNotes'
+TAG_READING = '{http://www.cmme.org}Reading'
+TAG_RELATIVE_STAFF_LOC = '{http://www.cmme.org}RelativeStaffLoc'
+TAG_REPEAT_SIGN = '{http://www.cmme.org}RepeatSign'
+TAG_SECONDARY_COLOR = '{http://www.cmme.org}SecondaryColor'
+TAG_SECTION = '{http://www.cmme.org}Section'
+TAG_SIDE = '{http://www.cmme.org}Side'
+TAG_SIGN = '{http://www.cmme.org}Sign'
+TAG_SIGNATURE = '{http://www.cmme.org}Signature'
+TAG_SIGNUM = '{http://www.cmme.org}Signum'
+TAG_SIG_ELEMENT = '{http://www.cmme.org}SigElement'
+TAG_SMALL = '{http://www.cmme.org}Small'
+TAG_SOURCE = '{http://www.cmme.org}Source'
+TAG_STAFF_LOC = '{http://www.cmme.org}StaffLoc'
+TAG_STEM = '{http://www.cmme.org}Stem'
+TAG_STROKES = '{http://www.cmme.org}Strokes'
+TAG_SUGGESTED_MODERN_CLEF = '{http://www.cmme.org}SuggestedModernClef'
+TAG_SYLLABLE = '{http://www.cmme.org}Syllable'
+TAG_TACET_INSTRUCTION = '{http://www.cmme.org}TacetInstruction'
+TAG_TACET_TEXT = '{http://www.cmme.org}TacetText'
+TAG_TEMPO_CHANGE = '{http://www.cmme.org}TempoChange'
+TAG_TEMPUS = '{http://www.cmme.org}Tempus'
+TAG_TEXT = '{http://www.cmme.org}Text'
+TAG_TEXT_ANNOTATION = '{http://www.cmme.org}TextAnnotation'
+TAG_TIE = '{http://www.cmme.org}Tie'
+TAG_TITLE = '{http://www.cmme.org}Title'
+TAG_TYPE = '{http://www.cmme.org}Type'
+TAG_VARIANT_VERSION = '{http://www.cmme.org}VariantVersion'
+TAG_VARIANT_VERSION_ID = '{http://www.cmme.org}VariantVersionID'
+TAG_VOICE = '{http://www.cmme.org}Voice'
+TAG_VOICE_DATA = '{http://www.cmme.org}VoiceData'
+TAG_VOICE_NUM = '{http://www.cmme.org}VoiceNum'
+TAG_WORD_END = '{http://www.cmme.org}WordEnd'
+
+
+def scan_barline(element: Element) -> dict:
+    """
+    Scans the children of an element with Barline content: NumLines, RepeatSign, BottomStaffLine, NumSpaces.
+    """
+    values = {}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_NUM_LINES:
+            values['num_lines'] = int(child.text)
+        elif tag == TAG_REPEAT_SIGN:
+            values['repeat_sign'] = child
+        elif tag == TAG_BOTTOM_STAFF_LINE:
+            values['bottom_staff_line'] = int(child.text)
+        elif tag == TAG_NUM_SPACES:
+            values['num_spaces'] = int(child.text)
+    return values
+
+
+def scan_clef_data(element: Element) -> dict:
+    """
+    Scans the children of an element with ClefData content: Appearance, StaffLoc, Pitch, Signature, Colored,
+    Ambiguous, Editorial, Error, EditorialCommentary.
+    """
+    values = {}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_APPEARANCE:
+            values['appearance'] = child.text
+        elif tag == TAG_STAFF_LOC:
+            values['staff_loc'] = int(child.text)
+        elif tag == TAG_PITCH:
+            values['pitch'] = child
+        elif tag == TAG_SIGNATURE:
+            values['signature'] = child
+        elif tag == TAG_COLORED:
+            values['colored'] = child
+        elif tag == TAG_AMBIGUOUS:
+            values['ambiguous'] = child
+        elif tag == TAG_EDITORIAL:
+            values['editorial'] = child
+        elif tag == TAG_ERROR:
+            values['error'] = child
+        elif tag == TAG_EDITORIAL_COMMENTARY:
+            values['editorial_commentary'] = child.text
+    return values
+
+
+def scan_color_and_fill_data(element: Element) -> dict:
+    """
+    Scans the children of an element with ColorAndFillData content: Color, Fill.
+    """
+    values = {}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_COLOR:
+            values['color'] = child.text
+        elif tag == TAG_FILL:
+            values['fill'] = child.text
+    return values
+
+
+def scan_color_change_data(element: Element) -> dict:
+    """
+    Scans the children of an element with ColorChangeData content: PrimaryColor, SecondaryColor, Colored, Ambiguous,
+    Editorial, Error, EditorialCommentary.
+    """
+    values = {}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_PRIMARY_COLOR:
+            values['primary_color'] = child
+        elif tag == TAG_SECONDARY_COLOR:
+            values['secondary_color'] = child
+        elif tag == TAG_COLORED:
+            values['colored'] = child
+        elif tag == TAG_AMBIGUOUS:
+            values['ambiguous'] = child
+        elif tag == TAG_EDITORIAL:
+            values['editorial'] = child
+        elif tag == TAG_ERROR:
+            values['error'] = child
+        elif tag == TAG_EDITORIAL_COMMENTARY:
+            values['editorial_commentary'] = child.text
+    return values
+
+
+def scan_coloration_data(element: Element) -> dict:
+    """
+    Scans the children of an element with ColorationData content: PrimaryColor, SecondaryColor.
+    """
+    values = {}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_PRIMARY_COLOR:
+            values['primary_color'] = child
+        elif tag == TAG_SECONDARY_COLOR:
+            values['secondary_color'] = child
+    return values
+
+
+def scan_custos_data(element: Element) -> dict:
+    """
+    Scans the children of an element with CustosData content: StaffLoc, LetterName, OctaveNum, Colored, Ambiguous,
+    Editorial, Error, EditorialCommentary.
+    """
+    values = {}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_STAFF_LOC:
+            values['staff_loc'] = int(child.text)
+        elif tag == TAG_LETTER_NAME:
+            values['letter_name'] = child.text
+        elif tag == TAG_OCTAVE_NUM:
+            values['octave_num'] = int(child.text)
+        elif tag == TAG_COLORED:
+            values['colored'] = child
+        elif tag == TAG_AMBIGUOUS:
+            values['ambiguous'] = child
+        elif tag == TAG_EDITORIAL:
+            values['editorial'] = child
+        elif tag == TAG_ERROR:
+            values['error'] = child
+        elif tag == TAG_EDITORIAL_COMMENTARY:
+            values['editorial_commentary'] = child.text
+    return values
+
+
+def scan_dot_data(element: Element) -> dict:
+    """
+    Scans the children of an element with DotData content: Pitch, StaffLoc, RelativeStaffLoc, NoteEventID, Colored,
+    Ambiguous, Editorial, Error, EditorialCommentary.
+    """
+    values = {}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_PITCH:
+            values['pitch'] = child
+        elif tag == TAG_STAFF_LOC:
+            values['staff_loc'] = int(child.text)
+        elif tag == TAG_RELATIVE_STAFF_LOC:
+            values['relative_staff_loc'] = int(child.text)
+        elif tag == TAG_NOTE_EVENT_ID:
+            values['note_event_id'] = int(child.text)
+        elif tag == TAG_COLORED:
+            values['colored'] = child
+        elif tag == TAG_AMBIGUOUS:
+            values['ambiguous'] = child
+        elif tag == TAG_EDITORIAL:
+            values['editorial'] = child
+        elif tag == TAG_ERROR:
+            values['error'] = child
+        elif tag == TAG_EDITORIAL_COMMENTARY:
+            values['editorial_commentary'] = child.text
+    return values
+
+
+def scan_editorial_data(element: Element) -> dict:
+    """
+    Scans the children of an element with EditorialData content: NewReading, OriginalReading.
+    """
+    values = {}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_NEW_READING:
+            values['new_reading'] = child
+        elif tag == TAG_ORIGINAL_READING:
+            values['original_reading'] = child
+    return values
+
+
+def scan_event_attributes(element: Element) -> dict:
+    """
+    Scans the children of an element with EventAttributes content: Colored, Ambiguous, Editorial, Error,
+    EditorialCommentary.
+    """
+    values = {}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_COLORED:
+            values['colored'] = child
+        elif tag == TAG_AMBIGUOUS:
+            values['ambiguous'] = child
+        elif tag == TAG_EDITORIAL:
+            values['editorial'] = child
+        elif tag == TAG_ERROR:
+            values['error'] = child
+        elif tag == TAG_EDITORIAL_COMMENTARY:
+            values['editorial_commentary'] = child.text
+    return values
+
+
+def scan_flagged(element: Element) -> dict:
+    """
+    Scans the children of an element with Flagged content: NumFlags.
+    """
+    values = {}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_NUM_FLAGS:
+            values['num_flags'] = int(child.text)
+    return values
+
+
+def scan_general_data_group(element: Element) -> dict:
+    """
+    Scans the children of an element with GeneralDataGroup content: Incipit, Title, Section, Composer, Editor,
+    PublicNotes, Notes, VariantVersion*, BaseColoration.
+    """
+    values = {'variant_version': []}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_INCIPIT:
+            values['incipit'] = child
+        elif tag == TAG_TITLE:
+            values['title'] = child.text
+        elif tag == TAG_SECTION:
+            values['section'] = child.text
+        elif tag == TAG_COMPOSER:
+            values['composer'] = child.text
+        elif tag == TAG_EDITOR:
+            values['editor'] = child.text
+        elif tag == TAG_PUBLIC_NOTES:
+            values['public_notes'] = child.text
+        elif tag == TAG_NOTES:
+            values['notes'] = child.text
+        elif tag == TAG_VARIANT_VERSION:
+            values['variant_version'].append(child)
+        elif tag == TAG_BASE_COLORATION:
+            values['base_coloration'] = child
+    return values
+
+
+def scan_lacuna(element: Element) -> dict:
+    """
+    Scans the children of an element with Lacuna content: Length, Begin, End.
+    """
+    values = {}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_LENGTH:
+            values['length'] = child
+        elif tag == TAG_BEGIN:
+            values['begin'] = child
+        elif tag == TAG_END:
+            values['end'] = child
+    return values
+
+
+def scan_line_end_data(element: Element) -> dict:
+    """
+    Scans the children of an element with LineEndData content: PageEnd, Colored, Ambiguous, Editorial, Error,
+    EditorialCommentary.
+    """
+    values = {}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_PAGE_END:
+            values['page_end'] = child
+        elif tag == TAG_COLORED:
+            values['colored'] = child
+        elif tag == TAG_AMBIGUOUS:
+            values['ambiguous'] = child
+        elif tag == TAG_EDITORIAL:
+            values['editorial'] = child
+        elif tag == TAG_ERROR:
+            values['error'] = child
+        elif tag == TAG_EDITORIAL_COMMENTARY:
+            values['editorial_commentary'] = child.text
+    return values
+
+
+def scan_locus(element: Element) -> dict:
+    """
+    Scans the children of an element with Locus content: LetterName, OctaveNum.
+    """
+    values = {}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_LETTER_NAME:
+            values['letter_name'] = child.text
+        elif tag == TAG_OCTAVE_NUM:
+            values['octave_num'] = int(child.text)
+    return values
+
+
+def scan_mens_info(element: Element) -> dict:
+    """
+    Scans the children of an element with MensInfo content: Prolatio, Tempus, ModusMinor, ModusMaior, TempoChange.
+    """
+    values = {}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_PROLATIO:
+            values['prolatio'] = child.text
+        elif tag == TAG_TEMPUS:
+            values['tempus'] = child.text
+        elif tag == TAG_MODUS_MINOR:
+            values['modus_minor'] = child.text
+        elif tag == TAG_MODUS_MAIOR:
+            values['modus_maior'] = child.text
+        elif tag == TAG_TEMPO_CHANGE:
+            values['tempo_change'] = child
+    return values
+
+
+def scan_mensural_music_data(element: Element) -> dict:
+    """
+    Scans the children of an element with MensuralMusicData content: NumVoices, BaseColoration, TacetInstruction*,
+    Voice*.
+    """
+    values = {'tacet_instruction': [], 'voice': []}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_NUM_VOICES:
+            values['num_voices'] = int(child.text)
+        elif tag == TAG_BASE_COLORATION:
+            values['base_coloration'] = child
+        elif tag == TAG_TACET_INSTRUCTION:
+            values['tacet_instruction'].append(child)
+        elif tag == TAG_VOICE:
+            values['voice'].append(child)
+    return values
+
+
+def scan_mensuration_data(element: Element) -> dict:
+    """
+    Scans the children of an element with MensurationData content: Sign*, Number*, StaffLoc, Orientation, Small,
+    MensInfo, NoScoreEffect, Colored, Ambiguous, Editorial, Error, EditorialCommentary.
+    """
+    values = {'sign': [], 'number': []}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_SIGN:
+            values['sign'].append(child)
+        elif tag == TAG_NUMBER:
+            values['number'].append(child)
+        elif tag == TAG_STAFF_LOC:
+            values['staff_loc'] = int(child.text)
+        elif tag == TAG_ORIENTATION:
+            values['orientation'] = child.text
+        elif tag == TAG_SMALL:
+            values['small'] = child
+        elif tag == TAG_MENS_INFO:
+            values['mens_info'] = child
+        elif tag == TAG_NO_SCORE_EFFECT:
+            values['no_score_effect'] = child
+        elif tag == TAG_COLORED:
+            values['colored'] = child
+        elif tag == TAG_AMBIGUOUS:
+            values['ambiguous'] = child
+        elif tag == TAG_EDITORIAL:
+            values['editorial'] = child
+        elif tag == TAG_ERROR:
+            values['error'] = child
+        elif tag == TAG_EDITORIAL_COMMENTARY:
+            values['editorial_commentary'] = child.text
+    return values
+
+
+def scan_misc_item_data(element: Element) -> dict:
+    """
+    Scans the children of an element with MiscItemData content: Barline, TextAnnotation, Lacuna, Ellipsis, Colored,
+    Ambiguous, Editorial, Error, EditorialCommentary.
+    """
+    values = {}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_BARLINE:
+            values['barline'] = child
+        elif tag == TAG_TEXT_ANNOTATION:
+            values['text_annotation'] = child
+        elif tag == TAG_LACUNA:
+            values['lacuna'] = child
+        elif tag == TAG_ELLIPSIS:
+            values['ellipsis'] = child
+        elif tag == TAG_COLORED:
+            values['colored'] = child
+        elif tag == TAG_AMBIGUOUS:
+            values['ambiguous'] = child
+        elif tag == TAG_EDITORIAL:
+            values['editorial'] = child
+        elif tag == TAG_ERROR:
+            values['error'] = child
+        elif tag == TAG_EDITORIAL_COMMENTARY:
+            values['editorial_commentary'] = child.text
+    return values
+
+
+def scan_missing_voices(element: Element) -> dict:
+    """
+    Scans the children of an element with MissingVoices content: VoiceNum*.
+    """
+    values = {'voice_num': []}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_VOICE_NUM:
+            values['voice_num'].append(child.text)
+    return values
+
+
+def scan_modern_accidental_data(element: Element) -> dict:
+    """
+    Scans the children of an element with ModernAccidentalData content: PitchOffset, AType, Num, Optional.
+    """
+    values = {}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_PITCH_OFFSET:
+            values['pitch_offset'] = int(child.text)
+        elif tag == TAG_A_TYPE:
+            values['a_type'] = child.text
+        elif tag == TAG_NUM:
+            values['num'] = int(child.text)
+        elif tag == TAG_OPTIONAL:
+            values['optional'] = child
+    return values
+
+
+def scan_modern_key_signature_data(element: Element) -> dict:
+    """
+    Scans the children of an element with ModernKeySignatureData content: SigElement*.
+    """
+    values = {'sig_element': []}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_SIG_ELEMENT:
+            values['sig_element'].append(child)
+    return values
+
+
+def scan_modern_key_signature_element(element: Element) -> dict:
+    """
+    Scans the children of an element with ModernKeySignatureElement content: Pitch, Octave, Accidental.
+    """
+    values = {}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_PITCH:
+            values['pitch'] = child.text
+        elif tag == TAG_OCTAVE:
+            values['octave'] = int(child.text)
+        elif tag == TAG_ACCIDENTAL:
+            values['accidental'] = child
+    return values
+
+
+def scan_modern_text_data(element: Element) -> dict:
+    """
+    Scans the children of an element with ModernTextData content: Syllable, WordEnd, Editorial.
+    """
+    values = {}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_SYLLABLE:
+            values['syllable'] = child.text
+        elif tag == TAG_WORD_END:
+            values['word_end'] = child
+        elif tag == TAG_EDITORIAL:
+            values['editorial'] = child
+    return values
+
+
+def scan_music_section_data_group(element: Element) -> dict:
+    """
+    Scans the children of an element with MusicSectionDataGroup content: Editorial, PrincipalSource, MensuralMusic,
+    Plainchant, Text.
+    """
+    values = {}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_EDITORIAL:
+            values['editorial'] = child
+        elif tag == TAG_PRINCIPAL_SOURCE:
+            values['principal_source'] = child
+        elif tag == TAG_MENSURAL_MUSIC:
+            values['mensural_music'] = child
+        elif tag == TAG_PLAINCHANT:
+            values['plainchant'] = child
+        elif tag == TAG_TEXT:
+            values['text'] = child
+    return values
+
+
+def scan_note_data(element: Element) -> dict:
+    """
+    Scans the children of an element with NoteData content: Type, Length, StaffLoc, LetterName, OctaveNum,
+    ModernAccidental, Flagged, Lig, Tie, Stem*, HalfColoration, Corona, Signum, ModernText, Colored, Ambiguous,
+    Editorial, Error, EditorialCommentary.
+    """
+    values = {'stem': []}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_TYPE:
+            values['type'] = child.text
+        elif tag == TAG_LENGTH:
+            values['length'] = child
+        elif tag == TAG_STAFF_LOC:
+            values['staff_loc'] = int(child.text)
+        elif tag == TAG_LETTER_NAME:
+            values['letter_name'] = child.text
+        elif tag == TAG_OCTAVE_NUM:
+            values['octave_num'] = int(child.text)
+        elif tag == TAG_MODERN_ACCIDENTAL:
+            values['modern_accidental'] = child
+        elif tag == TAG_FLAGGED:
+            values['flagged'] = child
+        elif tag == TAG_LIG:
+            values['lig'] = child.text
+        elif tag == TAG_TIE:
+            values['tie'] = child.text
+        elif tag == TAG_STEM:
+            values['stem'].append(child)
+        elif tag == TAG_HALF_COLORATION:
+            values['half_coloration'] = child.text
+        elif tag == TAG_CORONA:
+            values['corona'] = child
+        elif tag == TAG_SIGNUM:
+            values['signum'] = child
+        elif tag == TAG_MODERN_TEXT:
+            values['modern_text'] = child
+        elif tag == TAG_COLORED:
+            values['colored'] = child
+        elif tag == TAG_AMBIGUOUS:
+            values['ambiguous'] = child
+        elif tag == TAG_EDITORIAL:
+            values['editorial'] = child
+        elif tag == TAG_ERROR:
+            values['error'] = child
+        elif tag == TAG_EDITORIAL_COMMENTARY:
+            values['editorial_commentary'] = child.text
+    return values
+
+
+def scan_note_info_data(element: Element) -> dict:
+    """
+    Scans the children of an element with NoteInfoData content: Type, Length.
+    """
+    values = {}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_TYPE:
+            values['type'] = child.text
+        elif tag == TAG_LENGTH:
+            values['length'] = child
+    return values
+
+
+def scan_original_reading(element: Element) -> dict:
+    """
+    Scans the children of an element with OriginalReading content: Lacuna, Error.
+    """
+    values = {}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_LACUNA:
+            values['lacuna'] = child
+        elif tag == TAG_ERROR:
+            values['error'] = child
+    return values
+
+
+def scan_original_text_data(element: Element) -> dict:
+    """
+    Scans the children of an element with OriginalTextData content: Phrase, Colored, Ambiguous, Editorial, Error,
+    EditorialCommentary.
+    """
+    values = {}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_PHRASE:
+            values['phrase'] = child.text
+        elif tag == TAG_COLORED:
+            values['colored'] = child
+        elif tag == TAG_AMBIGUOUS:
+            values['ambiguous'] = child
+        elif tag == TAG_EDITORIAL:
+            values['editorial'] = child
+        elif tag == TAG_ERROR:
+            values['error'] = child
+        elif tag == TAG_EDITORIAL_COMMENTARY:
+            values['editorial_commentary'] = child.text
+    return values
+
+
+def scan_piece(element: Element) -> dict:
+    """
+    Scans the children of an element with Piece content: GeneralData, VoiceData, MusicSection*.
+    """
+    values = {'music_section': []}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_GENERAL_DATA:
+            values['general_data'] = child
+        elif tag == TAG_VOICE_DATA:
+            values['voice_data'] = child
+        elif tag == TAG_MUSIC_SECTION:
+            values['music_section'].append(child)
+    return values
+
+
+def scan_plainchant_section_data(element: Element) -> dict:
+    """
+    Scans the children of an element with PlainchantSectionData content: NumVoices, BaseColoration,
+    TacetInstruction*, Voice*.
+    """
+    values = {'tacet_instruction': [], 'voice': []}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_NUM_VOICES:
+            values['num_voices'] = int(child.text)
+        elif tag == TAG_BASE_COLORATION:
+            values['base_coloration'] = child
+        elif tag == TAG_TACET_INSTRUCTION:
+            values['tacet_instruction'].append(child)
+        elif tag == TAG_VOICE:
+            values['voice'].append(child)
+    return values
+
+
+def scan_proportion(element: Element) -> dict:
+    """
+    Scans the children of an element with Proportion content: Num, Den.
+    """
+    values = {}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_NUM:
+            values['num'] = int(child.text)
+        elif tag == TAG_DEN:
+            values['den'] = int(child.text)
+    return values
+
+
+def scan_proportion_data(element: Element) -> dict:
+    """
+    Scans the children of an element with ProportionData content: Num, Den, Colored, Ambiguous, Editorial, Error,
+    EditorialCommentary.
+    """
+    values = {}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_NUM:
+            values['num'] = int(child.text)
+        elif tag == TAG_DEN:
+            values['den'] = int(child.text)
+        elif tag == TAG_COLORED:
+            values['colored'] = child
+        elif tag == TAG_AMBIGUOUS:
+            values['ambiguous'] = child
+        elif tag == TAG_EDITORIAL:
+            values['editorial'] = child
+        elif tag == TAG_ERROR:
+            values['error'] = child
+        elif tag == TAG_EDITORIAL_COMMENTARY:
+            values['editorial_commentary'] = child.text
+    return values
+
+
+def scan_reading(element: Element) -> dict:
+    """
+    Scans the children of an element with Reading content: VariantVersionID*, PreferredReading, Error, Lacuna,
+    Music.
+    """
+    values = {'variant_version_id': []}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_VARIANT_VERSION_ID:
+            values['variant_version_id'].append(child.text)
+        elif tag == TAG_PREFERRED_READING:
+            values['preferred_reading'] = child
+        elif tag == TAG_ERROR:
+            values['error'] = child
+        elif tag == TAG_LACUNA:
+            values['lacuna'] = child
+        elif tag == TAG_MUSIC:
+            values['music'] = child
+    return values
+
+
+def scan_rest_data(element: Element) -> dict:
+    """
+    Scans the children of an element with RestData content: Type, Length, BottomStaffLine, NumSpaces, Corona,
+    Signum, Colored, Ambiguous, Editorial, Error, EditorialCommentary.
+    """
+    values = {}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_TYPE:
+            values['type'] = child.text
+        elif tag == TAG_LENGTH:
+            values['length'] = child
+        elif tag == TAG_BOTTOM_STAFF_LINE:
+            values['bottom_staff_line'] = int(child.text)
+        elif tag == TAG_NUM_SPACES:
+            values['num_spaces'] = int(child.text)
+        elif tag == TAG_CORONA:
+            values['corona'] = child
+        elif tag == TAG_SIGNUM:
+            values['signum'] = child
+        elif tag == TAG_COLORED:
+            values['colored'] = child
+        elif tag == TAG_AMBIGUOUS:
+            values['ambiguous'] = child
+        elif tag == TAG_EDITORIAL:
+            values['editorial'] = child
+        elif tag == TAG_ERROR:
+            values['error'] = child
+        elif tag == TAG_EDITORIAL_COMMENTARY:
+            values['editorial_commentary'] = child.text
+    return values
+
+
+def scan_sign(element: Element) -> dict:
+    """
+    Scans the children of an element with Sign content: MainSymbol, Orientation, Strokes, Dot.
+    """
+    values = {}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_MAIN_SYMBOL:
+            values['main_symbol'] = child.text
+        elif tag == TAG_ORIENTATION:
+            values['orientation'] = child.text
+        elif tag == TAG_STROKES:
+            values['strokes'] = int(child.text)
+        elif tag == TAG_DOT:
+            values['dot'] = child
+    return values
+
+
+def scan_signum_data(element: Element) -> dict:
+    """
+    Scans the children of an element with SignumData content: Offset, Orientation, Side.
+    """
+    values = {}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_OFFSET:
+            values['offset'] = int(child.text)
+        elif tag == TAG_ORIENTATION:
+            values['orientation'] = child.text
+        elif tag == TAG_SIDE:
+            values['side'] = child.text
+    return values
+
+
+def scan_single_voice_chant_section_data(element: Element) -> dict:
+    """
+    Scans the children of an element with SingleVoiceChantSectionData content: VoiceNum, MissingVersionID*,
+    EventList.
+    """
+    values = {'missing_version_id': []}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_VOICE_NUM:
+            values['voice_num'] = int(child.text)
+        elif tag == TAG_MISSING_VERSION_ID:
+            values['missing_version_id'].append(child.text)
+        elif tag == TAG_EVENT_LIST:
+            values['event_list'] = child
+    return values
+
+
+def scan_single_voice_data(element: Element) -> dict:
+    """
+    Scans the children of an element with SingleVoiceData content: Name, Editorial, CanonResolutio,
+    SuggestedModernClef.
+    """
+    values = {}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_NAME:
+            values['name'] = child.text
+        elif tag == TAG_EDITORIAL:
+            values['editorial'] = child
+        elif tag == TAG_CANON_RESOLUTIO:
+            values['canon_resolutio'] = child
+        elif tag == TAG_SUGGESTED_MODERN_CLEF:
+            values['suggested_modern_clef'] = child.text
+    return values
+
+
+def scan_single_voice_mensural_section_data(element: Element) -> dict:
+    """
+    Scans the children of an element with SingleVoiceMensuralSectionData content: VoiceNum, CanonResolutio,
+    MissingVersionID*, EventList.
+    """
+    values = {'missing_version_id': []}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_VOICE_NUM:
+            values['voice_num'] = int(child.text)
+        elif tag == TAG_CANON_RESOLUTIO:
+            values['canon_resolutio'] = child
+        elif tag == TAG_MISSING_VERSION_ID:
+            values['missing_version_id'].append(child.text)
+        elif tag == TAG_EVENT_LIST:
+            values['event_list'] = child
+    return values
+
+
+def scan_source_info(element: Element) -> dict:
+    """
+    Scans the children of an element with SourceInfo content: Name, ID.
+    """
+    values = {}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_NAME:
+            values['name'] = child.text
+        elif tag == TAG_ID:
+            values['id'] = int(child.text)
+    return values
+
+
+def scan_staff_pitch_data(element: Element) -> dict:
+    """
+    Scans the children of an element with StaffPitchData content: StaffLoc, LetterName, OctaveNum.
+    """
+    values = {}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_STAFF_LOC:
+            values['staff_loc'] = int(child.text)
+        elif tag == TAG_LETTER_NAME:
+            values['letter_name'] = child.text
+        elif tag == TAG_OCTAVE_NUM:
+            values['octave_num'] = int(child.text)
+    return values
+
+
+def scan_stem(element: Element) -> dict:
+    """
+    Scans the children of an element with Stem content: Dir, Side.
+    """
+    values = {}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_DIR:
+            values['dir'] = child.text
+        elif tag == TAG_SIDE:
+            values['side'] = child.text
+    return values
+
+
+def scan_tacet_data(element: Element) -> dict:
+    """
+    Scans the children of an element with TacetData content: VoiceNum, TacetText.
+    """
+    values = {}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_VOICE_NUM:
+            values['voice_num'] = int(child.text)
+        elif tag == TAG_TACET_TEXT:
+            values['tacet_text'] = child.text
+    return values
+
+
+def scan_text_annotation(element: Element) -> dict:
+    """
+    Scans the children of an element with TextAnnotation content: Text, StaffLoc.
+    """
+    values = {}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_TEXT:
+            values['text'] = child.text
+        elif tag == TAG_STAFF_LOC:
+            values['staff_loc'] = int(child.text)
+    return values
+
+
+def scan_text_section_data(element: Element) -> dict:
+    """
+    Scans the children of an element with TextSectionData content: Content.
+    """
+    values = {}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_CONTENT:
+            values['content'] = child.text
+    return values
+
+
+def scan_variant_readings(element: Element) -> dict:
+    """
+    Scans the children of an element with VariantReadings content: Reading*.
+    """
+    values = {'reading': []}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_READING:
+            values['reading'].append(child)
+    return values
+
+
+def scan_variant_version(element: Element) -> dict:
+    """
+    Scans the children of an element with VariantVersion content: Default, ID, Source, Editor, Description,
+    MissingVoices.
+    """
+    values = {}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_DEFAULT:
+            values['default'] = child
+        elif tag == TAG_ID:
+            values['id'] = child.text
+        elif tag == TAG_SOURCE:
+            values['source'] = child
+        elif tag == TAG_EDITOR:
+            values['editor'] = child.text
+        elif tag == TAG_DESCRIPTION:
+            values['description'] = child.text
+        elif tag == TAG_MISSING_VOICES:
+            values['missing_voices'] = child
+    return values
+
+
+def scan_voice_data_group(element: Element) -> dict:
+    """
+    Scans the children of an element with VoiceDataGroup content: NumVoices, Voice*.
+    """
+    values = {'voice': []}
+    for child in element:
+        tag = child.tag
+        if tag == TAG_NUM_VOICES:
+            values['num_voices'] = int(child.text)
+        elif tag == TAG_VOICE:
+            values['voice'].append(child)
+    return values
@@ -0,0 +1,41 @@
+from typing import Optional
+from xml.etree.ElementTree import Element
+
+from model.schema_parsers import scan_signum_data
+
+
+class Signum:
+    """
+    Represents the SignumData of a Corona or a Signum congruentiae on a note or a rest: its offset, orientation and
+    side, all optional.
+    """
+    def __init__(self, offset: Optional[int] = None, orientation: Optional[str] = None, side: Optional[str] = None):
+        self.offset = offset
+        self.orientation = orientation
+        self.side = side
+
+    @classmethod
+    def parse(cls, element: Optional[Element]) -> Optional['Signum']:
+        """
+        Parses the SignumData of a Corona or Signum element, or returns None if the element is None.
+        """
+        if element is None:
+            return None
+        values = scan_signum_data(element)
+        return cls(values.get('offset'), values.get('orientation'), values.get('side'))
+
+    def to_xml(self, writer):
+        """
+        Writes the SignumData group, within the Corona or Signum element written by the owner.
+        """
+        writer.element('Offset', self.offset)
+        writer.element('Orientation', self.orientation)
+        writer.element('Side', self.side)
+
+    def __eq__(self, other):
+        if isinstance(other, Signum):
+            return self.offset == other.offset and self.orientation == other.orientation and self.side == other.side
+        return False
+
+    def __repr__(self):
+        return f"Signum(Offset={self.offset}, Orientation={self.orientation}, Side={self.side})"
@@ -0,0 +1,233 @@
+"""
+Staff positions of the events of a voice, in the context of the clef in force.
+
+CMME numbers the staff locations from the bottom line of the staff: 1 is the bottom line, 2 the space above it, and 9
+the top line of a five-line staff (MEI's @loc counts from 0 on the bottom line). A clef sets the pitch at its staff
+location, so that under a clef the location of a pitch is its diatonic step (see model.columns) minus the anchor of the
+clef: the step of its pitch minus its location. Each anchor has a ClefTable, built on first use and shared by all the
+clefs with that anchor (e.g. a C clef on the bottom line and a G clef on the third line), that gives the pitch of every
+location from LOWEST_LOC to HIGHEST_LOC.
+
+StaffPositions resolves the location of every event of a list in one pass, with the clef in force: notes, custodes and
+dots from their pitch, clefs and mensurations from their StaffLoc, and rests from their BottomStaffLine (the line their
+bottom is on, 0 being the ledger line below the staff). The events nested in other events (VariantReadings,
+EditorialData, MultiEvent) are resolved too; the clef in force after them is the one of the edited text (the new
+reading of EditorialData and the first reading of VariantReadings, as in model.checkpoints). The positions of an
+EventList are memoized on it (see EventList.staff_positions), like its checkpoints. A voice keeps its clef from one
+MusicSection to the next: resolve_piece resolves the voices of a piece section by section, each starting with the clef
+in force at the end of the same voice in the previous section.
+"""
+from typing import Dict, List, Optional
+
+from model.checkpoints import ACCIDENTAL_APPEARANCES
+from model.columns import MISSING, diatonic_step, step_pitch
+from model.pitch import Pitch
+
+# Attribute of the memoized positions of an EventList
+MEMO = '_staff_positions'
+
+# The locations of the tables: four ledger lines below and above a staff of up to 15 lines
+LOWEST_LOC = -8
+HIGHEST_LOC = 38
+
+
+class ClefTable:
+    """
+    The pitches of the staff locations under the clefs with the same anchor.
+    """
+    _tables: Dict[int, 'ClefTable'] = {}
+
+    def __init__(self, anchor: int):
+        self.anchor = anchor
+        self.pitches = tuple(step_pitch(anchor + loc) if anchor + loc >= 0 else None
+                             for loc in range(LOWEST_LOC, HIGHEST_LOC + 1))
+
+    @classmethod
+    def of(cls, anchor: int) -> 'ClefTable':
+        """
+        Returns the table of an anchor, built on first use.
+        """
+        table = cls._tables.get(anchor)
+        if table is None:
+            table = cls._tables[anchor] = cls(anchor)
+        return table
+
+    @classmethod
+    def of_clef(cls, clef) -> Optional['ClefTable']:
+        """
+        Returns the table of a ClefEvent, or None if its pitch or location is not given.
+        """
+        step = diatonic_step(clef.pitch)
+        if step == MISSING or clef.staff_loc is None:
+            return None
+        return cls.of(step - clef.staff_loc)
+
+    def loc(self, pitch: Optional[Pitch]) -> Optional[int]:
+        """
+        Returns the staff location of a pitch, or None if it is incomplete.
+        """
+        step = diatonic_step(pitch)
+        return step - self.anchor if step != MISSING else None
+
+    def pitch(self, loc: Optional[int]) -> Optional[Pitch]:
+        """
+        Returns the pitch of a staff location, or None outside the table.
+        """
+        if loc is None or not LOWEST_LOC <= loc <= HIGHEST_LOC:
+            return None
+        return self.pitches[loc - LOWEST_LOC]
+
+    def __repr__(self):
+        return f"ClefTable(Anchor={self.anchor})"
+
+
+def table_anchor(table: Optional[ClefTable]) -> Optional[int]:
+    return table.anchor if table is not None else None
+
+
+def table_of(anchor: Optional[int]) -> Optional[ClefTable]:
+    return ClefTable.of(anchor) if anchor is not None else None
+
+
+class StaffPositions:
+    """
+    The staff locations of the events of a list and of the events nested in them, with the clef table in force at each
+    event, in document order (events[i] is at locs[i] under tables[i]).
+    """
+    def __init__(self, events: list, locs: List[Optional[int]], tables: List[Optional[ClefTable]],
+                 initial: Optional[ClefTable] = None, final: Optional[ClefTable] = None):
+        self.events = events
+        self.locs = locs
+        self.tables = tables
+        self.initial = initial
+        self.final = final
+        self.order = {id(event): index for index, event in enumerate(events)}
+
+    @classmethod
+    def build(cls, events: list, initial: Optional[ClefTable] = None) -> 'StaffPositions':
+        """
+        Resolves the staff locations of a list of events (the events of a voice), in one pass.
+
+        Args:
+            events: The events.
+            initial: The table of the clef in force before the events, if any.
+
+        Returns:
+            The positions, with the table in force after the events as final.
+        """
+        positions = cls([], [], [], initial)
+        positions.final = positions.resolve(events, initial)
+        positions.order = {id(event): index for index, event in enumerate(positions.events)}
+        return positions
+
+    def resolve(self, events: list, table: Optional[ClefTable]) -> Optional[ClefTable]:
+        """
+        Resolves a list of events starting with a clef table, and returns the table in force after them.
+        """
+        for event in events:
+            if event is None:
+                continue
+            name = type(event).__name__
+            loc = None
+            if name == 'NoteEvent' or name == 'CustosEvent' or name == 'DotEvent':
+                loc = table.loc(event.pitch) if table is not None else None
+            elif name == 'RestEvent':
+                if event.bottom_staff_line is not None:
+                    loc = 2 * event.bottom_staff_line - 1
+            elif name == 'ClefEvent':
+                loc = event.staff_loc
+                if event.appearance not in ACCIDENTAL_APPEARANCES:
+                    table = ClefTable.of_clef(event) or table
+            elif name == 'MensurationEvent':
+                loc = event.staff_loc
+            self.events.append(event)
+            self.locs.append(loc)
+            self.tables.append(table)
+            if name == 'MultiEvent':
+                table = self.resolve(event.events, table)
+            elif name == 'EditorialData':
+                if event.original_reading is not None:
+                    self.resolve(event.original_reading.music_events, table)
+                table = self.resolve(event.new_reading, table)
+            elif name == 'VariantReadings':
+                after = table
+                for index, reading in enumerate(event.readings):
+                    reading_table = self.resolve(reading.music_events, table)
+                    if index == 0:
+                        after = reading_table
+                table = after
+        return table
+
+    def loc(self, event) -> Optional[int]:
+        """
+        Returns the CMME staff location of an event, or None if it has none (or is not in the list).
+        """
+        index = self.order.get(id(event))
+        return self.locs[index] if index is not None else None
+
+    def mei_loc(self, event) -> Optional[int]:
+        """
+        Returns the MEI staff location (@loc) of an event.
+        """
+        loc = self.loc(event)
+        return loc - 1 if loc is not None else None
+
+    def table(self, event) -> Optional[ClefTable]:
+        """
+        Returns the clef table in force at an event.
+        """
+        index = self.order.get(id(event))
+        return self.tables[index] if index is not None else None
+
+    def pitch(self, event) -> Optional[Pitch]:
+        """
+        Returns the pitch of the staff location of an event (e.g. of the line a rest stands on) under the clef in force.
+        """
+        index = self.order.get(id(event))
+        if index is None or self.tables[index] is None:
+            return None
+        return self.tables[index].pitch(self.locs[index])
+
+    def __getstate__(self):
+        # The tables are shared, by anchor, and the order is rebuilt from the events, whose ids change when they are
+        # unpickled
+        return {'events': self.events, 'locs': self.locs, 'tables': [table_anchor(table) for table in self.tables],
+                'initial': table_anchor(self.initial), 'final': table_anchor(self.final)}
+
+    def __setstate__(self, state):
+        self.events = state['events']
+        self.locs = state['locs']
+        self.tables = [table_of(anchor) for anchor in state['tables']]
+        self.initial = table_of(state['initial'])
+        self.final = table_of(state['final'])
+        self.order = {id(event): index for index, event in enumerate(self.events)}
+
+    def __repr__(self):
+        return f"StaffPositions(Events={len(self.events)})"
+
+
+def resolve_piece(piece):
+    """
+    Resolves the staff positions of the voices of a piece (memoized on their EventLists), carrying the clef of each
+    voice from one section to the next.
+    """
+    clefs: Dict[int, Optional[ClefTable]] = {}
+    for music_section in piece.music_sections:
+        if music_section is not None:
+            resolve_section(music_section, clefs)
+
+
+def resolve_section(music_section, clefs: Dict[int, Optional[ClefTable]]):
+    """
+    Resolves the staff positions of the voices of a section, starting with the clef tables of the voices (by voice
+    number) at the end of the previous sections, and updates them.
+    """
+    for voice in getattr(music_section.content, 'voices', None) or []:
+        if voice.event_list is not None:
+            initial = clefs.get(voice.voice_num)
+            positions = voice.event_list.__dict__.get(MEMO)
+            if positions is None or table_anchor(positions.initial) != table_anchor(initial):
+                # The positions of the list in its piece are the ones memoized
+                positions = StaffPositions.build(voice.event_list.events, initial)
+                setattr(voice.event_list, MEMO, positions)
+            clefs[voice.voice_num] = positions.final
@@ -0,0 +1,246 @@
+"""
+Traversal of the model with visitors.
+
+A Visitor defines enter_<name> and leave_<name> methods, where <name> is the snake_case name of a model class:
+enter_piece, enter_music_section, enter_plainchant, enter_voice, enter_event_list, enter_note_event,
+leave_variant_readings, etc. The methods for a node are looked up along the MRO of its class (enter_voice is called for
+a SharedVoice, enter_abstract_music_section_content for MensuralMusic and Plainchant), and the events fall back to
+enter_event and leave_event. The lookup is made once per visitor class and node class: a traversal then dispatches on
+the type of each node with a dictionary lookup.
+
+A Traversal walks a tree of the model in document order: the music sections of a piece, the content of each section,
+its voices, their event lists and events, and the events nested in MultiEvents, in the readings of VariantReadings and
+in EditorialData (the new reading, then the original reading). enter_ is called before the children of a node, leave_
+after them. When enter_ returns SKIP, the children are not visited (leave_ is still called); subtrees that cannot
+contain a class handled by a visitor are skipped without being visited at all.
+
+Several visitors can be fused in a Traversal, which then walks the tree once for all of them (each one pruning its own
+subtrees). Piece.parse(..., visitor=...) runs the traversal while the piece is being parsed: the piece is entered once
+its GeneralData and VoiceData are known, and each music section is walked as soon as it has been parsed.
+"""
+import re
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+# Returned by an enter_ method so that the children of the node are not visited
+SKIP = 'SKIP'
+
+
+class Visitor:
+    """
+    Base class of the visitors, which only define the enter_ and leave_ methods of the classes they need.
+    """
+    pass
+
+
+def method_suffix(node_class: type) -> str:
+    """
+    Returns the suffix of the methods of a class, e.g. 'note_event' for NoteEvent.
+    """
+    return re.sub(r'(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])', '_', node_class.__name__).lower()
+
+
+class Structure:
+    """
+    The shape of the model: the children of each class of node, and the classes that can appear below it. Built on
+    first use, as it needs all the model classes.
+    """
+    _instance = None
+
+    def __init__(self):
+        from model.event_factory import EventFactory
+        from model.multievent import MultiEvent
+        from model.music_section import AbstractMusicSectionContent, EventList, MusicSection, Voice
+        from model.piece import Piece
+        from model.reading import EditorialData, OriginalReading, Reading, VariantReadings
+        from model.recovery import UnparsedEvent
+
+        self.event_classes = ({parse_method.__self__ for parse_method in EventFactory.parsers().values()} |
+                              {VariantReadings, EditorialData, UnparsedEvent})
+        events = tuple(self.event_classes)
+
+        self.children: Dict[type, Callable] = {
+            Piece: lambda piece: piece.music_sections,
+            MusicSection: lambda music_section: (music_section.content,),
+            AbstractMusicSectionContent: lambda content: content.voices,
+            Voice: lambda voice: (voice.event_list,) if voice.event_list is not None else (),
+            EventList: lambda event_list: event_list.events,
+            MultiEvent: lambda multi_event: multi_event.events,
+            VariantReadings: lambda variant_readings: variant_readings.readings,
+            Reading: lambda reading: reading.music_events,
+            EditorialData: lambda editorial_data: (
+                editorial_data.new_reading + [editorial_data.original_reading]
+                if editorial_data.original_reading is not None else editorial_data.new_reading),
+            OriginalReading: lambda reading: reading.music_events,
+        }
+        # The (base) classes of the children of each class
+        contents = {
+            Piece: (MusicSection,),
+            MusicSection: tuple(AbstractMusicSectionContent.__subclasses__()),
+            AbstractMusicSectionContent: (Voice,),
+            Voice: (EventList,),
+            EventList: events,
+            MultiEvent: events,
+            VariantReadings: (Reading,),
+            Reading: events,
+            EditorialData: events + (OriginalReading,),
+            OriginalReading: events,
+        }
+        self.descendants: Dict[type, frozenset] = {}
+        for node_class in contents:
+            found = set()
+            pending = list(contents[node_class])
+            while pending:
+                child_class = pending.pop()
+                if child_class not in found:
+                    found.add(child_class)
+                    pending += contents.get(self.lookup(contents, child_class), ())
+            self.descendants[node_class] = frozenset(found)
+
+    @classmethod
+    def get(cls) -> 'Structure':
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @staticmethod
+    def lookup(table: dict, node_class: type):
+        """
+        Returns the first class of the MRO of node_class that is a key of table, or None.
+        """
+        for base in node_class.__mro__:
+            if base in table:
+                return base
+        return None
+
+    def children_of(self, node_class: type) -> Optional[Callable]:
+        base = self.lookup(self.children, node_class)
+        return self.children[base] if base is not None else None
+
+    def descendants_of(self, node_class: type) -> frozenset:
+        base = self.lookup(self.descendants, node_class)
+        return self.descendants[base] if base is not None else frozenset()
+
+    def is_event(self, node_class: type) -> bool:
+        return any(base in self.event_classes for base in node_class.__mro__)
+
+
+# (visitor class, node class, prefix) -> the method of the visitor class for the node class, or None
+_methods: Dict[Tuple[type, type, str], Optional[Callable]] = {}
+
+
+def find_method(visitor_class: type, node_class: type, prefix: str) -> Optional[Callable]:
+    """
+    Returns the (unbound) enter_ or leave_ method of a visitor class for a node class, or None.
+    """
+    key = (visitor_class, node_class, prefix)
+    if key not in _methods:
+        names = [prefix + method_suffix(base) for base in node_class.__mro__[:-1]]
+        if Structure.get().is_event(node_class):
+            names.append(prefix + 'event')
+        _methods[key] = next((getattr(visitor_class, name) for name in names if hasattr(visitor_class, name)), None)
+    return _methods[key]
+
+
+class Traversal:
+    """
+    Walks trees of the model with one or several (fused) visitors.
+    """
+    def __init__(self, *visitors: Visitor):
+        self.visitors = visitors
+        self.everyone = list(range(len(visitors)))
+        # node class -> (children function, (enter, leave) bound methods and relevance of the subtree per visitor,
+        # whether any visitor handles the class)
+        self.table: Dict[type, tuple] = {}
+
+    @classmethod
+    def of(cls, visitor: Union[Visitor, 'Traversal']) -> 'Traversal':
+        return visitor if isinstance(visitor, Traversal) else cls(visitor)
+
+    def compile(self, node_class: type) -> tuple:
+        structure = Structure.get()
+        children = structure.children_of(node_class)
+        descendants = structure.descendants_of(node_class)
+        methods = []
+        relevant = []
+        for visitor in self.visitors:
+            visitor_class = type(visitor)
+            enter = find_method(visitor_class, node_class, 'enter_')
+            leave = find_method(visitor_class, node_class, 'leave_')
+            methods.append((enter.__get__(visitor) if enter is not None else None,
+                            leave.__get__(visitor) if leave is not None else None))
+            relevant.append(children is not None and any(
+                find_method(visitor_class, descendant, prefix) is not None
+                for descendant in descendants for prefix in ('enter_', 'leave_')))
+        entry = (children, methods, relevant, any(enter or leave for enter, leave in methods))
+        self.table[node_class] = entry
+        return entry
+
+    def walk(self, node, active: Optional[Sequence[int]] = None):
+        """
+        Visits a node and its subtree.
+
+        Args:
+            node: A node of the model (Piece, MusicSection, Voice, an event...).
+            active: The indices of the visitors that visit the node, all of them by default.
+        """
+        table = self.table
+        children, methods, relevant, _ = table.get(type(node)) or self.compile(type(node))
+        if active is None:
+            active = self.everyone
+        descending = []
+        for index in active:
+            enter = methods[index][0]
+            if (enter is None or enter(node) is not SKIP) and relevant[index]:
+                descending.append(index)
+        if descending:
+            for child in children(node):
+                child_entry = table.get(type(child)) or self.compile(type(child))
+                if child_entry[0] is not None:
+                    self.walk(child, descending)
+                    continue
+                # Most nodes are events without children: visit them here rather than through a call of walk
+                child_methods = child_entry[1]
+                if not child_entry[3]:
+                    continue
+                for index in descending:
+                    enter = child_methods[index][0]
+                    if enter is not None:
+                        enter(child)
+                for index in descending:
+                    leave = child_methods[index][1]
+                    if leave is not None:
+                        leave(child)
+        for index in active:
+            leave = methods[index][1]
+            if leave is not None:
+                leave(node)
+
+    def enter(self, node) -> List[int]:
+        """
+        Enters a node whose children will be walked separately (e.g. as they are parsed).
+
+        Returns:
+            The visitors that visit the children, to be passed to walk().
+        """
+        children, methods, relevant, _ = self.table.get(type(node)) or self.compile(type(node))
+        descending = []
+        for index in self.everyone:
+            enter = methods[index][0]
+            if (enter is None or enter(node) is not SKIP) and relevant[index]:
+                descending.append(index)
+        return descending
+
+    def leave(self, node):
+        """
+        Leaves a node entered with enter().
+        """
+        for enter, leave in (self.table.get(type(node)) or self.compile(type(node)))[1]:
+            if leave is not None:
+                leave(node)
+
+
+def walk(node, *visitors: Visitor):
+    """
+    Visits a node and its subtree with one or several visitors, in a single traversal.
+    """
+    Traversal(*visitors).walk(node)
@@ -2,6 +2,7 @@ from typing import List, Optional
 from xml.etree.ElementTree import Element
 
 from .events import Event
+from .schema_parsers import scan_single_voice_data, scan_voice_data_group
 
 class SingleVoiceData:
     def __init__(self, name: str, editorial: Optional[str] = None, canon_resolutio: Optional[str] = None,
@@ -13,20 +14,25 @@ class SingleVoiceData:
 
     @classmethod
     def parse(cls, element: Element) -> 'SingleVoiceData':
-        name_el = element.find('{http://www.cmme.org}Name')
-        name = name_el.text if name_el is not None else None
+        values = scan_single_voice_data(element)
 
-        editorial_el = element.find('{http://www.cmme.org}Editorial')
-        editorial = editorial_el.text if editorial_el is not None else None
+        # Editorial is untyped: keep its text, empty if it has none (e.g. <Editorial/>)
+        editorial_el = values.get('editorial')
+        editorial = editorial_el.text or '' if editorial_el is not None else None
 
         # Only used in mensural music, not in plainchant. As it's optional, it can be added here
-        canon_resolutio_el = element.find('{http://www.cmme.org}CanonResolutio')
-        canon_resolutio = canon_resolutio_el.text if canon_resolutio_el is not None else None
+        canon_resolutio_el = values.get('canon_resolutio')
+        canon_resolutio = canon_resolutio_el.text or '' if canon_resolutio_el is not None else None
 
-        suggested_modern_clef_el = element.find('{http://www.cmme.org}SuggestedModernClef')
-        suggested_modern_clef = suggested_modern_clef_el.text if suggested_modern_clef_el is not None else None
+        return cls(values.get('name'), editorial, canon_resolutio, values.get('suggested_modern_clef'))
 
-        return cls(name, editorial, canon_resolutio, suggested_modern_clef)
+    def to_xml(self, writer):
+        writer.start('Voice')
+        writer.element('Name', self.name)
+        writer.element('Editorial', self.editorial)
+        writer.element('CanonResolutio', self.canon_resolutio)
+        writer.element('SuggestedModernClef', self.suggested_modern_clef)
+        writer.end('Voice')
 
 
 class VoiceData:
@@ -36,16 +42,18 @@ class VoiceData:
 
     @classmethod
     def parse(cls, element: Element) -> 'VoiceData':
-        # Parse NumVoices (required)
-        num_voices_el = element.find('{http://www.cmme.org}NumVoices')
-        num_voices = int(num_voices_el.text) if num_voices_el is not None else 0
+        values = scan_voice_data_group(element)
 
         # Parse the list of Voice elements
-        voices = []
-        voice_elements = element.findall('{http://www.cmme.org}Voice')
-        for voice_el in voice_elements:
-            single_voice_data = SingleVoiceData.parse(voice_el)
-            voices.append(single_voice_data)
+        voices = [SingleVoiceData.parse(voice_el) for voice_el in values['voice']]
 
-        return cls(num_voices, voices)
+        # NumVoices is required
+        return cls(values.get('num_voices', 0), voices)
+
+    def to_xml(self, writer):
+        writer.start('VoiceData')
+        writer.element('NumVoices', self.num_voices)
+        for voice in self.voices:
+            voice.to_xml(writer)
+        writer.end('VoiceData')
 
@@ -0,0 +1,141 @@
+"""
+Streaming writer of CMME documents.
+
+The to_xml methods of the model classes write their elements, in the order of resources/cmme.xsd, through a
+CMMEWriter. The writer buffers the text and flushes it to the file as it goes, so a piece is never held in memory as an
+XML tree or as a whole string. The classes that model a group of the schema (e.g. Pitch for Locus, Proportion,
+EventAttributes) write the elements of the group, and the element that contains them is written by their owner.
+
+Only what the model keeps is written (e.g. not the event attributes of a Custos or a MiscItem, nor the SigElements of
+a key signature or the Signs of a mensuration after the first one): the output of a parsed piece parses into an equal
+piece, but not necessarily into the same elements as the original document.
+"""
+from typing import Optional, TextIO
+
+NAMESPACE = 'http://www.cmme.org'
+XSI_NAMESPACE = 'http://www.w3.org/2001/XMLSchema-instance'
+
+
+def escape(text: str) -> str:
+    if '&' in text:
+        text = text.replace('&', '&amp;')
+    if '<' in text:
+        text = text.replace('<', '&lt;')
+    if '>' in text:
+        text = text.replace('>', '&gt;')
+    return text
+
+
+def escape_attribute(text: str) -> str:
+    return escape(text).replace('"', '&quot;')
+
+
+def format_attributes(attributes: dict) -> str:
+    """
+    Formats the attributes of a start tag, skipping those whose value is None.
+    """
+    return ''.join(f' {name}="{escape_attribute(str(value))}"' for name, value in attributes.items()
+                   if value is not None)
+
+
+class CMMEWriter:
+    """
+    Writes indented XML to a text file, a few thousand elements at a time.
+    """
+    def __init__(self, file: TextIO, indent: str = '  ', buffered_parts: int = 1 << 12, depth: int = 0):
+        self.file = file
+        self.indent = indent
+        self.buffered_parts = buffered_parts
+        self.parts = []
+        self.depth = depth
+        # The number of parts when the last element was opened, while nothing has been written in it
+        self.opened = -1
+        self.indents = ['\n' + indent * depth for depth in range(32)]
+
+    def line(self) -> str:
+        if self.depth >= len(self.indents):
+            self.indents += ['\n' + self.indent * depth for depth in range(len(self.indents), self.depth + 1)]
+        return self.indents[self.depth]
+
+    def declaration(self):
+        self.parts.append('<?xml version="1.0" encoding="UTF-8"?>')
+
+    def start(self, tag: str, attributes: Optional[dict] = None):
+        """
+        Opens an element, whose content is written until end() is called.
+        """
+        if attributes:
+            self.parts.append(f'{self.line()}<{tag}{format_attributes(attributes)}>')
+        else:
+            self.parts.append(f'{self.line()}<{tag}>')
+        self.depth += 1
+        self.opened = len(self.parts)
+
+    def end(self, tag: str):
+        self.depth -= 1
+        if len(self.parts) == self.opened:
+            # Nothing was written in the element
+            self.parts[-1] = self.parts[-1][:-1] + '/>'
+            self.opened = -1
+        else:
+            self.parts.append(f'{self.line()}</{tag}>')
+            self.opened = -1
+        if len(self.parts) >= self.buffered_parts:
+            self.flush()
+
+    def element(self, tag: str, value, attributes: Optional[dict] = None):
+        """
+        Writes an element with text content (a string or a number), unless the value is None.
+        """
+        if value is None:
+            return
+        text = escape(value) if isinstance(value, str) else str(value)
+        if attributes:
+            self.parts.append(f'{self.line()}<{tag}{format_attributes(attributes)}>{text}</{tag}>')
+        else:
+            self.parts.append(f'{self.line()}<{tag}>{text}</{tag}>')
+
+    def empty(self, tag: str, attributes: Optional[dict] = None):
+        if attributes:
+            self.parts.append(f'{self.line()}<{tag}{format_attributes(attributes)}/>')
+        else:
+            self.parts.append(f'{self.line()}<{tag}/>')
+
+    def raw(self, xml: str):
+        """
+        Writes an element given as XML (e.g. an UnparsedEvent), on a line of its own.
+        """
+        self.parts.append(self.line() + xml)
+
+    def splice(self, fragment: str):
+        """
+        Writes a fragment produced by another writer started at the current depth, as it is.
+        """
+        self.parts.append(fragment)
+
+    def flag(self, tag: str, value: bool):
+        """
+        Writes an empty element if the value is true (e.g. <Colored/>).
+        """
+        if value:
+            self.parts.append(f'{self.line()}<{tag}/>')
+
+    def events(self, events):
+        """
+        Writes a list of events, each of which writes its own element.
+        """
+        for event in events:
+            event.to_xml(self)
+
+    def flush(self):
+        self.file.write(''.join(self.parts))
+        self.parts = []
+        # The part of an opened element is written: it cannot be collapsed any more
+        self.opened = -1
+
+    def close(self):
+        """
+        Writes what remains in the buffer, ending the document with a new line.
+        """
+        self.parts.append('\n')
+        self.flush()
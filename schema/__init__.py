@@ -0,0 +1,3 @@
+"""
+Tools built on resources/cmme.xsd.
+"""
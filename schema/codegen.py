@@ -0,0 +1,207 @@
+"""
+Generates model/schema_parsers.py from resources/cmme.xsd.
+
+For every named group and every inline complex type of the schema, a scan_* function is emitted that walks the
+children of an element once, compares their tags against precompiled constants and converts simple values to their
+Python type (int for integers, str for strings and patterns). Complex and untyped children are returned as elements,
+and children that may occur several times are collected in lists. The model classes build their objects from the
+resulting dictionaries.
+
+Content made of events (EventListData, SingleOrMultiEventData, SingleEventData) is not scanned: it is dispatched
+by EventFactory.
+
+Usage (from the repository root):
+    python -m schema.codegen            # regenerates model/schema_parsers.py
+    python -m schema.codegen --check    # exits with an error if the checked-in file is out of date
+"""
+import os
+import re
+import sys
+import textwrap
+from typing import Dict, List, Tuple
+
+from schema.xsd import ElementDecl, GroupRef, ModelGroup, Particle, Schema
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+SCHEMA_PATH = os.path.join(ROOT, 'resources', 'cmme.xsd')
+OUTPUT_PATH = os.path.join(ROOT, 'model', 'schema_parsers.py')
+
+# Groups whose content is a list of events
+EVENT_GROUPS = {'EventListData', 'SingleOrMultiEventData', 'SingleEventData'}
+
+CONVERSIONS = {
+    'xs:integer': 'int',
+    'xs:unsignedInt': 'int',
+    'xs:decimal': 'float',
+}
+
+
+def snake_case(name: str) -> str:
+    """
+    Converts a schema name to snake case, e.g. 'VariantVersionID' to 'variant_version_id'.
+    """
+    return re.sub(r'(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])', '_', name).lower()
+
+
+def tag_constant(name: str) -> str:
+    return 'TAG_' + snake_case(name).upper()
+
+
+class ScannerSpec:
+    """
+    The children recognised by one generated scan function, in schema order, with whether each may repeat.
+    """
+    def __init__(self, function_name: str, schema_name: str, children: List[Tuple[ElementDecl, bool]]):
+        self.function_name = function_name
+        self.schema_name = schema_name
+        self.children = children
+
+
+def collect_children(schema: Schema, particle: Particle, repeated: bool,
+                     children: Dict[str, Tuple[ElementDecl, bool]]):
+    """
+    Flattens a content model into the element declarations that can appear as direct children.
+    """
+    repeated = repeated or particle.repeats
+    if isinstance(particle, ElementDecl):
+        if particle.name in children and children[particle.name][0] is not particle:
+            raise ValueError(f"Element {particle.name} is declared twice in the same content model")
+        children[particle.name] = (particle, repeated)
+    elif isinstance(particle, GroupRef):
+        collect_children(schema, schema.groups[particle.name], repeated, children)
+    elif isinstance(particle, ModelGroup):
+        for child in particle.particles:
+            collect_children(schema, child, repeated, children)
+
+
+def references_events(schema: Schema, particle: Particle) -> bool:
+    if isinstance(particle, GroupRef):
+        return particle.name in EVENT_GROUPS or references_events(schema, schema.groups[particle.name])
+    if isinstance(particle, ModelGroup):
+        return any(references_events(schema, child) for child in particle.particles)
+    return False
+
+
+def is_group_wrapper(particle: Particle) -> bool:
+    """
+    True for the content of elements such as <GeneralData>, which only wrap a named group: they are scanned by the
+    function of the group.
+    """
+    return (isinstance(particle, ModelGroup) and len(particle.particles) == 1
+            and isinstance(particle.particles[0], GroupRef))
+
+
+def inline_elements(schema: Schema, particle: Particle, found: List[ElementDecl]):
+    """
+    Collects, recursively, the element declarations with an inline complex type.
+    """
+    if isinstance(particle, ElementDecl):
+        if particle.content is not None:
+            found.append(particle)
+            inline_elements(schema, particle.content, found)
+    elif isinstance(particle, ModelGroup):
+        for child in particle.particles:
+            inline_elements(schema, child, found)
+
+
+def scanner_specs(schema: Schema) -> List[ScannerSpec]:
+    contents = []
+    for group_name, group in schema.groups.items():
+        if group_name not in EVENT_GROUPS and not references_events(schema, group):
+            contents.append((group_name, group))
+
+    elements = []
+    for element_decl in schema.elements.values():
+        inline_elements(schema, element_decl, elements)
+    for group in schema.groups.values():
+        inline_elements(schema, group, elements)
+    for element_decl in elements:
+        if not is_group_wrapper(element_decl.content) and not references_events(schema, element_decl.content):
+            contents.append((element_decl.name, element_decl.content))
+
+    specs = {}
+    for schema_name, content in contents:
+        function_name = 'scan_' + snake_case(schema_name)
+        if function_name in specs:
+            raise ValueError(f"Two content models would generate {function_name}")
+        children = {}
+        collect_children(schema, content, False, children)
+        specs[function_name] = ScannerSpec(function_name, schema_name, list(children.values()))
+
+    return [specs[function_name] for function_name in sorted(specs)]
+
+
+def value_expression(schema: Schema, element_decl: ElementDecl) -> str:
+    simple_type = schema.resolve_simple_type(element_decl)
+    if simple_type is None:
+        return 'child'
+    base = simple_type.base
+    while not base.startswith('xs:'):
+        base = schema.simple_types[base].base
+    conversion = CONVERSIONS.get(base)
+    return f'{conversion}(child.text)' if conversion is not None else 'child.text'
+
+
+def generate(schema: Schema) -> str:
+    specs = scanner_specs(schema)
+    namespace = '{' + schema.target_namespace + '}'
+    tags = sorted({element_decl.name for spec in specs for element_decl, _ in spec.children}, key=tag_constant)
+
+    lines = [
+        '"""',
+        'Schema-driven scanners for the CMME complex types.',
+        '',
+        'GENERATED by schema/codegen.py from resources/cmme.xsd: do not edit, run `python -m schema.codegen` instead.',
+        '"""',
+        'from xml.etree.ElementTree import Element',
+        '',
+        f"NAMESPACE = '{namespace}'",
+        '',
+    ]
+    lines += [f"{tag_constant(tag)} = '{namespace}{tag}'" for tag in tags]
+
+    for spec in specs:
+        lists = [snake_case(element_decl.name) for element_decl, repeated in spec.children if repeated]
+        described = ', '.join(element_decl.name + ('*' if repeated else '') for element_decl, repeated in spec.children)
+        lines += [
+            '',
+            '',
+            f'def {spec.function_name}(element: Element) -> dict:',
+            '    """',
+        ]
+        lines += textwrap.wrap(f'Scans the children of an element with {spec.schema_name} content: {described}.',
+                               width=116, initial_indent='    ', subsequent_indent='    ')
+        lines += [
+            '    """',
+            '    values = {' + ', '.join(f"'{key}': []" for key in lists) + '}',
+            '    for child in element:',
+            '        tag = child.tag',
+        ]
+        keyword = 'if'
+        for element_decl, repeated in spec.children:
+            key = snake_case(element_decl.name)
+            expression = value_expression(schema, element_decl)
+            assignment = f"values['{key}'].append({expression})" if repeated else f"values['{key}'] = {expression}"
+            lines += [f'        {keyword} tag == {tag_constant(element_decl.name)}:', f'            {assignment}']
+            keyword = 'elif'
+        lines.append('    return values')
+
+    return '\n'.join(lines) + '\n'
+
+
+def main(argv: List[str]) -> int:
+    code = generate(Schema.load(SCHEMA_PATH))
+    if '--check' in argv:
+        with open(OUTPUT_PATH) as file:
+            if file.read() != code:
+                print(f"{OUTPUT_PATH} is out of date, run `python -m schema.codegen`", file=sys.stderr)
+                return 1
+        return 0
+
+    with open(OUTPUT_PATH, 'w') as file:
+        file.write(code)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
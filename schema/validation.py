@@ -0,0 +1,567 @@
+"""
+Streaming validation of CMME documents against resources/cmme.xsd.
+
+The schema is compiled once into a tree of CompiledElement objects: the content model of each complex element is an
+automaton over the names of its children (determinised lazily, so every transition is computed once per schema and
+then looked up), and each simple type becomes a text checker. The compiled schema is cached by path, so all the
+files of a batch share it.
+
+Documents are read with expat in a single streaming pass, without building a tree. Every violation is collected with
+its line and column instead of stopping at the first one; only a document that is not well-formed stops the pass.
+Trees that have already been parsed (as in Piece.parse(..., validate=True)) are checked directly with
+Validator.is_valid_tree, which is cheaper since the document is not tokenised a second time.
+
+Validation is not cheap, which is why it is off by default. Piece.parse spends most of its time tokenising in C
+(ElementTree), while the validator runs Python code for every element: streaming validation costs about one and a half
+parses. Checking the parsed tree memoizes the steps of the content models and the texts already accepted, so that most
+elements cost a few dictionary lookups, and adds about two fifths of a parse (see benchmarks/validation.py). It is meant
+for the files that have not been checked yet, e.g. once when they enter a corpus, rather than for every conversion.
+"""
+import os
+import re
+import sys
+import xml.parsers.expat
+from typing import Callable, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from schema.xsd import ElementDecl, GroupRef, ModelGroup, Particle, Schema
+
+DEFAULT_SCHEMA_PATH = os.path.join(os.path.dirname(__file__), '..', 'resources', 'cmme.xsd')
+
+XSI_NAMESPACE = 'http://www.w3.org/2001/XMLSchema-instance'
+
+# Lexical spaces of the built-in types used by cmme.xsd (whitespace is collapsed before matching)
+BUILTIN_PATTERNS = {
+    'xs:integer': r'[+-]?\d+',
+    'xs:unsignedInt': r'\+?\d+',
+    'xs:decimal': r'[+-]?(\d+(\.\d*)?|\.\d+)',
+}
+
+
+# Bound of the memoized texts of a simple element, which grow with the free texts (e.g. syllables) of the documents
+CHECKED_TEXTS_LIMIT = 10000
+
+
+def any_text(text: str) -> bool:
+    return True
+
+
+def enumerate_patterns(patterns: List[str]) -> Optional[FrozenSet[str]]:
+    """
+    Returns the finite set of strings matched by patterns made of alternatives of literals and character ranges
+    (e.g. 'A|[C-G]|Bmol'), or None for any other pattern.
+    """
+    values = set()
+    for alternative in '|'.join(patterns).split('|'):
+        if re.fullmatch(r'[A-Za-z0-9]+', alternative):
+            values.add(alternative)
+        elif re.fullmatch(r'\[[A-Za-z0-9]-[A-Za-z0-9]\]', alternative):
+            values.update(chr(code) for code in range(ord(alternative[1]), ord(alternative[3]) + 1))
+        else:
+            return None
+    return frozenset(values)
+
+
+class Violation:
+    """
+    A schema violation at a position of the validated document.
+    """
+    def __init__(self, line: int, column: int, message: str):
+        self.line = line
+        self.column = column
+        self.message = message
+
+    def __eq__(self, other):
+        if isinstance(other, Violation):
+            return self.line == other.line and self.column == other.column and self.message == other.message
+        return False
+
+    def __str__(self):
+        return f"line {self.line}, column {self.column}: {self.message}"
+
+    def __repr__(self):
+        return f"Violation(Line={self.line}, Column={self.column}, Message={self.message})"
+
+
+class InvalidCMMEException(Exception):
+    """Exception raised when a document does not conform to the CMME schema."""
+    def __init__(self, violations: List[Violation]):
+        self.violations = violations
+        summary = '\n'.join(str(violation) for violation in violations[:10])
+        more = f"\n... and {len(violations) - 10} more" if len(violations) > 10 else ''
+        super().__init__(f"{len(violations)} schema violation(s):\n{summary}{more}")
+
+
+class ContentModel:
+    """
+    An automaton accepting the sequences of child names allowed by a content model. It is built as an NFA and
+    determinised on demand: each reachable set of NFA states becomes a numbered DFA state, and the transitions out of
+    a DFA state are memoized in a dictionary from child name to the next state (REJECT if the child is not allowed).
+    """
+    REJECT = -1
+
+    def __init__(self):
+        self.transitions: List[List[Tuple[Optional[str], int]]] = []
+        self.accept = None
+        self.start = 0
+        self.state_sets: List[FrozenSet[int]] = []
+        self.state_ids: Dict[FrozenSet[int], int] = {}
+        self.table: List[Dict[str, int]] = []
+        self.accepting: List[bool] = []
+
+    def new_state(self) -> int:
+        self.transitions.append([])
+        return len(self.transitions) - 1
+
+    def finish(self, start: int, accept: int):
+        self.accept = accept
+        self.start = self.dfa_state(self.closure([start]))
+
+    def closure(self, states) -> FrozenSet[int]:
+        pending = list(states)
+        closed = set(states)
+        while pending:
+            for label, target in self.transitions[pending.pop()]:
+                if label is None and target not in closed:
+                    closed.add(target)
+                    pending.append(target)
+        return frozenset(closed)
+
+    def dfa_state(self, states: FrozenSet[int]) -> int:
+        if not states:
+            return self.REJECT
+        state = self.state_ids.get(states)
+        if state is None:
+            state = len(self.state_sets)
+            self.state_ids[states] = state
+            self.state_sets.append(states)
+            self.table.append({})
+            self.accepting.append(self.accept in states)
+        return state
+
+    def step(self, state: int, name: str) -> int:
+        """
+        Returns the state reached after a child called name, or REJECT if the child is not allowed there.
+        """
+        next_state = self.table[state].get(name)
+        if next_state is None:
+            next_state = self.dfa_state(self.closure([target for nfa_state in self.state_sets[state]
+                                                      for label, target in self.transitions[nfa_state]
+                                                      if label == name]))
+            self.table[state][name] = next_state
+        return next_state
+
+    def resynchronize(self, name: str) -> int:
+        """
+        Returns the state reached after a child called name from any position of the content model, used to carry on
+        after an unexpected child instead of reporting every following sibling.
+        """
+        return self.dfa_state(self.closure([target for transitions in self.transitions
+                                            for label, target in transitions if label == name]))
+
+    def expected(self, state: int) -> List[str]:
+        return sorted({label for nfa_state in self.state_sets[state]
+                       for label, _ in self.transitions[nfa_state] if label is not None})
+
+
+class CompiledElement:
+    """
+    The compiled form of an element declaration. Complex elements have a content model and the declarations of
+    their children; simple elements have a text checker; untyped elements accept any content.
+
+    The checks of parsed trees are memoized: the steps of the content model by state and child tag, and the texts
+    already accepted by a simple element, so that most elements of a document cost a few dictionary lookups.
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self.content_model: Optional[ContentModel] = None
+        self.children: Dict[str, 'CompiledElement'] = {}
+        self.children_by_tag: Dict[str, 'CompiledElement'] = {}
+        self.check_text: Optional[Callable[[str], bool]] = None
+        self.type_description: Optional[str] = None
+        self.attributes: Dict[str, Callable[[str], bool]] = {}
+        self.required_attributes: List[str] = []
+        self.untyped = False
+        self.steps: List[Dict[str, Tuple[int, Optional['CompiledElement']]]] = []
+        self.valid_texts: Optional[Set[Optional[str]]] = None
+
+    def step(self, state: int, tag: str) -> Tuple[int, Optional['CompiledElement']]:
+        """
+        Returns the state of the content model reached after a child with an ElementTree tag and the declaration of
+        the child, which is None if the child is not allowed there.
+        """
+        child = self.children_by_tag.get(tag)
+        next_state = self.content_model.step(state, child.name) if child is not None else ContentModel.REJECT
+        step = (next_state, child) if next_state != ContentModel.REJECT else (next_state, None)
+        # One dictionary per state of the content model, including the ones it has just determinised
+        self.steps.extend({} for _ in range(len(self.content_model.table) - len(self.steps)))
+        self.steps[state][tag] = step
+        return step
+
+    def accepts_text(self, text: Optional[str]) -> bool:
+        if text in self.valid_texts:
+            return True
+        if not self.check_text(text or ''):
+            return False
+        if len(self.valid_texts) >= CHECKED_TEXTS_LIMIT:
+            self.valid_texts.clear()
+        self.valid_texts.add(text)
+        return True
+
+
+class CompiledSchema:
+    """
+    A schema compiled for validation. Use CompiledSchema.load to share one instance per schema file.
+    """
+    _cache: Dict[str, 'CompiledSchema'] = {}
+
+    def __init__(self, schema: Schema):
+        self.schema = schema
+        self.namespace = schema.target_namespace
+        self._compiled: Dict[int, CompiledElement] = {}
+        self.blank_texts: Set[Optional[str]] = {None}
+        self._text_checkers: Dict[str, Callable[[str], bool]] = {}
+        self.roots = {name: self.compile_element(element_decl) for name, element_decl in schema.elements.items()}
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_SCHEMA_PATH) -> 'CompiledSchema':
+        """
+        Returns the compiled schema of a file, compiling it on first use.
+        """
+        key = os.path.abspath(path)
+        compiled = cls._cache.get(key)
+        if compiled is None:
+            compiled = cls(Schema.load(path))
+            cls._cache[key] = compiled
+        return compiled
+
+    def is_blank(self, text: Optional[str]) -> bool:
+        """
+        Returns whether a text between elements is only whitespace, remembering the blank texts (indentations).
+        """
+        if not text.isspace():
+            return False
+        self.blank_texts.add(text)
+        return True
+
+    def compile_element(self, element_decl: ElementDecl) -> CompiledElement:
+        compiled = self._compiled.get(id(element_decl))
+        if compiled is not None:
+            return compiled
+
+        compiled = CompiledElement(element_decl.name)
+        self._compiled[id(element_decl)] = compiled
+        for attribute_decl in element_decl.attributes:
+            compiled.attributes[attribute_decl.name] = self.text_checker(attribute_decl.type_name)
+            if attribute_decl.required:
+                compiled.required_attributes.append(attribute_decl.name)
+
+        if element_decl.content is not None or element_decl.complex:
+            model = ContentModel()
+            start = model.new_state()
+            accept = self.build(model, element_decl.content, start, compiled) \
+                if element_decl.content is not None else start
+            model.finish(start, accept)
+            compiled.content_model = model
+            compiled.steps = [{} for _ in model.table]
+        else:
+            simple_type = self.schema.resolve_simple_type(element_decl)
+            if simple_type is None:
+                compiled.untyped = True
+            else:
+                compiled.check_text = self.simple_type_checker(simple_type)
+                compiled.valid_texts = set()
+                compiled.type_description = simple_type.name or '|'.join(simple_type.patterns)
+        return compiled
+
+    def build(self, model: ContentModel, particle: Particle, start: int, owner: CompiledElement) -> int:
+        """
+        Adds the NFA of a particle (with its occurrence bounds) from state start and returns its final state.
+        """
+        state = start
+        for _ in range(particle.min_occurs):
+            state = self.build_once(model, particle, state, owner)
+        if particle.max_occurs is None:
+            loop_end = self.build_once(model, particle, state, owner)
+            model.transitions[loop_end].append((None, state))
+            end = model.new_state()
+            model.transitions[state].append((None, end))
+            return end
+        for _ in range(particle.max_occurs - particle.min_occurs):
+            optional_end = self.build_once(model, particle, state, owner)
+            model.transitions[state].append((None, optional_end))
+            state = optional_end
+        return state
+
+    def build_once(self, model: ContentModel, particle: Particle, start: int, owner: CompiledElement) -> int:
+        end = model.new_state()
+        if isinstance(particle, ElementDecl):
+            owner.children[particle.name] = self.compile_element(particle)
+            owner.children_by_tag['{' + self.namespace + '}' + particle.name] = owner.children[particle.name]
+            model.transitions[start].append((particle.name, end))
+        elif isinstance(particle, GroupRef):
+            group_end = self.build(model, self.schema.groups[particle.name], start, owner)
+            model.transitions[group_end].append((None, end))
+        elif isinstance(particle, ModelGroup) and particle.kind == 'sequence':
+            state = start
+            for child in particle.particles:
+                state = self.build(model, child, state, owner)
+            model.transitions[state].append((None, end))
+        elif isinstance(particle, ModelGroup):
+            for child in particle.particles:
+                branch_start = model.new_state()
+                model.transitions[start].append((None, branch_start))
+                model.transitions[self.build(model, child, branch_start, owner)].append((None, end))
+        return end
+
+    def simple_type_checker(self, simple_type) -> Callable[[str], bool]:
+        if not simple_type.patterns:
+            return self.text_checker(simple_type.base)
+        values = enumerate_patterns(simple_type.patterns)
+        if values is not None:
+            # Enumerations such as NoteTypeName are checked by a set lookup
+            return values.__contains__
+        pattern = re.compile('|'.join(f'(?:{pattern})' for pattern in simple_type.patterns))
+        return lambda text: pattern.fullmatch(text) is not None
+
+    def text_checker(self, type_name: str) -> Callable[[str], bool]:
+        checker = self._text_checkers.get(type_name)
+        if checker is None:
+            if type_name in BUILTIN_PATTERNS:
+                pattern = re.compile(BUILTIN_PATTERNS[type_name])
+                checker = lambda text: pattern.fullmatch(text.strip()) is not None
+            elif type_name in self.schema.simple_types:
+                checker = self.simple_type_checker(self.schema.simple_types[type_name])
+            else:
+                checker = any_text
+            self._text_checkers[type_name] = checker
+        return checker
+
+
+class Validator:
+    """
+    Validates CMME documents against a compiled schema.
+
+    validate_file and validate_string read the document with expat in a single streaming pass and collect every
+    violation with its position. is_valid_tree checks an ElementTree that has already been built (ElementTree keeps no
+    positions), so that a parser can validate its tree without tokenising the document again (for about two fifths of
+    the cost of the parse) and only stream the source again to report the violations of an invalid document.
+    """
+    def __init__(self, compiled_schema: Optional[CompiledSchema] = None):
+        self.compiled_schema = compiled_schema if compiled_schema is not None else CompiledSchema.load()
+        self._local_names: Dict[str, Optional[str]] = {}
+
+    def validate_file(self, path: str) -> List[Violation]:
+        with open(path, 'rb') as file:
+            return self._validate(lambda parser: parser.ParseFile(file))
+
+    def validate_string(self, xml_string) -> List[Violation]:
+        return self._validate(lambda parser: parser.Parse(xml_string, True))
+
+    def local_name(self, name: str) -> str:
+        """
+        Returns the name used by the compiled schema for an expat ('uri}Name') or ElementTree ('{uri}Name') name:
+        the local name in the target namespace, the full name otherwise (which matches no declaration).
+        """
+        local = self._local_names.get(name)
+        if local is None:
+            uri, _, local = name.lstrip('{').rpartition('}')
+            if uri != self.compiled_schema.namespace:
+                local = '{' + uri + '}' + local
+            self._local_names[name] = local
+        return local
+
+    def is_valid_tree(self, root) -> bool:
+        """
+        Checks a document already parsed by ElementTree, stopping at the first violation.
+        """
+        element = self.compiled_schema.roots.get(self.local_name(root.tag))
+        return element is not None and self._is_valid_element(element, root)
+
+    def _is_valid_element(self, element: CompiledElement, node) -> bool:
+        # Element.keys() tells whether there are attributes without creating the attrib dictionary of the element
+        if node.keys() or element.required_attributes:
+            if not self._are_valid_attributes(element, node.attrib):
+                return False
+        model = element.content_model
+        if model is None:
+            return element.untyped or (len(node) == 0 and element.accepts_text(node.text))
+        schema = self.compiled_schema
+        blank_texts = schema.blank_texts
+        if node.text not in blank_texts and not schema.is_blank(node.text):
+            return False
+
+        steps = element.steps
+        state = model.start
+        for child_node in node:
+            state, child = steps[state].get(child_node.tag) or element.step(state, child_node.tag)
+            if child is None:
+                return False
+            if child_node.tail not in blank_texts and not schema.is_blank(child_node.tail):
+                return False
+            if child.valid_texts is None or len(child_node) or child_node.keys():
+                if not child.untyped and not self._is_valid_element(child, child_node):
+                    return False
+            elif child_node.text not in child.valid_texts and not child.accepts_text(child_node.text):
+                # Simple elements are checked inline, as they are most of the document
+                return False
+        return model.accepting[state]
+
+    def _are_valid_attributes(self, element: CompiledElement, attributes) -> bool:
+        for attribute_name, value in attributes.items():
+            if not attribute_name.startswith('{' + XSI_NAMESPACE + '}'):
+                check = element.attributes.get(attribute_name)
+                if check is None or not check(value):
+                    return False
+        return all(attribute_name in attributes for attribute_name in element.required_attributes)
+
+    def _validate(self, feed) -> List[Violation]:
+        roots = self.compiled_schema.roots
+        local_names = self._local_names
+        reject = ContentModel.REJECT
+        violations = []
+
+        # The open elements: their compiled declaration (None if unknown, whose content is skipped), the state of
+        # their content model and their start position
+        elements: List[Optional[CompiledElement]] = []
+        states: List[int] = []
+        positions: List[Tuple[int, int]] = []
+        text: List[str] = []
+
+        parser = xml.parsers.expat.ParserCreate(namespace_separator='}')
+        parser.buffer_text = True
+
+        def report(message, position=None):
+            if position is None:
+                position = (parser.CurrentLineNumber, parser.CurrentColumnNumber)
+            violations.append(Violation(position[0], position[1], message))
+
+        def start_element(name, attributes):
+            local = local_names.get(name) or self.local_name(name)
+            if elements:
+                parent = elements[-1]
+                if parent is None or parent.untyped:
+                    # The content of unknown and untyped elements is not checked
+                    elements.append(None)
+                    states.append(reject)
+                    positions.append(None)
+                    return
+                model = parent.content_model
+                if model is None:
+                    element = None
+                    report(f"<{parent.name}> has a simple type and cannot contain <{local}>")
+                else:
+                    element = parent.children.get(local)
+                    if element is None:
+                        report(f"unexpected element <{local}> in <{parent.name}>")
+                    else:
+                        state = model.table[states[-1]].get(local)
+                        if state is None:
+                            state = model.step(states[-1], local)
+                        if state == reject:
+                            expected = model.expected(states[-1])
+                            report(f"element <{local}> not allowed here in <{parent.name}>; expected "
+                                   + (', '.join(f'<{child}>' for child in expected) if expected else 'no more elements'))
+                            state = model.resynchronize(local)
+                        states[-1] = state
+            else:
+                element = roots.get(local)
+                if element is None:
+                    report(f"unexpected root element <{local}>")
+
+            positions.append((parser.CurrentLineNumber, parser.CurrentColumnNumber))
+            elements.append(element)
+            if element is None:
+                states.append(reject)
+                return
+            if attributes or element.required_attributes:
+                check_attributes(element, attributes)
+            model = element.content_model
+            if model is not None:
+                states.append(model.start)
+                parser.CharacterDataHandler = complex_character_data
+            else:
+                states.append(reject)
+                text.clear()
+                parser.CharacterDataHandler = None if element.untyped else text.append
+
+        def check_attributes(element, attributes):
+            for attribute_name, value in attributes.items():
+                if attribute_name.startswith(XSI_NAMESPACE + '}'):
+                    continue
+                check = element.attributes.get(attribute_name)
+                if check is None:
+                    report(f"attribute {attribute_name} not allowed in <{element.name}>")
+                elif not check(value):
+                    report(f"invalid value '{value}' for attribute {attribute_name} of <{element.name}>")
+            for attribute_name in element.required_attributes:
+                if attribute_name not in attributes:
+                    report(f"missing required attribute {attribute_name} in <{element.name}>")
+
+        def end_element(name):
+            element = elements.pop()
+            state = states.pop()
+            position = positions.pop()
+            if element is not None and not element.untyped:
+                model = element.content_model
+                if model is not None:
+                    if state != reject and not model.accepting[state]:
+                        expected = model.expected(state)
+                        report(f"incomplete content in <{element.name}>; expected "
+                               + ', '.join(f'<{child}>' for child in expected), position)
+                else:
+                    value = ''.join(text)
+                    if not element.check_text(value):
+                        report(f"invalid value '{value}' for <{element.name}> (expected {element.type_description})",
+                               position)
+
+            # Back in the parent, only whitespace is allowed between elements
+            parent = elements[-1] if elements else None
+            parser.CharacterDataHandler = complex_character_data \
+                if parent is not None and parent.content_model is not None else None
+
+        def complex_character_data(data):
+            if not data.isspace():
+                report(f"text not allowed in <{elements[-1].name}>")
+
+        parser.StartElementHandler = start_element
+        parser.EndElementHandler = end_element
+        try:
+            feed(parser)
+        except xml.parsers.expat.ExpatError as error:
+            violations.append(Violation(error.lineno, error.offset,
+                                        f"not well-formed: {xml.parsers.expat.ErrorString(error.code)}"))
+        return violations
+
+
+def validate(source: str, schema_path: str = DEFAULT_SCHEMA_PATH) -> List[Violation]:
+    """
+    Validates a CMME file against the (cached) compiled schema.
+
+    Args:
+        source: The path of the CMME file.
+        schema_path: The XSD to validate against, resources/cmme.xsd by default.
+
+    Returns:
+        The list of violations, empty if the file is valid.
+    """
+    return Validator(CompiledSchema.load(schema_path)).validate_file(source)
+
+
+def validate_string(xml_string, schema_path: str = DEFAULT_SCHEMA_PATH) -> List[Violation]:
+    """
+    Validates a CMME document held in memory against the (cached) compiled schema.
+    """
+    return Validator(CompiledSchema.load(schema_path)).validate_string(xml_string)
+
+
+def main(argv: List[str]) -> int:
+    status = 0
+    for path in argv:
+        for violation in validate(path):
+            print(f"{path}:{violation}")
+            status = 1
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
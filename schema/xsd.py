@@ -0,0 +1,159 @@
+from typing import Dict, List, Optional
+import xml.etree.ElementTree as ET
+
+XS = '{http://www.w3.org/2001/XMLSchema}'
+
+
+class Particle:
+    """
+    Base class for the parts of a content model, with their occurrence bounds (max_occurs is None when unbounded).
+    """
+    def __init__(self, min_occurs: int = 1, max_occurs: Optional[int] = 1):
+        self.min_occurs = min_occurs
+        self.max_occurs = max_occurs
+
+    @property
+    def repeats(self) -> bool:
+        return self.max_occurs is None or self.max_occurs > 1
+
+    @staticmethod
+    def parse_occurs(element: ET.Element):
+        min_occurs = int(element.get('minOccurs', '1'))
+        max_occurs = element.get('maxOccurs', '1')
+        return min_occurs, None if max_occurs == 'unbounded' else int(max_occurs)
+
+
+class SimpleType:
+    """
+    Represents a simple type: a built-in XSD type or a restriction of one by patterns.
+    """
+    def __init__(self, name: Optional[str], base: str, patterns: List[str]):
+        self.name = name
+        self.base = base
+        self.patterns = patterns
+
+    @classmethod
+    def parse(cls, element: ET.Element) -> 'SimpleType':
+        restriction_el = element.find(XS + 'restriction')
+        patterns = [pattern_el.get('value') for pattern_el in restriction_el.findall(XS + 'pattern')]
+        return cls(element.get('name'), restriction_el.get('base'), patterns)
+
+
+class AttributeDecl:
+    def __init__(self, name: str, type_name: str, required: bool):
+        self.name = name
+        self.type_name = type_name
+        self.required = required
+
+    @classmethod
+    def parse(cls, element: ET.Element) -> 'AttributeDecl':
+        return cls(element.get('name'), element.get('type'), element.get('use') == 'required')
+
+
+class ElementDecl(Particle):
+    """
+    Represents an element declaration. Elements are either simple (type_name or simple_type is set), complex
+    (content is the content model of their complexType) or untyped (an empty or free-text marker such as <Lacuna/>).
+    """
+    def __init__(self, name: str, min_occurs: int, max_occurs: Optional[int], type_name: Optional[str] = None,
+                 simple_type: Optional[SimpleType] = None, content: Optional[Particle] = None,
+                 attributes: Optional[List[AttributeDecl]] = None, complex: bool = False):
+        super().__init__(min_occurs, max_occurs)
+        self.name = name
+        self.type_name = type_name
+        self.simple_type = simple_type
+        self.content = content
+        self.attributes = attributes if attributes is not None else []
+        self.complex = complex
+
+    @classmethod
+    def parse(cls, element: ET.Element) -> 'ElementDecl':
+        min_occurs, max_occurs = cls.parse_occurs(element)
+        simple_type_el = element.find(XS + 'simpleType')
+        simple_type = SimpleType.parse(simple_type_el) if simple_type_el is not None else None
+
+        content = None
+        attributes = []
+        complex_type_el = element.find(XS + 'complexType')
+        if complex_type_el is not None:
+            for child_el in complex_type_el:
+                if child_el.tag == XS + 'attribute':
+                    attributes.append(AttributeDecl.parse(child_el))
+                else:
+                    content = parse_particle(child_el)
+
+        return cls(element.get('name'), min_occurs, max_occurs, element.get('type'), simple_type, content,
+                   attributes, complex_type_el is not None)
+
+
+class ModelGroup(Particle):
+    """
+    Represents an xs:sequence or an xs:choice.
+    """
+    def __init__(self, kind: str, particles: List[Particle], min_occurs: int = 1, max_occurs: Optional[int] = 1):
+        super().__init__(min_occurs, max_occurs)
+        self.kind = kind
+        self.particles = particles
+
+
+class GroupRef(Particle):
+    """
+    Represents a reference to a named xs:group.
+    """
+    def __init__(self, name: str, min_occurs: int = 1, max_occurs: Optional[int] = 1):
+        super().__init__(min_occurs, max_occurs)
+        self.name = name
+
+
+def parse_particle(element: ET.Element) -> Particle:
+    min_occurs, max_occurs = Particle.parse_occurs(element)
+    if element.tag == XS + 'element':
+        return ElementDecl.parse(element)
+    if element.tag == XS + 'group':
+        return GroupRef(element.get('ref'), min_occurs, max_occurs)
+    if element.tag in (XS + 'sequence', XS + 'choice'):
+        return ModelGroup(element.tag[len(XS):], [parse_particle(child_el) for child_el in element],
+                          min_occurs, max_occurs)
+    raise ValueError(f"Unsupported schema construct: {element.tag}")
+
+
+class Schema:
+    """
+    The subset of XML Schema used by cmme.xsd: global elements, named groups and named simple types.
+    """
+    def __init__(self, target_namespace: str, elements: Dict[str, ElementDecl], groups: Dict[str, Particle],
+                 simple_types: Dict[str, SimpleType]):
+        self.target_namespace = target_namespace
+        self.elements = elements
+        self.groups = groups
+        self.simple_types = simple_types
+
+    @classmethod
+    def load(cls, path: str) -> 'Schema':
+        root = ET.parse(path).getroot()
+        elements = {}
+        groups = {}
+        simple_types = {}
+        for child_el in root:
+            if child_el.tag == XS + 'element':
+                elements[child_el.get('name')] = ElementDecl.parse(child_el)
+            elif child_el.tag == XS + 'group':
+                # A named group holds exactly one sequence or choice
+                groups[child_el.get('name')] = parse_particle(child_el[0])
+            elif child_el.tag == XS + 'simpleType':
+                simple_types[child_el.get('name')] = SimpleType.parse(child_el)
+
+        return cls(root.get('targetNamespace'), elements, groups, simple_types)
+
+    def resolve_simple_type(self, element_decl: ElementDecl) -> Optional[SimpleType]:
+        """
+        Returns the simple type of an element, or None for complex and untyped elements. Built-in types are
+        returned as a SimpleType without patterns.
+        """
+        if element_decl.simple_type is not None:
+            return element_decl.simple_type
+        if element_decl.type_name is None:
+            return None
+        if element_decl.type_name.startswith('xs:'):
+            return SimpleType(element_decl.type_name, element_decl.type_name, [])
+        return self.simple_types[element_decl.type_name]
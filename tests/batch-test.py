@@ -0,0 +1,116 @@
+import gc
+import os
+import pickle
+import sys
+import tempfile
+import unittest
+from multiprocessing.shared_memory import SharedMemory
+
+from batch.catalog import catalog_record, find_files, scan_directory, scan_files
+from batch.runner import parse_file, parse_files
+from batch.transport import SharedVoice, SharedVoiceHandle, attach_voices, share_voices
+from model import Piece
+from model.columns import EVENT_KIND_CODES, NOTE_TYPE_CODES, VoiceColumns, diatonic_step
+from model.music_section import Voice
+from model.pitch import Pitch
+
+
+class TestBatch(unittest.TestCase):
+    def resource(self, filename):
+        return os.path.join(os.path.dirname(__file__), 'resources', filename)
+
+    def test_voice_columns(self):
+        piece = parse_file(self.resource('Anonymous-CibavitEos-BrusBRIV922.cmme.xml'))
+        events = piece.music_sections[1].content.voices[0].event_list.events
+        columns = VoiceColumns.from_events(events)
+        self.assertEqual(len(events), len(columns))
+        self.assertEqual(28, diatonic_step(Pitch('A', 4)))
+        self.assertEqual(27, diatonic_step(Pitch('G', 3)))
+
+        buffer = bytearray(columns.nbytes + 2)
+        self.assertEqual(columns.nbytes + 2, columns.write_into(buffer, 2))
+        read, end = VoiceColumns.from_buffer(buffer, 2)
+        self.assertEqual(columns.nbytes + 2, end)
+        self.assertEqual(list(columns.kind), list(read.kind))
+        self.assertEqual(list(columns.pitch), list(read.pitch))
+        for index, event in enumerate(events):
+            self.assertEqual(EVENT_KIND_CODES[type(event).__name__], read.kind[index])
+            if type(event).__name__ == 'NoteEvent':
+                self.assertEqual(NOTE_TYPE_CODES[event.note_type], read.note_type[index])
+                self.assertEqual(diatonic_step(event.pitch), read.pitch[index])
+        read.release()
+
+    def test_shared_voices(self):
+        piece = parse_file(self.resource('LaRue-OSalutarisHostia.cmme.xml'))
+        expected = [voice.event_list.events for voice in piece.music_sections[0].content.voices]
+
+        share_voices(piece)
+        handles = list(piece.music_sections[0].content.voices)
+        self.assertTrue(all(isinstance(handle, SharedVoiceHandle) for handle in handles))
+        attach_voices(piece)
+        voices = piece.music_sections[0].content.voices
+        self.assertTrue(all(isinstance(voice, SharedVoice) for voice in voices))
+        self.assertEqual(expected, [voice.event_list.events for voice in voices])
+
+        # The blocks are unlinked once attached, and a copy of a shared voice is an ordinary Voice
+        with self.assertRaises(FileNotFoundError):
+            SharedMemory(handles[0].name)
+        copy = pickle.loads(pickle.dumps(voices[0]))
+        self.assertIs(Voice, type(copy))
+        self.assertEqual(expected[0], copy.event_list.events)
+        for voice in voices:
+            voice.close()
+
+    def test_missing_block(self):
+        unraisable = []
+        hook, sys.unraisablehook = sys.unraisablehook, unraisable.append
+        try:
+            with self.assertRaises(FileNotFoundError):
+                SharedVoice(SharedVoiceHandle('cmme2mei_missing_block', 1, []))
+            gc.collect()
+        finally:
+            sys.unraisablehook = hook
+        # The voice that failed to map its block is collected without errors
+        self.assertEqual([], unraisable)
+
+    def test_parse_files(self):
+        filenames = ['Anonymous-CibavitEos-BrusBRIV922.cmme.xml', 'LaRue-OSalutarisHostia.cmme.xml',
+                     'Editorial-Synthetic.cmme.xml']
+        paths = [self.resource(filename) for filename in filenames]
+        for shared_memory in (False, True):
+            results = list(parse_files(paths, max_workers=2, shared_memory=shared_memory))
+            self.assertEqual(paths, [path for path, _ in results])
+            for path, piece in results:
+                with open(path) as file:
+                    expected = Piece.parse(file.read())
+                for music_section, expected_section in zip(piece.music_sections, expected.music_sections):
+                    self.assertEqual([voice.event_list.events for voice in expected_section.content.voices],
+                                     [voice.event_list.events for voice in music_section.content.voices])
+
+    def test_scan_directory(self):
+        directory = os.path.join(os.path.dirname(__file__), 'resources')
+        records = [catalog_record(path, metadata, error) for path, metadata, error in scan_directory(directory, 2)]
+        self.assertEqual(find_files(directory), [record['path'] for record in records])
+        self.assertEqual(['Cibavit eos', 'Editorial test', 'O salutaris hostia'],
+                         [record['title'] for record in records])
+        self.assertEqual(['Wiering', 'Occo Codex'], [variant_version['id']
+                                                     for variant_version in records[0]['variant_versions']])
+
+        _, metadata, error = next(scan_files([os.path.join(directory, 'missing.cmme.xml')], max_workers=1))
+        self.assertIsNone(metadata)
+        self.assertIn('FileNotFoundError', error)
+
+        # The errors of the model are reported too (int(None) for an empty NumVoices)
+        with open(self.resource('Anonymous-CibavitEos-BrusBRIV922.cmme.xml')) as file:
+            xml_string = file.read().replace('<NumVoices>4</NumVoices>', '<NumVoices/>', 1)
+        with tempfile.TemporaryDirectory() as temporary:
+            path = os.path.join(temporary, 'empty.cmme.xml')
+            with open(path, 'w') as file:
+                file.write(xml_string)
+            _, metadata, error = next(scan_files([path], max_workers=1))
+        self.assertIsNone(metadata)
+        self.assertIn('TypeError', error)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import pickle
+import unittest
+from fractions import Fraction
+
+from model import Piece
+from model.checkpoints import Checkpoints, VoiceState, nominal_length
+from model.hashing import forget
+from model.proportion import Proportion
+
+RESOURCES = os.path.join(os.path.dirname(__file__), 'resources')
+
+
+def parse(filename):
+    with open(os.path.join(RESOURCES, filename)) as file:
+        return Piece.parse(file.read())
+
+
+def replay(events, index):
+    state = VoiceState()
+    for event in events[:index]:
+        if event is not None:
+            state.advance(event)
+    return state
+
+
+class TestCheckpoints(unittest.TestCase):
+    def test_states_match_a_replay(self):
+        for filename in sorted(os.listdir(RESOURCES)):
+            piece = parse(filename)
+            for music_section in piece.music_sections:
+                for voice in music_section.content.voices:
+                    events = voice.event_list.events
+                    for interval in (1, 7, 64):
+                        with self.subTest(filename=filename, voice=voice.voice_num, interval=interval):
+                            checkpoints = Checkpoints.build(events, interval)
+                            self.assertEqual(-(-len(events) // interval), len(checkpoints.states))
+                            for index in range(0, len(events) + 1, 5):
+                                self.assertEqual(replay(events, index), checkpoints.state_at(events, index))
+
+    def test_state(self):
+        piece = parse('LaRue-OSalutarisHostia.cmme.xml')
+        voices = piece.music_sections[0].content.voices
+        # The voices of a section have the same length
+        self.assertEqual({Fraction(136)}, {voice.event_list.state_at(len(voice.event_list.events)).onset
+                                           for voice in voices})
+        state = voices[3].event_list.state_at(20)
+        self.assertEqual('Frnd', state.clef.appearance)
+        self.assertEqual(['Bmol', 'Bmol'], [clef.appearance for clef in state.signature])
+        self.assertEqual('C', state.mensuration.main_symbol)
+        with self.assertRaises(IndexError):
+            voices[3].event_list.state_at(len(voices[3].event_list.events) + 1)
+
+    def test_nominal_lengths(self):
+        self.assertEqual(Fraction(1, 2), nominal_length('Semiminima', {}))
+        self.assertEqual(Fraction(4), nominal_length('Brevis', None))
+        self.assertEqual(Fraction(6), nominal_length('Brevis', {'tempus': '3', 'prolatio': '2'}))
+        self.assertEqual(Fraction(18), nominal_length('Longa', {'modus_minor': '2', 'tempus': '3', 'prolatio': '3'}))
+
+    def test_memoized_and_pickled(self):
+        piece = parse('LaRue-OSalutarisHostia.cmme.xml')
+        event_list = piece.music_sections[0].content.voices[0].event_list
+        self.assertEqual(Proportion(4, 1), event_list.events[4].length)
+        checkpoints = event_list.checkpoints(8)
+        self.assertIs(checkpoints, event_list.checkpoints(8))
+        copy = pickle.loads(pickle.dumps(piece)).music_sections[0].content.voices[0].event_list
+        self.assertEqual(checkpoints.states, copy.checkpoints(8).states)
+        self.assertTrue(event_list.same_content(copy))
+        forget(event_list)
+        self.assertIsNot(checkpoints, event_list.checkpoints(8))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,6 @@
 import unittest
 import os
+import tempfile
 
 from model import Piece
 from model.clef import ClefEvent
@@ -9,6 +10,9 @@ from model.modern_text import ModernText
 from model.note import NoteEvent
 from model.pitch import Pitch
 from model.original_text import OriginalTextEvent
+from model.piece import music_section_ranges
+from model.reading import EditorialData, VariantReadings
+from model.rest import RestEvent
 
 
 class TestCMMEImporter(unittest.TestCase):
@@ -107,6 +111,98 @@ class TestCMMEImporter(unittest.TestCase):
 
         #TO-DO Finish checking it
 
+    def test_import_score_OSalutarisHostia(self):
+        piece = self.import_score('LaRue-OSalutarisHostia.cmme.xml')
+
+        # The variant readings keep the events of their Music element
+        first_event = piece.music_sections[0].content.voices[0].event_list.events[0]
+        self.assertIsInstance(first_event, VariantReadings)
+        self.assertEqual(['DEFAULT'], first_event.readings[0].variant_version_ids)
+        self.assertEqual(ClefEvent(appearance='G', staff_loc=3, pitch=Pitch('G', 3), signature=False,
+                                   event_attributes=EventAttributes()), first_event.readings[0].music_events[0])
+        self.assertEqual(['UppsU 76b'], first_event.readings[1].variant_version_ids)
+
+    def test_import_score_editorial(self):
+        piece = self.import_score('Editorial-Synthetic.cmme.xml')
+
+        cantus_events = piece.music_sections[0].content.voices[0].event_list.events
+        self.assertEqual(7, len(cantus_events))
+        self.assertEqual(EventAttributes(editorial=True, editorial_commentary='Clef supplied by the editor'),
+                         cantus_events[0].event_attributes)
+
+        # New reading replacing a lacuna
+        lacuna = cantus_events[2]
+        self.assertIsInstance(lacuna, EditorialData)
+        self.assertEqual([NoteEvent('Brevis', Pitch('D', 3), None, None, None, EventAttributes(editorial=True))],
+                         lacuna.new_reading)
+        self.assertTrue(lacuna.original_reading.lacuna)
+        self.assertEqual([], lacuna.original_reading.music_events)
+
+        # New reading correcting an error of the source
+        correction = cantus_events[4]
+        self.assertEqual(2, len(correction.new_reading))
+        self.assertFalse(correction.original_reading.lacuna)
+        self.assertEqual([NoteEvent('Semibrevis', Pitch('A', 3), None, None, None)],
+                         correction.original_reading.music_events)
+
+        # Variant with a lacuna in one of the sources
+        variants = cantus_events[5]
+        self.assertIsInstance(variants, VariantReadings)
+        self.assertEqual(1, len(variants.readings[0].music_events))
+        self.assertTrue(variants.readings[1].lacuna)
+        self.assertEqual([], variants.readings[1].music_events)
+
+        # MultiEvent inside a new reading
+        multi_event_correction = cantus_events[6]
+        self.assertEqual(2, len(multi_event_correction.new_reading[0].events))
+        self.assertEqual(2, len(multi_event_correction.original_reading.music_events))
+
+        tenor_events = piece.music_sections[0].content.voices[1].event_list.events
+        self.assertEqual(RestEvent('Brevis', 2, 1, 3, 1, event_attributes=EventAttributes(editorial=True)),
+                         tenor_events[1].new_reading[0])
+        self.assertEqual(2, len(tenor_events[2].readings[0].music_events))
+
+    def test_parse_parallel(self):
+        piece = self.import_score('Anonymous-CibavitEos-BrusBRIV922.cmme.xml')
+        with open(self.resource_path) as file:
+            xml_string = file.read()
+        ranges = music_section_ranges(xml_string)
+        self.assertEqual(6, len(ranges))
+        self.assertTrue(all(xml_string[start:end].endswith('</MusicSection>') for start, end in ranges))
+
+        parallel_piece = Piece.parse_parallel(xml_string, max_workers=2)
+        self.assertEqual(piece.general_data.title, parallel_piece.general_data.title)
+        self.assertEqual(piece.voice_data.num_voices, parallel_piece.voice_data.num_voices)
+        self.assertEqual(len(piece.music_sections), len(parallel_piece.music_sections))
+        for section, parallel_section in zip(piece.music_sections, parallel_piece.music_sections):
+            self.assertEqual(section.content.section_type, parallel_section.content.section_type)
+            self.assertEqual([voice.event_list.events for voice in section.content.voices],
+                             [voice.event_list.events for voice in parallel_section.content.voices])
+
+    def test_scan_metadata(self):
+        piece = self.import_score('Anonymous-CibavitEos-BrusBRIV922.cmme.xml')
+        metadata = Piece.scan_metadata(self.resource_path)
+        self.assertEqual(piece.cmme_version, metadata.cmme_version)
+        self.assertEqual(piece.general_data.title, metadata.general_data.title)
+        self.assertEqual(piece.general_data.editor, metadata.general_data.editor)
+        self.assertEqual([variant_version.id_ for variant_version in piece.general_data.variant_versions],
+                         [variant_version.id_ for variant_version in metadata.general_data.variant_versions])
+        self.assertEqual([voice.name for voice in piece.voice_data.voices],
+                         [voice.name for voice in metadata.voice_data.voices])
+
+    def test_scan_metadata_stops_at_music(self):
+        with open(os.path.join(os.path.dirname(__file__), 'resources', 'LaRue-OSalutarisHostia.cmme.xml')) as file:
+            xml_string = file.read()
+        # Everything after the first MusicSection starts is garbage: it must not be read
+        start = xml_string.index('<MusicSection>') + len('<MusicSection>')
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'truncated.cmme.xml')
+            with open(path, 'w') as file:
+                file.write(xml_string[:start] + '<' * (1 << 16))
+            metadata = Piece.scan_metadata(path, chunk_size=256)
+        self.assertEqual('O salutaris hostia', metadata.general_data.title)
+        self.assertEqual(4, metadata.voice_data.num_voices)
+
 
 if __name__ == '__main__':
     unittest.main()
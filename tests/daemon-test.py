@@ -0,0 +1,81 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from batch.client import Client, main
+from batch.daemon import ConversionServer
+from cmme2mei import cmme2mei
+
+RESOURCES = os.path.join(os.path.dirname(__file__), 'resources')
+
+
+class TestDaemon(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.socket_path = os.path.join(self.directory, 'cmme2mei.sock')
+        self.server = ConversionServer(self.socket_path)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        shutil.rmtree(self.directory)
+
+    def test_conversions(self):
+        broken = os.path.join(self.directory, 'broken.cmme.xml')
+        with open(os.path.join(RESOURCES, 'LaRue-OSalutarisHostia.cmme.xml')) as file:
+            xml_string = file.read()
+        with open(broken, 'w') as file:
+            file.write(xml_string.replace('<EventList>', '<EventList><Foo/>', 1))
+
+        paths = [os.path.join(RESOURCES, filename) for filename in sorted(os.listdir(RESOURCES))]
+        with Client(self.socket_path, timeout=30) as client:
+            responses = list(client.convert_all(paths + [broken, os.path.join(self.directory, 'missing.cmme.xml')]))
+            # The same connection serves further requests
+            self.assertTrue(client.convert(paths[0], validate=True)['ok'])
+        self.assertTrue(all(response['ok'] and not response['diagnostics'] for response in responses[:len(paths)]))
+        self.assertTrue(all(response['mei'].startswith('<?xml') for response in responses[:len(paths)]))
+        self.assertEqual([path for path in paths + [broken]], [response['path'] for response in responses[:-1]])
+        self.assertFalse(responses[-2]['ok'])
+        self.assertEqual([{'location': '/Piece/MusicSection/MensuralMusic/Voice[1]/EventList/Foo',
+                           'message': 'unknown event Foo'}], responses[-2]['diagnostics'])
+        self.assertFalse(responses[-1]['ok'])
+        self.assertTrue(responses[-1]['error'].startswith('FileNotFoundError'))
+
+    def test_client_writes_mei(self):
+        path = os.path.join(self.directory, 'LaRue.cmme.xml')
+        shutil.copy(os.path.join(RESOURCES, 'LaRue-OSalutarisHostia.cmme.xml'), path)
+        output = os.path.join(self.directory, 'output')
+        os.mkdir(output)
+
+        # Next to the input, or in the directory given with -o
+        self.assertEqual(0, main([self.socket_path, os.path.relpath(path)]))
+        self.assertEqual(0, main([self.socket_path, '-o', output, path]))
+        for written in (os.path.join(self.directory, 'LaRue.mei'), os.path.join(output, 'LaRue.mei')):
+            with open(written, encoding='utf-8') as file:
+                self.assertEqual(cmme2mei(path), file.read())
+
+        # The daemon is sent absolute paths
+        with Client(self.socket_path, timeout=30) as client:
+            self.assertEqual(path, client.convert(os.path.relpath(path))['path'])
+
+    def test_concurrent_clients_and_shutdown(self):
+        path = os.path.join(RESOURCES, 'Anonymous-CibavitEos-BrusBRIV922.cmme.xml')
+        with Client(self.socket_path, timeout=30) as first, Client(self.socket_path, timeout=30) as second:
+            self.assertTrue(first.convert(path)['ok'])
+            self.assertTrue(second.convert(path)['ok'])
+            second.shutdown()
+        self.thread.join(timeout=30)
+        self.assertFalse(self.thread.is_alive())
+
+    def test_running_daemon_is_not_replaced(self):
+        with self.assertRaises(OSError):
+            ConversionServer(self.socket_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+import contextlib
+import os
+import shutil
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+
+from analysis.notes import notes
+from batch.dataset import NPY_HEADER_SIZE, NPY_MAGIC, Dataset, DatasetWriter, EventRecorder, main, read_npy_header
+from batch.pipeline import default_pipeline
+from model import Piece
+from model.columns import EVENT_KIND_CODES, MISSING, NOTE_TYPE_CODES, diatonic_step
+from model.multievent import MultiEvent
+from model.music_section import EventList, Voice
+from model.note import NoteEvent
+from model.pitch import Pitch
+from model.proportion import Proportion
+from model.rest import RestEvent
+from model.visitor import Traversal
+
+RESOURCES = os.path.join(os.path.dirname(__file__), 'resources')
+FILENAMES = ('Anonymous-CibavitEos-BrusBRIV922.cmme.xml', 'LaRue-OSalutarisHostia.cmme.xml',
+             'Editorial-Synthetic.cmme.xml')
+
+
+class TestDataset(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_records(self):
+        chord = MultiEvent([NoteEvent('Brevis', Pitch('C', 3), None, None, None, length=Proportion(2, 1)),
+                            NoteEvent('Brevis', Pitch('E', 3), None, None, None)])
+        recorder = EventRecorder()
+        Traversal(recorder).walk(Voice(2, [], EventList([RestEvent('Minima', 1, 2, None, None), chord])))
+        self.assertEqual([(0, 2, 0, 4)], recorder.voices)
+        columns = {name: list(values) for name, values in recorder.columns.items()}
+        self.assertEqual([0, 0, 1, 1], columns['depth'])
+        self.assertEqual([EVENT_KIND_CODES['RestEvent'], EVENT_KIND_CODES['MultiEvent'], EVENT_KIND_CODES['NoteEvent'],
+                          EVENT_KIND_CODES['NoteEvent']], columns['kind'])
+        self.assertEqual([NOTE_TYPE_CODES['Minima'], MISSING, NOTE_TYPE_CODES['Brevis'], NOTE_TYPE_CODES['Brevis']],
+                         columns['note_type'])
+        self.assertEqual([MISSING, MISSING, 23, 25], columns['pitch'])
+        self.assertEqual([1, MISSING, 2, MISSING], columns['length_num'])
+        self.assertEqual([2, MISSING, 1, MISSING], columns['length_den'])
+
+    def test_corpus(self):
+        invalid = os.path.join(self.directory, 'invalid.cmme.xml')
+        with open(invalid, 'w') as file:
+            file.write('<Piece>')
+        with DatasetWriter(self.directory) as writer:
+            for filename in FILENAMES[:2]:
+                writer.add_file(os.path.join(RESOURCES, filename))
+            # A file that cannot be parsed leaves no rows
+            with self.assertRaises(ET.ParseError):
+                writer.add_file(invalid)
+            with open(os.path.join(RESOURCES, FILENAMES[2])) as file:
+                self.assertEqual(2, writer.add(Piece.parse(file.read()), 'synthetic'))
+
+        with open(os.path.join(self.directory, 'voices.npy'), 'rb') as file:
+            header = file.read(NPY_HEADER_SIZE)
+        self.assertTrue(header.startswith(NPY_MAGIC))
+        dtype, shape, offset = read_npy_header(header)
+        self.assertEqual(('<i8', 5, NPY_HEADER_SIZE), (dtype, shape[1], offset))
+
+        with Dataset(self.directory) as dataset:
+            self.assertEqual([os.path.abspath(os.path.join(RESOURCES, filename)) for filename in FILENAMES[:2]] +
+                             ['synthetic'], dataset.keys)
+            stop = 0
+            for index, filename in enumerate(FILENAMES):
+                with open(os.path.join(RESOURCES, filename)) as file:
+                    piece = Piece.parse(file.read())
+                start, stop = dataset.piece(index)
+                self.assertEqual(index, dataset.column('piece')[start])
+                voices = [(section, voice.voice_num) for section, music_section in enumerate(piece.music_sections)
+                          for voice in getattr(music_section.content, 'voices', None) or []]
+                self.assertEqual(voices, [(section, voice) for section, voice, _, _ in dataset.voices_of(index)])
+                for (section, voice_num), (_, _, voice_start, voice_stop) in zip(voices, dataset.voices_of(index)):
+                    voice = next(voice for voice in piece.music_sections[section].content.voices
+                                 if voice.voice_num == voice_num)
+                    kinds = dataset.column('kind')[voice_start:voice_stop]
+                    pitches = dataset.column('pitch')[voice_start:voice_stop]
+                    self.assertEqual([diatonic_step(note.pitch) for note in notes(voice.event_list.events)],
+                                     [pitch for kind, pitch in zip(kinds, pitches)
+                                      if kind == EVENT_KIND_CODES['NoteEvent']])
+                    kinds.release()
+                    pitches.release()
+            self.assertEqual(len(dataset.column('kind')), stop)
+
+    def test_main(self):
+        broken = os.path.join(self.directory, 'broken.cmme.xml')
+        with open(os.path.join(RESOURCES, FILENAMES[1])) as file:
+            xml_string = file.read()
+        with open(broken, 'w') as file:
+            file.write(xml_string.replace('<EventList>', '<EventList><Foo/>', 1))
+        output = os.path.join(self.directory, 'dataset')
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stderr(devnull), \
+                contextlib.redirect_stdout(devnull):
+            # The unknown event fails its file only
+            self.assertEqual(1, main([output, broken, os.path.join(RESOURCES, FILENAMES[0])]))
+        with Dataset(output) as dataset:
+            self.assertEqual([os.path.abspath(os.path.join(RESOURCES, FILENAMES[0]))], dataset.keys)
+
+    def test_empty_dataset(self):
+        output = os.path.join(self.directory, 'empty')
+        DatasetWriter(output).close()
+        with Dataset(output) as dataset:
+            self.assertEqual(0, len(dataset))
+            self.assertEqual(0, len(dataset.column('kind')))
+            self.assertEqual(0, len(dataset.voices))
+            self.assertEqual(0, len(dataset.pieces))
+
+    def test_pipeline(self):
+        paths = [os.path.join(RESOURCES, filename) for filename in FILENAMES]
+        expected = os.path.join(self.directory, 'expected')
+        with DatasetWriter(expected) as writer:
+            for path in paths:
+                writer.add_file(path)
+        written = os.path.join(self.directory, 'written')
+        with DatasetWriter(written) as writer:
+            pipeline = default_pipeline(dataset=writer)
+            self.assertEqual([0, 1, 2], [pipeline.run_file(path)['dataset'] for path in paths])
+        for filename in sorted(os.listdir(expected)):
+            with open(os.path.join(expected, filename), 'rb') as file:
+                with open(os.path.join(written, filename), 'rb') as other:
+                    self.assertEqual(file.read(), other.read(), filename)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import random
+import unittest
+
+from analysis.diff import EventEdit, VoiceDiff, diff_events, diff_pieces, matches
+from model import Piece
+from model.pitch import Pitch
+
+RESOURCES = os.path.join(os.path.dirname(__file__), 'resources')
+
+
+def lcs_length(a, b):
+    lengths = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
+    for i, a_item in enumerate(a):
+        for j, b_item in enumerate(b):
+            lengths[i + 1][j + 1] = (lengths[i][j] + 1 if a_item == b_item else
+                                     max(lengths[i][j + 1], lengths[i + 1][j]))
+    return lengths[-1][-1]
+
+
+class TestDiff(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open(os.path.join(RESOURCES, 'Anonymous-CibavitEos-BrusBRIV922.cmme.xml')) as file:
+            cls.xml_string = file.read()
+
+    def test_matches_are_a_longest_common_subsequence(self):
+        generator = random.Random(0)
+        for _ in range(500):
+            a = [generator.randrange(4) for _ in range(generator.randrange(30))]
+            b = [generator.randrange(4) for _ in range(generator.randrange(30))]
+            found = matches(a, b)
+            self.assertTrue(all(a[i] == b[j] for i, j in found))
+            self.assertTrue(all(i < next_i and j < next_j for (i, j), (next_i, next_j) in zip(found, found[1:])))
+            self.assertEqual(lcs_length(a, b), len(found))
+
+    def test_diff_events(self):
+        old = list('abcdefg')
+        new = list('abXdeYfg')
+        self.assertEqual([EventEdit(EventEdit.MODIFY, 2, 2, 'c', 'X'), EventEdit(EventEdit.INSERT, 5, 5, None, 'Y')],
+                         diff_events(old, new))
+        self.assertEqual([EventEdit(EventEdit.DELETE, 0, 0, 'a', None)], diff_events(old, old[1:]))
+
+    def test_identical_pieces(self):
+        self.assertFalse(diff_pieces(Piece.parse(self.xml_string), Piece.parse(self.xml_string)))
+
+    def test_diff_pieces(self):
+        old, new = Piece.parse(self.xml_string), Piece.parse(self.xml_string)
+        events = new.music_sections[3].content.voices[1].event_list.events
+        index, note = next((index, event) for index, event in enumerate(events)
+                           if type(event).__name__ == 'NoteEvent')
+        note.pitch = Pitch('C', 2)
+        deleted = events.pop(index + 1)
+        removed_voice = new.music_sections[5].content.voices.pop()
+
+        piece_diff = diff_pieces(old, new)
+        self.assertFalse(piece_diff.metadata_changed)
+        self.assertEqual(([], []), (piece_diff.sections_added, piece_diff.sections_removed))
+        changed, removed = piece_diff.voices
+        self.assertEqual((3, 2, VoiceDiff.CHANGED), (changed.section, changed.voice_num, changed.status))
+        old_events = old.music_sections[3].content.voices[1].event_list.events
+        self.assertEqual([EventEdit(EventEdit.MODIFY, index, index, old_events[index], note),
+                          EventEdit(EventEdit.DELETE, index + 1, index + 1, deleted, None)], changed.edits)
+        self.assertEqual((5, removed_voice.voice_num, VoiceDiff.REMOVED),
+                         (removed.section, removed.voice_num, removed.status))
+        self.assertEqual(len(removed_voice.event_list.events), len(removed.edits))
+
+
+if __name__ == '__main__':
+    unittest.main()
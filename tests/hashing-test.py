@@ -0,0 +1,99 @@
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from analysis.duplicates import duplicate_pieces, duplicate_sections, hash_files
+from batch.transport import attach_voices, share_voices
+from model import Piece
+from model.hashing import MEMO, content_hash, forget, music_hash
+from model.pitch import Pitch
+
+RESOURCES = os.path.join(os.path.dirname(__file__), 'resources')
+
+
+class TestHashing(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open(os.path.join(RESOURCES, 'Anonymous-CibavitEos-BrusBRIV922.cmme.xml')) as file:
+            cls.xml_string = file.read()
+
+    def test_equal_pieces_have_equal_hashes(self):
+        first, second = Piece.parse(self.xml_string), Piece.parse(self.xml_string)
+        self.assertIsNot(first, second)
+        self.assertEqual(content_hash(first), content_hash(second))
+        self.assertTrue(first.same_content(second))
+        self.assertEqual(first.digest(), second.digest())
+        # The nodes are mutable: they compare and hash by identity
+        self.assertNotEqual(first, second)
+        self.assertEqual(2, len({first, second}))
+        # The digest does not depend on the process
+        self.assertEqual(content_hash(first), content_hash(pickle.loads(pickle.dumps(Piece.parse(self.xml_string)))))
+        self.assertFalse(first.music_sections[0].same_content(first.music_sections[1]))
+
+    def test_incremental_hashing(self):
+        piece = Piece.parse(self.xml_string)
+        before = content_hash(piece)
+        sections = [content_hash(music_section) for music_section in piece.music_sections]
+
+        music_section = piece.music_sections[1]
+        voice = music_section.content.voices[0]
+        note = next(event for event in voice.event_list.events if type(event).__name__ == 'NoteEvent')
+        note.pitch = Pitch('C', 1)
+        # The digests are memoized until they are forgotten
+        self.assertEqual(before, content_hash(piece))
+        forget(voice.event_list, voice, music_section, piece)
+        self.assertIn(MEMO, vars(piece.music_sections[0]))
+        self.assertNotEqual(before, content_hash(piece))
+        self.assertEqual(sections[0], content_hash(piece.music_sections[0]))
+        self.assertNotEqual(sections[1], content_hash(music_section))
+
+    def test_changed_node_in_a_set(self):
+        piece = Piece.parse(self.xml_string)
+        voice = piece.music_sections[1].content.voices[0]
+        voices = {voice}
+        voice.digest()
+        voice.voice_num += 1
+        # A change does not make a node unequal to itself, nor lose it in a set
+        self.assertIn(voice, voices)
+        self.assertEqual(voice, voice)
+
+    def test_music_hash(self):
+        renamed = Piece.parse(self.xml_string.replace('<Title>', '<Title>Another ', 1))
+        piece = Piece.parse(self.xml_string)
+        self.assertNotEqual(content_hash(piece), content_hash(renamed))
+        self.assertEqual(music_hash(piece), music_hash(renamed))
+
+    def test_shared_voices(self):
+        piece = Piece.parse(self.xml_string)
+        expected = content_hash(Piece.parse(self.xml_string))
+        shared = attach_voices(share_voices(piece))
+        try:
+            self.assertEqual(expected, content_hash(shared))
+        finally:
+            for music_section in shared.music_sections:
+                for voice in music_section.content.voices:
+                    voice.close()
+
+    def test_duplicates(self):
+        directory = tempfile.mkdtemp()
+        try:
+            paths = []
+            for name in ('a', 'b', 'c'):
+                paths.append(os.path.join(directory, f'{name}.cmme.xml'))
+                shutil.copy(os.path.join(RESOURCES, 'Anonymous-CibavitEos-BrusBRIV922.cmme.xml'), paths[-1])
+            with open(paths[2], 'w') as file:
+                file.write(self.xml_string.replace('<Title>', '<Title>Another ', 1))
+            paths.append(os.path.join(RESOURCES, 'LaRue-OSalutarisHostia.cmme.xml'))
+
+            hashes = hash_files(paths)
+            self.assertEqual([paths[:2]], duplicate_pieces(hashes))
+            self.assertEqual([paths[:3]], duplicate_pieces(hashes, music=True))
+            self.assertEqual(6, len(duplicate_sections(hashes)))
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
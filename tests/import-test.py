@@ -0,0 +1,45 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+import model
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+
+def imported_modules(statement):
+    """
+    Returns the modules imported by a statement, run in a new interpreter.
+    """
+    code = f'{statement}\nimport json, sys\nprint(json.dumps(sorted(sys.modules)))'
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    return set(json.loads(output.splitlines()[-1]))
+
+
+class TestImports(unittest.TestCase):
+    def test_package_is_lazy(self):
+        modules = imported_modules('import model')
+        self.assertEqual({'model'}, {name for name in modules if name.startswith('model')})
+
+    def test_piece_does_not_import_the_events_nor_the_pool(self):
+        modules = imported_modules('from model import Piece')
+        self.assertIn('model.piece', modules)
+        self.assertNotIn('model.note', modules)
+        self.assertNotIn('concurrent.futures', modules)
+        # The events are imported by the first parse
+        modules = imported_modules("from model import Piece\n"
+                                   "Piece.parse(open('tests/resources/LaRue-OSalutarisHostia.cmme.xml').read())")
+        self.assertIn('model.note', modules)
+
+    def test_lazy_attributes(self):
+        from model.music_section import Voice
+        self.assertIs(Voice, model.Voice)
+        self.assertIn('NoteEvent', dir(model))
+        with self.assertRaises(AttributeError):
+            model.Missing
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import unittest
+
+from model import Piece
+from model.custos import CustosEvent
+from model.layout import LayoutIndex, LayoutIndexer
+from model.line_end import LineEndEvent
+from model.music_section import EventList, MensuralMusic, MusicSection, Voice
+from model.pitch import Pitch
+from model.rest import RestEvent
+
+RESOURCES = os.path.join(os.path.dirname(__file__), 'resources')
+
+
+def read(filename):
+    with open(os.path.join(RESOURCES, filename)) as file:
+        return file.read()
+
+
+def rest():
+    return RestEvent('Brevis', None, None, None, None)
+
+
+class TestLayoutIndex(unittest.TestCase):
+    def test_systems(self):
+        custos = CustosEvent(Pitch('A', 3))
+        events = [rest(), rest(), custos, LineEndEvent(False), rest(), LineEndEvent(True), rest()]
+        second = [rest(), LineEndEvent(False), rest()]
+        piece = Piece(None, None, None, [MusicSection(MensuralMusic(1, None, [], [Voice(1, [], EventList(events))])),
+                                         MusicSection(MensuralMusic(1, None, [], [Voice(1, [], EventList(second))]))])
+        layout = LayoutIndex.of(piece).voice(1)
+        self.assertEqual([(1, 1), (1, 2), (2, 1), (2, 2)], layout.systems())
+        self.assertEqual(custos, layout.system(1, 1)[0].custos)
+        self.assertEqual([(0, 4, 6)], [(r.section, r.start, r.stop) for r in layout.system(1, 2)])
+        # The first system of page 2 goes on in the second section
+        self.assertEqual([(0, 6, 7), (1, 0, 2)], [(r.section, r.start, r.stop) for r in layout.system(2, 1)])
+        self.assertEqual(3, len(LayoutIndex.of(piece).events(piece, 1, 2, 1)))
+        self.assertEqual((1, 2), layout.locate(0, 5))
+        self.assertEqual((2, 2), layout.locate(1, 2))
+        self.assertIsNone(layout.locate(1, 3))
+        self.assertEqual([], layout.system(3, 1))
+
+    def test_source_layout_built_while_parsing(self):
+        xml_string = read('Anonymous-CibavitEos-BrusBRIV922.cmme.xml')
+        indexer = LayoutIndexer('Occo Codex')
+        piece = Piece.parse(xml_string, visitor=indexer)
+        index = indexer.index
+        self.assertEqual(index.voices[1].ranges, LayoutIndex.of(piece, 'Occo Codex').voices[1].ranges)
+        # The line ends of the Occo Codex (four of them ending a page) are in its readings
+        self.assertEqual({1: 10, 2: 10, 3: 9, 4: 8}, {voice_num: len(layout.systems())
+                                                      for voice_num, layout in index.voices.items()})
+        self.assertEqual(2, max(page for page, _ in index.voice(1).systems()))
+        # The edited text has no line ends: each voice is on a single system, spanning its sections
+        default = LayoutIndex.of(piece)
+        self.assertEqual([(1, 1)], default.voice(1).systems())
+        events = [event for music_section in piece.music_sections for voice in music_section.content.voices
+                  if voice.voice_num == 1 for event in voice.event_list.events]
+        self.assertEqual(events, default.events(piece, 1, 1, 1))
+        # Each system ends with a reading holding a line end, after the events of the previous one
+        for page, system in index.voice(1).systems()[:-1]:
+            last = index.voice(1).system(page, system)[-1]
+            self.assertTrue(indexer.line_ends(piece.music_sections[last.section].content.voices[0]
+                                              .event_list.events[last.stop - 1]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import itertools
+import os
+import unittest
+import xml.etree.ElementTree as ET
+from fractions import Fraction
+
+from mei.export import NAMESPACE
+from mei.render import render_voice
+from model import Piece
+from model.columns import diatonic_step
+from model.dot import DotEvent
+from model.ligatures import FIRST, LAST, MIDDLE, LigatureResolver, key, rule
+from model.mensuration import MensurationEvent
+from model.music_section import EventList, Voice
+from model.note import NoteEvent
+from model.pitch import Pitch
+from model.rest import RestEvent
+
+RESOURCES = os.path.join(os.path.dirname(__file__), 'resources')
+
+
+def parse(filename):
+    with open(os.path.join(RESOURCES, filename)) as file:
+        return Piece.parse(file.read())
+
+
+def note(letter, octave, lig=None, stem_dir=None, note_type='Brevis'):
+    return NoteEvent(note_type, Pitch(letter, octave), lig, stem_dir, None)
+
+
+class TestLigatures(unittest.TestCase):
+    def test_table(self):
+        table = LigatureResolver.table()
+        self.assertIs(table, LigatureResolver.table())
+        for features in itertools.product((FIRST, MIDDLE, LAST), (False, True), (False, True), (0, 1, 2),
+                                          (False, True), (False, True)):
+            self.assertEqual(rule(*features), table[key(*features)])
+
+    def test_first_note(self):
+        def first_value(first, second):
+            return LigatureResolver.resolve([first, second])[0].values[0]
+
+        # Descending: a long without a stem, a breve with a descending stem
+        self.assertEqual('Longa', first_value(note('D', 3, 'Recta'), note('C', 3)))
+        self.assertEqual('Brevis', first_value(note('D', 3, 'Recta', 'Down'), note('C', 3)))
+        # Ascending: a breve without a stem, a long with a descending stem
+        self.assertEqual('Brevis', first_value(note('C', 3, 'Recta'), note('D', 3)))
+        self.assertEqual('Longa', first_value(note('C', 3, 'Recta', 'Down'), note('D', 3)))
+
+        # The values encoded by the editor of the source agree, for the cases that it has
+        piece = parse('Anonymous-CibavitEos-BrusBRIV922.cmme.xml')
+        encoded = set()
+        for music_section in piece.music_sections:
+            for voice in music_section.content.voices:
+                for ligature in LigatureResolver.resolve_all(voice.event_list.events):
+                    first, second = ligature.notes[:2]
+                    if first.stem_dir != 'Up' and first.note_type != 'Semibrevis':
+                        encoded.add((diatonic_step(second.pitch) > diatonic_step(first.pitch), first.stem_dir,
+                                     first.note_type, ligature.values[0]))
+        self.assertEqual({(True, None, 'Brevis', 'Brevis'), (False, 'Down', 'Brevis', 'Brevis')}, encoded)
+
+    def test_grouping(self):
+        perfect = MensurationEvent('O', None, None, False, None, None, {'tempus': '3'}, False, None)
+        events = [note('C', 3, 'Recta', 'Up'), DotEvent(None), note('D', 3, 'Obliqua'), note('C', 3),
+                  RestEvent('Brevis', None, None, None, None), perfect, note('D', 3, 'Recta'), note('C', 3),
+                  note('E', 3, 'Recta')]
+        ligatures = LigatureResolver.resolve(events)
+        self.assertEqual([(0, 4), (6, 8), (8, 9)], [(ligature.start, ligature.stop) for ligature in ligatures])
+        # A semibreve cum opposita proprietate, then an oblique breve
+        self.assertEqual(['Semibrevis', 'Semibrevis', 'Brevis'], ligatures[0].values)
+        self.assertEqual(['Recta', 'Obliqua'], ligatures[0].connections)
+        self.assertIsNone(ligatures[0].form)
+        self.assertEqual([Fraction(2), Fraction(2), Fraction(4)], ligatures[0].lengths)
+        # A descending square ligature, in perfect tempus
+        self.assertEqual(['Longa', 'Longa'], ligatures[1].values)
+        self.assertEqual('Recta', ligatures[1].form)
+        self.assertEqual([Fraction(12), Fraction(12)], ligatures[1].lengths)
+        self.assertEqual([], LigatureResolver.resolve([note('C', 3), note('D', 3)]))
+
+    def test_source_ligatures(self):
+        piece = parse('Anonymous-CibavitEos-BrusBRIV922.cmme.xml')
+        resolved = []
+        for music_section in piece.music_sections:
+            for voice in music_section.content.voices:
+                for ligature in LigatureResolver.resolve_all(voice.event_list.events):
+                    resolved.append(ligature.values == [ligature_note.note_type for ligature_note in ligature.notes])
+                    for ligature_note, length in zip(ligature.notes, ligature.lengths):
+                        if ligature_note.length is not None:
+                            self.assertEqual(Fraction(ligature_note.length.num, ligature_note.length.den), length)
+        self.assertEqual(49, len(resolved))
+        # The values of the editor are those of the shapes, but for a semibreve pair encoded without its stem
+        self.assertEqual(48, sum(resolved))
+
+    def test_mei(self):
+        events = [note('C', 3, 'Recta', 'Down'), note('D', 3), note('E', 3, 'Recta', 'Up'), note('F', 3, 'Obliqua'),
+                  note('E', 3)]
+        fragment = render_voice(Voice(1, [], EventList(events)))
+        staff = ET.fromstring(fragment.replace('<staff', f'<staff xmlns="{NAMESPACE}"', 1))
+        ligatures = staff.findall('.//{%s}ligature' % NAMESPACE)
+        self.assertEqual([{'form': 'recta'}, {}], [ligature.attrib for ligature in ligatures])
+        self.assertEqual([2, 3], [len(ligature) for ligature in ligatures])
+        self.assertEqual(['recta', 'obliqua', None], [element.get('lig') for element in ligatures[1]])
+
+
+if __name__ == '__main__':
+    unittest.main()
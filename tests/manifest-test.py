@@ -0,0 +1,148 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from batch.manifest import DONE, FAILED, Manifest, content_hash, parse_shard, run_batch, shard_of
+from analysis.search_index import SearchIndex
+from batch.pipeline import main
+
+RESOURCES = os.path.join(os.path.dirname(__file__), 'resources')
+FILENAMES = ('Anonymous-CibavitEos-BrusBRIV922.cmme.xml', 'LaRue-OSalutarisHostia.cmme.xml',
+             'Editorial-Synthetic.cmme.xml')
+
+
+class TestManifest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.paths = []
+        for filename in FILENAMES:
+            self.paths.append(os.path.join(self.directory, filename))
+            shutil.copy(os.path.join(RESOURCES, filename), self.paths[-1])
+        self.manifest_path = os.path.join(self.directory, 'manifest.jsonl')
+        self.converted = []
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def convert(self, key):
+        self.converted.append(key)
+        with open(key) as file:
+            if not file.read().startswith('<?xml'):
+                raise ValueError("Not a CMME file")
+        output = key + '.out'
+        with open(output, 'w') as file:
+            file.write('converted')
+        return [output]
+
+    def run_batch(self):
+        self.converted = []
+        return run_batch(Manifest(self.manifest_path), self.paths, self.convert)
+
+    def test_resume(self):
+        keys = self.run_batch()
+        self.assertEqual(self.paths, keys[DONE])
+        entry = Manifest(self.manifest_path).entries[self.paths[0]]
+        self.assertEqual((DONE, content_hash(self.paths[0]), [self.paths[0] + '.out']),
+                         (entry.status, entry.content_hash, entry.outputs))
+        self.assertEqual(self.paths, self.run_batch()['skipped'])
+
+        # A file touched but not changed is not converted again, nor hashed at the next run
+        os.utime(self.paths[0], ns=(0, 0))
+        self.assertEqual(self.paths, self.run_batch()['skipped'])
+        self.assertEqual(0, Manifest(self.manifest_path).entries[self.paths[0]].mtime_ns)
+        # A changed file, or one whose output is missing, is converted again
+        with open(self.paths[1], 'a') as file:
+            file.write('\n')
+        os.remove(self.paths[2] + '.out')
+        self.assertEqual(self.paths[1:], self.run_batch()[DONE])
+        self.assertEqual(self.paths[1:], self.converted)
+
+        # A failure is recorded, the run goes on, and the file is retried at the next run
+        with open(self.paths[0], 'w') as file:
+            file.write('<Piece>')
+        keys = self.run_batch()
+        self.assertEqual(([self.paths[0]], self.paths[1:]), (keys[FAILED], keys['skipped']))
+        self.assertEqual("ValueError: Not a CMME file", Manifest(self.manifest_path).entries[self.paths[0]].error)
+        self.assertEqual([self.paths[0]], self.run_batch()[FAILED])
+
+    def test_missing_input(self):
+        self.run_batch()
+        # A removed input is not done: its failure is recorded, and the run goes on
+        os.remove(self.paths[0])
+        keys = self.run_batch()
+        self.assertEqual(([self.paths[0]], self.paths[1:]), (keys[FAILED], keys['skipped']))
+        self.assertTrue(Manifest(self.manifest_path).entries[self.paths[0]].error.startswith('FileNotFoundError'))
+
+    def test_any_error(self):
+        def convert(key):
+            raise KeyError(key)
+
+        keys = run_batch(Manifest(self.manifest_path), self.paths, convert)
+        self.assertEqual(self.paths, keys[FAILED])
+        self.assertTrue(Manifest(self.manifest_path).entries[self.paths[0]].error.startswith('KeyError'))
+
+    def test_interrupted(self):
+        self.run_batch()
+        with open(self.manifest_path, 'a') as file:
+            file.write('{"key": "' + self.paths[0])
+        manifest = Manifest(self.manifest_path)
+        self.assertEqual(3, len(manifest))
+        manifest.compact()
+        with open(self.manifest_path) as file:
+            self.assertEqual(3, len(file.readlines()))
+        self.assertEqual(self.paths, self.run_batch()['skipped'])
+
+    def test_shards(self):
+        shards = [run_batch(Manifest(self.manifest_path), self.paths, self.convert, (index, 2)) for index in range(2)]
+        self.assertEqual(sorted(self.paths), sorted(shards[0][DONE] + shards[1][DONE]))
+        self.assertEqual([shard_of(path, 2) for path in self.paths], [int(path in shards[1][DONE])
+                                                                       for path in self.paths])
+        self.assertEqual((1, 4), parse_shard('1/4'))
+        with self.assertRaises(ValueError):
+            parse_shard('4/4')
+
+    def test_main(self):
+        output = os.path.join(self.directory, 'out')
+        with open(self.paths[2], 'w') as file:
+            file.write('<Piece>')
+        arguments = ['--manifest', self.manifest_path, output] + self.paths
+        self.assertEqual(1, main(arguments))
+        self.assertEqual(['Anonymous-CibavitEos-BrusBRIV922.json', 'Anonymous-CibavitEos-BrusBRIV922.mei',
+                          'LaRue-OSalutarisHostia.json', 'LaRue-OSalutarisHostia.mei'], sorted(os.listdir(output)))
+        shutil.copy(os.path.join(RESOURCES, FILENAMES[2]), self.paths[2])
+        self.assertEqual(0, main(arguments))
+        manifest = Manifest(self.manifest_path)
+        self.assertEqual([DONE] * 3, [manifest.entries[path].status for path in self.paths])
+        self.assertEqual(6, len(os.listdir(output)))
+
+    def test_main_with_index(self):
+        output = os.path.join(self.directory, 'out')
+        index_path = os.path.join(self.directory, 'index')
+        self.assertEqual(0, main(['--manifest', self.manifest_path, output] + self.paths))
+        # The files done in a run whose index was not saved are converted again, then skipped
+        arguments = ['--index', index_path, '--manifest', self.manifest_path, output] + self.paths
+        self.assertEqual(0, main(arguments))
+        self.assertEqual(3, len(SearchIndex.load(index_path)))
+        self.assertEqual(0, main(arguments))
+        with open(self.manifest_path) as file:
+            self.assertEqual(6, len(file.readlines()))
+
+    def test_same_names(self):
+        paths = []
+        for directory, filename in (('a', FILENAMES[0]), ('b', FILENAMES[1])):
+            os.mkdir(os.path.join(self.directory, directory))
+            paths.append(os.path.join(self.directory, directory, 'piece.cmme.xml'))
+            shutil.copy(os.path.join(RESOURCES, filename), paths[-1])
+        output = os.path.join(self.directory, 'out')
+        self.assertEqual(0, main(['--manifest', self.manifest_path, output] + paths))
+        # The outputs of each file are in the subdirectory of its own
+        titles = []
+        for directory in ('a', 'b'):
+            with open(os.path.join(output, directory, 'piece.json')) as file:
+                titles.append(json.load(file)['summary']['title'])
+        self.assertEqual(['Cibavit eos', 'O salutaris hostia'], titles)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import subprocess
+import sys
+import unittest
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+
+from mei.export import NAMESPACE, to_mei
+from mei.render import mei_pitch
+from model import Piece
+from model.pitch import Pitch
+
+RESOURCES = os.path.join(os.path.dirname(__file__), 'resources')
+MEI = {'mei': NAMESPACE}
+
+
+def parse(filename):
+    with open(os.path.join(RESOURCES, filename)) as file:
+        return Piece.parse(file.read())
+
+
+class TestMEIExport(unittest.TestCase):
+    def test_pitches(self):
+        # CMME octaves start on A, MEI octaves on C: CMME C3 is middle C
+        self.assertEqual({'pname': 'c', 'oct': 4}, mei_pitch(Pitch('C', 3)))
+        self.assertEqual({'pname': 'b', 'oct': 3}, mei_pitch(Pitch('B', 3)))
+        self.assertEqual({'pname': 'a', 'oct': 4}, mei_pitch(Pitch('A', 4)))
+        self.assertEqual({'pname': None, 'oct': None}, mei_pitch(None))
+
+    def test_structure(self):
+        piece = parse('LaRue-OSalutarisHostia.cmme.xml')
+        root = ET.fromstring(to_mei(piece))
+        self.assertEqual('O salutaris hostia', root.find('mei:meiHead/mei:fileDesc/mei:titleStmt/mei:title', MEI).text)
+        self.assertEqual(['[Superius]', 'Contra[tenor]', 'Tenor', 'Bassus'],
+                         [staff_def.get('label') for staff_def in root.iterfind('.//mei:staffDef', MEI)])
+        sections = root.findall('.//mei:section', MEI)
+        self.assertEqual(len(piece.music_sections), len(sections))
+        self.assertEqual(['1', '2', '3', '4'], [staff.get('n') for staff in sections[0].findall('mei:staff', MEI)])
+        first_note = sections[0].find('mei:staff/mei:layer/mei:note', MEI)
+        self.assertEqual({'dur': 'brevis', 'pname': 'a', 'oct': '4'}, first_note.attrib)
+        self.assertEqual('O', first_note.find('mei:verse/mei:syl', MEI).text)
+        # Every reading refers to a source of the header
+        sources = {'#' + source.get('{http://www.w3.org/XML/1998/namespace}id')
+                   for source in root.iterfind('.//mei:source', MEI)}
+        for reading in root.iterfind('.//mei:rdg', MEI):
+            self.assertTrue(set(reading.get('source').split()) <= sources)
+
+    def test_editorial_data(self):
+        root = ET.fromstring(to_mei(parse('Editorial-Synthetic.cmme.xml')))
+        choices = root.findall('.//mei:choice', MEI)
+        self.assertEqual(4, len(choices))
+        self.assertIsNotNone(choices[0].find('mei:sic/mei:gap', MEI))
+        self.assertEqual(['f', 'g'], [note.get('pname') for note in choices[1].findall('mei:corr/mei:note', MEI)])
+
+    def test_parallel_rendering(self):
+        pieces = [parse(filename) for filename in sorted(os.listdir(RESOURCES))]
+        with ProcessPoolExecutor(2) as executor:
+            for piece in pieces:
+                with self.subTest(title=piece.general_data.title):
+                    serial = to_mei(piece)
+                    self.assertEqual(serial, to_mei(piece, executor=executor))
+        self.assertEqual(to_mei(pieces[0]), to_mei(pieces[0], max_workers=2))
+
+    def test_spawned_workers(self):
+        # The workers of a pool started for the export get the voices from its initializer, not by being forked
+        script = ('import multiprocessing, sys\n'
+                  'from mei.export import to_mei\n'
+                  'from model import Piece\n'
+                  'multiprocessing.set_start_method("spawn")\n'
+                  'with open(sys.argv[1]) as file:\n'
+                  '    piece = Piece.parse(file.read())\n'
+                  'assert to_mei(piece, max_workers=2) == to_mei(piece)\n')
+        environment = dict(os.environ, PYTHONPATH=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+        path = os.path.join(RESOURCES, 'LaRue-OSalutarisHostia.cmme.xml')
+        result = subprocess.run([sys.executable, '-c', script, path], env=environment, capture_output=True, text=True,
+                                timeout=120)
+        self.assertEqual(0, result.returncode, result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
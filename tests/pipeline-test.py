@@ -0,0 +1,72 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from analysis.search_index import SearchIndex
+from analysis.statistics import collect
+from batch.pipeline import Pipeline, Sink, default_pipeline, main
+from mei.export import to_mei
+from model import Piece
+
+RESOURCES = os.path.join(os.path.dirname(__file__), 'resources')
+FILENAMES = ('Anonymous-CibavitEos-BrusBRIV922.cmme.xml', 'LaRue-OSalutarisHostia.cmme.xml',
+             'Editorial-Synthetic.cmme.xml')
+
+
+class SectionCounter(Sink):
+    def __init__(self, key):
+        self.sections = 0
+
+    def enter_music_section(self, music_section):
+        self.sections += 1
+
+    def result(self):
+        return self.sections
+
+
+class TestPipeline(unittest.TestCase):
+    def test_outputs_of_one_parse(self):
+        index = SearchIndex()
+        pipeline = default_pipeline(index).register('sections', SectionCounter)
+        for filename in FILENAMES:
+            path = os.path.join(RESOURCES, filename)
+            with self.subTest(filename=filename):
+                results = pipeline.run_file(path)
+                with open(path) as file:
+                    piece = Piece.parse(file.read())
+                # Each output is the one made from a parsed piece
+                self.assertEqual(to_mei(piece), results['mei'])
+                self.assertEqual(collect(piece, os.path.abspath(path)).to_dict(), results['statistics'].to_dict())
+                self.assertEqual(len(piece.music_sections), results['sections'])
+                self.assertEqual([music_section.content.section_type for music_section in piece.music_sections],
+                                 results['summary']['music_sections'])
+                self.assertEqual(piece.general_data.title, results['summary']['title'])
+                self.assertIn(os.path.abspath(path), index)
+        self.assertEqual(4, len(index.search_text('O salutaris')))
+        with self.assertRaises(ValueError):
+            pipeline.register('mei', SectionCounter)
+
+    def test_main(self):
+        directory = tempfile.mkdtemp()
+        try:
+            index_path = os.path.join(directory, 'index')
+            paths = [os.path.join(RESOURCES, filename) for filename in FILENAMES]
+            self.assertEqual(0, main(['--index', index_path, directory] + paths))
+            with open(os.path.join(directory, 'LaRue-OSalutarisHostia.json')) as file:
+                output = json.load(file)
+            self.assertEqual('O salutaris hostia', output['summary']['title'])
+            self.assertEqual(4, len(output['statistics']['voices']))
+            self.assertTrue(os.path.exists(os.path.join(directory, 'Editorial-Synthetic.mei')))
+            self.assertEqual(3, len(SearchIndex.load(index_path)))
+        finally:
+            shutil.rmtree(directory)
+
+    def test_empty_pipeline(self):
+        with open(os.path.join(RESOURCES, FILENAMES[2])) as file:
+            self.assertEqual({}, Pipeline().run(file.read()))
+
+
+if __name__ == '__main__':
+    unittest.main()
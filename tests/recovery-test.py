@@ -0,0 +1,95 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from batch.runner import parse_files
+from model import Piece
+from model.event_factory import EventClassNotFoundException
+from model.recovery import Diagnostic, UnparsedEvent
+
+RESOURCES = os.path.join(os.path.dirname(__file__), 'resources')
+
+
+def replace_nth(text, old, new, n):
+    index = -1
+    for _ in range(n + 1):
+        index = text.index(old, index + 1)
+    return text[:index] + new + text[index + len(old):]
+
+
+class TestRecovery(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open(os.path.join(RESOURCES, 'Anonymous-CibavitEos-BrusBRIV922.cmme.xml')) as file:
+            cls.xml_string = file.read()
+        # An unknown event in the first section, a note with a wrong octave in the second, and a third section whose
+        # number of voices is not a number (the first NumVoices is that of VoiceData)
+        broken = cls.xml_string.replace('<EventList>', '<EventList>\n<Foo><Bar>1</Bar></Foo>', 1)
+        broken = replace_nth(broken, '<EventList>', '<EventList>\n<Note><Type>Brevis</Type><LetterName>C</LetterName>'
+                                                    '<OctaveNum>x</OctaveNum></Note>', 1)
+        cls.broken = replace_nth(broken, '<NumVoices>', '<NumVoices>?', 3)
+
+    def test_errors_are_raised_by_default(self):
+        with self.assertRaises(EventClassNotFoundException):
+            Piece.parse(self.broken)
+        with self.assertRaises(ValueError):
+            Piece.parse(replace_nth(self.xml_string, '<NumVoices>', '<NumVoices>?', 3))
+
+    def test_recovering_parse(self):
+        diagnostics = []
+        piece = Piece.parse(self.broken, diagnostics=diagnostics)
+        original = Piece.parse(self.xml_string)
+        self.assertEqual(3, len(diagnostics))
+        unknown, wrong_octave, skipped = diagnostics
+        self.assertEqual(Diagnostic('/Piece/MusicSection[1]/Plainchant/Voice/EventList/Foo', 'unknown event Foo'),
+                         unknown)
+        self.assertEqual('/Piece/MusicSection[2]/MensuralMusic/Voice[1]/EventList/Note[1]', wrong_octave.location)
+        self.assertTrue(wrong_octave.message.startswith('ValueError'))
+        self.assertEqual('/Piece/MusicSection[3]', skipped.location)
+        self.assertTrue(skipped.message.startswith('section skipped'))
+
+        # The rest of the piece is parsed
+        self.assertEqual(len(original.music_sections) - 1, len(piece.music_sections))
+        self.assertEqual([music_section.digest() for music_section in original.music_sections[3:]],
+                         [music_section.digest() for music_section in piece.music_sections[2:]])
+        first = piece.music_sections[0].content.voices[0]
+        self.assertEqual([UnparsedEvent('Foo', '<Foo xmlns="http://www.cmme.org"><Bar>1</Bar></Foo>')],
+                         first.event_list.events[:1])
+        self.assertEqual(original.music_sections[0].content.voices[0].event_list.events,
+                         first.event_list.events[1:])
+        second = piece.music_sections[1].content.voices[0]
+        self.assertIsInstance(second.event_list.events[0], UnparsedEvent)
+        self.assertEqual(original.music_sections[1].content.voices[0].event_list.events,
+                         second.event_list.events[1:])
+
+        # The unparsed events are written back as they were
+        diagnostics = []
+        reparsed = Piece.parse(piece.to_string(), diagnostics=diagnostics)
+        self.assertTrue(piece.same_content(reparsed))
+        self.assertEqual(2, len(diagnostics))
+
+    def test_batch(self):
+        directory = tempfile.mkdtemp()
+        try:
+            paths = [os.path.join(directory, name) for name in ('a.cmme.xml', 'b.cmme.xml', 'c.cmme.xml', 'd.cmme.xml')]
+            # An empty NumVoices in VoiceData is a TypeError, outside the music
+            empty_num_voices = self.xml_string.replace('<NumVoices>4</NumVoices>', '<NumVoices/>', 1)
+            for path, content in zip(paths, (self.broken, self.xml_string[:-100], self.xml_string, empty_num_voices)):
+                with open(path, 'w') as file:
+                    file.write(content)
+            diagnostics = {}
+            parsed = [path for path, _ in parse_files(paths, max_workers=2, diagnostics=diagnostics)]
+            self.assertEqual([paths[0], paths[2]], parsed)
+            self.assertEqual([paths[0], paths[1], paths[3]], sorted(diagnostics))
+            self.assertEqual(3, len(diagnostics[paths[0]]))
+            self.assertEqual('/', diagnostics[paths[1]][0].location)
+            self.assertTrue(diagnostics[paths[1]][0].message.startswith('ParseError'))
+            self.assertEqual('/', diagnostics[paths[3]][0].location)
+            self.assertTrue(diagnostics[paths[3]][0].message.startswith('TypeError'))
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+import xml.etree.ElementTree as ET
+
+from model.music_section import MusicSection
+from model.schema_parsers import scan_rest_data
+from schema.codegen import OUTPUT_PATH, SCHEMA_PATH, generate
+from schema.xsd import Schema
+
+
+class TestSchemaCodegen(unittest.TestCase):
+    def test_generated_parsers_up_to_date(self):
+        with open(OUTPUT_PATH) as file:
+            checked_in = file.read()
+        self.assertEqual(generate(Schema.load(SCHEMA_PATH)), checked_in,
+                         "model/schema_parsers.py is out of date, run `python -m schema.codegen`")
+
+    def test_typed_conversions(self):
+        rest_el = ET.fromstring('<Rest xmlns="http://www.cmme.org"><Type>Brevis</Type>'
+                                '<BottomStaffLine>3</BottomStaffLine><NumSpaces>1</NumSpaces><Colored/></Rest>')
+        values = scan_rest_data(rest_el)
+        self.assertEqual('Brevis', values['type'])
+        self.assertEqual(3, values['bottom_staff_line'])
+        self.assertEqual(1, values['num_spaces'])
+        self.assertIsNotNone(values['colored'])
+        self.assertNotIn('length', values)
+
+    def test_text_section(self):
+        section_el = ET.fromstring('<MusicSection xmlns="http://www.cmme.org"><Text><Content>Incipit</Content></Text>'
+                                   '</MusicSection>')
+        section = MusicSection.parse(section_el)
+        self.assertEqual('Text', section.content.section_type)
+        self.assertEqual('Incipit', section.content.content)
+        self.assertEqual([], section.content.voices)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from analysis.search_index import SearchIndex, SearchMatch
+from model import Piece
+from model.event_factory import EventClassNotFoundException
+from model.pitch import Pitch
+
+RESOURCES = os.path.join(os.path.dirname(__file__), 'resources')
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.paths = []
+        for filename in ('Anonymous-CibavitEos-BrusBRIV922.cmme.xml', 'LaRue-OSalutarisHostia.cmme.xml',
+                         'Editorial-Synthetic.cmme.xml'):
+            self.paths.append(os.path.join(self.directory, filename))
+            shutil.copy(os.path.join(RESOURCES, filename), self.paths[-1])
+        self.brussels, self.la_rue, self.editorial = self.paths
+        self.index = SearchIndex()
+        self.index.update(self.paths)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_search_text(self):
+        self.assertEqual([SearchMatch(self.la_rue, 0, voice_num, 0) for voice_num in (1, 2, 3, 4)],
+                         self.index.search_text('O salutaris'))
+        self.assertEqual([SearchMatch(self.brussels, 1, 1, 1), SearchMatch(self.brussels, 1, 2, 0),
+                          SearchMatch(self.brussels, 1, 3, 1), SearchMatch(self.brussels, 1, 4, 1)],
+                         self.index.search_text('eos ex adipe frumenti'))
+        self.assertEqual([], self.index.search_text('frumenti eos'))
+
+    def test_search_melody(self):
+        matches = self.index.search_intervals([2, -1, -1, -1, 0, -1])
+        self.assertIn(SearchMatch(self.brussels, 1, 1, 0), matches)
+        self.assertIn(SearchMatch(self.brussels, 1, 2, 0), matches)
+
+        # At any transposition (G3 B4 A4 G3, a step higher)
+        transposed = self.index.search_melody([Pitch('A', 4), Pitch('C', 4), Pitch('B', 4), Pitch('A', 4)])
+        self.assertIn(SearchMatch(self.brussels, 1, 1, 0), transposed)
+
+        # Patterns shorter than the n-grams
+        self.assertTrue(set(map(repr, matches)) <= set(map(repr, self.index.search_intervals([2, -1]))))
+
+    def test_search_rhythm_and_metadata(self):
+        self.assertTrue(self.index.search_rhythm(['Semibrevis', 'Minima', 'Minima']))
+        with self.assertRaises(ValueError):
+            self.index.search_rhythm(['Crotchet'])
+        self.assertEqual([self.la_rue], self.index.search_metadata(composer='La Rue'))
+        self.assertEqual([self.brussels], self.index.search_metadata(title='cibavit', composer='anonymous'))
+        self.assertEqual([], self.index.search_metadata(title='cibavit', composer='la rue'))
+
+    def test_incremental_update(self):
+        self.assertEqual([], self.index.update(self.paths))
+        status = os.stat(self.la_rue)
+        os.utime(self.la_rue, ns=(status.st_atime_ns, status.st_mtime_ns + 1000))
+        self.assertEqual([self.la_rue], self.index.update(self.paths))
+        self.assertEqual(4, len(self.index.search_text('O salutaris')))
+
+        # Pieces missing from the corpus are pruned
+        self.index.update([self.brussels, self.editorial], prune=True)
+        self.assertEqual(2, len(self.index))
+        self.assertEqual([], self.index.search_text('O salutaris'))
+        self.assertEqual([], self.index.search_metadata(composer='La Rue'))
+
+    def test_failed_parse(self):
+        voices = list(self.index.voices)
+        documents = dict(self.index.documents)
+        with open(self.la_rue) as file:
+            xml_string = file.read()
+        # An unknown event in the last EventList: the voices before it have been visited when the parse fails
+        position = xml_string.rindex('</EventList>')
+        with self.assertRaises(EventClassNotFoundException):
+            Piece.parse(xml_string[:position] + '<Bogus/>' + xml_string[position:],
+                        visitor=self.index.indexer(self.la_rue))
+        self.assertEqual(voices, self.index.voices)
+        self.assertEqual(documents, self.index.documents)
+        self.assertEqual([SearchMatch(self.la_rue, 0, voice_num, 0) for voice_num in (1, 2, 3, 4)],
+                         self.index.search_text('O salutaris'))
+
+    def test_save_and_load(self):
+        index_path = os.path.join(self.directory, 'corpus.index')
+        self.index.remove(self.brussels)
+        self.index.save(index_path)
+        loaded = SearchIndex.load(index_path)
+        self.assertEqual(0, loaded.dead_voices)
+        self.assertEqual(self.index.search_text('O salutaris'), loaded.search_text('O salutaris'))
+        self.assertEqual([], loaded.search_text('eos ex adipe'))
+
+        loaded.update(self.paths)
+        self.assertEqual(4, len(loaded.search_text('eos ex adipe frumenti')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import pickle
+import unittest
+
+from model import Piece
+from model.clef import ClefEvent
+from model.columns import diatonic_step
+from model.events import EventAttributes
+from model.hashing import forget
+from model.note import NoteEvent
+from model.pitch import Pitch
+from model.rest import RestEvent
+from model.staff import ClefTable, StaffPositions, resolve_piece
+
+RESOURCES = os.path.join(os.path.dirname(__file__), 'resources')
+
+
+def parse(filename):
+    with open(os.path.join(RESOURCES, filename)) as file:
+        return Piece.parse(file.read())
+
+
+def clef(appearance, staff_loc, letter, octave):
+    return ClefEvent(appearance, staff_loc, Pitch(letter, octave), EventAttributes(), False)
+
+
+def note(letter, octave):
+    return NoteEvent('Brevis', Pitch(letter, octave), None, None, None)
+
+
+class TestStaffPositions(unittest.TestCase):
+    def test_tables(self):
+        # A C clef on the bottom line and a G clef on the third line have the same anchor
+        table = ClefTable.of_clef(clef('C', 1, 'C', 3))
+        self.assertIs(table, ClefTable.of_clef(clef('G', 5, 'G', 3)))
+        self.assertEqual(8, table.loc(Pitch('C', 4)))
+        self.assertEqual(Pitch('C', 4), table.pitch(8))
+        self.assertEqual(Pitch('B', 3), table.pitch(0))
+        self.assertIsNone(table.pitch(100))
+        self.assertIsNone(table.loc(Pitch('C', None)))
+        self.assertIsNone(ClefTable.of_clef(clef('C', None, 'C', 3)))
+
+    def test_positions(self):
+        first, second = note('D', 3), note('D', 3)
+        rest = RestEvent('Brevis', None, None, 2, None)
+        events = [note('C', 3), clef('C', 1, 'C', 3), first, rest, clef('F', 7, 'F', 2), second]
+        positions = StaffPositions.build(events)
+        # Under the F clef on the fourth line, the D above middle C is above the staff
+        self.assertEqual([None, 1, 2, 3, 7, 12], positions.locs)
+        self.assertIsNone(positions.table(events[0]))
+        # A rest stands on the pitch of its bottom line
+        self.assertEqual(Pitch('E', 3), positions.pitch(rest))
+        self.assertEqual(2, positions.mei_loc(rest))
+        self.assertIsNone(positions.loc(note('C', 3)))
+        self.assertEqual(positions.final, StaffPositions.build([], positions.final).final)
+
+    def test_voices(self):
+        piece = parse('Anonymous-CibavitEos-BrusBRIV922.cmme.xml')
+        resolve_piece(piece)
+        for music_section in piece.music_sections:
+            for voice in music_section.content.voices:
+                positions = voice.event_list.staff_positions()
+                for event, loc, table in zip(positions.events, positions.locs, positions.tables):
+                    if type(event).__name__ == 'NoteEvent':
+                        # Every note is under a clef, carried over from the previous sections if needed
+                        self.assertIsNotNone(table)
+                        self.assertEqual(event.pitch, table.pitch(loc))
+                        self.assertEqual(diatonic_step(event.pitch) - table.anchor, loc)
+        event_list = piece.music_sections[2].content.voices[0].event_list
+        positions = event_list.staff_positions()
+        self.assertIs(positions, event_list.staff_positions(positions.initial))
+        # Positions from another clef are not memoized in place of those of the piece
+        other = ClefTable.of(positions.initial.anchor + 1)
+        self.assertIs(other, event_list.staff_positions(other).initial)
+        self.assertIs(positions, event_list.staff_positions())
+        copy = pickle.loads(pickle.dumps(event_list))
+        self.assertEqual(positions.locs, copy.staff_positions().locs)
+        self.assertEqual(positions.loc(event_list.events[-1]), copy.staff_positions().loc(copy.events[-1]))
+        forget(event_list)
+        self.assertIsNot(positions, event_list.staff_positions())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import csv
+import io
+import json
+import os
+import unittest
+
+from analysis.statistics import StatisticsCollector, collect, collect_file, write_csv, write_json
+from model import Piece
+
+RESOURCES = os.path.join(os.path.dirname(__file__), 'resources')
+
+
+class TestStatistics(unittest.TestCase):
+    def resource(self, filename):
+        return os.path.join(RESOURCES, filename)
+
+    def test_voice_statistics(self):
+        statistics = collect_file(self.resource('Editorial-Synthetic.cmme.xml'))
+        cantus, tenor = statistics.voices
+        self.assertEqual((0, 1), (cantus.section, cantus.voice_num))
+        self.assertEqual(7, cantus.events)
+        self.assertEqual({'ClefEvent': 1, 'EditorialData': 3, 'MensurationEvent': 1, 'NoteEvent': 1,
+                          'VariantReadings': 1}, cantus.event_counts)
+        self.assertEqual(6, cantus.notes)
+        self.assertEqual(1, cantus.mensuration_changes)
+        self.assertEqual((1, 3), (cantus.variants, cantus.editorial_data))
+        self.assertAlmostEqual(100 / 7, cantus.variant_density)
+        self.assertEqual(('D3', 'G3'), (cantus.to_dict()['lowest'], cantus.to_dict()['highest']))
+
+        self.assertEqual((1, 2), (tenor.ligatures, tenor.ligated_notes))
+        self.assertEqual(11, statistics.totals.events)
+        self.assertEqual(2, statistics.totals.variants)
+
+    def test_ligatures_and_coloration(self):
+        statistics = collect_file(self.resource('Anonymous-CibavitEos-BrusBRIV922.cmme.xml'))
+        # 51 notes carry <Lig>, the last note of each ligature does not
+        self.assertEqual(49, statistics.totals.ligatures)
+        self.assertEqual(100, statistics.totals.ligated_notes)
+        self.assertEqual(12, statistics.totals.mensuration_changes)
+        self.assertEqual(6, statistics.totals.colored_notes)
+
+    def test_same_statistics_during_and_after_parsing(self):
+        with open(self.resource('LaRue-OSalutarisHostia.cmme.xml')) as file:
+            xml_string = file.read()
+        collector = StatisticsCollector('LaRue')
+        piece = Piece.parse(xml_string, visitor=collector)
+        self.assertEqual(collect(piece, 'LaRue').to_dict(), collector.statistics.to_dict())
+
+    def test_export(self):
+        statistics = [collect_file(self.resource(filename))
+                      for filename in ('LaRue-OSalutarisHostia.cmme.xml', 'Editorial-Synthetic.cmme.xml')]
+        output = io.StringIO()
+        write_json(statistics, output)
+        pieces = json.loads(output.getvalue())
+        self.assertEqual(['O salutaris hostia', 'Editorial test'], [piece['title'] for piece in pieces])
+        self.assertEqual(4, len(pieces[0]['voices']))
+
+        output = io.StringIO()
+        write_csv(statistics, output)
+        rows = list(csv.DictReader(io.StringIO(output.getvalue())))
+        self.assertEqual(6, len(rows))
+        self.assertEqual(['1', '2', '3', '4', '1', '2'], [row['voice_num'] for row in rows])
+        self.assertEqual('3', rows[4]['EditorialData'])
+
+
+if __name__ == '__main__':
+    unittest.main()
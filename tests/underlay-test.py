@@ -0,0 +1,66 @@
+import os
+import unittest
+
+from analysis.search_index import words
+from analysis.underlay import Underlay, UnderlayAligner, UnderlayPhrase, UnderlaySyllable, UnderlayWord
+from mei.render import render_voice
+from model import Piece
+from model.modern_text import ModernText
+from model.music_section import EventList, Voice
+from model.note import NoteEvent
+from model.original_text import OriginalTextEvent
+from model.pitch import Pitch
+
+RESOURCES = os.path.join(os.path.dirname(__file__), 'resources')
+
+
+def note(*syllables, word_end=False):
+    return NoteEvent('Brevis', Pitch('C', 3), None, None, ModernText(list(syllables), word_end) if syllables else None)
+
+
+class TestUnderlay(unittest.TestCase):
+    def test_alignment(self):
+        events = [OriginalTextEvent('Eos ex'), note('E'), note('os,', word_end=True), note(), note('ex', word_end=True),
+                  note('a'), OriginalTextEvent('adipe'), note('di'), note('pe', word_end=True),
+                  OriginalTextEvent('alleluya')]
+        underlay = Underlay.of(events)
+        self.assertEqual([UnderlayWord('Eos,', 0, 2), UnderlayWord('ex', 2, 3), UnderlayWord('adipe', 3, 6)],
+                         underlay.words)
+        self.assertEqual('Eos, ex adipe', underlay.text())
+        self.assertEqual(UnderlaySyllable('ex', 3, 1, 's'), underlay.syllables[2])
+        self.assertEqual(['i', 't', 's', 'i', 'm', 't'], [syllable.position for syllable in underlay.syllables])
+        # A phrase goes with the next note, in the middle of a word here, and the last one with no note
+        self.assertEqual([UnderlayPhrase('Eos ex', 0, 0), UnderlayPhrase('adipe', 5, 2),
+                          UnderlayPhrase('alleluya', 7, 3)], underlay.phrases)
+        # A word left open at the end of the voice is ended
+        self.assertEqual(['sa'], [word.text for word in Underlay.of([note('sa')]).words])
+
+    def test_voices_aligned_while_parsing(self):
+        aligner = UnderlayAligner()
+        with open(os.path.join(RESOURCES, 'Anonymous-CibavitEos-BrusBRIV922.cmme.xml')) as file:
+            piece = Piece.parse(file.read(), visitor=aligner)
+        self.assertEqual([(music_section_index, voice.voice_num)
+                          for music_section_index, music_section in enumerate(piece.music_sections)
+                          for voice in music_section.content.voices],
+                         [(section, voice_num) for section, voice_num, _ in aligner.underlays])
+        section, voice_num, underlay = aligner.underlays[1]
+        self.assertEqual((1, 1), (section, voice_num))
+        self.assertTrue(underlay.text().startswith('Eos, eos ex adipe frumenti, alleluia:'))
+        self.assertEqual(['Eos', 'ex adipe', 'fru'], [phrase.text for phrase in underlay.phrases[:3]])
+        self.assertEqual([0, 1, 4], [phrase.word_index for phrase in underlay.phrases[:3]])
+        # The words of the search index are those of the underlay
+        voice = piece.music_sections[1].content.voices[0]
+        self.assertEqual(['eos', 'eos', 'ex', 'adipe', 'frumenti'], words(underlay.notes)[:5])
+        self.assertEqual(underlay.notes, Underlay.of(voice.event_list.events).notes)
+
+    def test_mei_syllables(self):
+        events = [note('sa'), note('lu'), note('ta'), note('ris', word_end=True), note('O', word_end=True)]
+        fragment = render_voice(Voice(1, [], EventList(events)))
+        self.assertIn('<syl wordpos="i" con="d">sa</syl>', fragment)
+        self.assertIn('<syl wordpos="m" con="d">ta</syl>', fragment)
+        self.assertIn('<syl wordpos="t">ris</syl>', fragment)
+        self.assertIn('<syl wordpos="s">O</syl>', fragment)
+
+
+if __name__ == '__main__':
+    unittest.main()
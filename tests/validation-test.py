@@ -0,0 +1,77 @@
+import os
+import unittest
+import xml.etree.ElementTree as ET
+
+from model import Piece
+from schema.validation import CompiledSchema, InvalidCMMEException, Validator, validate, validate_string
+
+
+class TestValidation(unittest.TestCase):
+    def resource(self, filename):
+        return os.path.join(os.path.dirname(__file__), 'resources', filename)
+
+    def read_resource(self, filename):
+        with open(self.resource(filename)) as file:
+            return file.read()
+
+    def test_bundled_scores_are_valid(self):
+        for filename in ('Anonymous-CibavitEos-BrusBRIV922.cmme.xml', 'LaRue-OSalutarisHostia.cmme.xml',
+                         'Editorial-Synthetic.cmme.xml'):
+            self.assertEqual([], validate(self.resource(filename)), filename)
+
+    def test_schema_compiled_once(self):
+        self.assertIs(CompiledSchema.load(), CompiledSchema.load())
+
+    def test_all_violations_reported_with_lines(self):
+        xml_string = (self.read_resource('Editorial-Synthetic.cmme.xml')
+                      .replace('<Type>Semibrevis</Type>', '<Type>Semibreve</Type>')
+                      .replace('<Title>Editorial test</Title>', '')
+                      .replace('<PageEnd />', '<PageEnd />\n            <Barline />'))
+        violations = validate_string(xml_string)
+        self.assertEqual([(5, "element <Composer> not allowed here in <GeneralData>; expected <Incipit>, <Title>"),
+                          (66, "invalid value 'Semibreve' for <Type> (expected NoteTypeName)"),
+                          (86, "invalid value 'Semibreve' for <Type> (expected NoteTypeName)"),
+                          (206, "unexpected element <Barline> in <LineEnd>")],
+                         [(violation.line, violation.message) for violation in violations])
+
+    def test_not_well_formed(self):
+        violations = validate_string('<Piece xmlns="http://www.cmme.org" CMMEversion="0.897"><GeneralData>')
+        self.assertEqual(1, len(violations))
+        self.assertIn('not well-formed', violations[0].message)
+
+    def test_parse_with_validation(self):
+        xml_string = self.read_resource('Editorial-Synthetic.cmme.xml')
+        self.assertIsNotNone(Piece.parse(xml_string, validate=True))
+
+        # Without validation the unknown event only fails deep inside the event factory
+        invalid = xml_string.replace('<LineEnd>', '<LineEnds>').replace('</LineEnd>', '</LineEnds>')
+        with self.assertRaises(InvalidCMMEException) as context:
+            Piece.parse(invalid, validate=True)
+        self.assertEqual(1, len(context.exception.violations))
+        self.assertEqual(204, context.exception.violations[0].line)
+
+    def test_tree_check_after_memoized_checks(self):
+        xml_string = self.read_resource('Editorial-Synthetic.cmme.xml')
+        validator = Validator()
+        self.assertTrue(validator.is_valid_tree(ET.fromstring(xml_string)))
+
+        # The texts, steps and blank texts memoized for the valid document do not let these through
+        for invalid in (xml_string.replace('<Type>Semibrevis</Type>', '<Type>Semibreve</Type>', 1),
+                        xml_string.replace('<OctaveNum>', '<OctaveNum>x', 1),
+                        xml_string.replace('</Type>', '</Type>text', 1),
+                        xml_string.replace('<Type>', '<Type ID="1">', 1),
+                        xml_string.replace('<Title>Editorial test</Title>', '')):
+            self.assertFalse(validator.is_valid_tree(ET.fromstring(invalid)))
+            self.assertNotEqual([], validator.validate_string(invalid))
+
+    def test_invalid_tree_without_positions_is_rejected(self):
+        xml_string = self.read_resource('Editorial-Synthetic.cmme.xml')
+        invalid_root = ET.fromstring(xml_string.replace('<Title>Editorial test</Title>', ''))
+
+        # The streamed document is valid, yet the tree that was checked is not
+        with self.assertRaises(InvalidCMMEException):
+            Piece.validate(xml_string, invalid_root)
+
+
+if __name__ == '__main__':
+    unittest.main()
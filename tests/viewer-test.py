@@ -0,0 +1,110 @@
+import io
+import json
+import os
+import unittest
+
+from model import Piece
+from model.columns import diatonic_step
+from model.modern_text import ModernText
+from model.music_section import EventList, MensuralMusic, MusicSection, Voice
+from model.note import NoteEvent
+from model.pitch import Pitch
+from model.rest import RestEvent
+from viewer.export import EVENT_TYPES, FLAGS, JSONExporter, JSONStreamWriter, iter_chunks, to_json
+
+RESOURCES = os.path.join(os.path.dirname(__file__), 'resources')
+
+
+def read(filename):
+    with open(os.path.join(RESOURCES, filename)) as file:
+        return file.read()
+
+
+def notes(events, found):
+    # The notes of a voice of the document, nested ones included, in order
+    for event in events:
+        kind = EVENT_TYPES[event[0]]
+        if kind == 'NoteEvent':
+            found.append(event)
+        elif kind == 'MultiEvent':
+            notes(event[1], found)
+        elif kind == 'VariantReadings':
+            for reading in event[1]:
+                notes(reading[2] if len(reading) > 2 else [], found)
+        elif kind == 'EditorialData':
+            notes(event[1], found)
+            if len(event) > 2 and len(event[2]) > 2:
+                notes(event[2][2], found)
+    return found
+
+
+class TestJSONExport(unittest.TestCase):
+    def test_events(self):
+        exporter = JSONExporter()
+        note = NoteEvent('Brevis', Pitch('C', 3), 'Recta', None, ModernText(['Sa'], False))
+        rest = RestEvent('Semibrevis', None, None, 0, None)
+        section = MusicSection(MensuralMusic(1, None, [], [Voice(2, [], EventList([note, rest]))]))
+        encoded = exporter.section(section)
+        self.assertEqual({'type': 'MensuralMusic', 'voices': [[2, [[9, 5, 23, 1, None, None, 0], [12, 4, 0]]]],
+                          'strings': ['Sa']}, encoded)
+        # The strings are only given by the first section that uses them
+        self.assertEqual([], exporter.section(section)['strings'])
+
+    def test_streamed_while_parsing(self):
+        xml_string = read('Anonymous-CibavitEos-BrusBRIV922.cmme.xml')
+        piece = Piece.parse(xml_string)
+        output = io.StringIO()
+        Piece.parse(xml_string, visitor=JSONStreamWriter(output))
+        self.assertEqual(to_json(piece), output.getvalue())
+        chunks = list(iter_chunks(piece))
+        self.assertEqual(1 + len(piece.music_sections), len(chunks))
+        document = json.loads(output.getvalue())
+        self.assertEqual(json.loads(chunks[1]), document['sections'][0])
+        self.assertEqual('Cibavit eos', document['piece']['title'])
+        self.assertEqual(list(EVENT_TYPES), document['tables']['events'])
+        # A section is decoded with the strings of the sections before it
+        strings = []
+        for music_section, section in zip(piece.music_sections, document['sections']):
+            strings += section['strings']
+            for voice, (voice_num, events) in zip(music_section.content.voices, section['voices']):
+                self.assertEqual(voice.voice_num, voice_num)
+                expected = []
+                for event in voice.event_list.events:
+                    expected += [item for item in walk_notes(event)]
+                decoded = notes(events, [])
+                self.assertEqual([diatonic_step(note.pitch) for note in expected], [note[2] for note in decoded])
+                self.assertEqual([note.modern_text.syllables[0] if note.modern_text else None for note in expected],
+                                 [strings[note[6]] if len(note) > 6 and note[6] is not None else None
+                                  for note in decoded])
+                self.assertEqual([bool(note.modern_text and note.modern_text.has_word_end) for note in expected],
+                                 [bool(len(note) > 5 and note[5] and note[5] & FLAGS['word_end']) for note in decoded])
+
+    def test_compact(self):
+        for filename in sorted(os.listdir(RESOURCES)):
+            piece = Piece.parse(read(filename))
+            reflected = json.dumps(piece, default=lambda value: value.__dict__)
+            with self.subTest(filename=filename):
+                self.assertLess(len(to_json(piece)) * 4, len(reflected))
+
+
+def walk_notes(event):
+    name = type(event).__name__
+    if name == 'NoteEvent':
+        yield event
+    elif name == 'MultiEvent':
+        for item in event.events:
+            yield from walk_notes(item)
+    elif name == 'VariantReadings':
+        for reading in event.readings:
+            for item in reading.music_events:
+                yield from walk_notes(item)
+    elif name == 'EditorialData':
+        for item in event.new_reading:
+            yield from walk_notes(item)
+        if event.original_reading is not None:
+            for item in event.original_reading.music_events:
+                yield from walk_notes(item)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import unittest
+
+from analysis.notes import NoteCollector, notes
+from analysis.statistics import StatisticsCollector, collect
+from model import Piece
+from model.music_section import EventList, Voice
+from model.note import NoteEvent
+from model.visitor import SKIP, Traversal, Visitor, method_suffix, walk
+
+RESOURCES = os.path.join(os.path.dirname(__file__), 'resources')
+
+
+class PlainchantNotes(Visitor):
+    def __init__(self):
+        self.notes = []
+
+    def enter_mensural_music(self, mensural_music):
+        return SKIP
+
+    def enter_note_event(self, note):
+        self.notes.append(note)
+
+
+class Recorder(Visitor):
+    def __init__(self):
+        self.calls = []
+
+    def enter_abstract_music_section_content(self, content):
+        self.calls.append(('enter', type(content).__name__))
+
+    def enter_voice(self, voice):
+        self.calls.append(('enter', 'voice'))
+
+    def leave_voice(self, voice):
+        self.calls.append(('leave', 'voice'))
+
+    def enter_event(self, event):
+        self.calls.append(('enter', type(event).__name__))
+
+
+class VoiceCounter(Visitor):
+    def __init__(self):
+        self.voices = 0
+
+    def enter_voice(self, voice):
+        self.voices += 1
+
+
+class TestVisitor(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open(os.path.join(RESOURCES, 'Anonymous-CibavitEos-BrusBRIV922.cmme.xml')) as file:
+            cls.xml_string = file.read()
+        cls.piece = Piece.parse(cls.xml_string)
+
+    def test_method_suffix(self):
+        self.assertEqual('note_event', method_suffix(NoteEvent))
+        self.assertEqual('event_list', method_suffix(EventList))
+        self.assertEqual('modern_key_signature_event', method_suffix(type('ModernKeySignatureEvent', (), {})))
+
+    def test_dispatch_along_the_mro(self):
+        recorder = Recorder()
+        walk(self.piece.music_sections[0], recorder)
+        events = self.piece.music_sections[0].content.voices[0].event_list.events
+        self.assertEqual([('enter', 'Plainchant'), ('enter', 'voice')] +
+                         [('enter', type(event).__name__) for event in events] + [('leave', 'voice')],
+                         recorder.calls)
+
+    def test_skip(self):
+        visitor = PlainchantNotes()
+        walk(self.piece, visitor)
+        expected = [note for music_section in self.piece.music_sections
+                    if type(music_section.content).__name__ == 'Plainchant'
+                    for voice in music_section.content.voices for note in notes(voice.event_list.events)]
+        self.assertEqual(42, len(visitor.notes))
+        self.assertEqual(expected, visitor.notes)
+
+    def test_irrelevant_subtrees_are_not_visited(self):
+        counter = VoiceCounter()
+        traversal = Traversal(counter)
+        traversal.walk(self.piece)
+        self.assertEqual(15, counter.voices)
+        # The event lists were never reached
+        _, _, relevant, _ = traversal.table[Voice]
+        self.assertEqual([False], relevant)
+        self.assertNotIn(EventList, traversal.table)
+
+    def test_fused_visitors(self):
+        statistics, plainchant, collector = StatisticsCollector(), PlainchantNotes(), NoteCollector()
+        piece = Piece.parse(self.xml_string, visitor=Traversal(statistics, plainchant, collector))
+        self.assertEqual(collect(piece).to_dict(), statistics.statistics.to_dict())
+        self.assertEqual(42, len(plainchant.notes))
+        self.assertEqual([note for music_section in piece.music_sections for voice in music_section.content.voices
+                          for note in notes(voice.event_list.events)], collector.notes)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+import io
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from collections import Counter
+
+from model import Piece
+from model.custos import CustosEvent
+from model.dot import DotEvent
+from model.pitch import Pitch
+from model.recovery import UnparsedEvent
+from model.visitor import Visitor, walk
+from model.hashing import content_hash
+from model.writer import CMMEWriter
+from schema.validation import Validator
+
+RESOURCES = os.path.join(os.path.dirname(__file__), 'resources')
+
+
+class EventCollector(Visitor):
+    def __init__(self):
+        self.events = []
+
+    def enter_event(self, event):
+        self.events.append(event)
+
+
+def events(piece):
+    # The events of a piece, including those of the readings
+    collector = EventCollector()
+    walk(piece, collector)
+    return collector.events
+
+
+def element_pairs(xml_string):
+    # The number of times each element occurs under each parent, by their local names
+    counts = Counter()
+    for parent in ET.fromstring(xml_string).iter():
+        for child in parent:
+            counts[parent.tag.split('}')[-1], child.tag.split('}')[-1]] += 1
+    return counts
+
+
+class TestWriter(unittest.TestCase):
+    def test_round_trip(self):
+        for filename in sorted(os.listdir(RESOURCES)):
+            with self.subTest(filename=filename):
+                with open(os.path.join(RESOURCES, filename)) as file:
+                    piece = Piece.parse(file.read())
+                written = piece.to_string()
+                reparsed = Piece.parse(written)
+                self.assertEqual(content_hash(piece), content_hash(reparsed))
+                self.assertTrue(piece.same_content(reparsed))
+                self.assertEqual(written, reparsed.to_string())
+
+    def test_written_scores_are_valid(self):
+        validator = Validator()
+        for filename in sorted(os.listdir(RESOURCES)):
+            with self.subTest(filename=filename):
+                with open(os.path.join(RESOURCES, filename)) as file:
+                    written = Piece.parse(file.read()).to_string()
+                self.assertEqual([], validator.validate_string(written))
+
+    def test_kept_elements(self):
+        with open(os.path.join(RESOURCES, 'Editorial-Synthetic.cmme.xml')) as file:
+            written = Piece.parse(file.read()).to_string()
+        # A dot placed by its staff location only
+        self.assertIn(DotEvent(Pitch(None, None, 4)), list(events(Piece.parse(written))))
+
+        with open(os.path.join(RESOURCES, 'Anonymous-CibavitEos-BrusBRIV922.cmme.xml')) as file:
+            piece = Piece.parse(file.read())
+        # The MiscItems that the model does not represent (here a Lacuna) are written back as they were
+        unparsed = [event for event in events(piece) if isinstance(event, UnparsedEvent)]
+        self.assertEqual(['MiscItem', 'MiscItem'], [event.tag for event in unparsed])
+        self.assertEqual(unparsed, [event for event in events(Piece.parse(piece.to_string()))
+                                    if isinstance(event, UnparsedEvent)])
+
+    def test_written_elements(self):
+        # Every element of the resources is written back, under the same parent
+        for filename in sorted(os.listdir(RESOURCES)):
+            with self.subTest(filename=filename):
+                with open(os.path.join(RESOURCES, filename)) as file:
+                    source = file.read()
+                self.assertEqual(element_pairs(source), element_pairs(Piece.parse(source).to_string()))
+
+    def test_unwritable_events(self):
+        with self.assertRaises(ValueError):
+            DotEvent(None).to_xml(CMMEWriter(io.StringIO()))
+        with self.assertRaises(ValueError):
+            CustosEvent(Pitch(None, None)).to_xml(CMMEWriter(io.StringIO()))
+
+    def test_write_to_file(self):
+        with open(os.path.join(RESOURCES, 'LaRue-OSalutarisHostia.cmme.xml')) as file:
+            piece = Piece.parse(file.read())
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'piece.cmme.xml')
+            piece.write(path)
+            with open(path, encoding='utf-8') as file:
+                self.assertEqual(piece.to_string(), file.read())
+
+    def test_streaming(self):
+        output = io.StringIO()
+        writer = CMMEWriter(output, buffered_parts=4)
+        writer.start('EventList')
+        for _ in range(3):
+            writer.start('Note')
+            writer.element('Type', 'Semibrevis')
+            writer.flag('Colored', True)
+            writer.end('Note')
+        self.assertTrue(output.getvalue())
+        writer.start('Proportion')
+        writer.end('Proportion')
+        writer.element('Phrase', 'a < b & c')
+        writer.end('EventList')
+        writer.close()
+        self.assertTrue(output.getvalue().endswith('\n  <Proportion/>\n  <Phrase>a &lt; b &amp; c</Phrase>\n'
+                                                   '</EventList>\n'))
+
+    def test_small_buffer(self):
+        # An element is not collapsed after a flush, whatever the number of parts written in it since
+        output = io.StringIO()
+        writer = CMMEWriter(output, buffered_parts=4)
+        writer.start('a')
+        writer.start('b')
+        writer.element('x', 1)
+        writer.end('b')
+        writer.element('y', 2)
+        writer.element('z', 3)
+        writer.end('a')
+        writer.close()
+        self.assertEqual('\n<a>\n  <b>\n    <x>1</x>\n  </b>\n  <y>2</y>\n  <z>3</z>\n</a>\n', output.getvalue())
+
+        for filename in sorted(os.listdir(RESOURCES)):
+            with self.subTest(filename=filename):
+                with open(os.path.join(RESOURCES, filename)) as file:
+                    piece = Piece.parse(file.read())
+                output = io.StringIO()
+                writer = CMMEWriter(output, buffered_parts=3)
+                writer.declaration()
+                piece.to_xml(writer)
+                writer.close()
+                ET.fromstring(output.getvalue())
+                self.assertEqual(piece.to_string(), output.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,3 @@
+"""
+Export of the model for the web viewer.
+"""
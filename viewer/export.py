@@ -0,0 +1,338 @@
+"""
+Compact JSON export of a Piece, for the web viewer.
+
+The document is written to a stream one MusicSection at a time, so that the viewer can show the first sections while
+the others are loading:
+
+    {"format": "cmme-json", "version": 1,
+     "tables": {"events": [...], "noteTypes": [...], "letters": "ABCDEFG"},
+     "piece": {"title": ..., "composer": ..., "editor": ..., "incipit": ..., "voices": [...], "versions": [...]},
+     "sections": [SECTION, ...]}
+
+A SECTION is {"type": ..., "strings": [...], "voices": [[VOICE_NUM, [EVENT, ...]], ...]} (a Text section has "text"
+instead of voices). The strings used by the events (clef appearances, syllables, phrases, variant version ids...) are
+numbers in a table that grows along the document: each section gives the strings it adds to it, so that a section can
+be decoded as soon as it has been received, given the ones before it.
+
+An EVENT is an array whose first item is the index of its class in tables.events, followed by its fields in a fixed
+order (see ENCODERS); the fields at the end that are null are left out. Note types are indices in tables.noteTypes,
+and pitches are diatonic steps from A0 (step % 7 is the index of the letter in tables.letters, and step // 7 the
+octave); an incomplete pitch is null. The flags of an event are a bit mask of FLAGS (null for none), and ligatures and
+stem directions are codes (LIGATURES, STEM_DIRECTIONS).
+
+Usage (from the repository root):
+    python -m viewer.export INPUT.cmme.xml [OUTPUT.json]
+"""
+import io
+import json
+import sys
+from typing import Callable, Dict, Iterator, List, Optional, TextIO, Union
+
+from model import Piece
+from model.columns import EVENT_KINDS, MISSING, NOTE_TYPES, PITCH_LETTERS, diatonic_step
+from model.visitor import Visitor
+
+FORMAT = 'cmme-json'
+FORMAT_VERSION = 1
+
+# The classes of the events, by index, as given in tables.events
+EVENT_TYPES = EVENT_KINDS + ('UnparsedEvent',)
+EVENT_TYPE_CODES = {name: code for code, name in enumerate(EVENT_TYPES)}
+NOTE_TYPE_INDICES = {name: index for index, name in enumerate(NOTE_TYPES)}
+
+# Bits of the flags
+FLAGS = {'colored': 1, 'ambiguous': 2, 'editorial': 4, 'error': 8, 'word_end': 16, 'signature': 32, 'lacuna': 64,
+         'page_end': 128, 'dot': 256, 'no_score_effect': 512, 'preferred_reading': 1024}
+
+LIGATURES = {'Recta': 1, 'Obliqua': 2}
+STEM_DIRECTIONS = {'Up': 1, 'Down': 2}
+
+SEPARATORS = (',', ':')
+
+
+def pitch_step(pitch) -> Optional[int]:
+    step = diatonic_step(pitch)
+    return step if step != MISSING else None
+
+
+def attribute_flags(event_attributes) -> int:
+    if event_attributes is None:
+        return 0
+    return ((FLAGS['colored'] if event_attributes.colored else 0) |
+            (FLAGS['ambiguous'] if event_attributes.ambiguous else 0) |
+            (FLAGS['editorial'] if event_attributes.editorial else 0) |
+            (FLAGS['error'] if event_attributes.error else 0))
+
+
+def trim(fields: list) -> list:
+    """
+    Drops the null fields at the end of an event.
+    """
+    end = len(fields)
+    while end > 1 and fields[end - 1] is None:
+        end -= 1
+    return fields[:end] if end < len(fields) else fields
+
+
+class StringTable:
+    """
+    The strings of a document by number, with the ones added since the last section.
+    """
+    def __init__(self):
+        self.numbers: Dict[str, int] = {}
+        self.added: List[str] = []
+
+    def number(self, string: Optional[str]) -> Optional[int]:
+        if string is None:
+            return None
+        number = self.numbers.get(string)
+        if number is None:
+            number = self.numbers[string] = len(self.numbers)
+            self.added.append(string)
+        return number
+
+    def take_added(self) -> List[str]:
+        added, self.added = self.added, []
+        return added
+
+
+class JSONExporter:
+    """
+    Encodes a piece in the compact schema: its header, then its sections one at a time (with the strings they add).
+    """
+    def __init__(self):
+        self.strings = StringTable()
+
+    @staticmethod
+    def header(piece: Piece) -> dict:
+        general_data = piece.general_data
+        return {'format': FORMAT, 'version': FORMAT_VERSION,
+                'tables': {'events': list(EVENT_TYPES), 'noteTypes': list(NOTE_TYPES), 'letters': PITCH_LETTERS},
+                'piece': {'title': general_data.title, 'composer': general_data.composer,
+                          'editor': general_data.editor, 'incipit': general_data.incipit,
+                          'voices': [voice.name for voice in piece.voice_data.voices],
+                          'versions': [variant_version.id_ for variant_version in general_data.variant_versions or []]}}
+
+    def section(self, music_section) -> dict:
+        """
+        Encodes a MusicSection, with the strings it adds to the table.
+        """
+        content = music_section.content
+        if content.section_type == 'Text':
+            encoded = {'type': content.section_type, 'text': content.content}
+        else:
+            encoded = {'type': content.section_type,
+                       'voices': [[voice.voice_num, self.events(voice.event_list.events)
+                                   if voice.event_list is not None else []] for voice in content.voices]}
+        encoded['strings'] = self.strings.take_added()
+        return encoded
+
+    def events(self, events: list) -> list:
+        encoded = []
+        for event in events:
+            if event is None:
+                continue
+            encoder = ENCODERS.get(type(event).__name__)
+            if encoder is not None:
+                encoded.append(trim(encoder(self, event)))
+        return encoded
+
+    def note(self, note) -> list:
+        flags = attribute_flags(note.event_attributes)
+        syllables = None
+        if note.modern_text is not None:
+            if note.modern_text.has_word_end:
+                flags |= FLAGS['word_end']
+            numbers = [self.strings.number(syllable) for syllable in note.modern_text.syllables]
+            syllables = numbers[0] if len(numbers) == 1 else numbers or None
+        length = note.length
+        return [EVENT_TYPE_CODES['NoteEvent'], NOTE_TYPE_INDICES.get(note.note_type), pitch_step(note.pitch),
+                LIGATURES.get(note.lig), STEM_DIRECTIONS.get(note.stem_dir), flags or None, syllables,
+                length.num if length is not None else None, length.den if length is not None else None,
+                self.commentary(note.event_attributes)]
+
+    def rest(self, rest) -> list:
+        return [EVENT_TYPE_CODES['RestEvent'], NOTE_TYPE_INDICES.get(rest.rest_type), rest.bottom_staff_line,
+                rest.num_spaces, rest.length_num, rest.length_den]
+
+    def clef(self, clef) -> list:
+        flags = attribute_flags(clef.event_attributes) | (FLAGS['signature'] if clef.signature else 0)
+        return [EVENT_TYPE_CODES['ClefEvent'], self.strings.number(clef.appearance), clef.staff_loc,
+                pitch_step(clef.pitch), flags or None, self.commentary(clef.event_attributes)]
+
+    def mensuration(self, mensuration) -> list:
+        mens_info = mensuration.mens_info or {}
+        flags = (attribute_flags(mensuration.event_attributes) | (FLAGS['dot'] if mensuration.dot else 0) |
+                 (FLAGS['no_score_effect'] if mensuration.no_score_effect else 0))
+        number = mensuration.number
+        levels = [mens_info.get(level) for level in ('modus_maior', 'modus_minor', 'tempus', 'prolatio')]
+        return [EVENT_TYPE_CODES['MensurationEvent'], self.strings.number(mensuration.main_symbol), mensuration.strokes,
+                self.strings.number(mensuration.orientation), number.num if number is not None else None,
+                number.den if number is not None else None, mensuration.staff_loc,
+                levels if any(level is not None for level in levels) else None, flags or None]
+
+    def color_change(self, color_change) -> list:
+        return [EVENT_TYPE_CODES['ColorChangeEvent'], self.colors(color_change.primary_color),
+                self.colors(color_change.secondary_color)]
+
+    def colors(self, color_and_fill) -> Optional[list]:
+        if color_and_fill is None:
+            return None
+        return [self.strings.number(color_and_fill.color), self.strings.number(color_and_fill.fill)]
+
+    def custos(self, custos) -> list:
+        return [EVENT_TYPE_CODES['CustosEvent'], pitch_step(custos.pitch)]
+
+    def dot(self, dot) -> list:
+        return [EVENT_TYPE_CODES['DotEvent'], pitch_step(dot.pitch)]
+
+    def key_signature(self, key_signature) -> list:
+        return [EVENT_TYPE_CODES['ModernKeySignatureEvent'], self.strings.number(key_signature.accidental),
+                self.strings.number(key_signature.pitch_class)]
+
+    def line_end(self, line_end) -> list:
+        return [EVENT_TYPE_CODES['LineEndEvent'], FLAGS['page_end'] if line_end.page_end else None]
+
+    def misc_item(self, misc_item) -> list:
+        return [EVENT_TYPE_CODES['MiscItemEvent'], misc_item.num_lines]
+
+    def multi_event(self, multi_event) -> list:
+        return [EVENT_TYPE_CODES['MultiEvent'], self.events(multi_event.events)]
+
+    def original_text(self, original_text) -> list:
+        return [EVENT_TYPE_CODES['OriginalTextEvent'], self.strings.number(original_text.phrase)]
+
+    def proportion(self, proportion_event) -> list:
+        proportion = proportion_event.proportion
+        return [EVENT_TYPE_CODES['ProportionEvent'], proportion.num if proportion is not None else None,
+                proportion.den if proportion is not None else None]
+
+    def variant_readings(self, variant_readings) -> list:
+        return [EVENT_TYPE_CODES['VariantReadings'], [self.reading(reading) for reading in variant_readings.readings]]
+
+    def editorial_data(self, editorial_data) -> list:
+        original = editorial_data.original_reading
+        return [EVENT_TYPE_CODES['EditorialData'], self.events(editorial_data.new_reading),
+                self.reading(original) if original is not None else None]
+
+    def reading(self, reading) -> list:
+        """
+        Encodes a Reading or OriginalReading as [version ids, flags, events], the flags being those of a lacuna, an
+        error and the preferred reading.
+        """
+        flags = ((FLAGS['lacuna'] if reading.lacuna else 0) |
+                 (FLAGS['error'] if reading.error else 0) |
+                 (FLAGS['preferred_reading'] if reading.preferred_reading else 0))
+        return trim([[self.strings.number(version_id) for version_id in reading.variant_version_ids],
+                     flags or None, self.events(reading.music_events)])
+
+    def unparsed(self, unparsed) -> list:
+        return [EVENT_TYPE_CODES['UnparsedEvent'], self.strings.number(unparsed.tag)]
+
+    def commentary(self, event_attributes) -> Optional[int]:
+        if event_attributes is None:
+            return None
+        return self.strings.number(event_attributes.editorial_commentary)
+
+
+# The encoder of each class of event, by class name
+ENCODERS: Dict[str, Callable[[JSONExporter, object], list]] = {
+    'NoteEvent': JSONExporter.note,
+    'RestEvent': JSONExporter.rest,
+    'ClefEvent': JSONExporter.clef,
+    'MensurationEvent': JSONExporter.mensuration,
+    'ColorChangeEvent': JSONExporter.color_change,
+    'CustosEvent': JSONExporter.custos,
+    'DotEvent': JSONExporter.dot,
+    'ModernKeySignatureEvent': JSONExporter.key_signature,
+    'LineEndEvent': JSONExporter.line_end,
+    'MiscItemEvent': JSONExporter.misc_item,
+    'MultiEvent': JSONExporter.multi_event,
+    'OriginalTextEvent': JSONExporter.original_text,
+    'ProportionEvent': JSONExporter.proportion,
+    'VariantReadings': JSONExporter.variant_readings,
+    'EditorialData': JSONExporter.editorial_data,
+    'UnparsedEvent': JSONExporter.unparsed,
+}
+
+
+def dumps(value) -> str:
+    return json.dumps(value, separators=SEPARATORS, ensure_ascii=False)
+
+
+class JSONStreamWriter(Visitor):
+    """
+    Writes the document to a stream as the piece is visited, a section at a time: walk a parsed piece with it, or give
+    it to Piece.parse to write each section as soon as it is parsed.
+    """
+    def __init__(self, file: TextIO):
+        self.file = file
+        self.exporter = JSONExporter()
+        self.sections = 0
+
+    def enter_piece(self, piece):
+        # The sections are written in the array that ends the header
+        self.file.write(dumps(JSONExporter.header(piece))[:-1] + ',"sections":[')
+
+    def leave_music_section(self, music_section):
+        if self.sections:
+            self.file.write(',')
+        self.file.write(dumps(self.exporter.section(music_section)))
+        self.sections += 1
+
+    def leave_piece(self, piece):
+        self.file.write(']}')
+
+
+def iter_chunks(piece: Piece) -> Iterator[str]:
+    """
+    Yields the header of a piece and then each of its sections, as separate JSON texts (e.g. to be sent as JSON lines
+    for progressive loading).
+    """
+    exporter = JSONExporter()
+    yield dumps(exporter.header(piece))
+    for music_section in piece.music_sections:
+        yield dumps(exporter.section(music_section))
+
+
+def write_json(piece: Piece, file: Union[str, TextIO]):
+    """
+    Writes a piece as a compact JSON document, one section at a time.
+    """
+    if isinstance(file, str):
+        with open(file, 'w', encoding='utf-8') as opened:
+            write_json(piece, opened)
+        return
+    writer = JSONStreamWriter(file)
+    writer.enter_piece(piece)
+    for music_section in piece.music_sections:
+        writer.leave_music_section(music_section)
+    writer.leave_piece(piece)
+
+
+def to_json(piece: Piece) -> str:
+    """
+    Returns a piece as a compact JSON document.
+    """
+    output = io.StringIO()
+    write_json(piece, output)
+    return output.getvalue()
+
+
+def main(argv: List[str]) -> int:
+    if not argv or len(argv) > 2:
+        print(__doc__, file=sys.stderr)
+        return 2
+    with open(argv[0]) as source:
+        xml_string = source.read()
+    if len(argv) == 1:
+        Piece.parse(xml_string, visitor=JSONStreamWriter(sys.stdout))
+        return 0
+    with open(argv[1], 'w', encoding='utf-8') as file:
+        # Each section is written as soon as it is parsed
+        Piece.parse(xml_string, visitor=JSONStreamWriter(file))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))